@@ -2,3 +2,11 @@
 AkShare Service Package
 """
 __version__ = "0.1.0"
+
+
+import os as _os
+
+# AKSHARE_HTTP_MODE=record/replay 时，AkShare 内部的 requests 调用也走录制/回放
+if _os.environ.get('AKSHARE_HTTP_MODE', 'live').lower() != 'live':
+    from akshare_service.infra.replay import activate_from_env as _activate_replay
+    _activate_replay()
@@ -3,11 +3,16 @@ TuShare 数据源适配器
 提供标准化的 TuShare 接口封装
 """
 
-import tushare as ts
-import pandas as pd
+from __future__ import annotations
+
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import os
+from akshare_service.infra.lazy import lazy_import
+
+# 重依赖在首次使用时才导入，见 infra/lazy.py
+ts = lazy_import('tushare')
+pd = lazy_import('pandas')
 
 # TuShare Token 配置
 # 优先从环境变量获取，否则使用默认值
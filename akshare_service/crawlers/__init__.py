@@ -1,6 +1,7 @@
 # 东方财富爬虫模块
 # 提供直接 API 调用，作为 AkShare 的兜底方案
 
-from .eastmoney_api import EastMoneyAPI
+from .eastmoney_api import EastMoneyAPI, EastMoneyRequestError
+from .period_snapshot import PeriodSnapshot, sync_period_snapshot, get_period_record, get_code_history
 
-__all__ = ['EastMoneyAPI']
\ No newline at end of file
+__all__ = ['EastMoneyAPI', 'EastMoneyRequestError', 'PeriodSnapshot', 'sync_period_snapshot', 'get_period_record', 'get_code_history']
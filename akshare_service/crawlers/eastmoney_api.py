@@ -4,12 +4,29 @@
 作为 AkShare 接口的兜底方案
 """
 
+from __future__ import annotations
+
+import logging
 import requests
-import pandas as pd
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import time
 
+from akshare_service.infra import codec, events, metrics, replay
+from akshare_service.infra.lazy import lazy_import
+
+# 重依赖在首次使用时才导入，见 infra/lazy.py
+pd = lazy_import('pandas')
+
+
+class EastMoneyRequestError(Exception):
+    """请求在重试后仍失败（区别于成功响应但没有数据）"""
+
+    def __init__(self, message: str, pages: Optional[List[int]] = None):
+        super().__init__(message)
+        self.pages = pages or []
+
 
 class EastMoneyAPI:
     """东方财富数据 API"""
@@ -27,6 +44,71 @@ class EastMoneyAPI:
         "valuation": "RPT_VALUE_ANALYSIS",      # 估值分析
     }
     
+    # 报告期字段（按报告期拉取全市场时用于过滤）
+    REPORT_DATE_FIELDS = {
+        "indicator": "REPORTDATE",
+        "balance": "REPORT_DATE",
+        "income": "REPORT_DATE",
+        "cashflow": "REPORT_DATE",
+    }
+    
+    # 字段映射
+    COLUMN_MAPS = {
+        "indicator": {
+            'REPORTDATE': 'report_date',
+            'SECURITY_CODE': 'code',
+            'SECURITY_NAME_ABBR': 'name',
+            'BASIC_EPS': 'eps',
+            'WEIGHTAVG_ROE': 'roe',
+            'TOTAL_OPERATE_INCOME': 'revenue',
+            'PARENT_NETPROFIT': 'net_profit',
+            'XSMLL': 'gross_margin',
+            'BPS': 'bps',
+            'MGJYXJJE': 'ocf_per_share',
+            'YSTZ': 'revenue_yoy',
+            'SJLTZ': 'profit_yoy',
+        },
+        "balance": {
+            'REPORT_DATE': 'report_date',
+            'REPORTDATE': 'report_date',  # 兼容两种格式
+            'SECURITY_CODE': 'code',
+            'TOTAL_ASSETS': 'total_assets',
+            'TOTAL_LIABILITIES': 'total_liabilities',
+            'TOTAL_EQUITY': 'total_equity',
+            'MONETARYFUNDS': 'cash',
+            'TOTAL_CURRENT_ASSETS': 'current_assets',
+            'TOTAL_CURRENT_LIABILITIES': 'current_liabilities',
+        },
+        "income": {
+            'REPORT_DATE': 'report_date',
+            'REPORTDATE': 'report_date',  # 兼容两种格式
+            'SECURITY_CODE': 'code',
+            'TOTAL_OPERATE_INCOME': 'revenue',
+            'TOTAL_OPERATE_COST': 'operate_cost',
+            'OPERATE_PROFIT': 'operate_profit',
+            'TOTAL_PROFIT': 'total_profit',
+            'PARENT_NETPROFIT': 'net_profit',
+            'INCOME_TAX': 'income_tax',
+        },
+        "cashflow": {
+            'REPORT_DATE': 'report_date',
+            'REPORTDATE': 'report_date',  # 兼容两种格式
+            'SECURITY_CODE': 'code',
+            'NETCASH_OPERATE': 'operating_cf',
+            'NETCASH_INVEST': 'investing_cf',
+            'NETCASH_FINANCE': 'financing_cf',
+        },
+    }
+    
+    # 需要转为亿元的字段
+    AMOUNT_COLUMNS = {
+        "indicator": ['revenue', 'net_profit'],
+        "balance": ['total_assets', 'total_liabilities', 'total_equity', 'cash',
+                    'current_assets', 'current_liabilities'],
+        "income": ['revenue', 'operate_cost', 'operate_profit', 'total_profit', 'net_profit', 'income_tax'],
+        "cashflow": [],
+    }
+    
     def __init__(self, timeout: int = 30, max_retries: int = 3):
         self.timeout = timeout
         self.max_retries = max_retries
@@ -35,32 +117,271 @@ class EastMoneyAPI:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Referer': 'https://data.eastmoney.com/',
         })
+        # AKSHARE_HTTP_MODE=record/replay 时挂载录制/回放 Adapter
+        replay.install(self.session)
     
-    def _request(self, params: dict) -> Optional[dict]:
-        """发送请求"""
-        for attempt in range(self.max_retries):
-            try:
-                response = self.session.get(
-                    self.BASE_URL,
-                    params=params,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if data.get('success') and data.get('result'):
-                    return data['result']
-                else:
-                    return None
+    def _request(self, params: dict, strict: bool = False) -> Optional[dict]:
+        """
+        发送请求
+
+        Args:
+            params: 请求参数
+            strict: True 时重试后仍失败抛出 EastMoneyRequestError；否则失败与无数据一样返回 None
+
+        Returns:
+            result 字段；成功响应但没有数据时为 None
+        """
+        report = params.get('reportName', '')
+        with metrics.timer('akshare_upstream_request_seconds', upstream='eastmoney', report=report,
+                           span='http.eastmoney', span_attributes={
+                               'http.url': self.BASE_URL,
+                               'page': params.get('pageNumber'),
+                               'filter': params.get('filter'),
+                           }) as call:
+            for attempt in range(self.max_retries):
+                call.span.set_attribute('retry_count', attempt)
+                try:
+                    response = self.session.get(
+                        self.BASE_URL,
+                        params=params,
+                        timeout=self.timeout
+                    )
+                    response.raise_for_status()
+                    call.span.set_attribute('http.status_code', response.status_code)
+                    call.span.set_attribute('bytes_received', len(response.content))
+                    metrics.inc('akshare_upstream_bytes_total', len(response.content),
+                                upstream='eastmoney', report=report)
+                    data = codec.loads(response.content)
                     
-            except Exception as e:
-                if attempt < self.max_retries - 1:
-                    time.sleep(1)
+                    if data.get('success') and data.get('result'):
+                        return data['result']
+                    else:
+                        call.outcome = 'empty'
+                        return None
+                        
+                except Exception as e:
+                    if attempt < self.max_retries - 1:
+                        time.sleep(1)
+                        continue
+                    call.outcome = 'error'
+                    call.span.record_exception(e)
+                    events.warning('upstream.request_failed', upstream='eastmoney', report=report,
+                                   retries=attempt, error=str(e))
+                    if strict:
+                        page = params.get('pageNumber')
+                        raise EastMoneyRequestError(f"{report} 第 {page} 页请求失败: {e}",
+                                                    pages=[page] if page else None) from e
+                    return None
+            
+            return None
+    
+    @classmethod
+    def _normalize_frame(cls, df: pd.DataFrame, kind: str) -> pd.DataFrame:
+        """字段映射 + 金额转为亿元"""
+        df = df.rename(columns=cls.COLUMN_MAPS[kind])
+        for col in cls.AMOUNT_COLUMNS[kind]:
+            if col in df.columns:
+                df[col] = df[col] / 1e8
+        return df
+    
+    def iter_report(self, report_name: str, filter: Optional[str] = None, page_size: int = 500,
+                    columns: str = "ALL", sort_columns: Optional[str] = None,
+                    sort_types: Optional[str] = None, as_records: bool = False,
+                    max_rows: Optional[int] = None) -> Iterator[Union[pd.DataFrame, Dict[str, Any]]]:
+        """
+        分页流式获取报表数据（生成器）
+        
+        每次只请求一页，消费完再请求下一页；调用方 break 即停止翻页，
+        全市场报表也只占用一页大小的内存。成功响应但没有数据、或到达最后一页时结束；
+        某页重试后仍失败时抛出 EastMoneyRequestError，不会把截断的结果当作完整数据。
+        
+        Args:
+            report_name: 报表名称，如 "RPT_LICO_FN_CPD"，也可用 REPORT_TYPES 中的简称（如 "indicator"）
+            filter: 过滤条件，如 '(SECURITY_CODE="300760")'，为空则拉取全部
+            page_size: 每页条数
+            columns: 返回字段
+            sort_columns: 排序字段（全市场翻页时建议指定，保证分页稳定）
+            sort_types: 排序方向，1 升序 / -1 降序
+            as_records: True 时逐条返回 dict，否则每页返回一个 DataFrame
+            max_rows: 最多返回条数，达到后停止翻页
+        
+        Yields:
+            DataFrame（每页一块）或 dict（逐条记录）
+        
+        Raises:
+            EastMoneyRequestError: 某页请求失败
+        """
+        report_name = self.REPORT_TYPES.get(report_name, report_name)
+        page = 1
+        emitted = 0
+        
+        while True:
+            params = {
+                "reportName": report_name,
+                "columns": columns,
+                "pageSize": page_size,
+                "pageNumber": page
+            }
+            if filter:
+                params["filter"] = filter
+            if sort_columns:
+                params["sortColumns"] = sort_columns
+                params["sortTypes"] = sort_types or "1"
+            
+            try:
+                result = self._request(params, strict=True)
+            except EastMoneyRequestError as e:
+                events.emit('eastmoney.page_failed', level=logging.ERROR, report=report_name,
+                            page=page, rows_emitted=emitted, error=str(e))
+                raise
+            if not result or not result.get('data'):
+                return
+            
+            data = result['data']
+            if max_rows is not None:
+                data = data[:max_rows - emitted]
+            emitted += len(data)
+            
+            if as_records:
+                yield from data
+            else:
+                yield pd.DataFrame(data)
+            
+            pages = result.get('pages') or 1
+            if page >= pages or (max_rows is not None and emitted >= max_rows):
+                return
+            page += 1
+    
+    def read_report(self, report_name: str, filter: Optional[str] = None, page_size: int = 500,
+                    max_rows: Optional[int] = None, **kwargs) -> pd.DataFrame:
+        """
+        读取完整报表（自动翻页，合并为一个 DataFrame）
+        
+        Args:
+            report_name: 报表名称或 REPORT_TYPES 简称
+            filter: 过滤条件
+            page_size: 每页条数
+            max_rows: 最多返回条数
+            **kwargs: 透传给 iter_report
+        
+        Returns:
+            DataFrame
+        """
+        chunks = list(self.iter_report(report_name, filter=filter, page_size=page_size,
+                                       max_rows=max_rows, **kwargs))
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True)
+    
+    def iter_pages_concurrent(self, report_name: str, filter: Optional[str] = None,
+                              page_size: int = 500, max_workers: int = 4,
+                              sort_columns: str = "SECURITY_CODE", skip_pages: Iterable[int] = (),
+                              total_pages: Optional[int] = None) -> Iterator[Tuple[int, int, List[Dict[str, Any]]]]:
+        """
+        并发分页拉取报表
+        
+        先请求第 1 页得到总页数，其余页交给线程池并发请求，按完成顺序返回。
+        失败的页不会被当作空页跳过：第 1 页失败立即抛出，其余页在成功页全部返回后
+        统一抛出 EastMoneyRequestError（pages 为失败页码），调用方可据此续传。
+        
+        Args:
+            report_name: 报表名称或 REPORT_TYPES 简称
+            filter: 过滤条件
+            page_size: 每页条数
+            max_workers: 并发线程数
+            sort_columns: 排序字段，保证各页之间不重不漏
+            skip_pages: 已完成的页码（断点续传时跳过）
+            total_pages: 已知总页数（断点续传时可省去第 1 页探测）
+        
+        Yields:
+            (页码, 总页数, 该页记录列表)
+        
+        Raises:
+            EastMoneyRequestError: 有页请求失败
+        """
+        report_name = self.REPORT_TYPES.get(report_name, report_name)
+        skip_pages = set(skip_pages)
+        
+        def fetch(page: int) -> Optional[dict]:
+            params = {
+                "reportName": report_name,
+                "columns": "ALL",
+                "pageSize": page_size,
+                "pageNumber": page,
+                "sortColumns": sort_columns,
+                "sortTypes": "1",
+            }
+            if filter:
+                params["filter"] = filter
+            return self._request(params, strict=True)
+        
+        if total_pages is None or 1 not in skip_pages:
+            first = fetch(1)
+            if not first or not first.get('data'):
+                return
+            total_pages = first.get('pages') or 1
+            if 1 not in skip_pages:
+                yield 1, total_pages, first['data']
+        
+        remaining = [p for p in range(2, total_pages + 1) if p not in skip_pages]
+        failed = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch, page): page for page in remaining}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except EastMoneyRequestError:
+                    failed.append(futures[future])
                     continue
-                print(f"请求失败: {e}")
-                return None
+                # 成功响应但没有数据的页按空页返回，避免断点续传时反复重试
+                yield futures[future], total_pages, (result or {}).get('data') or []
         
-        return None
+        if failed:
+            raise EastMoneyRequestError(f"{report_name} 第 {sorted(failed)} 页请求失败", pages=sorted(failed))
+    
+    def _get_by_period(self, kind: str, report_date: str, page_size: int, max_workers: int) -> pd.DataFrame:
+        """按报告期拉取全市场数据（有页失败时抛出 EastMoneyRequestError，不返回缺页的结果）"""
+        date_field = self.REPORT_DATE_FIELDS[kind]
+        records = []
+        for _, _, data in self.iter_pages_concurrent(
+            kind, filter=f"({date_field}='{report_date}')",
+            page_size=page_size, max_workers=max_workers
+        ):
+            records.extend(data)
+        
+        if not records:
+            return pd.DataFrame()
+        return self._normalize_frame(pd.DataFrame(records), kind)
+    
+    def get_financial_indicator_by_period(self, report_date: str, page_size: int = 500,
+                                          max_workers: int = 4) -> pd.DataFrame:
+        """
+        获取某一报告期全市场财务指标
+        
+        Args:
+            report_date: 报告期，如 "2025-12-31"
+            page_size: 每页条数
+            max_workers: 并发线程数
+        
+        Returns:
+            DataFrame，字段与 get_financial_indicator 一致
+        """
+        return self._get_by_period("indicator", report_date, page_size, max_workers)
+    
+    def get_balance_sheet_by_period(self, report_date: str, page_size: int = 500,
+                                    max_workers: int = 4) -> pd.DataFrame:
+        """获取某一报告期全市场资产负债表"""
+        return self._get_by_period("balance", report_date, page_size, max_workers)
+    
+    def get_income_statement_by_period(self, report_date: str, page_size: int = 500,
+                                       max_workers: int = 4) -> pd.DataFrame:
+        """获取某一报告期全市场利润表"""
+        return self._get_by_period("income", report_date, page_size, max_workers)
+    
+    def get_cashflow_statement_by_period(self, report_date: str, page_size: int = 500,
+                                         max_workers: int = 4) -> pd.DataFrame:
+        """获取某一报告期全市场现金流量表"""
+        return self._get_by_period("cashflow", report_date, page_size, max_workers)
     
     def get_financial_indicator(self, code: str, pagesize: int = 50) -> pd.DataFrame:
         """
@@ -85,31 +406,7 @@ class EastMoneyAPI:
         if not result or not result.get('data'):
             return pd.DataFrame()
         
-        df = pd.DataFrame(result['data'])
-        
-        # 字段映射
-        column_map = {
-            'REPORTDATE': 'report_date',
-            'SECURITY_CODE': 'code',
-            'SECURITY_NAME_ABBR': 'name',
-            'BASIC_EPS': 'eps',
-            'WEIGHTAVG_ROE': 'roe',
-            'TOTAL_OPERATE_INCOME': 'revenue',
-            'PARENT_NETPROFIT': 'net_profit',
-            'XSMLL': 'gross_margin',
-            'BPS': 'bps',
-            'MGJYXJJE': 'ocf_per_share',
-            'YSTZ': 'revenue_yoy',
-            'SJLTZ': 'profit_yoy',
-        }
-        
-        df = df.rename(columns=column_map)
-        
-        # 转换数值
-        df['revenue'] = df['revenue'] / 1e8  # 转为亿元
-        df['net_profit'] = df['net_profit'] / 1e8
-        
-        return df
+        return self._normalize_frame(pd.DataFrame(result['data']), 'indicator')
     
     def get_balance_sheet(self, code: str, pagesize: int = 20) -> pd.DataFrame:
         """
@@ -134,30 +431,7 @@ class EastMoneyAPI:
         if not result or not result.get('data'):
             return pd.DataFrame()
         
-        df = pd.DataFrame(result['data'])
-        
-        # 字段映射
-        column_map = {
-            'REPORT_DATE': 'report_date',
-            'REPORTDATE': 'report_date',  # 兼容两种格式
-            'SECURITY_CODE': 'code',
-            'TOTAL_ASSETS': 'total_assets',
-            'TOTAL_LIABILITIES': 'total_liabilities',
-            'TOTAL_EQUITY': 'total_equity',
-            'MONETARYFUNDS': 'cash',
-            'TOTAL_CURRENT_ASSETS': 'current_assets',
-            'TOTAL_CURRENT_LIABILITIES': 'current_liabilities',
-        }
-        
-        df = df.rename(columns=column_map)
-        
-        # 转换数值（转为亿元）
-        for col in ['total_assets', 'total_liabilities', 'total_equity', 'cash', 
-                    'current_assets', 'current_liabilities']:
-            if col in df.columns:
-                df[col] = df[col] / 1e8
-        
-        return df
+        return self._normalize_frame(pd.DataFrame(result['data']), 'balance')
     
     def get_income_statement(self, code: str, pagesize: int = 20) -> pd.DataFrame:
         """
@@ -182,29 +456,7 @@ class EastMoneyAPI:
         if not result or not result.get('data'):
             return pd.DataFrame()
         
-        df = pd.DataFrame(result['data'])
-        
-        # 字段映射
-        column_map = {
-            'REPORT_DATE': 'report_date',
-            'REPORTDATE': 'report_date',  # 兼容两种格式
-            'SECURITY_CODE': 'code',
-            'TOTAL_OPERATE_INCOME': 'revenue',
-            'TOTAL_OPERATE_COST': 'operate_cost',
-            'OPERATE_PROFIT': 'operate_profit',
-            'TOTAL_PROFIT': 'total_profit',
-            'PARENT_NETPROFIT': 'net_profit',
-            'INCOME_TAX': 'income_tax',
-        }
-        
-        df = df.rename(columns=column_map)
-        
-        # 转换数值
-        for col in ['revenue', 'operate_cost', 'operate_profit', 'total_profit', 'net_profit', 'income_tax']:
-            if col in df.columns:
-                df[col] = df[col] / 1e8
-        
-        return df
+        return self._normalize_frame(pd.DataFrame(result['data']), 'income')
     
     def get_cashflow_statement(self, code: str, pagesize: int = 20) -> pd.DataFrame:
         """
@@ -229,21 +481,7 @@ class EastMoneyAPI:
         if not result or not result.get('data'):
             return pd.DataFrame()
         
-        df = pd.DataFrame(result['data'])
-        
-        # 字段映射
-        column_map = {
-            'REPORT_DATE': 'report_date',
-            'REPORTDATE': 'report_date',  # 兼容两种格式
-            'SECURITY_CODE': 'code',
-            'NETCASH_OPERATE': 'operating_cf',
-            'NETCASH_INVEST': 'investing_cf',
-            'NETCASH_FINANCE': 'financing_cf',
-        }
-        
-        df = df.rename(columns=column_map)
-        
-        return df
+        return self._normalize_frame(pd.DataFrame(result['data']), 'cashflow')
     
     def get_forecast(self, code: str, pagesize: int = 20) -> pd.DataFrame:
         """
@@ -370,38 +608,56 @@ class EastMoneyAPI:
         }
 
 
+# 全局实例（复用 HTTP 连接池，常驻进程中保持连接热）
+_api_instance: Optional[EastMoneyAPI] = None
+
+
+def get_eastmoney_api() -> EastMoneyAPI:
+    """获取全局东方财富 API 实例"""
+    global _api_instance
+    if _api_instance is None:
+        _api_instance = EastMoneyAPI()
+    return _api_instance
+
+
 # 便捷函数
 def get_financial_indicator(code: str) -> pd.DataFrame:
     """获取财务指标"""
-    api = EastMoneyAPI()
+    api = get_eastmoney_api()
     return api.get_financial_indicator(code)
 
 
 def get_balance_sheet(code: str) -> pd.DataFrame:
     """获取资产负债表"""
-    api = EastMoneyAPI()
+    api = get_eastmoney_api()
     return api.get_balance_sheet(code)
 
 
 def get_income_statement(code: str) -> pd.DataFrame:
     """获取利润表"""
-    api = EastMoneyAPI()
+    api = get_eastmoney_api()
     return api.get_income_statement(code)
 
 
 def get_forecast(code: str) -> pd.DataFrame:
     """获取业绩预告"""
-    api = EastMoneyAPI()
+    api = get_eastmoney_api()
     return api.get_forecast(code)
 
 
 def get_valuation(code: str) -> pd.DataFrame:
     """获取估值分析"""
-    api = EastMoneyAPI()
+    api = get_eastmoney_api()
     return api.get_valuation(code)
 
 
 def get_all_financial_data(code: str) -> Dict[str, pd.DataFrame]:
     """获取全部财务数据"""
-    api = EastMoneyAPI()
-    return api.get_all_financial_data(code)
\ No newline at end of file
+    api = get_eastmoney_api()
+    return api.get_all_financial_data(code)
+
+
+def iter_report(report_name: str, filter: Optional[str] = None, page_size: int = 500, **kwargs):
+    """分页流式获取报表数据"""
+    api = get_eastmoney_api()
+    return api.iter_report(report_name, filter=filter, page_size=page_size, **kwargs)
\ No newline at end of file
@@ -0,0 +1,246 @@
+"""
+报告期全市场快照 (Period Snapshot)
+按报告期（如 2025-12-31）分页拉取东方财富全市场财务报表，
+每页落盘并记录断点（含失败页），中断或有页失败后可续传；完成后按股票代码写入本地缓存，
+东方财富按代码查询的数据源（财务指标、现金流、ROIC）先用 get_code_history() 读取快照，
+快照覆盖所需年报时不再发请求，一次夜间任务即可替代成千上万次按代码查询。
+
+使用方法:
+    python -m akshare_service.crawlers.period_snapshot --report indicator --date 2025-12-31
+"""
+
+from __future__ import annotations
+
+import os
+import json
+from typing import Dict, Any, List, Optional
+
+
+from akshare_service.crawlers.eastmoney_api import EastMoneyAPI, EastMoneyRequestError
+from akshare_service.infra import events
+from akshare_service.infra.cache import get_cache
+from akshare_service.infra.lazy import lazy_import
+
+# 重依赖在首次使用时才导入，见 infra/lazy.py
+pd = lazy_import('pandas')
+
+
+# 快照写入缓存的默认有效期（秒），默认 7 天
+SNAPSHOT_TTL = 7 * 24 * 3600
+
+
+def period_cache_key(report: str, report_date: str, code: str) -> str:
+    """单只股票在某报告期快照中的缓存键"""
+    return f"period_snapshot:{report}:{report_date}:{code}"
+
+
+def period_index_key(report: str) -> str:
+    """某报表已写入缓存的报告期列表"""
+    return f"period_snapshot:{report}:dates"
+
+
+class PeriodSnapshot:
+    """可断点续传的报告期全市场快照"""
+
+    def __init__(self, report: str, report_date: str, snapshot_dir: Optional[str] = None,
+                 api: Optional[EastMoneyAPI] = None, page_size: int = 500, max_workers: int = 4):
+        """
+        初始化快照任务
+
+        Args:
+            report: 报表类型，indicator / balance / income / cashflow
+            report_date: 报告期，如 "2025-12-31"
+            snapshot_dir: 快照根目录，默认在缓存目录下的 snapshots/
+            api: EastMoneyAPI 实例
+            page_size: 每页条数
+            max_workers: 并发线程数
+        """
+        if report not in EastMoneyAPI.REPORT_DATE_FIELDS:
+            raise ValueError(f"不支持的报表类型：{report}，可选 {list(EastMoneyAPI.REPORT_DATE_FIELDS)}")
+
+        self.report = report
+        self.report_date = report_date
+        self.api = api or EastMoneyAPI()
+        self.page_size = page_size
+        self.max_workers = max_workers
+
+        root = snapshot_dir or os.path.join(get_cache().cache_dir, 'snapshots')
+        self.dir = os.path.join(root, report, report_date)
+        self.checkpoint_path = os.path.join(self.dir, 'checkpoint.json')
+        os.makedirs(self.dir, exist_ok=True)
+
+    def _page_path(self, page: int) -> str:
+        return os.path.join(self.dir, f"page_{page:05d}.json")
+
+    def load_checkpoint(self) -> Dict[str, Any]:
+        """读取断点；页大小变化时断点作废"""
+        if os.path.exists(self.checkpoint_path):
+            try:
+                with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                    checkpoint = json.load(f)
+                if checkpoint.get('page_size') == self.page_size:
+                    return checkpoint
+            except (json.JSONDecodeError, OSError):
+                pass
+        return {'page_size': self.page_size, 'total_pages': None, 'done_pages': [], 'failed_pages': [],
+                'completed': False}
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    @property
+    def completed(self) -> bool:
+        return self.load_checkpoint().get('completed', False)
+
+    def sync(self, write_cache: bool = True, cache_ttl: int = SNAPSHOT_TTL) -> bool:
+        """
+        拉取快照（已完成的页自动跳过）
+
+        Args:
+            write_cache: 完成后是否按股票代码写入本地缓存
+            cache_ttl: 缓存有效期（秒）
+
+        Returns:
+            是否全部页完成；有页请求失败时记录到断点的 failed_pages，下次续传重试
+        """
+        checkpoint = self.load_checkpoint()
+        if checkpoint['completed']:
+            return True
+
+        date_field = EastMoneyAPI.REPORT_DATE_FIELDS[self.report]
+        done = set(checkpoint['done_pages'])
+
+        try:
+            for page, total_pages, data in self.api.iter_pages_concurrent(
+                self.report,
+                filter=f"({date_field}='{self.report_date}')",
+                page_size=self.page_size,
+                max_workers=self.max_workers,
+                skip_pages=done,
+                total_pages=checkpoint['total_pages'],
+            ):
+                with open(self._page_path(page), 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                done.add(page)
+                checkpoint['total_pages'] = total_pages
+                checkpoint['done_pages'] = sorted(done)
+                self._save_checkpoint(checkpoint)
+                events.emit('snapshot.page_done', report=self.report, report_date=self.report_date,
+                            page=page, total_pages=total_pages)
+            checkpoint['failed_pages'] = []
+        except EastMoneyRequestError as e:
+            checkpoint['failed_pages'] = e.pages
+        self._save_checkpoint(checkpoint)
+
+        total_pages = checkpoint['total_pages']
+        if checkpoint['failed_pages'] or not total_pages or len(done) < total_pages:
+            events.warning('snapshot.incomplete', report=self.report, report_date=self.report_date,
+                           done_pages=len(done), total_pages=total_pages,
+                           failed_pages=checkpoint['failed_pages'])
+            return False
+
+        checkpoint['completed'] = True
+        self._save_checkpoint(checkpoint)
+
+        if write_cache:
+            self.write_cache(cache_ttl)
+        return True
+
+    def iter_records(self):
+        """逐页读取已落盘的原始记录"""
+        checkpoint = self.load_checkpoint()
+        for page in checkpoint['done_pages']:
+            with open(self._page_path(page), 'r', encoding='utf-8') as f:
+                yield from json.load(f)
+
+    def load(self) -> pd.DataFrame:
+        """读取快照为 DataFrame（字段与 EastMoneyAPI 按代码查询一致）"""
+        records = list(self.iter_records())
+        if not records:
+            return pd.DataFrame()
+        df = pd.DataFrame(records)
+        if 'SECURITY_CODE' in df.columns:
+            df = df.drop_duplicates(subset=['SECURITY_CODE'], keep='first')
+        return self.api._normalize_frame(df, self.report)
+
+    def write_cache(self, ttl: int = SNAPSHOT_TTL) -> int:
+        """按股票代码写入本地缓存，返回写入条数"""
+        cache = get_cache()
+        count = 0
+        for record in self.iter_records():
+            code = record.get('SECURITY_CODE')
+            if not code:
+                continue
+            cache.set(period_cache_key(self.report, self.report_date, code), record, ttl)
+            count += 1
+        dates = set(cache.get(period_index_key(self.report)) or [])
+        dates.add(self.report_date)
+        cache.set(period_index_key(self.report), sorted(dates), ttl)
+        events.emit('snapshot.cache_written', report=self.report, report_date=self.report_date, count=count)
+        return count
+
+
+def sync_period_snapshot(report: str, report_date: str, **kwargs) -> pd.DataFrame:
+    """
+    拉取报告期全市场快照并返回 DataFrame
+
+    Args:
+        report: 报表类型，indicator / balance / income / cashflow
+        report_date: 报告期，如 "2025-12-31"
+        **kwargs: 透传给 PeriodSnapshot
+
+    Returns:
+        DataFrame；未全部完成时返回已拉取部分
+    """
+    snapshot = PeriodSnapshot(report, report_date, **kwargs)
+    snapshot.sync()
+    return snapshot.load()
+
+
+def get_period_record(report: str, report_date: str, code: str) -> Optional[Dict[str, Any]]:
+    """从缓存读取单只股票在某报告期的原始记录（需先运行快照任务）"""
+    return get_cache().get(period_cache_key(report, report_date, code))
+
+
+def get_code_history(report: str, code: str, years: int) -> Optional[pd.DataFrame]:
+    """
+    从快照缓存读取单只股票最近 years 个年报期的记录（字段与 EastMoneyAPI 按代码查询一致）
+
+    Returns:
+        按报告期降序的 DataFrame；快照不足 years 个年报期或缺少该股票任一期记录时返回 None，
+        调用方回退到按代码查询
+    """
+    cache = get_cache()
+    dates = sorted((d for d in cache.get(period_index_key(report)) or [] if d.endswith('-12-31')),
+                   reverse=True)[:years]
+    if not years or len(dates) < years:
+        return None
+    records = []
+    for report_date in dates:
+        record = cache.get(period_cache_key(report, report_date, code))
+        if not record:
+            return None
+        records.append(record)
+    events.debug('snapshot.hit', report=report, code=code, periods=dates)
+    return EastMoneyAPI._normalize_frame(pd.DataFrame(records), report)
+
+
+if __name__ == '__main__':
+    import argparse
+    import logging
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    parser = argparse.ArgumentParser(description='报告期全市场快照')
+    parser.add_argument('--report', default='indicator', help='报表类型: indicator/balance/income/cashflow')
+    parser.add_argument('--date', required=True, help='报告期，如 2025-12-31')
+    parser.add_argument('--page-size', type=int, default=500, help='每页条数')
+    parser.add_argument('--workers', type=int, default=4, help='并发线程数')
+    args = parser.parse_args()
+
+    job = PeriodSnapshot(args.report, args.date, page_size=args.page_size, max_workers=args.workers)
+    ok = job.sync()
+    print(f"完成: {ok}，共 {len(job.load())} 家公司")
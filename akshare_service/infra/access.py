@@ -0,0 +1,155 @@
+"""
+访问记录 (Access Log)
+记录每次 skill 调用涉及的股票代码，供预取调度按近期访问频率排序（见 service/prefetch.py）。
+
+- 记录先写入内存缓冲，每 FLUSH_INTERVAL 秒或 FLUSH_SIZE 条追加到 JSON 行文件，进程退出时补写
+- 多个进程（agent worker、常驻服务）共用同一文件，按行追加
+- 热度按指数衰减累计：越近的访问权重越高，半衰期可配置
+
+文件路径：AKSHARE_ACCESS_LOG（默认 /tmp/akshare_cache/access.jsonl），设为 off 关闭记录。
+"""
+
+import atexit
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from akshare_service.infra import events
+
+
+ACCESS_LOG_ENV = 'AKSHARE_ACCESS_LOG'
+DEFAULT_ACCESS_LOG = '/tmp/akshare_cache/access.jsonl'
+
+FLUSH_INTERVAL = 5.0
+FLUSH_SIZE = 50
+
+# 预取等后台任务的调用不计入访问热度
+_suppressed: contextvars.ContextVar = contextvars.ContextVar('akshare_access_suppressed', default=False)
+
+
+class AccessLog:
+    """追加写入的访问记录"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get(ACCESS_LOG_ENV) or DEFAULT_ACCESS_LOG
+        self._buffer: List[Tuple[float, str, str]] = []
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, skill: str, code: str) -> None:
+        with self._lock:
+            self._buffer.append((time.time(), skill, str(code)))
+            due = len(self._buffer) >= FLUSH_SIZE or time.time() - self._last_flush >= FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            buffer, self._buffer = self._buffer, []
+            self._last_flush = time.time()
+        if not buffer:
+            return
+        lines = ''.join(json.dumps({'ts': round(ts, 3), 'skill': skill, 'code': code}, ensure_ascii=False) + '\n'
+                        for ts, skill, code in buffer)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        except OSError as e:
+            events.warning('access.flush_failed', path=self.path, error=str(e))
+
+    def load(self, since: Optional[float] = None) -> List[Dict]:
+        """读取记录（含尚未落盘的缓冲）"""
+        records = []
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if since is None or record.get('ts', 0) >= since:
+                        records.append(record)
+        with self._lock:
+            records.extend({'ts': ts, 'skill': skill, 'code': code} for ts, skill, code in self._buffer
+                           if since is None or ts >= since)
+        return records
+
+    def scores(self, half_life_hours: float = 72, window_days: float = 30,
+               now: Optional[float] = None) -> Dict[str, float]:
+        """
+        各股票代码的访问热度（指数衰减计数）
+
+        Args:
+            half_life_hours: 半衰期（小时）
+            window_days: 只统计最近 N 天
+        """
+        now = now or time.time()
+        decay = math.log(2) / (half_life_hours * 3600)
+        scores: Dict[str, float] = {}
+        for record in self.load(since=now - window_days * 86400):
+            code = record.get('code')
+            if code:
+                scores[code] = scores.get(code, 0.0) + math.exp(-decay * max(0.0, now - record['ts']))
+        return scores
+
+    def compact(self, window_days: float = 30) -> int:
+        """只保留最近 N 天的记录，返回删除条数"""
+        self.flush()
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        cutoff = time.time() - window_days * 86400
+        kept = []
+        for line in lines:
+            try:
+                if json.loads(line).get('ts', 0) >= cutoff:
+                    kept.append(line)
+            except ValueError:
+                continue
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(kept)
+        os.replace(tmp_path, self.path)
+        return len(lines) - len(kept)
+
+
+# 全局访问记录；None 表示尚未初始化，False 表示已关闭
+_log_instance = None
+
+
+def get_access_log() -> Optional[AccessLog]:
+    """获取全局访问记录（AKSHARE_ACCESS_LOG=off 时返回 None）"""
+    global _log_instance
+    if _log_instance is None:
+        if os.environ.get(ACCESS_LOG_ENV, '').lower() == 'off':
+            _log_instance = False
+        else:
+            _log_instance = AccessLog()
+            atexit.register(_log_instance.flush)
+    return _log_instance or None
+
+
+def record(skill: str, code: Optional[str]) -> None:
+    """记录一次访问（无代码或处于 suppressed() 内时忽略）"""
+    if not code or _suppressed.get():
+        return
+    log = get_access_log()
+    if log is not None:
+        log.record(skill, code)
+
+
+@contextmanager
+def suppressed() -> Iterator[None]:
+    """在此上下文中的调用不计入访问记录"""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
@@ -4,12 +4,13 @@
 """
 
 import os
-import json
 import hashlib
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
+from akshare_service.infra import codec, metrics
+
 
 class LocalCache:
     """本地文件缓存"""
@@ -33,46 +34,96 @@ class LocalCache:
     
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         """获取缓存数据"""
-        cache_file = self._get_cache_key(key)
+        entry = self.get_with_meta(key)
+        return entry[0] if entry else None
+    
+    def get_with_meta(self, key: str, max_stale: float = 0) -> Optional[Tuple[Any, Optional[float], bool]]:
+        """
+        获取缓存数据及其新鲜度（stale-while-revalidate 用）
         
-        if not os.path.exists(cache_file):
-            return None
+        Args:
+            key: 缓存键
+            max_stale: 过期后仍可返回的秒数；超过后删除缓存文件
         
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached = json.load(f)
+        Returns:
+            (数据, 距写入的秒数, 是否已过期)；未命中返回 None
+        """
+        with metrics.track_cache('get', key) as lookup:
+            cache_file = self._get_cache_key(key)
             
-            expired_at = cached.get('expired_at')
-            if expired_at and datetime.fromisoformat(expired_at) < datetime.now():
-                os.remove(cache_file)
+            if not os.path.exists(cache_file):
+                lookup.outcome = 'miss'
                 return None
             
-            return cached.get('data')
-        except (json.JSONDecodeError, KeyError, ValueError):
-            return None
+            try:
+                with open(cache_file, 'rb') as f:
+                    cached = codec.loads(f.read())
+                
+                now = datetime.now()
+                expired_at = cached.get('expired_at')
+                overdue = (now - datetime.fromisoformat(expired_at)).total_seconds() if expired_at else 0
+                if overdue > max_stale:
+                    try:
+                        os.remove(cache_file)
+                    except OSError:
+                        pass    # 并发读取者已删除
+                    lookup.outcome = 'expired'
+                    return None
+                
+                created_at = cached.get('created_at')
+                age = (now - datetime.fromisoformat(created_at)).total_seconds() if created_at else None
+                stale = overdue > 0
+                if stale:
+                    lookup.outcome = 'stale'
+                return cached.get('data'), age, stale
+            except FileNotFoundError:
+                # 并发读取者刚删除了过期文件
+                lookup.outcome = 'miss'
+                return None
+            except (*codec.DecodeError, KeyError, ValueError):
+                lookup.outcome = 'corrupt'
+                return None
     
     def set(self, key: str, data: Dict[str, Any], ttl: Optional[int] = None) -> None:
         """设置缓存数据"""
+        with metrics.track_cache('set', key):
+            cache_file = self._get_cache_key(key)
+            ttl = ttl or self.default_ttl
+            
+            cache_data = {
+                'data': data,
+                'expired_at': (datetime.now() + timedelta(seconds=ttl)).isoformat(),
+                'created_at': datetime.now().isoformat()
+            }
+            
+            with open(cache_file, 'wb') as f:
+                f.write(codec.dumps(cache_data))
+    
+    def expires_in(self, key: str) -> Optional[float]:
+        """缓存剩余有效秒数（已过期为负数）；不存在或无法解析时返回 None"""
         cache_file = self._get_cache_key(key)
-        ttl = ttl or self.default_ttl
-        
-        cache_data = {
-            'data': data,
-            'expired_at': (datetime.now() + timedelta(seconds=ttl)).isoformat(),
-            'created_at': datetime.now().isoformat()
-        }
-        
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(cache_data, f, ensure_ascii=False)
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = codec.loads(f.read())
+            return (datetime.fromisoformat(cached['expired_at']) - datetime.now()).total_seconds()
+        except (OSError, *codec.DecodeError, KeyError, TypeError):
+            return None
     
     def delete(self, key: str) -> None:
         """删除缓存"""
         cache_file = self._get_cache_key(key)
-        if os.path.exists(cache_file):
+        try:
             os.remove(cache_file)
+        except FileNotFoundError:
+            pass
     
-    def clear_expired(self) -> int:
-        """清理过期缓存"""
+    def clear_expired(self, grace: float = 0) -> int:
+        """
+        清理过期缓存
+        
+        Args:
+            grace: 过期不足该秒数的条目保留（供 stale-while-revalidate 使用）
+        """
         count = 0
         if not os.path.exists(self.cache_dir):
             return count
@@ -83,11 +134,11 @@ class LocalCache:
             
             filepath = os.path.join(self.cache_dir, filename)
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    cached = json.load(f)
+                with open(filepath, 'rb') as f:
+                    cached = codec.loads(f.read())
                 
                 expired_at = cached.get('expired_at')
-                if expired_at and datetime.fromisoformat(expired_at) < datetime.now():
+                if expired_at and datetime.fromisoformat(expired_at) < datetime.now() - timedelta(seconds=grace):
                     os.remove(filepath)
                     count += 1
             except:
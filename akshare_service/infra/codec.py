@@ -0,0 +1,148 @@
+"""
+JSON 编解码基础设施 (Codec)
+优先使用 orjson / msgspec 加速解析，未安装时回退到标准库 json。
+东方财富 datacenter 响应和本地缓存统一走这里。
+
+可通过环境变量 AKSHARE_JSON_BACKEND=json|orjson|msgspec 强制指定后端。
+
+JSON 没有 NaN / Infinity：各后端序列化时一律把非有限浮点数（NaN、±inf）写成 null，
+读回为 None，缓存内容与安装了哪个后端无关。标准库后端读到旧数据中的 NaN / Infinity 也解析为 None。
+"""
+
+import os
+import json
+import math
+from typing import Any, Dict, List, Optional, Union
+
+
+def _select_backend(preferred: Optional[str] = None) -> str:
+    """按优先级选择可用后端"""
+    candidates = [preferred] if preferred else ['orjson', 'msgspec']
+    for name in candidates:
+        if name == 'json':
+            return 'json'
+        try:
+            __import__(name)
+            return name
+        except ImportError:
+            continue
+    return 'json'
+
+
+BACKEND = _select_backend(os.environ.get('AKSHARE_JSON_BACKEND'))
+
+# 解析失败时抛出的异常类型，调用方用 except codec.DecodeError 捕获
+DecodeError = (ValueError,)
+
+if BACKEND == 'orjson':
+    import orjson
+elif BACKEND == 'msgspec':
+    import msgspec
+    _msgspec_decoder = msgspec.json.Decoder()
+    DecodeError = (ValueError, msgspec.DecodeError)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    解析 JSON
+
+    Args:
+        data: JSON 文本（bytes 或 str）
+
+    Returns:
+        解析结果
+    """
+    if BACKEND == 'orjson':
+        return orjson.loads(data)
+    if BACKEND == 'msgspec':
+        return _msgspec_decoder.decode(data.encode('utf-8') if isinstance(data, str) else data)
+    return json.loads(data, parse_constant=lambda _: None)
+
+
+def _finite(obj: Any) -> Any:
+    """把非有限浮点数替换为 None（标准库后端使用，与 orjson / msgspec 的输出一致）"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def dumps(obj: Any, default=None) -> bytes:
+    """
+    序列化为 UTF-8 编码的 JSON（保留中文，不转义；NaN / ±inf 写成 null）
+
+    Args:
+        obj: 待序列化对象
+        default: 无法序列化的对象的转换函数
+
+    Returns:
+        bytes
+    """
+    if BACKEND == 'orjson':
+        return orjson.dumps(obj, default=default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    if BACKEND == 'msgspec':
+        return msgspec.json.encode(obj, enc_hook=default)
+    # default 转换出的值（如 numpy 标量）也可能是 NaN
+    finite_default = (lambda o: _finite(default(o))) if default else None
+    try:
+        return json.dumps(obj, ensure_ascii=False, default=finite_default, allow_nan=False).encode('utf-8')
+    except ValueError:
+        # 含非有限浮点数时才做一次替换，常见的无 NaN 数据不多走一遍
+        return json.dumps(_finite(obj), ensure_ascii=False, default=finite_default,
+                          allow_nan=False).encode('utf-8')
+
+
+def records_to_columns(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    行记录转列数组（用于列式输出或按列构建 DataFrame）
+
+    所有记录字段顺序一致时直接按列转置；否则取字段并集，缺失字段补 None。
+    """
+    if not records:
+        return {}
+    keys = tuple(records[0])
+    if all(tuple(record) == keys for record in records):
+        return dict(zip(keys, map(list, zip(*map(dict.values, records)))))
+
+    all_keys = list(keys)
+    seen = set(all_keys)
+    for record in records:
+        for key in record:
+            if key not in seen:
+                seen.add(key)
+                all_keys.append(key)
+    return {key: [record.get(key) for record in records] for key in all_keys}
+
+
+def frame_to_columns(df) -> Dict[str, Any]:
+    """
+    DataFrame 转紧凑列式结构（常驻服务 / 通用调度的 JSON 输出）
+
+    Returns:
+        {'columns': [列名], 'data': {列名: [值]}, 'rows': 行数}，缺失值为 None，
+        时间等非基本类型由 dumps 的 default 处理（见 json_default）
+    """
+    columns = [str(c) for c in df.columns]
+    frame = df.astype(object).where(df.notna(), None)
+    return {
+        'columns': columns,
+        'data': {name: frame[col].tolist() for name, col in zip(columns, df.columns)},
+        'rows': len(df),
+    }
+
+
+def json_default(obj: Any) -> Any:
+    """dumps 的 default：处理 DataFrame / Series / numpy 标量 / 日期时间"""
+    if hasattr(obj, 'to_frame') and hasattr(obj, 'tolist'):  # Series
+        return obj.astype(object).where(obj.notna(), None).tolist()
+    if hasattr(obj, 'columns') and hasattr(obj, 'astype'):   # DataFrame
+        return frame_to_columns(obj)
+    if hasattr(obj, 'item') and callable(obj.item):         # numpy 标量
+        return obj.item()
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    return str(obj)
@@ -0,0 +1,93 @@
+"""
+Cron 表达式 (Cron Schedule)
+解析 config.yaml 中的五段式 cron（分 时 日 月 周），计算下一次触发时间。
+
+支持 *、数字、a-b 区间、a,b 列表、*/n 与 a-b/n 步长；周取值 0-7（0 和 7 都是周日）。
+日与周同时指定时按标准 cron 语义取并集。
+
+使用方法:
+    schedule = CronSchedule("30 1 * * 1-5")     # 工作日 01:30
+    schedule.next_after(datetime.now())
+"""
+
+from datetime import datetime, timedelta
+from typing import FrozenSet, Tuple
+
+
+# (最小值, 最大值)
+FIELD_RANGES = (
+    (0, 59),   # 分
+    (0, 23),   # 时
+    (1, 31),   # 日
+    (1, 12),   # 月
+    (0, 7),    # 周
+)
+
+
+def _parse_field(text: str, low: int, high: int) -> FrozenSet[int]:
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"无效步长: {text}")
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(v) for v in part.split('-', 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"取值超出范围 {low}-{high}: {text}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """五段式 cron 表达式"""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 表达式应为 5 段（分 时 日 月 周）: {expression!r}")
+        self.expression = expression
+        parsed: Tuple[FrozenSet[int], ...] = tuple(
+            _parse_field(text, low, high) for text, (low, high) in zip(fields, FIELD_RANGES))
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # cron 周日为 0 或 7，换算为 Python weekday（周一 0 ... 周日 6）
+        self.weekdays = frozenset((d - 1) % 7 for d in weekdays)
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = dt.weekday() in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def matches(self, dt: datetime) -> bool:
+        return (dt.minute in self.minutes and dt.hour in self.hours
+                and dt.month in self.months and self._day_matches(dt))
+
+    def next_after(self, dt: datetime) -> datetime:
+        """dt 之后（不含）的第一次触发时间，精确到分钟"""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute in self.minutes:
+                return candidate
+            candidate += timedelta(minutes=1)
+        raise ValueError(f"cron 表达式永不触发: {self.expression!r}")
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
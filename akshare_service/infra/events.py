@@ -0,0 +1,41 @@
+"""
+结构化事件 (Structured Events)
+替代散落在各模块的 print("[Router] ...")：每条事件是一行 JSON，
+经 logging 输出（logger 名 akshare_service.events），便于采集和检索。
+
+使用方法:
+    emit('router.fallback', skill='financial_summary', source='eastmoney', error='...')
+    # {"event": "router.fallback", "ts": "...", "skill": "financial_summary", ...}
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any
+
+
+logger = logging.getLogger('akshare_service.events')
+
+
+def emit(event: str, level: int = logging.INFO, **fields: Any) -> None:
+    """
+    输出一条结构化事件
+
+    Args:
+        event: 事件名，点分层级，如 router.attempt / cache.hit
+        level: 日志级别
+        **fields: 事件字段（不可 JSON 序列化的值转为字符串）
+    """
+    if not logger.isEnabledFor(level):
+        return
+    record = {'event': event, 'ts': datetime.now().isoformat(timespec='milliseconds')}
+    record.update(fields)
+    logger.log(level, json.dumps(record, ensure_ascii=False, default=str))
+
+
+def warning(event: str, **fields: Any) -> None:
+    emit(event, logging.WARNING, **fields)
+
+
+def debug(event: str, **fields: Any) -> None:
+    emit(event, logging.DEBUG, **fields)
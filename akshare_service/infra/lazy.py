@@ -0,0 +1,67 @@
+"""
+延迟导入 (Lazy Import)
+akshare / tushare / pandas 导入耗时数秒，按需在首次访问属性时才真正导入，
+降低冷启动时间（如 agent worker 每次拉起都要 import akshare_service.skills）。
+
+使用方法:
+    ak = lazy_import('akshare')
+    pd = lazy_import('pandas')
+
+    df = ak.stock_zh_a_spot_em()    # 此时才导入 akshare
+
+注意：使用 lazy 模块做类型注解的文件需加 `from __future__ import annotations`，
+否则定义函数时求值注解会立即触发导入。
+"""
+
+import importlib
+import sys
+import threading
+import types
+from typing import Any
+
+
+class LazyModule(types.ModuleType):
+    """首次访问属性时导入真实模块的代理"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    返回模块的延迟代理；模块已导入时直接返回真实模块
+
+    Args:
+        name: 模块名，如 'akshare'
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    """模块是否已被真正导入"""
+    return name in sys.modules
@@ -0,0 +1,340 @@
+"""
+指标采集 (Metrics)
+进程内计数器 / 直方图，按 skill、数据源、市场打标签，
+记录每次上游调用、每次数据源回退和每次缓存查询的耗时（开启追踪时同时产生 span），
+可导出为 Prometheus 文本格式或通过 HTTP 端点（兼容 OpenMetrics）暴露。
+
+使用方法:
+    @track_skill('financial_summary')
+    def get_financial_summary(code, ...):
+        with track_source('financial_summary', 'eastmoney') as attempt:
+            ...
+            if empty:
+                attempt.outcome = 'empty'
+
+    print(render_prometheus())
+    start_metrics_server(9464)   # GET /metrics
+"""
+
+import bisect
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from akshare_service.infra import access, profiling, tracing
+
+
+# 直方图默认分桶（秒），覆盖本地缓存命中到慢速上游
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 指标说明
+METRIC_HELP = {
+    'akshare_skill_duration_seconds': 'Skill 调用耗时',
+    'akshare_skill_calls_total': 'Skill 调用次数',
+    'akshare_source_duration_seconds': '单个数据源尝试耗时',
+    'akshare_source_attempts_total': '数据源尝试次数',
+    'akshare_fallback_total': '数据源回退次数',
+    'akshare_cache_lookup_seconds': '缓存查询耗时',
+    'akshare_cache_requests_total': '缓存查询次数',
+    'akshare_upstream_request_seconds': '上游 HTTP 请求耗时',
+    'akshare_upstream_bytes_total': '上游响应字节数',
+    'akshare_rpc_duration_seconds': '常驻服务方法调用耗时',
+    'akshare_rpc_requests_total': '常驻服务方法调用次数',
+    'akshare_dispatch_duration_seconds': '通用调度单次调用耗时',
+    'akshare_dispatch_calls_total': '通用调度调用次数',
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, '' if v is None else str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """累积分桶直方图"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """[(le, 累计数)]，最后一项为 +Inf"""
+        result = []
+        total = 0
+        for bound, n in zip(self.buckets, self.counts):
+            total += n
+            result.append((_format_float(bound), total))
+        result.append(('+Inf', self.count))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按分桶估算分位数（取所在桶上界）"""
+        if not self.count:
+            return None
+        target = q * self.count
+        total = 0
+        for bound, n in zip(self.buckets, self.counts):
+            total += n
+            if total >= target:
+                return bound
+        return float('inf')
+
+
+class MetricsRegistry:
+    """线程安全的指标注册表"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram(self.buckets)
+            hist.observe(value)
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        return self._counters.get(name, {}).get(_label_key(labels), 0)
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        return self._histograms.get(name, {}).get(_label_key(labels))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON 友好的快照：计数器取值，直方图给出次数、总和和 p50/p95/p99"""
+        with self._lock:
+            counters = {name: [{'labels': dict(k), 'value': v} for k, v in series.items()]
+                        for name, series in self._counters.items()}
+            histograms = {
+                name: [{
+                    'labels': dict(k),
+                    'count': h.count,
+                    'sum': round(h.sum, 6),
+                    'p50': h.quantile(0.5),
+                    'p95': h.quantile(0.95),
+                    'p99': h.quantile(0.99),
+                } for k, h in series.items()]
+                for name, series in self._histograms.items()
+            }
+        return {'counters': counters, 'histograms': histograms}
+
+    def render(self, openmetrics: bool = False) -> str:
+        """
+        导出为 Prometheus 文本格式
+
+        Args:
+            openmetrics: 按 OpenMetrics 1.0 输出（计数器族名去掉 _total，并以 # EOF 结尾）
+        """
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                family = name[:-len('_total')] if openmetrics and name.endswith('_total') else name
+                lines.append(f"# HELP {family} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {family} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_float(value)}")
+            for name in sorted(self._histograms):
+                lines.append(f"# HELP {name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(self._histograms[name].items()):
+                    for le, count in hist.cumulative():
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', le),))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_float(hist.sum)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        if openmetrics:
+            lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_float(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ''
+    parts = []
+    for k, v in key:
+        v = v.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return '{' + ','.join(parts) + '}'
+
+
+# 全局注册表
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """获取全局指标注册表"""
+    return _registry
+
+
+def inc(name: str, value: float = 1, **labels: Any) -> None:
+    _registry.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    _registry.observe(name, value, **labels)
+
+
+class Attempt:
+    """一次被计时的调用；调用方可修改 outcome（success / empty / error / hit / miss ...）"""
+
+    __slots__ = ('labels', 'outcome', 'started', 'elapsed', 'span')
+
+    def __init__(self, labels: Dict[str, Any], outcome: str = 'success', span=tracing.NOOP_SPAN):
+        self.labels = labels
+        self.outcome = outcome
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.span = span
+
+
+@contextmanager
+def timer(histogram: str, counter: Optional[str] = None, outcome: str = 'success',
+          span: Optional[str] = None, span_attributes: Optional[Dict[str, Any]] = None,
+          **labels: Any) -> Iterator[Attempt]:
+    """
+    计时上下文：结束时把耗时记入直方图（并可计数），标签附带 outcome
+
+    传入 span 名称时同时开启追踪 span（标签和 span_attributes 作为属性）。
+    异常会将 outcome 置为 error 并继续抛出。
+    """
+    with tracing.start_span(span or histogram, {**labels, **(span_attributes or {})}) as current:
+        attempt = Attempt(labels, outcome, current)
+        try:
+            yield attempt
+        except BaseException:
+            attempt.outcome = 'error'
+            raise
+        finally:
+            attempt.elapsed = time.perf_counter() - attempt.started
+            current.set_attribute('outcome', attempt.outcome)
+            _registry.observe(histogram, attempt.elapsed, outcome=attempt.outcome, **labels)
+            if counter:
+                _registry.inc(counter, outcome=attempt.outcome, **labels)
+
+
+def track_source(skill: str, source: str, market: str = 'A股', code: Optional[str] = None, **labels: Any):
+    """数据源尝试计时（code 只作为 span 属性，不进入指标标签）"""
+    return timer('akshare_source_duration_seconds', 'akshare_source_attempts_total',
+                 span=f'source.{source}', span_attributes={'code': code},
+                 skill=skill, source=source, market=market, **labels)
+
+
+def track_cache(op: str, key: str):
+    """缓存操作计时，namespace 取缓存键第一段（如 financial_summary）"""
+    return timer('akshare_cache_lookup_seconds', 'akshare_cache_requests_total',
+                 outcome='hit' if op == 'get' else 'success',
+                 span=f'cache.{op}', span_attributes={'cache.key': key},
+                 op=op, namespace=key.split(':', 1)[0])
+
+
+def record_fallback(skill: str, from_source: str, to_source: str, market: str = 'A股') -> None:
+    """记录一次数据源回退"""
+    _registry.inc('akshare_fallback_total', skill=skill, market=market,
+                  from_source=from_source, to_source=to_source)
+
+
+# 作为 span 属性 code 的参数名（按优先级）
+_CODE_PARAMS = ('code', 'symbol', 'stock')
+
+
+def track_skill(skill: str, market: Optional[str] = None):
+    """
+    Skill 计时装饰器（同时记录访问的股票代码，见 infra/access.py）
+
+    Args:
+        skill: Skill 名称
+        market: 固定市场标签；为 None 时取被装饰函数的 market 参数，缺省为 A股
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        has_market = 'market' in signature.parameters
+        code_param = next((p for p in _CODE_PARAMS if p in signature.parameters), None)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            label = market
+            code = None
+            if (label is None and has_market) or code_param:
+                try:
+                    arguments = signature.bind_partial(*args, **kwargs).arguments
+                except TypeError:
+                    arguments = {}
+                if label is None and has_market:
+                    label = arguments.get('market')
+                code = arguments.get(code_param) if code_param else None
+            access.record(skill, code)
+            with timer('akshare_skill_duration_seconds', 'akshare_skill_calls_total',
+                       span=f'skill.{skill}', span_attributes={'code': code},
+                       skill=skill, market=label or 'A股'):
+                # AKSHARE_PROFILE 开启时对最外层 skill 调用做剖析
+                with profiling.maybe_profile(f"{skill}_{code}" if code else skill):
+                    return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def render_prometheus(openmetrics: bool = False) -> str:
+    """导出全局指标"""
+    return _registry.render(openmetrics)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+        body = render_prometheus(openmetrics).encode('utf-8')
+        content_type = ('application/openmetrics-text; version=1.0.0; charset=utf-8' if openmetrics
+                        else 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int = 9464, addr: str = '0.0.0.0') -> ThreadingHTTPServer:
+    """
+    在后台线程启动 /metrics 端点
+
+    根据 Accept 头返回 Prometheus 0.0.4 文本或 OpenMetrics 1.0 格式。
+    """
+    server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    return server
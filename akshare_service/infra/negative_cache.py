@@ -0,0 +1,176 @@
+"""
+负缓存 (Negative Cache)
+记录"数据源 X 对股票 K 返回空 / 失败"，短时间内路由直接跳过该数据源，
+不再每次都走完整回退链、重复等待超时（如无港股/美股报表的代码、新浪返回空）。
+
+- 空结果（数据源正常响应但没有数据）缓存 NEGATIVE_TTL['empty'] 秒；
+  失败（异常、超时）只缓存 NEGATIVE_TTL['error'] 秒，避免把瞬时故障放大
+- 数据源对 K 成功后清除该数据源在相关 skill（RELATED_SKILLS，同一批报表接口）上的负缓存；
+  排在前面、本次为空 / 失败的数据源仍按记录跳过
+- refresh=True（预取、后台刷新）不跳过，逐个重试数据源，成功即清除过期的负缓存记录
+- 数据源函数捕获上游异常后调用 mark_error()，路由用 call() 区分"失败"与"无数据"
+- 缓存键 negative:{skill}:{source}:{code}，存放在全局本地缓存中
+- AKSHARE_NEGATIVE_CACHE=off 关闭；skill 调用 use_cache=False 时也不读写（guard 同样接受 use_cache / refresh）
+
+使用方法:
+    reason = skip('financial_summary', 'sina', code)
+    if reason:
+        continue                          # 已知无数据，跳过
+    (result, errors), failed = call(fetch, code)
+    record('financial_summary', 'sina', code, 'error' if failed else 'empty', errors)
+    invalidate('financial_summary', code, ['sina'])
+"""
+
+import contextvars
+import functools
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from akshare_service.infra import events, metrics
+from akshare_service.infra.cache import get_cache
+
+
+NEGATIVE_CACHE_ENV = 'AKSHARE_NEGATIVE_CACHE'
+
+# outcome -> 负缓存时间（秒）
+NEGATIVE_TTL = {
+    'empty': 6 * 3600,
+    'error': 300,
+}
+
+
+# 共用同一批数据源报表接口的 skill：任一 skill 从某数据源拿到数据，即清除该数据源在其他 skill 上的负缓存
+RELATED_SKILLS = ('financial_summary', 'cashflow', 'calculate_roic')
+
+
+# guard 包裹的函数内部捕获异常后调用 mark_error()，使本次结果按"失败"而非"无数据"记录
+_failed: contextvars.ContextVar[bool] = contextvars.ContextVar('negative_cache_failed', default=False)
+
+
+def enabled() -> bool:
+    return os.environ.get(NEGATIVE_CACHE_ENV, 'on').lower() != 'off'
+
+
+def cache_key(skill: str, source: str, code: str) -> str:
+    return f"negative:{skill}:{source}:{code}"
+
+
+def check(skill: str, source: str, code: str) -> Optional[Dict[str, Any]]:
+    """数据源对该代码的负缓存记录（outcome / reason / recorded_at），没有则返回 None"""
+    if not enabled():
+        return None
+    return get_cache().get(cache_key(skill, source, code))
+
+
+def record(skill: str, source: str, code: str, outcome: str,
+           reason: Union[str, List[str], None] = None) -> None:
+    """
+    记录一次空结果或失败
+
+    Args:
+        outcome: empty / error（其他取值忽略）
+        reason: 错误信息
+    """
+    if not enabled() or outcome not in NEGATIVE_TTL:
+        return
+    if isinstance(reason, list):
+        reason = '; '.join(str(r) for r in reason)
+    get_cache().set(cache_key(skill, source, code), {
+        'outcome': outcome,
+        'reason': reason or '',
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+    }, ttl=NEGATIVE_TTL[outcome])
+
+
+def related(skill: str) -> Tuple[str, ...]:
+    """与 skill 共用数据源的 skill（含自身）"""
+    return RELATED_SKILLS if skill in RELATED_SKILLS else (skill,)
+
+
+def invalidate(skill: str, code: str, sources: Iterable[str]) -> None:
+    """清除该代码在给定数据源上的负缓存（数据源本次返回了数据），相关 skill 一并清除"""
+    if not enabled():
+        return
+    cache = get_cache()
+    for source in sources:
+        for name in related(skill):
+            cache.delete(cache_key(name, source, code))
+
+
+def skip(skill: str, source: str, code: str, market: str = 'A股') -> Optional[str]:
+    """
+    路由前检查：已知该数据源对此代码无数据时返回跳过原因（并记录事件和指标），否则返回 None
+    """
+    entry = check(skill, source, code)
+    if not entry:
+        return None
+    events.emit('router.skip', skill=skill, source=source, code=code,
+                outcome=entry.get('outcome'), recorded_at=entry.get('recorded_at'))
+    metrics.inc('akshare_source_attempts_total', skill=skill, source=source, market=market,
+                outcome='skipped')
+    label = '无数据' if entry.get('outcome') == 'empty' else '失败'
+    return f"{source} 近期{label}，已跳过（{entry.get('recorded_at')}: {entry.get('reason')}）"
+
+
+def is_empty(result: Any) -> bool:
+    """skill 返回值是否为空（None、空 DataFrame、annual_data 为空的字典）"""
+    if result is None:
+        return True
+    if hasattr(result, 'empty'):
+        return bool(result.empty)
+    if isinstance(result, dict):
+        return not result.get('annual_data')
+    return False
+
+
+def mark_error() -> None:
+    """标记当前 guard / call 调用为失败（上游异常），负缓存使用较短的 error TTL"""
+    _failed.set(True)
+
+
+def call(func: Callable, *args, **kwargs) -> Tuple[Any, bool]:
+    """
+    调用数据源函数
+
+    Returns:
+        (返回值, 是否调用过 mark_error())
+    """
+    token = _failed.set(False)
+    try:
+        return func(*args, **kwargs), _failed.get()
+    finally:
+        _failed.reset(token)
+
+
+def empty_report(code: str, reason: str) -> Dict[str, Any]:
+    """跳过时返回的财务报表占位（与各 skill 的失败返回格式一致）"""
+    return {'code': code, 'annual_data': [], 'errors': [reason], 'negative_cached': True}
+
+
+def guard(skill: str, source: str, empty_result: Callable[[str, str], Any], market: str = 'A股'):
+    """
+    单数据源 skill 的负缓存装饰器（第一个参数为股票代码）
+
+    已知无数据时直接返回 empty_result(code, reason)，不访问上游；
+    返回空时记录负缓存（返回 None 或调用过 mark_error() 视为失败），返回数据时清除。
+    包裹后的函数额外接受 use_cache（False 时不读写负缓存）和 refresh（True 时不跳过）。
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(code, *args, use_cache: bool = True, refresh: bool = False, **kwargs):
+            if not use_cache:
+                return func(code, *args, **kwargs)
+            reason = skip(skill, source, code, market) if not refresh else None
+            if reason:
+                return empty_result(code, reason)
+            result, failed = call(func, code, *args, **kwargs)
+            if is_empty(result):
+                outcome = 'error' if failed or result is None else 'empty'
+                errors = result.get('errors') if isinstance(result, dict) else None
+                record(skill, source, code, outcome, errors)
+            else:
+                invalidate(skill, code, [source])
+            return result
+        return wrapper
+    return decorator
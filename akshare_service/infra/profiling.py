@@ -0,0 +1,304 @@
+"""
+性能剖析 (Profiling)
+给任意 skill 调用套上 cProfile 或采样剖析器，无需改代码即可在真实负载下找热点。
+每次调用输出一个目录，包含折叠栈（flamegraph.pl / speedscope 均可导入）、
+speedscope JSON 和按类别（网络等待 / pandas / JSON 编解码 / 其他 Python）归集的耗时。
+
+开启方式:
+    AKSHARE_PROFILE=sample      采样剖析（默认间隔 5ms，AKSHARE_PROFILE_INTERVAL_MS 调整）
+    AKSHARE_PROFILE=cprofile    确定性剖析，额外输出 profile.prof（pstats 格式）
+    AKSHARE_PROFILE_DIR         输出目录，默认 /tmp/akshare_cache/profiles
+
+采样剖析开销低，但持有 GIL 的长 C 调用（如一次大 JSON 解析）会被计到其后的帧上；
+需要精确的类别占比时用 cprofile。
+
+    # 或在代码中：
+    with profile('roic_600519'):
+        calculate_roic('A股', '600519')
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import contextvars
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+MODE_ENV = 'AKSHARE_PROFILE'
+DIR_ENV = 'AKSHARE_PROFILE_DIR'
+INTERVAL_ENV = 'AKSHARE_PROFILE_INTERVAL_MS'
+DEFAULT_PROFILE_DIR = '/tmp/akshare_cache/profiles'
+DEFAULT_INTERVAL_MS = 5.0
+
+# 按文件路径 / 函数名归类，从栈顶（最内层）往外找第一个命中的类别
+CATEGORY_RULES: List[Tuple[str, Tuple[str, ...]]] = [
+    ('json', ('/json/', '_json.', 'orjson', 'msgspec', 'infra/codec.py')),
+    ('network', ('/requests/', '/urllib3/', '/http/client.py', 'socket', '/ssl.py', '/selectors.py',
+                 'infra/replay.py')),
+    ('pandas', ('/pandas/', '/numpy/', 'pandas.', 'numpy.')),
+]
+CATEGORIES = ('network', 'pandas', 'json', 'python')
+
+Frame = Tuple[str, str, int]   # (函数名, 文件, 行号)
+
+# 当前线程是否已在剖析中（嵌套 skill 只剖析最外层）
+_active: contextvars.ContextVar = contextvars.ContextVar('akshare_profile_active', default=False)
+
+
+def classify(filename: str, funcname: str = '') -> Optional[str]:
+    """按文件名或函数名归类，未命中返回 None"""
+    text = f"{filename} {funcname}".replace('\\', '/')
+    for category, patterns in CATEGORY_RULES:
+        if any(p in text for p in patterns):
+            return category
+    return None
+
+
+def classify_stack(stack: Tuple[Frame, ...]) -> str:
+    """栈（外层在前）归类：从最内层往外找第一个命中的帧"""
+    for funcname, filename, _ in reversed(stack):
+        category = classify(filename, funcname)
+        if category:
+            return category
+    return 'python'
+
+
+def _short_path(filename: str) -> str:
+    """去掉 site-packages / 项目根目录前缀，便于阅读"""
+    for marker in ('site-packages/', 'dist-packages/'):
+        idx = filename.find(marker)
+        if idx >= 0:
+            return filename[idx + len(marker):]
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.relpath(filename, root) if filename.startswith(root) else filename
+
+
+class SamplingProfiler:
+    """后台线程定时抓取目标线程的调用栈"""
+
+    def __init__(self, interval_ms: float = DEFAULT_INTERVAL_MS, thread_id: Optional[int] = None):
+        self.interval = interval_ms / 1000
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name='akshare-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_file = __file__
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename != own_file:
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+
+class ProfileResult:
+    """一次剖析的结果"""
+
+    def __init__(self, name: str, wall_ms: float, stacks: Dict[Tuple[Frame, ...], float],
+                 categories: Dict[str, float], output_dir: Optional[str] = None):
+        self.name = name
+        self.wall_ms = wall_ms
+        self.stacks = stacks            # 栈 -> 毫秒
+        self.categories = categories    # 类别 -> 毫秒
+        self.output_dir = output_dir
+
+    def summary(self) -> Dict[str, Any]:
+        total = sum(self.categories.values()) or 1
+        top = sorted(self.stacks.items(), key=lambda kv: kv[1], reverse=True)[:10]
+        return {
+            'name': self.name,
+            'wall_ms': round(self.wall_ms, 1),
+            'categories': {k: {'ms': round(v, 1), 'percent': round(v / total * 100, 1)}
+                           for k, v in self.categories.items()},
+            'top_stacks': [{'leaf': f"{s[-1][0]} ({_short_path(s[-1][1])}:{s[-1][2]})", 'ms': round(ms, 1)}
+                           for s, ms in top],
+        }
+
+    def collapsed(self) -> str:
+        """折叠栈格式：frame;frame;frame <微秒>"""
+        lines = []
+        for stack, ms in sorted(self.stacks.items()):
+            names = ';'.join(f"{fn} ({_short_path(f)}:{line})" for fn, f, line in stack)
+            lines.append(f"{names} {max(1, int(round(ms * 1000)))}")
+        return '\n'.join(lines) + '\n'
+
+    def speedscope(self) -> Dict[str, Any]:
+        """speedscope 文件格式（sampled profile）"""
+        frame_index: Dict[Frame, int] = {}
+        frames = []
+        samples, weights = [], []
+        for stack, ms in self.stacks.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({'name': frame[0], 'file': _short_path(frame[1]), 'line': frame[2]})
+                indices.append(frame_index[frame])
+            samples.append(indices)
+            weights.append(round(ms, 3))
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': self.name,
+            'exporter': 'akshare_service.infra.profiling',
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': self.name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': round(sum(weights), 3),
+                'samples': samples,
+                'weights': weights,
+            }],
+        }
+
+
+def _from_samples(name: str, profiler: SamplingProfiler, wall_ms: float) -> ProfileResult:
+    total = sum(profiler.samples.values())
+    per_sample = wall_ms / total if total else 0
+    stacks = {stack: count * per_sample for stack, count in profiler.samples.items()}
+    categories = {c: 0.0 for c in CATEGORIES}
+    for stack, ms in stacks.items():
+        categories[classify_stack(stack)] += ms
+    return ProfileResult(name, wall_ms, stacks, categories)
+
+
+def _from_cprofile(name: str, stats, wall_ms: float) -> ProfileResult:
+    """cProfile 没有完整调用栈，按 调用者;被调用者 两层近似折叠，类别按函数自身耗时归集"""
+    stacks: Dict[Tuple[Frame, ...], float] = {}
+    categories = {c: 0.0 for c in CATEGORIES}
+    for (filename, line, funcname), (_, _, tottime, _, callers) in stats.stats.items():
+        ms = tottime * 1000
+        categories[classify(filename, funcname) or 'python'] += ms
+        callee = (funcname, filename, line)
+        if callers:
+            caller_total = sum(c[2] for c in callers.values()) or 1
+            for (c_file, c_line, c_func), caller_stats in callers.items():
+                share = ms * caller_stats[2] / caller_total
+                if share > 0:
+                    stacks[((c_func, c_file, c_line), callee)] = share
+        elif ms > 0:
+            stacks[(callee,)] = ms
+    return ProfileResult(name, wall_ms, stacks, categories)
+
+
+def _output_dir(root: str, name: str) -> str:
+    safe = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+    path = os.path.join(root, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{safe}_{os.getpid()}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def write_result(result: ProfileResult, root: Optional[str] = None, pstats_obj=None) -> str:
+    """写入 summary.json / profile.collapsed / profile.speedscope.json（cProfile 额外写 profile.prof）"""
+    path = _output_dir(root or os.environ.get(DIR_ENV) or DEFAULT_PROFILE_DIR, result.name)
+    with open(os.path.join(path, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(result.summary(), f, ensure_ascii=False, indent=2)
+    with open(os.path.join(path, 'profile.collapsed'), 'w', encoding='utf-8') as f:
+        f.write(result.collapsed())
+    with open(os.path.join(path, 'profile.speedscope.json'), 'w', encoding='utf-8') as f:
+        json.dump(result.speedscope(), f, ensure_ascii=False)
+    if pstats_obj is not None:
+        pstats_obj.dump_stats(os.path.join(path, 'profile.prof'))
+    result.output_dir = path
+    return path
+
+
+@contextmanager
+def profile(name: str, mode: Optional[str] = None, output_dir: Optional[str] = None,
+            interval_ms: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    剖析一段代码
+
+    Args:
+        name: 名称（用于输出目录名）
+        mode: sample / cprofile，默认读取 AKSHARE_PROFILE，未设置时为 sample
+        output_dir: 输出根目录
+        interval_ms: 采样间隔（毫秒）
+
+    Yields:
+        dict，退出后包含 result（ProfileResult）和 path（输出目录）
+    """
+    mode = (mode or os.environ.get(MODE_ENV) or 'sample').lower()
+    info: Dict[str, Any] = {}
+    token = _active.set(True)
+    start = time.perf_counter()
+    try:
+        if mode == 'cprofile':
+            import cProfile
+            import pstats
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield info
+            finally:
+                profiler.disable()
+                wall_ms = (time.perf_counter() - start) * 1000
+                stats = pstats.Stats(profiler)
+                info['result'] = _from_cprofile(name, stats, wall_ms)
+                info['path'] = write_result(info['result'], output_dir, stats)
+        else:
+            if interval_ms is None:
+                interval_ms = float(os.environ.get(INTERVAL_ENV) or DEFAULT_INTERVAL_MS)
+            profiler = SamplingProfiler(interval_ms)
+            profiler.start()
+            try:
+                yield info
+            finally:
+                profiler.stop()
+                wall_ms = (time.perf_counter() - start) * 1000
+                info['result'] = _from_samples(name, profiler, wall_ms)
+                info['path'] = write_result(info['result'], output_dir)
+    finally:
+        _active.reset(token)
+
+
+def enabled() -> bool:
+    """环境变量是否开启了自动剖析"""
+    return os.environ.get(MODE_ENV, 'off').lower() in ('sample', 'cprofile')
+
+
+@contextmanager
+def maybe_profile(name: str) -> Iterator[None]:
+    """环境变量开启且当前不在剖析中时剖析，否则直接执行（供 skill 装饰器调用）"""
+    if not enabled() or _active.get():
+        yield
+        return
+    with profile(name):
+        yield
+
+
+if __name__ == '__main__':
+    # 汇总某个输出目录下所有剖析的类别占比
+    root = sys.argv[1] if len(sys.argv) > 1 else os.environ.get(DIR_ENV) or DEFAULT_PROFILE_DIR
+    for entry in sorted(os.listdir(root)):
+        summary_path = os.path.join(root, entry, 'summary.json')
+        if os.path.exists(summary_path):
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+            parts = ', '.join(f"{k} {v['percent']}%" for k, v in summary['categories'].items())
+            print(f"{entry}: {summary['wall_ms']} ms  {parts}")
@@ -0,0 +1,261 @@
+"""
+HTTP 录制/回放基础设施 (Record / Replay)
+在 requests 传输层录制上游响应到压缩的夹具目录，回放时不访问网络，
+可注入模拟延迟，用于离线测试和可复现的性能基准。
+
+环境变量:
+    AKSHARE_HTTP_MODE           live（默认）/ record / replay
+    AKSHARE_FIXTURE_DIR         夹具目录，默认 tests/fixtures/http
+    AKSHARE_REPLAY_LATENCY_MS   回放延迟：200 / 200:50（均值:抖动）/ recorded（按录制耗时）
+
+使用方法:
+    # EastMoneyAPI 的 Session 自动按环境变量挂载
+    # AkShare 内部的 requests 调用需在进程级打补丁：
+    with patch_requests(mode='replay', latency='100:20'):
+        df = ak.stock_profit_sheet_by_yearly_em(symbol='600519')
+"""
+
+import os
+import time
+import gzip
+import json
+import base64
+import random
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+MODE_ENV = 'AKSHARE_HTTP_MODE'
+FIXTURE_DIR_ENV = 'AKSHARE_FIXTURE_DIR'
+LATENCY_ENV = 'AKSHARE_REPLAY_LATENCY_MS'
+
+DEFAULT_FIXTURE_DIR = Path(__file__).resolve().parents[2] / 'tests' / 'fixtures' / 'http'
+
+# 每次请求都会变化的查询参数（时间戳、JSONP 回调名等），不参与夹具匹配
+VOLATILE_PARAMS = {'_', 'cb', 'callback', 'timestamp', 'random', 'rnd'}
+
+# 响应体已解压，这些头不能原样回放
+_DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'set-cookie'}
+
+# 未打补丁前的真实发送函数
+_ORIGINAL_SEND = HTTPAdapter.send
+
+
+class FixtureStore:
+    """夹具目录：每个请求一个 gzip 压缩的 JSON 文件，按域名分目录"""
+
+    def __init__(self, root: Optional[Union[str, Path]] = None,
+                 volatile_params: Iterable[str] = VOLATILE_PARAMS):
+        self.root = Path(root or os.environ.get(FIXTURE_DIR_ENV) or DEFAULT_FIXTURE_DIR)
+        self.volatile_params = set(volatile_params)
+
+    def normalize_url(self, url: str) -> str:
+        """去掉易变参数并排序查询串"""
+        parts = urlsplit(url)
+        query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if k not in self.volatile_params)
+        return f"{parts.scheme}://{parts.netloc}{parts.path}?{urlencode(query)}"
+
+    def key(self, method: str, url: str, body: Optional[Union[bytes, str]] = None) -> str:
+        """请求指纹"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        digest = hashlib.sha1(f"{method.upper()} {self.normalize_url(url)}".encode('utf-8'))
+        if body:
+            digest.update(b'\n')
+            digest.update(body)
+        return digest.hexdigest()
+
+    def path(self, method: str, url: str, body: Optional[Union[bytes, str]] = None) -> Path:
+        host = urlsplit(url).netloc or 'local'
+        return self.root / host / f"{self.key(method, url, body)}.json.gz"
+
+    def get(self, method: str, url: str, body: Optional[Union[bytes, str]] = None) -> Optional[Dict[str, Any]]:
+        """读取夹具，不存在返回 None"""
+        path = self.path(method, url, body)
+        if not path.exists():
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, method: str, url: str, body: Optional[Union[bytes, str]],
+            response: requests.Response, elapsed_ms: Optional[float] = None) -> Path:
+        """保存一次响应"""
+        path = self.path(method, url, body)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            'method': method.upper(),
+            'url': url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+            'encoding': response.encoding,
+            'body': base64.b64encode(response.content).decode('ascii'),
+            'elapsed_ms': round(elapsed_ms, 1) if elapsed_ms is not None else None,
+            'recorded_at': datetime.now().isoformat(),
+        }
+        tmp_path = path.with_suffix('.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+
+class LatencyModel:
+    """回放延迟：固定均值 + 均匀抖动，或按录制时的耗时"""
+
+    def __init__(self, mean_ms: float = 0, jitter_ms: float = 0, use_recorded: bool = False,
+                 seed: Optional[int] = None):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self.use_recorded = use_recorded
+        self._random = random.Random(seed)
+
+    @classmethod
+    def parse(cls, spec: Optional[Union[str, float, 'LatencyModel']]) -> 'LatencyModel':
+        """解析 '200' / '200:50' / 'recorded'"""
+        if isinstance(spec, LatencyModel):
+            return spec
+        if spec is None or spec == '':
+            return cls()
+        if isinstance(spec, (int, float)):
+            return cls(mean_ms=float(spec))
+        if spec.strip().lower() == 'recorded':
+            return cls(use_recorded=True)
+        mean, _, jitter = spec.partition(':')
+        return cls(mean_ms=float(mean), jitter_ms=float(jitter or 0))
+
+    def delay_ms(self, entry: Dict[str, Any]) -> float:
+        if self.use_recorded:
+            return float(entry.get('elapsed_ms') or 0)
+        if self.jitter_ms:
+            return max(0.0, self.mean_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+        return self.mean_ms
+
+    def sleep(self, entry: Dict[str, Any]) -> None:
+        delay = self.delay_ms(entry)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+
+class ReplayTransport:
+    """录制/回放逻辑，供 Adapter 和进程级补丁共用"""
+
+    def __init__(self, mode: Optional[str] = None, store: Optional[FixtureStore] = None,
+                 latency: Optional[Union[str, float, LatencyModel]] = None):
+        self.mode = (mode or os.environ.get(MODE_ENV) or 'live').lower()
+        if self.mode not in ('live', 'record', 'replay'):
+            raise ValueError(f"不支持的 HTTP 模式：{self.mode}，可选 live / record / replay")
+        self.store = store or FixtureStore()
+        self.latency = LatencyModel.parse(latency if latency is not None else os.environ.get(LATENCY_ENV))
+        self._lock = threading.Lock()
+
+    def send(self, adapter: HTTPAdapter, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.mode == 'replay':
+            entry = self.store.get(request.method, request.url, request.body)
+            if entry is None:
+                raise requests.ConnectionError(f"[Replay] 未录制的请求: {request.method} {request.url}",
+                                               request=request)
+            self.latency.sleep(entry)
+            return _build_response(adapter, request, entry)
+
+        start = time.perf_counter()
+        response = _ORIGINAL_SEND(adapter, request, **kwargs)
+        if self.mode == 'record':
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self.store.put(request.method, request.url, request.body, response, elapsed_ms)
+        return response
+
+
+class RecordReplayAdapter(HTTPAdapter):
+    """挂载到 requests.Session 的录制/回放 Adapter"""
+
+    def __init__(self, transport: ReplayTransport, **kwargs):
+        super().__init__(**kwargs)
+        self.transport = transport
+
+    def send(self, request, **kwargs):
+        return self.transport.send(self, request, **kwargs)
+
+
+def _build_response(adapter: HTTPAdapter, request: requests.PreparedRequest,
+                    entry: Dict[str, Any]) -> requests.Response:
+    """由夹具构造 Response"""
+    response = requests.Response()
+    response.status_code = entry['status']
+    response.reason = entry.get('reason') or ''
+    response.headers = CaseInsensitiveDict(entry.get('headers') or {})
+    response._content = base64.b64decode(entry['body'])
+    response.encoding = entry.get('encoding')
+    response.url = request.url
+    response.request = request
+    response.connection = adapter
+    return response
+
+
+def install(session: requests.Session, mode: Optional[str] = None, store: Optional[FixtureStore] = None,
+            latency: Optional[Union[str, float, LatencyModel]] = None) -> requests.Session:
+    """
+    为 Session 挂载录制/回放 Adapter（live 模式不做任何改动）
+
+    Args:
+        session: requests.Session
+        mode: live / record / replay，默认读取 AKSHARE_HTTP_MODE
+        store: 夹具目录
+        latency: 回放延迟
+
+    Returns:
+        原 Session
+    """
+    transport = ReplayTransport(mode, store, latency)
+    if transport.mode != 'live':
+        adapter = RecordReplayAdapter(transport)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+    return session
+
+
+@contextmanager
+def patch_requests(mode: Optional[str] = None, store: Optional[FixtureStore] = None,
+                   latency: Optional[Union[str, float, LatencyModel]] = None):
+    """
+    进程级补丁：所有 requests 请求（包括 AkShare 内部调用）走录制/回放
+
+    Yields:
+        ReplayTransport
+    """
+    transport = ReplayTransport(mode, store, latency)
+    if transport.mode == 'live':
+        yield transport
+        return
+
+    def send(adapter, request, **kwargs):
+        return transport.send(adapter, request, **kwargs)
+
+    HTTPAdapter.send = send
+    try:
+        yield transport
+    finally:
+        HTTPAdapter.send = _ORIGINAL_SEND
+
+
+_active_patch = None
+
+
+def activate_from_env() -> Optional[ReplayTransport]:
+    """按环境变量开启进程级录制/回放（供入口脚本调用，重复调用无副作用）"""
+    global _active_patch
+    if _active_patch is None and os.environ.get(MODE_ENV, 'live').lower() != 'live':
+        _active_patch = patch_requests()
+        return _active_patch.__enter__()
+    return None
@@ -0,0 +1,107 @@
+"""
+后台刷新 (Stale-While-Revalidate)
+缓存过期后，下一个调用方不必等完整的多数据源回退链（可能数十秒）：
+在最大陈旧时间内直接返回过期值（带 stale / cache_age_seconds 标记），同时在后台线程刷新。
+上游新取的结果用 mark_fresh() 带上 stale=False / cache_age_seconds=0，调用方只需处理一种返回结构。
+
+- 每个 skill 的最大陈旧时间见 MAX_STALE，可用环境变量 AKSHARE_MAX_STALE_<SKILL>（秒）覆盖，0 表示关闭
+- 同一缓存键同时只有一个后台刷新（single-flight），后台线程总数有上限
+- 后台线程为守护线程：一次性脚本退出时未完成的刷新会被放弃，常驻服务中则正常完成
+
+使用方法:
+    entry = cache.get_with_meta(key, max_stale=max_stale_for('financial_summary'))
+    if entry and entry[2]:
+        schedule(key, lambda: get_financial_summary(code, refresh=True))
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Set
+
+from akshare_service.infra import access, events
+
+
+# skill -> 过期后仍可返回的最长时间（秒）；财务数据按报告期更新，陈旧一天可以接受
+MAX_STALE = {
+    'financial_summary': 24 * 3600,
+    'cashflow': 24 * 3600,
+    'calculate_roic': 24 * 3600,
+}
+
+MAX_WORKERS = 4
+
+
+def mark_fresh(result: Dict[str, Any]) -> Dict[str, Any]:
+    """标记为刚从上游获取（与缓存命中的返回结构一致）"""
+    result['stale'] = False
+    result['cache_age_seconds'] = 0
+    return result
+
+
+def max_stale_for(skill: str) -> float:
+    """skill 的最大陈旧时间（秒）"""
+    override = os.environ.get(f'AKSHARE_MAX_STALE_{skill.upper()}')
+    if override is not None:
+        return float(override)
+    return MAX_STALE.get(skill, 0)
+
+
+class Revalidator:
+    """后台刷新执行器"""
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self._inflight: Set[str] = set()
+        self._threads: Dict[str, threading.Thread] = {}
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+
+    def schedule(self, key: str, refresh: Callable[[], object]) -> bool:
+        """
+        安排一次后台刷新
+
+        Returns:
+            是否新安排（同一键已在刷新或线程已满时返回 False）
+        """
+        def run():
+            try:
+                with access.suppressed():
+                    refresh()
+                events.debug('cache.revalidated', key=key)
+            except Exception as e:
+                events.warning('cache.revalidate_failed', key=key, error=str(e))
+            finally:
+                with self._lock:
+                    self._inflight.discard(key)
+                    self._threads.pop(key, None)
+                self._slots.release()
+
+        thread = threading.Thread(target=run, name=f'revalidate:{key}', daemon=True)
+        with self._lock:
+            if key in self._inflight:
+                return False
+            if not self._slots.acquire(blocking=False):
+                events.debug('cache.revalidate_skipped', key=key, reason='busy')
+                return False
+            self._inflight.add(key)
+            self._threads[key] = thread
+        thread.start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """等待当前所有后台刷新完成（测试和优雅退出用）"""
+        with self._lock:
+            threads = list(self._threads.values())
+        for thread in threads:
+            thread.join(timeout)
+
+
+_revalidator = Revalidator()
+
+
+def get_revalidator() -> Revalidator:
+    """获取全局后台刷新执行器"""
+    return _revalidator
+
+
+def schedule(key: str, refresh: Callable[[], object]) -> bool:
+    return _revalidator.schedule(key, refresh)
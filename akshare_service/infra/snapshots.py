@@ -0,0 +1,84 @@
+"""
+行情快照内存缓存 (Spot Snapshots)
+stock_zh_a_spot_em 等全市场快照一次返回数千行、耗时数秒，
+同一进程内短时间多次查询（常驻服务、批量估值）只拉取一次。
+
+- 每个快照按 TTL 缓存在进程内存中（默认 30 秒，AKSHARE_SPOT_TTL 覆盖）
+- 同一快照并发请求时只有一个线程真正拉取，其余等待结果（single-flight）
+
+使用方法:
+    df = get_spot('stock_zh_a_spot_em')
+    stock = df[df['代码'] == '600519']
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from akshare_service.infra import events
+from akshare_service.infra.lazy import lazy_import
+
+# 重依赖在首次使用时才导入，见 infra/lazy.py
+ak = lazy_import('akshare')
+
+DEFAULT_TTL = float(os.environ.get('AKSHARE_SPOT_TTL', 30))
+
+# 快照名 -> (拉取时间, DataFrame)
+_snapshots: Dict[str, Tuple[float, Any]] = {}
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(name: str) -> threading.Lock:
+    with _locks_guard:
+        lock = _locks.get(name)
+        if lock is None:
+            lock = _locks[name] = threading.Lock()
+        return lock
+
+
+def get_spot(name: str, ttl: Optional[float] = None):
+    """
+    获取全市场行情快照（进程内缓存）
+
+    Args:
+        name: AkShare 快照函数名，如 stock_zh_a_spot_em / stock_hk_spot_em
+        ttl: 缓存秒数，默认 DEFAULT_TTL；0 表示强制刷新
+
+    Returns:
+        DataFrame，与直接调用 ak.<name>() 相同（调用方不应原地修改）
+    """
+    ttl = DEFAULT_TTL if ttl is None else ttl
+    cached = _snapshots.get(name)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+
+    with _lock_for(name):
+        # 等锁期间其他线程可能已刷新
+        cached = _snapshots.get(name)
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        started = time.monotonic()
+        df = getattr(ak, name)()
+        if df is not None and not df.empty:
+            _snapshots[name] = (time.monotonic(), df)
+            events.debug('snapshot.refresh', snapshot=name, rows=len(df),
+                         elapsed_ms=round((time.monotonic() - started) * 1000, 1))
+        return df
+
+
+def snapshot_age(name: str) -> Optional[float]:
+    """快照已缓存的秒数，未缓存返回 None"""
+    cached = _snapshots.get(name)
+    return None if cached is None else time.monotonic() - cached[0]
+
+
+def clear(name: Optional[str] = None) -> None:
+    """清除指定或全部快照"""
+    if name is None:
+        _snapshots.clear()
+    else:
+        _snapshots.pop(name, None)
@@ -0,0 +1,197 @@
+"""
+股票名称字典 (Stock Name Registry)
+基于 stock_info_a_code_name 构建 代码 → 简称 映射（失败时改用沪、深、北交易所各自的列表），
+持久化到缓存目录并常驻内存，每日后台刷新，避免为取名称下载全市场行情。
+字典为空且拉取失败时，FAILURE_BACKOFF 秒内不再同步重试，查询直接返回空字符串。
+"""
+
+import os
+import json
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from akshare_service.infra import events
+from akshare_service.infra.cache import get_cache
+
+
+# 名称字典刷新间隔（秒），默认 1 天
+REFRESH_INTERVAL = 24 * 3600
+
+# 字典为空时拉取失败后的同步重试间隔（秒），避免上游故障期间每次查询都等待下载超时
+FAILURE_BACKOFF = 300
+
+# stock_info_a_code_name 失败时逐个拉取的交易所列表：(接口, 参数, 代码列, 简称列)
+EXCHANGE_LISTS = [
+    ('stock_info_sh_name_code', {'symbol': '主板A股'}, '证券代码', '证券简称'),
+    ('stock_info_sh_name_code', {'symbol': '科创板'}, '证券代码', '证券简称'),
+    ('stock_info_sz_name_code', {'symbol': 'A股列表'}, 'A股代码', 'A股简称'),
+    ('stock_info_bj_name_code', {}, '证券代码', '证券简称'),
+]
+
+
+def normalize_code(code: str) -> str:
+    """统一股票代码格式：SH600519 / sh600519 / 600519.SH -> 600519"""
+    code = str(code).strip().upper()
+    if '.' in code:
+        code = code.split('.')[0]
+    if code[:2] in ('SH', 'SZ', 'BJ'):
+        code = code[2:]
+    return code
+
+
+class StockNameRegistry:
+    """A股 代码→简称 字典（内存 + 本地文件）"""
+
+    def __init__(self, path: Optional[str] = None, refresh_interval: int = REFRESH_INTERVAL,
+                 failure_backoff: int = FAILURE_BACKOFF):
+        """
+        初始化名称字典
+
+        Args:
+            path: 持久化文件路径，默认在缓存目录下
+            refresh_interval: 刷新间隔（秒）
+            failure_backoff: 字典为空时拉取失败后的同步重试间隔（秒）
+        """
+        self.path = path or os.path.join(get_cache().cache_dir, 'stock_names.json')
+        self.refresh_interval = refresh_interval
+        self.failure_backoff = failure_backoff
+        self._names: Dict[str, str] = {}
+        self._updated_at = 0.0
+        self._failed_at = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def _load(self) -> None:
+        """从本地文件加载字典"""
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            self._names = stored.get('names', {})
+            self._updated_at = float(stored.get('updated_at', 0))
+        except (json.JSONDecodeError, ValueError, OSError):
+            self._names = {}
+            self._updated_at = 0.0
+
+    def _save(self) -> None:
+        """写入本地文件（先写临时文件再替换，避免读到半截内容）"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'updated_at': self._updated_at, 'names': self._names}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _fetch(self) -> Dict[str, str]:
+        """从 AkShare 拉取全部 A股 代码和简称"""
+        import akshare as ak
+
+        names = {}
+        try:
+            df = ak.stock_info_a_code_name()
+            if df is not None and not df.empty:
+                for code, name in zip(df['code'], df['name']):
+                    names[normalize_code(code)] = ''.join(str(name).split())
+        except Exception as e:
+            events.warning('names.fetch_failed', api='stock_info_a_code_name', error=str(e))
+
+        if not names:
+            for api, kwargs, code_column, name_column in EXCHANGE_LISTS:
+                try:
+                    df = getattr(ak, api)(**kwargs)
+                    if df is not None and not df.empty:
+                        for code, name in zip(df[code_column], df[name_column]):
+                            names[normalize_code(code)] = ''.join(str(name).split())
+                except Exception as e:
+                    events.warning('names.fetch_failed', api=api, error=str(e), **kwargs)
+
+        return names
+
+    def refresh(self) -> int:
+        """
+        同步刷新字典
+
+        Returns:
+            字典条目数；拉取失败时保留旧数据并记录失败时间
+        """
+        names = self._fetch()
+        if not names:
+            self._failed_at = time.time()
+            return len(self._names)
+        with self._lock:
+            self._names = names
+            self._updated_at = time.time()
+            try:
+                self._save()
+            except OSError as e:
+                events.warning('names.save_failed', path=self.path, error=str(e))
+        return len(names)
+
+    def _refresh_in_background(self) -> None:
+        """启动后台刷新线程（同一时间只运行一个）"""
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self.refresh, name='stock-names-refresh', daemon=True)
+            self._refresh_thread.start()
+
+    def _ensure_ready(self) -> None:
+        """首次使用时加载；字典为空则同步拉取（失败后退避 failure_backoff 秒），过期则后台刷新"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+        if not self._names:
+            if time.time() - self._failed_at >= self.failure_backoff:
+                self.refresh()
+        elif time.time() - self._updated_at > self.refresh_interval:
+            self._refresh_in_background()
+
+    def resolve(self, code: str) -> str:
+        """查询单个股票简称，未找到返回空字符串"""
+        self._ensure_ready()
+        return self._names.get(normalize_code(code), '')
+
+    def resolve_names(self, codes: Iterable[str]) -> Dict[str, str]:
+        """
+        批量查询股票简称
+
+        Args:
+            codes: 股票代码列表
+
+        Returns:
+            {原始代码: 简称}，未找到的代码对应空字符串
+        """
+        self._ensure_ready()
+        return {code: self._names.get(normalize_code(code), '') for code in codes}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+# 全局名称字典实例
+_registry_instance: Optional[StockNameRegistry] = None
+
+
+def get_name_registry() -> StockNameRegistry:
+    """获取全局名称字典实例"""
+    global _registry_instance
+    if _registry_instance is None:
+        _registry_instance = StockNameRegistry()
+    return _registry_instance
+
+
+def resolve_name(code: str) -> str:
+    """查询单个股票简称"""
+    return get_name_registry().resolve(code)
+
+
+def resolve_names(codes: Iterable[str]) -> Dict[str, str]:
+    """批量查询股票简称"""
+    return get_name_registry().resolve_names(codes)
+
+
+if __name__ == '__main__':
+    print(resolve_names(['600519', '300760', '000001']))
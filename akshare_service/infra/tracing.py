@@ -0,0 +1,262 @@
+"""
+链路追踪 (Tracing)
+在 skill、每个数据源尝试、东方财富 HTTP 请求和缓存读写外层打 span，
+定位回退链中到底是哪个数据源耗时。默认不采集（no-op），开启方式：
+
+    AKSHARE_TRACING=json    写入本地 JSON 行文件，无需 collector
+                            （路径 AKSHARE_TRACE_FILE，默认 /tmp/akshare_cache/traces.jsonl）
+    AKSHARE_TRACING=otel    交给 OpenTelemetry SDK（需安装 opentelemetry-api 并自行配置 exporter）
+
+span 接口与 OpenTelemetry 的 Span 兼容：set_attribute / set_attributes / record_exception。
+
+使用方法:
+    with start_span('source.eastmoney', {'code': '600519'}) as span:
+        ...
+        span.set_attribute('bytes_received', 1024)
+"""
+
+import os
+import json
+import time
+import secrets
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+MODE_ENV = 'AKSHARE_TRACING'
+TRACE_FILE_ENV = 'AKSHARE_TRACE_FILE'
+DEFAULT_TRACE_FILE = '/tmp/akshare_cache/traces.jsonl'
+
+
+class NoopSpan:
+    """未开启追踪时使用，所有操作为空"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Span:
+    """本地 span（字段命名参照 OTLP JSON）"""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.status = 'OK'
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        if attributes:
+            self.set_attributes(attributes)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.status = 'ERROR'
+        self.events.append({
+            'name': 'exception',
+            'timeUnixNano': time.time_ns(),
+            'attributes': {'exception.type': type(exception).__name__,
+                           'exception.message': str(exception)},
+        })
+
+    def is_recording(self) -> bool:
+        return self.end_ns is None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id,
+            'name': self.name,
+            'startTimeUnixNano': self.start_ns,
+            'endTimeUnixNano': self.end_ns,
+            'durationMs': round(self.duration_ms, 3),
+            'attributes': self.attributes,
+            'events': self.events,
+            'status': self.status,
+        }
+
+
+class JsonFileExporter:
+    """每个结束的 span 追加一行 JSON"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get(TRACE_FILE_ENV) or DEFAULT_TRACE_FILE
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+class InMemoryExporter:
+    """内存收集（用于测试和交互式排查）"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar('akshare_current_span', default=None)
+
+# 当前导出器：None 表示 no-op；'otel' 表示交给 OpenTelemetry
+_exporter = None
+_otel_tracer = None
+
+
+def configure(mode: Optional[str] = None, exporter=None) -> None:
+    """
+    设置追踪方式
+
+    Args:
+        mode: off / json / otel，默认读取 AKSHARE_TRACING
+        exporter: 自定义导出器（实现 export(span)），优先于 mode
+    """
+    global _exporter, _otel_tracer
+    _otel_tracer = None
+    if exporter is not None:
+        _exporter = exporter
+        return
+
+    mode = (mode or os.environ.get(MODE_ENV) or 'off').lower()
+    if mode == 'json':
+        _exporter = JsonFileExporter()
+    elif mode == 'otel':
+        try:
+            from opentelemetry import trace
+            _otel_tracer = trace.get_tracer('akshare_service')
+            _exporter = 'otel'
+        except ImportError:
+            from akshare_service.infra import events
+            events.warning('tracing.otel_unavailable', error='opentelemetry-api 未安装，追踪已关闭')
+            _exporter = None
+    else:
+        _exporter = None
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+def current_span():
+    """当前 span，未开启时返回 NOOP_SPAN"""
+    return _current_span.get() or NOOP_SPAN
+
+
+@contextmanager
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+    """
+    开启一个 span，自动挂到当前 span 之下；异常会记录到 span 并继续抛出
+    """
+    if _exporter is None:
+        yield NOOP_SPAN
+        return
+
+    if _exporter == 'otel':
+        with _otel_tracer.start_as_current_span(name, attributes=_clean(attributes)) as span:
+            yield span
+        return
+
+    parent = _current_span.get()
+    trace_id = parent.trace_id if parent else secrets.token_hex(16)
+    span = Span(name, trace_id, parent.span_id if parent else None, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        span.end_ns = time.time_ns()
+        _current_span.reset(token)
+        try:
+            _exporter.export(span)
+        except Exception:
+            pass
+
+
+def _clean(attributes: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """OpenTelemetry 只接受基本类型属性"""
+    if not attributes:
+        return attributes
+    return {k: v if isinstance(v, (str, bool, int, float)) else str(v)
+            for k, v in attributes.items() if v is not None}
+
+
+def load_traces(path: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """读取 JSON 导出文件，按 traceId 分组"""
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path or os.environ.get(TRACE_FILE_ENV) or DEFAULT_TRACE_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                traces.setdefault(span['traceId'], []).append(span)
+    return traces
+
+
+def format_trace(spans: List[Dict[str, Any]]) -> str:
+    """把一条 trace 渲染为缩进树，每行显示耗时和关键属性"""
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for span in sorted(spans, key=lambda s: s['startTimeUnixNano']):
+        children.setdefault(span.get('parentSpanId'), []).append(span)
+
+    lines = []
+
+    def walk(parent_id, depth):
+        for span in children.get(parent_id, []):
+            attrs = span.get('attributes', {})
+            detail = ' '.join(f"{k}={attrs[k]}" for k in ('code', 'outcome', 'retry_count', 'bytes_received')
+                              if k in attrs)
+            lines.append(f"{'  ' * depth}{span['name']:<32} {span['durationMs']:>10.1f} ms  {detail}")
+            walk(span['spanId'], depth + 1)
+
+    span_ids = {span['spanId'] for span in spans}
+    for root_parent in [p for p in children if p is None or p not in span_ids]:
+        walk(root_parent, 0)
+    return '\n'.join(lines)
+
+
+configure()
+
+
+if __name__ == '__main__':
+    import sys
+
+    for trace_id, spans in load_traces(sys.argv[1] if len(sys.argv) > 1 else None).items():
+        print(f"\n=== trace {trace_id} ===")
+        print(format_trace(spans))
@@ -0,0 +1,146 @@
+"""
+上游站点识别与限流 (Upstreams)
+AkShare 函数按所访问的站点归类（东方财富、新浪、同花顺、巨潮……），
+同一站点共享并发上限和最小请求间隔，避免并发调用把某个站点打到封禁。
+
+识别规则：先看函数名后缀（stock_zh_a_spot_em → eastmoney），
+再看文档描述的来源前缀（"新浪财经-..." → sina），都不匹配时归为 other。
+
+使用方法:
+    limiter = UpstreamLimiter()
+    with limiter.acquire(upstream_of('stock_zh_a_spot_em')):
+        df = ak.stock_zh_a_spot_em()
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+# 函数名片段 -> 上游
+NAME_TOKENS = {
+    'em': 'eastmoney',
+    'sina': 'sina',
+    'ths': 'ths',
+    'cninfo': 'cninfo',
+    'xq': 'xueqiu',
+    'baidu': 'baidu',
+    'lg': 'legulegu',
+    'sse': 'sse',
+    'szse': 'szse',
+    'bse': 'bse',
+    'tx': 'tencent',
+    'jsl': 'jisilu',
+    'cx': 'caixin',
+}
+
+# 文档描述中的来源 -> 上游
+DESCRIPTION_SOURCES = (
+    ('东方财富', 'eastmoney'),
+    ('新浪', 'sina'),
+    ('同花顺', 'ths'),
+    ('巨潮', 'cninfo'),
+    ('雪球', 'xueqiu'),
+    ('百度', 'baidu'),
+    ('乐咕乐股', 'legulegu'),
+    ('上海证券交易所', 'sse'),
+    ('深圳证券交易所', 'szse'),
+    ('北京证券交易所', 'bse'),
+    ('腾讯', 'tencent'),
+    ('集思录', 'jisilu'),
+    ('财新', 'caixin'),
+)
+
+# 每个上游的并发上限（同花顺、雪球等对并发更敏感）
+DEFAULT_LIMITS = {
+    'eastmoney': 4,
+    'sina': 2,
+    'ths': 1,
+    'cninfo': 2,
+    'xueqiu': 1,
+    'baidu': 1,
+    'legulegu': 1,
+    'sse': 2,
+    'szse': 2,
+    'bse': 2,
+    'tencent': 2,
+}
+DEFAULT_LIMIT = 2
+
+
+def upstream_of(api_name: str, description: str = '') -> str:
+    """
+    识别 AkShare 函数访问的上游站点
+
+    Args:
+        api_name: 函数名，如 stock_zh_a_spot_em
+        description: 文档描述（函数名无法识别时使用）
+
+    Returns:
+        上游名，如 eastmoney / sina；无法识别时为 other
+    """
+    for token in reversed(api_name.lower().split('_')):
+        if token in NAME_TOKENS:
+            return NAME_TOKENS[token]
+    for keyword, upstream in DESCRIPTION_SOURCES:
+        if keyword in description:
+            return upstream
+    return 'other'
+
+
+class UpstreamLimiter:
+    """按上游的并发上限 + 最小请求间隔"""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default_limit: int = DEFAULT_LIMIT,
+                 min_interval: Optional[Dict[str, float]] = None, default_interval: float = 0.0):
+        """
+        Args:
+            limits: 上游 -> 并发上限，未列出的使用 default_limit
+            min_interval: 上游 -> 相邻两次请求开始的最小间隔（秒）
+            default_interval: 未列出上游的最小间隔
+        """
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.default_limit = default_limit
+        self.min_interval = dict(min_interval or {})
+        self.default_interval = default_interval
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, upstream: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(upstream)
+            if semaphore is None:
+                limit = self.limits.get(upstream, self.default_limit)
+                semaphore = self._semaphores[upstream] = threading.BoundedSemaphore(max(1, limit))
+            return semaphore
+
+    def _wait_turn(self, upstream: str) -> float:
+        """预约下一个请求开始时间并等待，返回等待秒数"""
+        interval = self.min_interval.get(upstream, self.default_interval)
+        if interval <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(upstream, now))
+            self._next_start[upstream] = start + interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    @contextmanager
+    def acquire(self, upstream: str) -> Iterator[float]:
+        """
+        占用一个上游名额（阻塞直到可用）
+
+        Yields:
+            为满足最小间隔而等待的秒数
+        """
+        semaphore = self._semaphore(upstream)
+        semaphore.acquire()
+        try:
+            yield self._wait_turn(upstream)
+        finally:
+            semaphore.release()
@@ -8,10 +8,17 @@
 3. 东方财富 API（兜底）
 """
 
-import pandas as pd
+from __future__ import annotations
+
 from typing import Optional, Dict, Any
 import os
 
+from akshare_service.infra import events
+from akshare_service.infra.lazy import lazy_import
+
+# 重依赖在首次使用时才导入，见 infra/lazy.py
+pd = lazy_import('pandas')
+
 
 class FinancialRouter:
     """财务数据多源路由器"""
@@ -37,8 +44,8 @@ class FinancialRouter:
     def eastmoney(self):
         """延迟加载东方财富 API"""
         if self._eastmoney is None:
-            from akshare_service.crawlers.eastmoney_api import EastMoneyAPI
-            self._eastmoney = EastMoneyAPI()
+            from akshare_service.crawlers.eastmoney_api import get_eastmoney_api
+            self._eastmoney = get_eastmoney_api()
         return self._eastmoney
     
     def get_financial_indicator(self, code: str, years: int = 5) -> pd.DataFrame:
@@ -62,7 +69,8 @@ class FinancialRouter:
                     df['source'] = 'TuShare'
                     return df
             except Exception as e:
-                print(f"TuShare 失败: {e}")
+                events.warning('router.fallback', skill='financial_indicator', source='tushare',
+                               code=code, error=str(e))
         
         # 2. 尝试 AkShare
         if self.akshare:
@@ -72,10 +80,11 @@ class FinancialRouter:
                     df['source'] = 'AkShare'
                     return df
             except Exception as e:
-                print(f"AkShare 失败: {e}")
+                events.warning('router.fallback', skill='financial_indicator', source='akshare',
+                               code=code, error=str(e))
         
         # 3. 兜底：东方财富 API
-        print("使用东方财富 API 兜底...")
+        events.emit('router.attempt', skill='financial_indicator', source='eastmoney', code=code)
         df = self.eastmoney.get_financial_indicator(code)
         if not df.empty:
             df['source'] = 'EastMoney'
@@ -91,7 +100,8 @@ class FinancialRouter:
                     df['source'] = 'AkShare'
                     return df
             except Exception as e:
-                print(f"AkShare 失败: {e}")
+                events.warning('router.fallback', skill='balance_sheet', source='akshare',
+                               code=code, error=str(e))
         
         # 兜底：东方财富 API
         df = self.eastmoney.get_balance_sheet(code)
@@ -109,7 +119,8 @@ class FinancialRouter:
                     df['source'] = 'AkShare'
                     return df
             except Exception as e:
-                print(f"AkShare 失败: {e}")
+                events.warning('router.fallback', skill='income_statement', source='akshare',
+                               code=code, error=str(e))
         
         # 兜底：东方财富 API
         df = self.eastmoney.get_income_statement(code)
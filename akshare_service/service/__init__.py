@@ -0,0 +1,5 @@
+"""
+Service module - 常驻服务
+
+server: 常驻 skills 服务（HTTP / Unix socket 上的 JSON-RPC 2.0）
+"""
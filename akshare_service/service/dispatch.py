@@ -0,0 +1,325 @@
+"""
+通用调度 (Generic Dispatch)
+docs/skills.json 以工具 schema 描述了 368 个 AkShare 函数，这里提供统一的执行入口：
+
+1. 按 schema 校验并规范化参数（未知参数、缺少必填、类型、枚举）
+2. 以规范化参数的哈希为键查本地缓存，TTL 按函数类别（实时行情 30 秒 ... 静态列表 7 天）
+3. 未命中时 getattr(ak, name)(**args)，按上游站点限制并发（见 infra/upstreams.py）
+4. 返回紧凑的列式结果 {'columns', 'data', 'rows'}
+
+使用方法:
+    dispatcher = get_dispatcher()
+    result = dispatcher.call('stock_zh_a_hist', {'symbol': '600519', 'period': 'daily'}, max_rows=20)
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from akshare_service.infra import codec, events, metrics
+from akshare_service.infra.cache import LocalCache, get_cache
+from akshare_service.infra.lazy import lazy_import
+from akshare_service.infra.upstreams import UpstreamLimiter, upstream_of
+
+# 重依赖在首次使用时才导入，见 infra/lazy.py
+ak = lazy_import('akshare')
+
+SKILLS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           'docs', 'skills.json')
+
+# TTL 类别（秒）
+TTL_CLASSES = {
+    'realtime': 30,
+    'intraday': 300,
+    'daily': 4 * 3600,
+    'report': 24 * 3600,
+    'static': 7 * 24 * 3600,
+}
+DEFAULT_TTL_CLASS = 'daily'
+
+KEY_LOCK_STRIPES = 256
+
+# (类别, 函数名片段, 描述关键词)，按顺序匹配
+TTL_RULES = (
+    ('realtime', ('spot', 'tick', 'bid', 'ask', 'realtime'), ('实时', '盘口', '即时')),
+    ('intraday', ('minute', 'min', 'intraday'), ('分时', '分钟')),
+    ('static', ('info', 'name', 'code', 'list', 'delist', 'profile'), ('列表', '基本信息', '简介', '概况', '名称')),
+    ('report', ('report', 'financial', 'balance', 'profit', 'cash', 'dividend', 'yjbb', 'yjyg', 'yjkb',
+                'gdhs', 'holder'), ('报表', '财务', '年报', '业绩', '分红', '股东')),
+)
+
+
+class DispatchError(Exception):
+    """调度失败"""
+
+
+class UnknownApiError(DispatchError):
+    """skills.json 中没有该函数"""
+
+
+class InvalidArgumentsError(DispatchError):
+    """参数不符合 schema"""
+
+
+def ttl_class_of(api_name: str, description: str = '') -> str:
+    """按函数名和描述判断 TTL 类别"""
+    tokens = set(api_name.lower().split('_'))
+    for ttl_class, name_tokens, keywords in TTL_RULES:
+        if tokens.intersection(name_tokens) or any(k in description for k in keywords):
+            return ttl_class
+    return DEFAULT_TTL_CLASS
+
+
+def _is_clean_enum(values: List[Any]) -> bool:
+    """
+    枚举是否可用于严格校验
+
+    skills.json 的枚举由文档示例自动抽取，部分是说明文字（如 "具体股票代码"、'"5": 最近 5 天'），
+    这类枚举只作提示，不拒绝枚举外的取值。
+    """
+    return all(isinstance(v, str) and not any(c in v for c in ':："“”') and '具体' not in v
+               for v in values)
+
+
+def _coerce(name: str, value: Any, schema: Dict[str, Any]) -> Any:
+    """按 schema 类型规范化单个参数"""
+    expected = schema.get('type', 'string')
+    if expected == 'string':
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise InvalidArgumentsError(f"参数 {name} 应为字符串")
+        value = value.strip() if isinstance(value, str) else str(value)
+    elif expected in ('number', 'integer'):
+        if isinstance(value, str):
+            try:
+                value = float(value) if expected == 'number' else int(value)
+            except ValueError:
+                raise InvalidArgumentsError(f"参数 {name} 应为数值")
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise InvalidArgumentsError(f"参数 {name} 应为数值")
+        elif expected == 'integer':
+            if value != int(value):
+                raise InvalidArgumentsError(f"参数 {name} 应为整数")
+            value = int(value)
+    elif expected == 'boolean':
+        if isinstance(value, str) and value.lower() in ('true', 'false'):
+            value = value.lower() == 'true'
+        elif not isinstance(value, bool):
+            raise InvalidArgumentsError(f"参数 {name} 应为布尔值")
+
+    enum = schema.get('enum')
+    if enum and value not in enum and _is_clean_enum(enum):
+        raise InvalidArgumentsError(f"参数 {name} 取值应为 {enum} 之一")
+    return value
+
+
+def args_hash(args: Dict[str, Any]) -> str:
+    """规范化参数的哈希（键排序，与传参顺序无关）"""
+    canonical = json.dumps(args, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def to_columns(value: Any) -> Dict[str, Any]:
+    """AkShare 返回值转为可缓存的列式结构"""
+    if hasattr(value, 'to_frame') and hasattr(value, 'tolist'):  # Series
+        value = value.to_frame()
+    if hasattr(value, 'columns') and hasattr(value, 'astype'):
+        payload = codec.frame_to_columns(value)
+    else:
+        payload = {'value': value}
+    # 日期、numpy 标量等转为 JSON 基本类型，保证可写入缓存
+    return codec.loads(codec.dumps(payload, default=codec.json_default))
+
+
+class Catalog:
+    """skills.json 中的函数 schema"""
+
+    def __init__(self, path: str = SKILLS_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            tools = json.load(f)
+        self.functions: Dict[str, Dict[str, Any]] = {}
+        for tool in tools:
+            function = tool.get('function', tool)
+            self.functions[function['name']] = function
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.functions
+
+    def __len__(self) -> int:
+        return len(self.functions)
+
+    def get(self, name: str) -> Dict[str, Any]:
+        function = self.functions.get(name)
+        if function is None:
+            raise UnknownApiError(f"未知接口: {name}")
+        return function
+
+    def validate(self, name: str, args: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        按 schema 校验参数
+
+        Returns:
+            规范化后的参数（去掉值为 None 的参数）
+        """
+        function = self.get(name)
+        if args is None:
+            args = {}
+        if not isinstance(args, dict):
+            raise InvalidArgumentsError("参数必须是对象")
+        parameters = function.get('parameters', {})
+        properties = parameters.get('properties', {})
+
+        unknown = sorted(set(args) - set(properties))
+        if unknown:
+            raise InvalidArgumentsError(f"{name} 不支持参数: {', '.join(unknown)}")
+        missing = [p for p in parameters.get('required', []) if args.get(p) is None]
+        if missing:
+            raise InvalidArgumentsError(f"{name} 缺少必填参数: {', '.join(missing)}")
+        return {key: _coerce(key, value, properties[key])
+                for key, value in args.items() if value is not None}
+
+
+class Dispatcher:
+    """通用 AkShare 调度：校验、缓存、按上游限流"""
+
+    def __init__(self, catalog: Optional[Catalog] = None, cache: Optional[LocalCache] = None,
+                 limiter: Optional[UpstreamLimiter] = None, ttl_overrides: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            catalog: 函数目录，默认读取 docs/skills.json
+            cache: 缓存实例，默认全局缓存
+            limiter: 上游限流器
+            ttl_overrides: 函数名 -> TTL（秒），优先于类别
+        """
+        self.catalog = catalog or Catalog()
+        self.cache = cache or get_cache()
+        self.limiter = limiter or UpstreamLimiter()
+        self.ttl_overrides = dict(ttl_overrides or {})
+        # 按键分片的锁：同一键的并发请求只打一次上游，锁数量固定不随键增长
+        self._key_locks = [threading.Lock() for _ in range(KEY_LOCK_STRIPES)]
+
+    def describe(self, name: str) -> Dict[str, Any]:
+        """函数 schema 及其上游、TTL 类别"""
+        function = self.catalog.get(name)
+        description = function.get('description', '')
+        ttl_class = ttl_class_of(name, description)
+        return {
+            **function,
+            'upstream': upstream_of(name, description),
+            'ttl_class': ttl_class,
+            'ttl': self.ttl_overrides.get(name, TTL_CLASSES[ttl_class]),
+        }
+
+    def list(self, prefix: str = '') -> List[Dict[str, str]]:
+        """函数清单（名称、描述、上游）"""
+        return [{'name': name, 'description': f.get('description', ''),
+                 'upstream': upstream_of(name, f.get('description', ''))}
+                for name, f in sorted(self.catalog.functions.items()) if name.startswith(prefix)]
+
+    def cache_key(self, name: str, args: Dict[str, Any]) -> str:
+        return f"ak:{name}:{args_hash(args)}"
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        return self._key_locks[int(key.rsplit(':', 1)[-1], 16) % KEY_LOCK_STRIPES]
+
+    def _resolve(self, name: str, args: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+        """取 AkShare 函数，并用真实签名补齐默认值（同一请求的不同写法得到同一缓存键）"""
+        func = getattr(ak, name, None)
+        if func is None:
+            raise UnknownApiError(f"当前 akshare 版本没有接口: {name}")
+        try:
+            bound = inspect.signature(func).bind(**args)
+        except TypeError as e:
+            raise InvalidArgumentsError(f"{name}: {e}")
+        except ValueError:  # 无法获取签名的内建函数
+            return func, args
+        bound.apply_defaults()
+        return func, dict(bound.arguments)
+
+    def call(self, name: str, args: Optional[Dict[str, Any]] = None, use_cache: bool = True,
+             max_rows: Optional[int] = None) -> Dict[str, Any]:
+        """
+        调用 AkShare 函数
+
+        Args:
+            name: 函数名
+            args: 参数（按 skills.json 校验）
+            use_cache: 是否读写缓存
+            max_rows: 只返回前 N 行（不影响缓存内容）
+
+        Returns:
+            {'api', 'args', 'upstream', 'ttl_class', 'cached', 'fetched_at', 'columns', 'data', 'rows'}
+            非 DataFrame 返回值放在 'value' 中
+        """
+        info = self.describe(name)
+        args = self.catalog.validate(name, args)
+        func, args = self._resolve(name, args)
+        key = self.cache_key(name, args)
+        meta = {'api': name, 'args': args, 'upstream': info['upstream'], 'ttl_class': info['ttl_class']}
+
+        with metrics.timer('akshare_dispatch_duration_seconds', 'akshare_dispatch_calls_total',
+                           span=f'ak.{name}', span_attributes={'cache.key': key},
+                           api=name, upstream=info['upstream']) as attempt:
+            payload = self.cache.get(key) if use_cache else None
+            if payload is not None:
+                attempt.outcome = 'cached'
+                return _limit_rows({**meta, 'cached': True, **payload}, max_rows)
+
+            # 同一键并发请求只打一次上游
+            with self._lock_for(key):
+                payload = self.cache.get(key) if use_cache else None
+                if payload is not None:
+                    attempt.outcome = 'cached'
+                    return _limit_rows({**meta, 'cached': True, **payload}, max_rows)
+
+                with self.limiter.acquire(info['upstream']) as waited:
+                    if waited:
+                        events.debug('dispatch.throttled', api=name, upstream=info['upstream'],
+                                     waited_ms=round(waited * 1000, 1))
+                    try:
+                        value = func(**args)
+                    except Exception as e:
+                        events.warning('dispatch.failed', api=name, upstream=info['upstream'], error=str(e))
+                        raise DispatchError(f"{name} 调用失败: {type(e).__name__}: {e}") from e
+
+                payload = {**to_columns(value), 'fetched_at': datetime.now().isoformat()}
+                empty = payload['rows'] == 0 if 'rows' in payload else payload.get('value') is None
+                if empty:
+                    attempt.outcome = 'empty'
+                elif use_cache:
+                    self.cache.set(key, payload, ttl=info['ttl'])
+        return _limit_rows({**meta, 'cached': False, **payload}, max_rows)
+
+
+def _limit_rows(result: Dict[str, Any], max_rows: Optional[int]) -> Dict[str, Any]:
+    if max_rows is None or 'data' not in result or result['rows'] <= max_rows:
+        return result
+    result['data'] = {column: values[:max_rows] for column, values in result['data'].items()}
+    result['truncated'] = True
+    return result
+
+
+# 全局调度实例
+_dispatcher_instance: Optional[Dispatcher] = None
+
+
+def get_dispatcher() -> Dispatcher:
+    """获取全局调度实例"""
+    global _dispatcher_instance
+    if _dispatcher_instance is None:
+        _dispatcher_instance = Dispatcher()
+    return _dispatcher_instance
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 2:
+        print("用法: python -m akshare_service.service.dispatch <函数名> [参数 JSON]")
+        sys.exit(1)
+    result = get_dispatcher().call(sys.argv[1], json.loads(sys.argv[2]) if len(sys.argv) > 2 else {},
+                                   max_rows=10)
+    print(codec.dumps(result).decode('utf-8'))
@@ -0,0 +1,247 @@
+"""
+自选股预取 (Watchlist Prefetch)
+agent 的问题集中在几百只自选股上。按 config.yaml 中 prefetch.schedule 的 cron 在非交易时段
+预先计算财务指标、现金流、ROIC 并写入缓存（TTL 覆盖到下一轮预取），交互请求直接命中缓存。
+估值依赖实时行情（进程内快照只缓存 30 秒），非交易时段预取的结果到交互请求时已过期，不支持预取。
+
+- 优先级：按近期访问热度（infra/access.py，指数衰减）从高到低，单轮任务数有上限
+- 限速：任务串行执行，两个任务之间至少间隔 interval 秒，skill 内部的请求限速照常生效
+- 缓存剩余有效期仍充足的条目跳过，不浪费上游配额
+- 预取本身的调用不计入访问热度
+
+使用方法:
+    python -m akshare_service.service.prefetch --once            # 立即执行一轮
+    python -m akshare_service.service.prefetch --dry-run         # 只打印计划
+    python -m akshare_service.service.prefetch                   # 按 cron 常驻运行
+    python -m akshare_service.service.server --prefetch          # 在常驻服务中运行
+"""
+
+import argparse
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from akshare_service.infra import access, events
+from akshare_service.infra.cache import LocalCache, get_cache
+from akshare_service.infra.cron import CronSchedule
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CONFIG_FILE = os.path.join(PROJECT_ROOT, 'config.yaml')
+
+DEFAULT_CONFIG = {
+    'enabled': False,
+    'schedule': '30 1 * * *',
+    'watchlist': [],
+    'watchlist_file': '',
+    'skills': ['financial_summary', 'cashflow', 'roic'],
+    'years': 5,
+    'cache_ttl': 86400,
+    'refresh_before': 0.25,
+    'interval': 1.0,
+    'max_jobs': 2000,
+    'half_life_hours': 72,
+    'window_days': 30,
+}
+
+
+def load_config(path: str = CONFIG_FILE) -> Dict[str, Any]:
+    """读取 config.yaml 的 prefetch 段（缺省项取 DEFAULT_CONFIG）"""
+    config = dict(DEFAULT_CONFIG)
+    if os.path.exists(path):
+        import yaml
+        with open(path, 'r', encoding='utf-8') as f:
+            config.update((yaml.safe_load(f) or {}).get('prefetch') or {})
+    return config
+
+
+def load_watchlist(config: Dict[str, Any]) -> List[str]:
+    """自选股代码（watchlist 列表 + watchlist_file 每行一个，# 开头为注释），保持顺序去重"""
+    codes = [str(c).strip() for c in config.get('watchlist') or []]
+    path = config.get('watchlist_file')
+    if path:
+        path = path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+        with open(path, 'r', encoding='utf-8') as f:
+            codes.extend(line.split('#', 1)[0].strip() for line in f)
+    return list(dict.fromkeys(c for c in codes if c))
+
+
+def _financial_summary(code: str, years: int, ttl: int) -> bool:
+    from akshare_service.skills.financial_summary import get_financial_summary
+    result = get_financial_summary(code, years, refresh=True, cache_ttl=ttl)
+    return bool(result and result.get('annual_data'))
+
+
+def _cashflow(code: str, years: int, ttl: int) -> bool:
+    from akshare_service.skills.cashflow import get_cashflow_data
+    result = get_cashflow_data(code, years, refresh=True, cache_ttl=ttl)
+    return bool(result and result.get('annual_data'))
+
+
+def _roic(code: str, years: int, ttl: int) -> bool:
+    from akshare_service.skills.finance import calculate_roic
+    df = calculate_roic('A股', code, years, refresh=True, cache_ttl=ttl)
+    return df is not None and not df.empty
+
+
+# skill -> (执行函数, 缓存键模板)
+PREFETCH_SKILLS: Dict[str, Tuple[Callable[[str, int, int], bool], str]] = {
+    'financial_summary': (_financial_summary, 'financial_summary:{code}:{years}'),
+    'cashflow': (_cashflow, 'cashflow_data:{code}:{years}'),
+    'roic': (_roic, 'roic:A股:{code}:{years}'),
+}
+
+# 不支持预取的 skill -> 原因
+UNSUPPORTED_SKILLS = {
+    'valuation': '估值依赖实时行情，进程内快照只缓存 30 秒，非交易时段预取的结果无法被交互请求命中',
+}
+
+
+@dataclass
+class PrefetchJob:
+    skill: str
+    code: str
+    score: float = 0.0
+    cache_key: Optional[str] = None
+
+
+class Prefetcher:
+    """自选股预取调度"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, cache: Optional[LocalCache] = None,
+                 access_log: Optional[access.AccessLog] = None):
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        unsupported = [s for s in self.config['skills'] if s in UNSUPPORTED_SKILLS]
+        if unsupported:
+            raise ValueError('; '.join(f"{s} 不支持预取：{UNSUPPORTED_SKILLS[s]}" for s in unsupported) +
+                             "，请从 prefetch.skills 中移除")
+        unknown = [s for s in self.config['skills'] if s not in PREFETCH_SKILLS]
+        if unknown:
+            raise ValueError(f"不支持预取的 skill: {unknown}，可选 {list(PREFETCH_SKILLS)}")
+        self.schedule = CronSchedule(self.config['schedule'])
+        self.cache = cache or get_cache()
+        self.access_log = access_log if access_log is not None else access.get_access_log()
+        self.last_run: Optional[Dict[str, Any]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def plan(self) -> Tuple[List[PrefetchJob], int]:
+        """
+        生成本轮任务（按访问热度排序，跳过缓存仍新鲜的条目）
+
+        Returns:
+            (任务列表, 因缓存新鲜而跳过的条目数)
+        """
+        codes = load_watchlist(self.config)
+        scores = self.access_log.scores(self.config['half_life_hours'], self.config['window_days']) \
+            if self.access_log else {}
+        years = self.config['years']
+        fresh_threshold = self.config['cache_ttl'] * self.config['refresh_before']
+
+        jobs, fresh = [], 0
+        ranked = sorted(enumerate(codes), key=lambda item: (-scores.get(item[1], 0.0), item[0]))
+        for _, code in ranked:
+            for skill in self.config['skills']:
+                key = PREFETCH_SKILLS[skill][1].format(code=code, years=years)
+                remaining = self.cache.expires_in(key)
+                if remaining is not None and remaining > fresh_threshold:
+                    fresh += 1
+                    continue
+                jobs.append(PrefetchJob(skill, code, scores.get(code, 0.0), key))
+        return jobs[:self.config['max_jobs']], fresh
+
+    def run_once(self) -> Dict[str, Any]:
+        """执行一轮预取，返回统计"""
+        started = time.time()
+        if self.access_log:
+            self.access_log.compact(self.config['window_days'])
+        jobs, fresh = self.plan()
+        summary = {'started_at': datetime.now().isoformat(timespec='seconds'), 'planned': len(jobs),
+                   'skipped_fresh': fresh, 'succeeded': 0, 'failed': 0, 'aborted': False}
+        events.emit('prefetch.start', planned=len(jobs), skipped_fresh=fresh)
+
+        interval = self.config['interval']
+        last_start = 0.0
+        with access.suppressed():
+            for job in jobs:
+                if self._stop.is_set():
+                    summary['aborted'] = True
+                    break
+                wait = interval - (time.monotonic() - last_start)
+                if wait > 0 and self._stop.wait(wait):
+                    summary['aborted'] = True
+                    break
+                last_start = time.monotonic()
+                runner = PREFETCH_SKILLS[job.skill][0]
+                try:
+                    ok = runner(job.code, self.config['years'], self.config['cache_ttl'])
+                except Exception as e:
+                    ok = False
+                    events.warning('prefetch.job_failed', skill=job.skill, code=job.code, error=str(e))
+                summary['succeeded' if ok else 'failed'] += 1
+                events.debug('prefetch.job', skill=job.skill, code=job.code, ok=ok, score=round(job.score, 3))
+
+        summary['elapsed_seconds'] = round(time.time() - started, 1)
+        self.last_run = summary
+        events.emit('prefetch.done', **summary)
+        return summary
+
+    def run_forever(self) -> None:
+        """按 cron 触发，直到 stop()"""
+        while not self._stop.is_set():
+            next_run = self.schedule.next_after(datetime.now())
+            events.emit('prefetch.scheduled', next_run=next_run.isoformat())
+            if self._stop.wait(max(0.0, (next_run - datetime.now()).total_seconds())):
+                break
+            try:
+                self.run_once()
+            except Exception as e:
+                events.warning('prefetch.run_failed', error=str(e))
+
+    def start(self) -> threading.Thread:
+        """在后台线程中按 cron 运行"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name='prefetch', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='自选股预取')
+    parser.add_argument('--config', default=CONFIG_FILE, help='配置文件（读取 prefetch 段）')
+    parser.add_argument('--codes', help='逗号分隔的股票代码，覆盖配置中的自选股')
+    parser.add_argument('--once', action='store_true', help='立即执行一轮后退出')
+    parser.add_argument('--dry-run', action='store_true', help='只打印本轮计划')
+    args = parser.parse_args()
+
+    import logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    config = load_config(args.config)
+    if args.codes:
+        config['watchlist'] = args.codes.split(',')
+        config['watchlist_file'] = ''
+    prefetcher = Prefetcher(config)
+
+    if args.dry_run:
+        jobs, fresh = prefetcher.plan()
+        print(f"计划 {len(jobs)} 个任务，{fresh} 个条目缓存仍新鲜")
+        for job in jobs:
+            print(f"  {job.skill:<18} {job.code:<8} score={job.score:.3f}")
+        return
+    if args.once:
+        print(prefetcher.run_once())
+        return
+    try:
+        prefetcher.run_forever()
+    except KeyboardInterrupt:
+        prefetcher.stop()
+
+
+if __name__ == '__main__':
+    main()
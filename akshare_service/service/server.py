@@ -0,0 +1,584 @@
+"""
+常驻 Skills 服务 (Skills Server)
+每次 agent 调用都 import 包再进程内调 skill，既要付导入开销，也丢掉了内存状态。
+常驻服务进程只导入一次，行情快照、HTTP 连接池、缓存实例在请求之间保持热。
+
+协议：JSON-RPC 2.0，方法名即 akshare_service.skills.__all__ 中的函数名；
+      docs/skills.json 中的 AkShare 函数以 ak.<函数名> 暴露（见 dispatch.py），另有 ak.list / ak.describe
+    HTTP        POST /rpc（单个请求或批量数组）；GET /health、/methods、/metrics
+    Unix socket 每行一个 JSON-RPC 请求（或批量数组），每行一个响应
+
+- 批量：一个数组内的请求并发执行，完全相同的 (method, params) 只执行一次
+- 并发限制：最多 max_concurrency 个 skill 同时执行，排队超过 max_pending 时直接返回繁忙
+- 输出：DataFrame 转为列式 JSON（见 codec.frame_to_columns）；
+        HTTP 单个请求带 Accept: application/vnd.apache.arrow.stream 时返回 Arrow IPC 流（需 pyarrow）
+
+使用方法:
+    python -m akshare_service.service.server --port 8765 --unix /tmp/akshare.sock
+
+    curl -s localhost:8765/rpc -d '{"jsonrpc": "2.0", "id": 1,
+        "method": "get_financial_summary", "params": {"code": "600519"}}'
+
+    client = ServiceClient(unix_path='/tmp/akshare.sock')
+    client.call('get_valuation_data', code='600519')
+"""
+
+import argparse
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import os
+import socket
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from akshare_service.infra import codec, events, metrics
+
+
+# JSON-RPC 2.0 错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SERVER_BUSY = -32000
+
+# 通用调度方法前缀与调度选项
+AK_PREFIX = 'ak.'
+DISPATCH_OPTIONS = ('max_rows', 'use_cache')
+
+ARROW_MIME = 'application/vnd.apache.arrow.stream'
+JSON_MIME = 'application/json'
+
+# 单个 HTTP 请求体上限
+MAX_BODY = 10 * 1024 * 1024
+
+
+class RpcError(Exception):
+    """JSON-RPC 错误"""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        error = {'code': self.code, 'message': self.message}
+        if self.data is not None:
+            error['data'] = self.data
+        return error
+
+
+def skill_methods() -> Dict[str, Callable]:
+    """skills.__all__ 中的全部函数（首次调用时才导入各 skill 模块）"""
+    from akshare_service import skills
+
+    def resolve(name):
+        @functools.wraps(getattr(skills, name))
+        def call(*args, **kwargs):
+            return getattr(skills, name)(*args, **kwargs)
+        return call
+
+    return {name: resolve(name) for name in skills.__all__}
+
+
+def warmup() -> List[str]:
+    """
+    预热：导入 akshare / pandas 与全部 skill 模块，创建缓存和东方财富客户端
+
+    Returns:
+        已预热的项目
+    """
+    from akshare_service import skills
+    from akshare_service.crawlers.eastmoney_api import get_eastmoney_api
+    from akshare_service.infra.cache import get_cache
+
+    warmed = []
+    for module in ('pandas', 'akshare'):
+        try:
+            __import__(module)
+            warmed.append(module)
+        except ImportError as e:
+            events.warning('server.warmup_failed', target=module, error=str(e))
+    for name in skills.__all__:
+        try:
+            getattr(skills, name)
+        except Exception as e:
+            events.warning('server.warmup_failed', target=name, error=str(e))
+    get_cache()
+    get_eastmoney_api()
+    warmed.extend(['skills', 'cache', 'eastmoney'])
+    return warmed
+
+
+def encode_json(obj: Any) -> bytes:
+    return codec.dumps(obj, default=codec.json_default)
+
+
+def encode_arrow(result: Any) -> Optional[bytes]:
+    """DataFrame 或记录列表转 Arrow IPC 流；不支持的类型或未安装 pyarrow 时返回 None"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    if hasattr(result, 'columns') and hasattr(result, 'astype'):
+        table = pa.Table.from_pandas(result, preserve_index=False)
+    elif isinstance(result, list) and result and all(isinstance(r, dict) for r in result):
+        table = pa.Table.from_pylist(result)
+    else:
+        return None
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+class SkillServer:
+    """JSON-RPC 调度：参数绑定、并发限制、批量去重"""
+
+    def __init__(self, methods: Optional[Dict[str, Callable]] = None, max_concurrency: int = 8,
+                 max_pending: int = 256, max_batch: int = 100, dispatch: bool = True):
+        """
+        Args:
+            methods: 方法名 -> 函数，默认为 skills.__all__
+            max_concurrency: 同时执行的 skill 数
+            max_pending: 排队 + 执行中的请求上限，超出返回 SERVER_BUSY
+            max_batch: 单个批量请求的最大条数
+            dispatch: 是否暴露 skills.json 中的全部 AkShare 函数（ak.<函数名>，见 dispatch.py）
+        """
+        self.methods = dict(methods) if methods is not None else skill_methods()
+        self.dispatch_enabled = dispatch
+        if dispatch:
+            self.methods.setdefault('ak.list', _ak_list)
+            self.methods.setdefault('ak.describe', _ak_describe)
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.started_at = time.time()
+        self.stats = {'requests': 0, 'errors': 0, 'rejected': 0, 'deduplicated': 0}
+        self._pending = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='skill')
+        self._builtins = {
+            'rpc.ping': lambda: 'pong',
+            'rpc.methods': self.describe_methods,
+            'rpc.stats': self.health,
+        }
+
+    # ---------- 调度 ----------
+
+    async def dispatch(self, payload: Any) -> Any:
+        """
+        处理一个 JSON-RPC 请求或批量数组
+
+        Returns:
+            响应对象 / 响应数组；全部为通知（无 id）时返回 None
+        """
+        if isinstance(payload, list):
+            if not payload:
+                return _error_response(None, RpcError(INVALID_REQUEST, '批量请求为空'))
+            if len(payload) > self.max_batch:
+                return _error_response(None, RpcError(
+                    INVALID_REQUEST, f'批量请求超过上限 {self.max_batch} 条'))
+            shared: Dict[str, asyncio.Future] = {}
+            responses = await asyncio.gather(*(self._handle(item, shared) for item in payload))
+            responses = [r for r in responses if r is not None]
+            return responses or None
+        return await self._handle(payload, None)
+
+    async def _handle(self, request: Any, shared: Optional[Dict[str, asyncio.Future]]) -> Optional[Dict]:
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' \
+                or not isinstance(request.get('method'), str):
+            return _error_response(request.get('id') if isinstance(request, dict) else None,
+                                   RpcError(INVALID_REQUEST, '不是合法的 JSON-RPC 2.0 请求'))
+
+        request_id = request.get('id')
+        is_notification = 'id' not in request
+        try:
+            result = await self._call_shared(request['method'], request.get('params'), shared)
+        except RpcError as e:
+            self.stats['errors'] += 1
+            return None if is_notification else _error_response(request_id, e)
+        return None if is_notification else {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+    async def _call_shared(self, method: str, params: Any,
+                           shared: Optional[Dict[str, asyncio.Future]]) -> Any:
+        """批量内相同调用只执行一次"""
+        if shared is None:
+            return await self.call(method, params)
+        key = method + ':' + json.dumps(params, sort_keys=True, default=str)
+        future = shared.get(key)
+        if future is not None:
+            self.stats['deduplicated'] += 1
+            return await asyncio.shield(future)
+        future = shared[key] = asyncio.ensure_future(self.call(method, params))
+        return await asyncio.shield(future)
+
+    async def call(self, method: str, params: Any = None) -> Any:
+        """执行一个方法（在线程池中运行，受并发限制）"""
+        self.stats['requests'] += 1
+        if method in self._builtins:
+            return self._builtins[method]()
+        func = self.methods.get(method)
+        if func is None and self.dispatch_enabled and method.startswith(AK_PREFIX):
+            func, params = _ak_method(method[len(AK_PREFIX):], params)
+        if func is None:
+            raise RpcError(METHOD_NOT_FOUND, f'未知方法: {method}')
+        args, kwargs = _bind(func, params)
+
+        if self._pending >= self.max_pending:
+            self.stats['rejected'] += 1
+            raise RpcError(SERVER_BUSY, '服务繁忙，请稍后重试', {'pending': self._pending})
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self._pending += 1
+        try:
+            async with self._semaphore:
+                loop = asyncio.get_running_loop()
+                context = contextvars.copy_context()
+                return await loop.run_in_executor(
+                    self._executor, functools.partial(context.run, self._invoke, method, func, args, kwargs))
+        finally:
+            self._pending -= 1
+
+    def _invoke(self, method: str, func: Callable, args: Tuple, kwargs: Dict) -> Any:
+        with metrics.timer('akshare_rpc_duration_seconds', 'akshare_rpc_requests_total',
+                           span=f'rpc.{method}', method=method):
+            try:
+                return func(*args, **kwargs)
+            except RpcError:
+                raise
+            except Exception as e:
+                from akshare_service.service.dispatch import InvalidArgumentsError, UnknownApiError
+                if isinstance(e, InvalidArgumentsError):
+                    raise RpcError(INVALID_PARAMS, str(e))
+                if isinstance(e, UnknownApiError):
+                    raise RpcError(METHOD_NOT_FOUND, str(e))
+                events.warning('server.call_failed', method=method, error=str(e))
+                raise RpcError(INTERNAL_ERROR, f'{type(e).__name__}: {e}')
+
+    # ---------- 内省 ----------
+
+    def describe_methods(self) -> List[Dict[str, Any]]:
+        """方法列表：名称、签名、文档首行"""
+        described = []
+        for name, func in sorted(self.methods.items()):
+            doc = (inspect.getdoc(func) or '').strip().splitlines()
+            described.append({'name': name, 'signature': str(inspect.signature(func)),
+                              'doc': doc[0] if doc else ''})
+        return described
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'pending': self._pending,
+            'max_concurrency': self.max_concurrency,
+            **self.stats,
+        }
+
+    # ---------- 传输层 ----------
+
+    async def handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """最小 HTTP/1.1 实现（支持 keep-alive）"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    verb, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await _write_http(writer, 400, JSON_MIME, b'{"error": "bad request"}', False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await _write_http(writer, 400, JSON_MIME, b'{"error": "invalid content-length"}', False)
+                    break
+                if length > MAX_BODY:
+                    await _write_http(writer, 413, JSON_MIME, b'{"error": "payload too large"}', False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, content_type, payload = await self._route(verb, target, headers, body)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                await _write_http(writer, status, content_type, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, verb: str, target: str, headers: Dict[str, str],
+                     body: bytes) -> Tuple[int, str, bytes]:
+        path = urlsplit(target).path.rstrip('/') or '/'
+        if verb == 'GET' and path == '/health':
+            return 200, JSON_MIME, encode_json(self.health())
+        if verb == 'GET' and path == '/methods':
+            return 200, JSON_MIME, encode_json(self.describe_methods())
+        if verb == 'GET' and path == '/metrics':
+            return 200, 'text/plain; version=0.0.4; charset=utf-8', metrics.render_prometheus().encode('utf-8')
+        if verb != 'POST' or path not in ('/', '/rpc'):
+            return 404, JSON_MIME, b'{"error": "not found"}'
+
+        try:
+            payload = codec.loads(body)
+        except codec.DecodeError:
+            return 200, JSON_MIME, encode_json(_error_response(None, RpcError(PARSE_ERROR, 'JSON 解析失败')))
+        response = await self.dispatch(payload)
+        if response is None:
+            return 204, JSON_MIME, b''
+
+        if ARROW_MIME in headers.get('accept', '') and isinstance(response, dict) and 'result' in response:
+            arrow = encode_arrow(response['result'])
+            if arrow is not None:
+                return 200, ARROW_MIME, arrow
+        return 200, JSON_MIME, encode_json(response)
+
+    async def handle_lines(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """行分隔 JSON-RPC（Unix socket）"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    response = await self.dispatch(codec.loads(line))
+                except codec.DecodeError:
+                    response = _error_response(None, RpcError(PARSE_ERROR, 'JSON 解析失败'))
+                if response is not None:
+                    writer.write(encode_json(response) + b'\n')
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def refresh_snapshots(self, names: List[str], interval: float) -> None:
+        """后台定时刷新行情快照，保证请求命中热数据"""
+        from akshare_service.infra import snapshots
+
+        loop = asyncio.get_running_loop()
+        while True:
+            for name in names:
+                try:
+                    await loop.run_in_executor(self._executor, functools.partial(snapshots.get_spot, name, 0))
+                except Exception as e:
+                    events.warning('server.snapshot_refresh_failed', snapshot=name, error=str(e))
+            await asyncio.sleep(interval)
+
+    async def serve(self, host: Optional[str] = '127.0.0.1', port: Optional[int] = 8765,
+                    unix_path: Optional[str] = None, warm: bool = True,
+                    spot: Optional[List[str]] = None, spot_interval: float = 30) -> None:
+        """启动服务并一直运行"""
+        loop = asyncio.get_running_loop()
+        if warm:
+            started = time.perf_counter()
+            warmed = await loop.run_in_executor(self._executor, warmup)
+            events.emit('server.warmup', warmed=warmed,
+                        elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+
+        servers = []
+        if port is not None:
+            servers.append(await asyncio.start_server(self.handle_http, host, port))
+            events.emit('server.listening', transport='http', host=host, port=port)
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            servers.append(await asyncio.start_unix_server(self.handle_lines, unix_path))
+            events.emit('server.listening', transport='unix', path=unix_path)
+
+        tasks = [asyncio.ensure_future(s.serve_forever()) for s in servers]
+        if spot:
+            tasks.append(asyncio.ensure_future(self.refresh_snapshots(spot, spot_interval)))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for s in servers:
+                s.close()
+            self._executor.shutdown(wait=False)
+
+
+def _ak_list(prefix: str = '') -> List[Dict[str, str]]:
+    """skills.json 中的 AkShare 函数清单"""
+    from akshare_service.service.dispatch import get_dispatcher
+    return get_dispatcher().list(prefix)
+
+
+def _ak_describe(name: str) -> Dict[str, Any]:
+    """AkShare 函数的参数 schema、上游和 TTL 类别"""
+    from akshare_service.service.dispatch import get_dispatcher
+    return get_dispatcher().describe(name)
+
+
+def _ak_method(name: str, params: Any) -> Tuple[Optional[Callable], Any]:
+    """
+    ak.<函数名> 方法：params 即 AkShare 参数（对象），
+    另可带 max_rows / use_cache 两个调度选项
+    """
+    from akshare_service.service.dispatch import get_dispatcher
+
+    dispatcher = get_dispatcher()
+    if name not in dispatcher.catalog:
+        return None, params
+    if params is not None and not isinstance(params, dict):
+        raise RpcError(INVALID_PARAMS, 'ak.* 方法的 params 必须是对象')
+    args = dict(params or {})
+    options = {key: args.pop(key) for key in DISPATCH_OPTIONS if key in args}
+
+    def call():
+        return dispatcher.call(name, args, **options)
+    return call, None
+
+
+def _bind(func: Callable, params: Any) -> Tuple[Tuple, Dict]:
+    """params（数组 / 对象 / 缺省）绑定到函数签名"""
+    if params is None:
+        args, kwargs = (), {}
+    elif isinstance(params, list):
+        args, kwargs = tuple(params), {}
+    elif isinstance(params, dict):
+        args, kwargs = (), params
+    else:
+        raise RpcError(INVALID_PARAMS, 'params 必须是数组或对象')
+    try:
+        inspect.signature(func).bind(*args, **kwargs)
+    except TypeError as e:
+        raise RpcError(INVALID_PARAMS, str(e))
+    return args, kwargs
+
+
+def _error_response(request_id: Any, error: RpcError) -> Dict[str, Any]:
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': error.to_dict()}
+
+
+_STATUS_TEXT = {200: 'OK', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large'}
+
+
+async def _write_http(writer: asyncio.StreamWriter, status: int, content_type: str,
+                      body: bytes, keep_alive: bool) -> None:
+    head = (f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode('latin-1') + body)
+    await writer.drain()
+
+
+class ServiceClient:
+    """常驻服务的同步客户端（HTTP 或 Unix socket）"""
+
+    def __init__(self, url: str = 'http://127.0.0.1:8765/rpc', unix_path: Optional[str] = None,
+                 timeout: float = 120):
+        self.url = url
+        self.unix_path = unix_path
+        self.timeout = timeout
+        self._next_id = 0
+
+    def _request(self, method: str, params: Any) -> Dict[str, Any]:
+        self._next_id += 1
+        request = {'jsonrpc': '2.0', 'id': self._next_id, 'method': method}
+        if params:
+            request['params'] = params
+        return request
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """调用单个方法，出错时抛出 RpcError"""
+        response = self._send(self._request(method, kwargs or list(args)))
+        return _unwrap(response)
+
+    def batch(self, calls: List[Tuple[str, Any]]) -> List[Any]:
+        """
+        批量调用
+
+        Args:
+            calls: [(method, params)]，params 为数组或对象
+
+        Returns:
+            按顺序的结果；出错项为 RpcError 实例
+        """
+        requests = [self._request(method, params) for method, params in calls]
+        responses = {r.get('id'): r for r in self._send(requests)}
+        results = []
+        for request in requests:
+            try:
+                results.append(_unwrap(responses[request['id']]))
+            except RpcError as e:
+                results.append(e)
+        return results
+
+    def _send(self, payload: Any) -> Any:
+        body = encode_json(payload)
+        if self.unix_path:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.unix_path)
+                sock.sendall(body + b'\n')
+                with sock.makefile('rb') as f:
+                    return codec.loads(f.readline())
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': JSON_MIME})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return codec.loads(response.read())
+
+
+def _unwrap(response: Dict[str, Any]) -> Any:
+    if 'error' in response:
+        error = response['error']
+        raise RpcError(error.get('code', INTERNAL_ERROR), error.get('message', ''), error.get('data'))
+    return response.get('result')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='常驻 Skills 服务（JSON-RPC 2.0）')
+    parser.add_argument('--host', default='127.0.0.1', help='HTTP 监听地址')
+    parser.add_argument('--port', type=int, default=8765, help='HTTP 端口，0 表示不启用 HTTP')
+    parser.add_argument('--unix', help='Unix socket 路径')
+    parser.add_argument('--concurrency', type=int, default=8, help='同时执行的 skill 数')
+    parser.add_argument('--max-pending', type=int, default=256, help='排队请求上限')
+    parser.add_argument('--spot', action='append', default=[],
+                        help='后台保持刷新的行情快照，如 stock_zh_a_spot_em（可重复）')
+    parser.add_argument('--spot-interval', type=float, default=30, help='快照刷新间隔（秒）')
+    parser.add_argument('--no-warmup', action='store_true', help='启动时不预热')
+    parser.add_argument('--prefetch', action='store_true',
+                        help='按 config.yaml 的 prefetch 段在后台预取自选股（prefetch.enabled 为 true 时默认开启）')
+    args = parser.parse_args()
+
+    import logging
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    from akshare_service.service.prefetch import Prefetcher, load_config
+    prefetch_config = load_config()
+    if args.prefetch or prefetch_config['enabled']:
+        Prefetcher(prefetch_config).start()
+
+    server = SkillServer(max_concurrency=args.concurrency, max_pending=args.max_pending)
+    try:
+        asyncio.run(server.serve(args.host, args.port or None, args.unix, warm=not args.no_warmup,
+                                 spot=args.spot, spot_interval=args.spot_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,30 @@
 """
 Skills module - 标准化财务数据接口
+
+各 skill 在首次访问时才导入所在模块（模块级 __getattr__），
+import akshare_service.skills 本身不会加载 akshare / tushare / pandas。
 """
 
-from .finance import (
-    calculate_roic, calculate_roic_a_share, calculate_roic_hk, calculate_roic_us,
-    get_financial_summary_us, get_cashflow_data_us,
-    get_financial_summary_hk, get_cashflow_data_hk
-)
-from .financial_summary import get_financial_summary
-from .cashflow import get_cashflow_data
-from .valuation import get_valuation_data, get_valuation_data_fast
-from .market import get_current_price, get_history_price
+import importlib
+from typing import TYPE_CHECKING
+
+# 导出名 -> 所在子模块
+_EXPORTS = {
+    'calculate_roic': 'finance',
+    'calculate_roic_a_share': 'finance',
+    'calculate_roic_hk': 'finance',
+    'calculate_roic_us': 'finance',
+    'get_financial_summary_us': 'finance',
+    'get_cashflow_data_us': 'finance',
+    'get_financial_summary_hk': 'finance',
+    'get_cashflow_data_hk': 'finance',
+    'get_financial_summary': 'financial_summary',
+    'get_cashflow_data': 'cashflow',
+    'get_valuation_data': 'valuation',
+    'get_valuation_data_fast': 'valuation',
+    'get_current_price': 'market',
+    'get_history_price': 'market',
+}
 
 __all__ = [
     'calculate_roic',
@@ -27,4 +41,29 @@ __all__ = [
     'get_valuation_data_fast',
     'get_current_price',
     'get_history_price',
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .finance import (
+        calculate_roic, calculate_roic_a_share, calculate_roic_hk, calculate_roic_us,
+        get_financial_summary_us, get_cashflow_data_us,
+        get_financial_summary_hk, get_cashflow_data_hk
+    )
+    from .financial_summary import get_financial_summary
+    from .cashflow import get_cashflow_data
+    from .valuation import get_valuation_data, get_valuation_data_fast
+    from .market import get_current_price, get_history_price
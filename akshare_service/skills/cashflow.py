@@ -3,8 +3,8 @@
 支持多数据源路由：TuShare → AkShare(新浪) → 东方财富API(兜底)
 """
 
-import akshare as ak
-import pandas as pd
+from __future__ import annotations
+
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import json
@@ -14,12 +14,20 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from akshare_service.infra import events, metrics, negative_cache, revalidate
 from akshare_service.infra.cache import get_cache
 from akshare_service.adapters.tushare_adapter import (
     get_cashflow_data_tushare,
     is_tushare_available
 )
+from akshare_service.infra.lazy import lazy_import
+
+# 重依赖在首次使用时才导入，见 infra/lazy.py
+ak = lazy_import('akshare')
+pd = lazy_import('pandas')
+
 
+SKILL = 'cashflow'
 
 # 请求间隔控制
 _last_request_time = 0
@@ -35,8 +43,10 @@ def _rate_limit():
     _last_request_time = time.time()
 
 
+@metrics.track_skill(SKILL)
 def get_cashflow_data(code: str, years: int = 5, use_cache: bool = True, 
-                      cache_ttl: int = 3600) -> Dict[str, Any]:
+                      cache_ttl: int = 3600, refresh: bool = False,
+                      max_stale: Optional[float] = None) -> Dict[str, Any]:
     """
     获取现金流数据（标准化输出）
     
@@ -47,40 +57,62 @@ def get_cashflow_data(code: str, years: int = 5, use_cache: bool = True,
         years: 获取年数
         use_cache: 是否使用缓存
         cache_ttl: 缓存过期时间（秒）
+        refresh: 跳过缓存读取，重新拉取并写入缓存（预取用）
+        max_stale: 缓存过期后仍直接返回的秒数（同时后台刷新），默认见 infra/revalidate.py
     """
     cache_key = f"cashflow_data:{code}:{years}"
     
-    if use_cache:
-        cache = get_cache()
-        cached = cache.get(cache_key)
-        if cached:
-            print(f"[Cache] 命中缓存: {cache_key}")
+    if use_cache and not refresh:
+        max_stale = revalidate.max_stale_for(SKILL) if max_stale is None else max_stale
+        entry = get_cache().get_with_meta(cache_key, max_stale)
+        if entry and entry[0]:
+            cached, age, stale = entry
+            cached['cache_age_seconds'] = round(age, 1) if age is not None else None
+            cached['stale'] = stale
+            if stale:
+                # 先返回过期值，后台刷新（见 infra/revalidate.py）
+                events.emit('cache.stale', skill=SKILL, key=cache_key, age_seconds=cached['cache_age_seconds'])
+                revalidate.schedule(cache_key, lambda: get_cashflow_data(code, years, cache_ttl=cache_ttl, refresh=True))
+            else:
+                events.debug('cache.hit', skill=SKILL, key=cache_key)
             return cached
     
     errors = []
     
-    # 1. 优先使用东方财富 API
-    print("[Router] 尝试东方财富 API...")
-    result, em_errors = _get_cashflow_data_eastmoney(code, years)
-    if result and result.get('annual_data'):
-        result['source'] = 'EastMoney.API'
-        if use_cache:
-            get_cache().set(cache_key, result, cache_ttl)
-        return result
-    errors.extend(em_errors)
-    print(f"[Router] 东方财富 API 失败: {em_errors}")
-    
-    # 2. 尝试 AkShare 新浪
-    print("[Router] 尝试 AkShare 新浪...")
-    result, sina_errors = _get_cashflow_data_sina(code, years)
-    if result and result.get('annual_data'):
+    # 数据源优先级：东方财富 API → AkShare 新浪
+    sources = [
+        ('eastmoney', 'EastMoney.API', _get_cashflow_data_eastmoney),
+        ('sina', None, _get_cashflow_data_sina),
+    ]
+    for i, (source, source_label, fetch) in enumerate(sources):
+        # 近期对该代码返回空 / 失败的数据源直接跳过（见 infra/negative_cache.py）；refresh 时逐个重试
+        skipped = negative_cache.skip(SKILL, source, code) if use_cache and not refresh else None
+        if skipped:
+            errors.append(skipped)
+            continue
+        events.emit('router.attempt', skill=SKILL, source=source, code=code)
+        with metrics.track_source(SKILL, source, code=code) as attempt:
+            # 数据源捕获上游异常时调用 negative_cache.mark_error()，否则没有数据视为"无数据"
+            (result, source_errors), failed = negative_cache.call(fetch, code, years)
+            if not (result and result.get('annual_data')):
+                attempt.outcome = 'error' if failed else 'empty'
+        if attempt.outcome == 'success':
+            if source_label:
+                result['source'] = source_label
+            if use_cache:
+                get_cache().set(cache_key, result, cache_ttl)
+                negative_cache.invalidate(SKILL, code, [source])
+            return revalidate.mark_fresh(result)
+        errors.extend(source_errors)
         if use_cache:
-            get_cache().set(cache_key, result, cache_ttl)
-        return result
-    errors.extend(sina_errors)
-    print(f"[Router] AkShare 新浪失败: {sina_errors}")
+            negative_cache.record(SKILL, source, code, attempt.outcome, source_errors)
+        next_source = sources[i + 1][0] if i + 1 < len(sources) else None
+        events.warning('router.fallback', skill=SKILL, source=source, next_source=next_source,
+                       code=code, errors=source_errors, elapsed_ms=round(attempt.elapsed * 1000, 1))
+        if next_source:
+            metrics.record_fallback(SKILL, source, next_source)
     
-    return _error_response(code, errors)
+    return revalidate.mark_fresh(_error_response(code, errors))
 
 
 def _get_cashflow_data_sina(code: str, years: int) -> Tuple[Dict[str, Any], List[str]]:
@@ -97,6 +129,7 @@ def _get_cashflow_data_sina(code: str, years: int) -> Tuple[Dict[str, Any], List
         df_cashflow['报告日'] = pd.to_datetime(df_cashflow['报告日'])
         df_cashflow = df_cashflow[df_cashflow['报告日'].dt.month == 12]
     except Exception as e:
+        negative_cache.mark_error()
         return None, [f"新浪现金流量表获取失败: {e}"]
     
     _rate_limit()
@@ -156,15 +189,18 @@ def _get_cashflow_data_sina(code: str, years: int) -> Tuple[Dict[str, Any], List
 
 
 def _get_cashflow_data_eastmoney(code: str, years: int) -> Tuple[Dict[str, Any], List[str]]:
-    """从东方财富 API 获取现金流数据（兜底方案）"""
+    """从东方财富 API 获取现金流数据（兜底方案；报告期快照已覆盖时不发请求）"""
     errors = []
     
     try:
-        from akshare_service.crawlers.eastmoney_api import EastMoneyAPI
-        api = EastMoneyAPI()
+        from akshare_service.crawlers.eastmoney_api import get_eastmoney_api
+        from akshare_service.crawlers.period_snapshot import get_code_history
+        api = get_eastmoney_api()
         
         # 获取现金流量表
-        df_cashflow = api.get_cashflow_statement(code)
+        df_cashflow = get_code_history('cashflow', code, years)
+        if df_cashflow is None:
+            df_cashflow = api.get_cashflow_statement(code)
         if df_cashflow is None or df_cashflow.empty:
             return None, ["东方财富现金流量表为空"]
         
@@ -207,6 +243,7 @@ def _get_cashflow_data_eastmoney(code: str, years: int) -> Tuple[Dict[str, Any],
         }, errors
         
     except Exception as e:
+        negative_cache.mark_error()
         return None, [f"东方财富 API 获取失败: {e}"]
 
 
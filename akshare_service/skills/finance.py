@@ -3,63 +3,105 @@
 提供 ROIC 计算、利润表获取、资产负债表获取等财务分析功能。
 """
 
-import akshare as ak
-import pandas as pd
+from __future__ import annotations
+
 import os
-from typing import Dict, Any
+import json
+from typing import Dict, Any, Optional
 from datetime import datetime
 
+from akshare_service.infra import events, metrics, negative_cache, revalidate
+from akshare_service.infra.cache import get_cache
 from akshare_service.infra.client import robust_api
+from akshare_service.infra.lazy import lazy_import
+
+# 重依赖在首次使用时才导入，见 infra/lazy.py
+ak = lazy_import('akshare')
+pd = lazy_import('pandas')
+
+def _roic_eastmoney(symbol: str, years: int) -> pd.DataFrame:
+    """东方财富 API：利润表 + 资产负债表（报告期快照已覆盖时不发请求）"""
+    from akshare_service.crawlers.eastmoney_api import get_eastmoney_api
+    from akshare_service.crawlers.period_snapshot import get_code_history
+    api = get_eastmoney_api()
+    
+    df_income = get_code_history('income', symbol, years)
+    if df_income is None:
+        df_income = api.get_income_statement(symbol)
+    df_balance = get_code_history('balance', symbol, years)
+    if df_balance is None:
+        df_balance = api.get_balance_sheet(symbol)
+    if df_income.empty or df_balance.empty:
+        return pd.DataFrame()
+    return _calculate_roic_from_eastmoney_data(df_income, df_balance, years)
+
+
+def _roic_akshare_em(symbol: str, years: int) -> pd.DataFrame:
+    """AkShare 东财：按年度利润表 + 资产负债表"""
+    df_profit = ak.stock_profit_sheet_by_yearly_em(symbol=symbol)
+    df_balance = ak.stock_balance_sheet_by_yearly_em(symbol=symbol)
+    if df_profit is None or df_profit.empty or df_balance is None or df_balance.empty:
+        return pd.DataFrame()
+    df_profit['REPORT_DATE'] = pd.to_datetime(df_profit['REPORT_DATE'])
+    df_balance['REPORT_DATE'] = pd.to_datetime(df_balance['REPORT_DATE'])
+    return _calculate_roic_from_em_data(df_profit, df_balance, years)
+
+
+def _roic_sina(symbol: str, years: int) -> pd.DataFrame:
+    """AkShare 新浪：利润表 + 资产负债表"""
+    market = 'sh' if symbol.startswith('6') else 'sz'
+    sina_code = f"{market}{symbol}"
+    
+    df_profit = ak.stock_financial_report_sina(stock=sina_code, symbol='利润表')
+    df_balance = ak.stock_financial_report_sina(stock=sina_code, symbol='资产负债表')
+    if df_profit is None or df_profit.empty or df_balance is None or df_balance.empty:
+        return pd.DataFrame()
+    return _calculate_roic_from_sina_data(df_profit, df_balance, years)
+
 
 @robust_api
-def calculate_roic_a_share(symbol: str, years: int = 5) -> pd.DataFrame:
+@metrics.track_skill('calculate_roic', market='A股')
+def calculate_roic_a_share(symbol: str, years: int = 5, use_cache: bool = True,
+                           refresh: bool = False) -> pd.DataFrame:
     """
     计算 A股 ROIC (Return on Invested Capital)
     数据源优先级：东方财富API → AkShare(东财) → AkShare(新浪)
+
+    use_cache=False 时不读写负缓存；refresh=True 时不跳过负缓存中的数据源（见 infra/negative_cache.py）
     """
-    # 1. 优先使用东方财富 API
-    print("[Router] 尝试东方财富 API...")
-    try:
-        from akshare_service.crawlers.eastmoney_api import EastMoneyAPI
-        api = EastMoneyAPI()
-        
-        df_income = api.get_income_statement(symbol)
-        df_balance = api.get_balance_sheet(symbol)
-        
-        if not df_income.empty and not df_balance.empty:
-            df = _calculate_roic_from_eastmoney_data(df_income, df_balance, years)
-            if not df.empty:
-                print("[Router] 东方财富 API 成功")
-                return df
-    except Exception as e:
-        print(f"[Router] 东方财富 API 失败: {e}")
-    
-    # 2. 尝试 AkShare 东财 API
-    print("[Router] 尝试 AkShare 东财...")
-    try:
-        df_profit = ak.stock_profit_sheet_by_yearly_em(symbol=symbol)
-        df_balance = ak.stock_balance_sheet_by_yearly_em(symbol=symbol)
-        
-        if df_profit is not None and not df_profit.empty and df_balance is not None and not df_balance.empty:
-            df_profit['REPORT_DATE'] = pd.to_datetime(df_profit['REPORT_DATE'])
-            df_balance['REPORT_DATE'] = pd.to_datetime(df_balance['REPORT_DATE'])
-            return _calculate_roic_from_em_data(df_profit, df_balance, years)
-    except Exception as e:
-        print(f"[Router] AkShare 东财 API 失败: {e}")
-    
-    # 3. 尝试 AkShare 新浪 API
-    print("[Router] 尝试 AkShare 新浪...")
-    try:
-        market = 'sh' if symbol.startswith('6') else 'sz'
-        sina_code = f"{market}{symbol}"
-        
-        df_profit = ak.stock_financial_report_sina(stock=sina_code, symbol='利润表')
-        df_balance = ak.stock_financial_report_sina(stock=sina_code, symbol='资产负债表')
-        
-        if df_profit is not None and not df_profit.empty and df_balance is not None and not df_balance.empty:
-            return _calculate_roic_from_sina_data(df_profit, df_balance, years)
-    except Exception as e:
-        print(f"[Router] AkShare 新浪 API 失败: {e}")
+    skill = 'calculate_roic'
+    sources = [
+        ('eastmoney', _roic_eastmoney, '东方财富 API 数据为空'),
+        ('akshare_em', _roic_akshare_em, 'AkShare 东财数据为空'),
+        ('sina', _roic_sina, 'AkShare 新浪数据为空'),
+    ]
+    for i, (source, fetch, empty_message) in enumerate(sources):
+        # 近期对该代码返回空 / 失败的数据源直接跳过（见 infra/negative_cache.py）；refresh 时逐个重试
+        if use_cache and not refresh and negative_cache.skip(skill, source, symbol):
+            continue
+        events.emit('router.attempt', skill=skill, source=source, code=symbol)
+        source_errors = []
+        try:
+            with metrics.track_source(skill, source, code=symbol) as attempt:
+                df = fetch(symbol, years)
+                if df is None or df.empty:
+                    attempt.outcome = 'empty'
+                    source_errors = [empty_message]
+        except Exception as e:
+            source_errors = [str(e)]
+        if attempt.outcome == 'success':
+            if use_cache:
+                negative_cache.invalidate(skill, symbol, [source])
+            return df
+        if use_cache:
+            negative_cache.record(skill, source, symbol, attempt.outcome, source_errors)
+        next_source = sources[i + 1][0] if i + 1 < len(sources) else None
+        if next_source:
+            events.warning('router.fallback', skill=skill, source=source, next_source=next_source,
+                           code=symbol, errors=source_errors)
+            metrics.record_fallback(skill, source, next_source)
+        else:
+            events.warning('router.failed', skill=skill, source=source, code=symbol, errors=source_errors)
     
     return pd.DataFrame()
 
@@ -193,7 +235,7 @@ def _calculate_roic_from_sina_data(df_profit: pd.DataFrame, df_balance: pd.DataF
                 'revenue': round(total_operate_income / 100000000, 2) if pd.notna(total_operate_income) else 0
             })
         except (IndexError, KeyError) as e:
-            print(f"Error processing year {year}: {e}")
+            events.warning('finance.process_error', year=year, error=str(e))
             continue
     
     return pd.DataFrame(results).sort_values('year')
@@ -256,13 +298,15 @@ def _calculate_roic_from_eastmoney_data(df_income: pd.DataFrame, df_balance: pd.
                 'revenue': round(revenue, 2)
             })
         except Exception as e:
-            print(f"Error: {e}")
+            events.warning('finance.process_error', error=str(e))
             continue
     
     return pd.DataFrame(results).sort_values('year')
 
 
+@negative_cache.guard('calculate_roic', 'hk_report_em', lambda code, reason: pd.DataFrame(), market='港股')
 @robust_api
+@metrics.track_skill('calculate_roic', market='港股')
 def calculate_roic_hk(stock: str, years: int = 5) -> pd.DataFrame:
     """
     计算港股 ROIC
@@ -279,7 +323,8 @@ def calculate_roic_hk(stock: str, years: int = 5) -> pd.DataFrame:
         df_profit['REPORT_DATE'] = pd.to_datetime(df_profit['REPORT_DATE'])
         df_balance['REPORT_DATE'] = pd.to_datetime(df_balance['REPORT_DATE'])
     except Exception as e:
-        print(f"Error fetching HK financials for {stock}: {e}")
+        events.warning('finance.fetch_error', market='港股', code=stock, error=str(e))
+        negative_cache.mark_error()
         return pd.DataFrame()
     
     # 透视转换
@@ -356,7 +401,9 @@ def calculate_roic_hk(stock: str, years: int = 5) -> pd.DataFrame:
     return pd.DataFrame(results).sort_values('year')
 
 
+@negative_cache.guard('calculate_roic', 'us_report_em', lambda code, reason: pd.DataFrame(), market='美股')
 @robust_api
+@metrics.track_skill('calculate_roic', market='美股')
 def calculate_roic_us(stock: str, years: int = 5) -> pd.DataFrame:
     """
     计算美股 ROIC
@@ -373,7 +420,8 @@ def calculate_roic_us(stock: str, years: int = 5) -> pd.DataFrame:
         df_profit['REPORT_DATE'] = pd.to_datetime(df_profit['REPORT_DATE'])
         df_balance['REPORT_DATE'] = pd.to_datetime(df_balance['REPORT_DATE'])
     except Exception as e:
-        print(f"Error fetching US financials for {stock}: {e}")
+        events.warning('finance.fetch_error', market='美股', code=stock, error=str(e))
+        negative_cache.mark_error()
         return pd.DataFrame()
     
     # 透视转换
@@ -457,7 +505,9 @@ def calculate_roic_us(stock: str, years: int = 5) -> pd.DataFrame:
     return pd.DataFrame(results).sort_values('year')
 
 
-def calculate_roic(market: str, code: str, years: int = 5) -> pd.DataFrame:
+def calculate_roic(market: str, code: str, years: int = 5, use_cache: bool = True,
+                   cache_ttl: int = 3600, refresh: bool = False,
+                   max_stale: Optional[float] = None) -> pd.DataFrame:
     """
     统一的 ROIC 计算入口
     
@@ -465,20 +515,46 @@ def calculate_roic(market: str, code: str, years: int = 5) -> pd.DataFrame:
         market: 'A股', '港股', '美股'
         code: 股票代码
         years: 年数
+        use_cache: 是否使用缓存
+        cache_ttl: 缓存过期时间（秒）
+        refresh: 跳过缓存读取，重新计算并写入缓存（预取用）
+        max_stale: 缓存过期后仍直接返回的秒数（同时后台刷新），默认见 infra/revalidate.py
     
     Returns:
-        DataFrame
+        DataFrame；df.attrs 带 stale / cache_age_seconds
     """
-    if market == 'A股':
-        return calculate_roic_a_share(code, years)
-    elif market == '港股':
-        return calculate_roic_hk(code, years)
-    elif market == '美股':
-        return calculate_roic_us(code, years)
+    calculators = {'A股': calculate_roic_a_share, '港股': calculate_roic_hk, '美股': calculate_roic_us}
+    if market not in calculators:
+        raise ValueError(f"不支持的市场类型：{market}，请选择 'A股'、'港股' 或 '美股'")
+
+    skill = 'calculate_roic'
+    cache_key = f"roic:{market}:{code}:{years}"
+    if use_cache and not refresh:
+        max_stale = revalidate.max_stale_for(skill) if max_stale is None else max_stale
+        entry = get_cache().get_with_meta(cache_key, max_stale)
+        if entry and entry[0]:
+            cached, age, stale = entry
+            df = pd.DataFrame(cached)
+            df.attrs['cache_age_seconds'] = round(age, 1) if age is not None else None
+            df.attrs['stale'] = stale
+            if stale:
+                # 先返回过期值，后台刷新（见 infra/revalidate.py）
+                events.emit('cache.stale', skill=skill, key=cache_key, age_seconds=df.attrs['cache_age_seconds'])
+                revalidate.schedule(cache_key, lambda: calculate_roic(market, code, years, cache_ttl=cache_ttl,
+                                                                      refresh=True))
+            else:
+                events.debug('cache.hit', skill=skill, key=cache_key)
+            return df
 
-    raise ValueError(f"不支持的市场类型：{market}，请选择 'A股'、'港股' 或 '美股'")
+    df = calculators[market](code, years, use_cache=use_cache, refresh=refresh)
+    if use_cache and df is not None and not df.empty:
+        get_cache().set(cache_key, json.loads(df.to_json(orient='records', force_ascii=False)), cache_ttl)
+    if df is not None:
+        revalidate.mark_fresh(df.attrs)
+    return df
 
 
+@negative_cache.guard('financial_summary', 'us_report_em', negative_cache.empty_report, market='美股')
 @robust_api
 def get_financial_summary_us(stock: str, years: int = 5) -> Dict[str, Any]:
     """
@@ -505,6 +581,7 @@ def get_financial_summary_us(stock: str, years: int = 5) -> Dict[str, Any]:
         df_profit['REPORT_DATE'] = pd.to_datetime(df_profit['REPORT_DATE'])
         df_balance['REPORT_DATE'] = pd.to_datetime(df_balance['REPORT_DATE'])
     except Exception as e:
+        negative_cache.mark_error()
         return {'code': stock, 'annual_data': [], 'errors': [f'获取数据失败: {e}']}
     
     # 透视转换
@@ -558,7 +635,7 @@ def get_financial_summary_us(stock: str, years: int = 5) -> Dict[str, Any]:
                 'debt_ratio': {'value': round(float(debt_ratio), 2), 'unit': '%'}
             })
         except (IndexError, KeyError) as e:
-            print(f"Error processing year {year}: {e}")
+            events.warning('finance.process_error', year=year, error=str(e))
             continue
     
     return {
@@ -570,6 +647,7 @@ def get_financial_summary_us(stock: str, years: int = 5) -> Dict[str, Any]:
     }
 
 
+@negative_cache.guard('cashflow', 'us_report_em', negative_cache.empty_report, market='美股')
 @robust_api
 def get_cashflow_data_us(stock: str, years: int = 5) -> Dict[str, Any]:
     """
@@ -591,6 +669,7 @@ def get_cashflow_data_us(stock: str, years: int = 5) -> Dict[str, Any]:
             
         df_cashflow['REPORT_DATE'] = pd.to_datetime(df_cashflow['REPORT_DATE'])
     except Exception as e:
+        negative_cache.mark_error()
         return {'code': stock, 'annual_data': [], 'errors': [f'获取数据失败: {e}']}
     
     # 透视转换
@@ -622,7 +701,7 @@ def get_cashflow_data_us(stock: str, years: int = 5) -> Dict[str, Any]:
                 'free_cashflow': {'value': round(free_cf / 100000000, 2), 'unit': '亿元'}
             })
         except (IndexError, KeyError) as e:
-            print(f"Error processing year {year}: {e}")
+            events.warning('finance.process_error', year=year, error=str(e))
             continue
     
     return {
@@ -634,6 +713,7 @@ def get_cashflow_data_us(stock: str, years: int = 5) -> Dict[str, Any]:
     }
 
 
+@negative_cache.guard('financial_summary', 'hk_report_em', negative_cache.empty_report, market='港股')
 @robust_api
 def get_financial_summary_hk(stock: str, years: int = 5) -> Dict[str, Any]:
     """
@@ -660,6 +740,7 @@ def get_financial_summary_hk(stock: str, years: int = 5) -> Dict[str, Any]:
         df_profit['REPORT_DATE'] = pd.to_datetime(df_profit['REPORT_DATE'])
         df_balance['REPORT_DATE'] = pd.to_datetime(df_balance['REPORT_DATE'])
     except Exception as e:
+        negative_cache.mark_error()
         return {'code': stock, 'annual_data': [], 'errors': [f'获取数据失败: {e}']}
     
     # 透视转换
@@ -703,7 +784,7 @@ def get_financial_summary_hk(stock: str, years: int = 5) -> Dict[str, Any]:
                 'debt_ratio': {'value': round(float(debt_ratio), 2), 'unit': '%'}
             })
         except (IndexError, KeyError) as e:
-            print(f"Error processing year {year}: {e}")
+            events.warning('finance.process_error', year=year, error=str(e))
             continue
     
     return {
@@ -715,6 +796,7 @@ def get_financial_summary_hk(stock: str, years: int = 5) -> Dict[str, Any]:
     }
 
 
+@negative_cache.guard('cashflow', 'hk_report_em', negative_cache.empty_report, market='港股')
 @robust_api
 def get_cashflow_data_hk(stock: str, years: int = 5) -> Dict[str, Any]:
     """
@@ -735,6 +817,7 @@ def get_cashflow_data_hk(stock: str, years: int = 5) -> Dict[str, Any]:
             
         df_cashflow['REPORT_DATE'] = pd.to_datetime(df_cashflow['REPORT_DATE'])
     except Exception as e:
+        negative_cache.mark_error()
         return {'code': stock, 'annual_data': [], 'errors': [f'获取数据失败: {e}']}
     
     cashflow_pivot = df_cashflow.pivot(index='REPORT_DATE', columns='STD_ITEM_NAME', values='AMOUNT').reset_index()
@@ -761,7 +844,7 @@ def get_cashflow_data_hk(stock: str, years: int = 5) -> Dict[str, Any]:
                 'free_cashflow': {'value': round(free_cf / 100000000, 2), 'unit': '亿元'}
             })
         except (IndexError, KeyError) as e:
-            print(f"Error processing year {year}: {e}")
+            events.warning('finance.process_error', year=year, error=str(e))
             continue
     
     return {
@@ -4,8 +4,8 @@
 数据源优先级：Longbridge → AkShare(东财) → AkShare(新浪)
 """
 
-import akshare as ak
-import pandas as pd
+from __future__ import annotations
+
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import os
@@ -14,6 +14,12 @@ import sys
 sys.path.insert(0, '/root/.openclaw/workspace/Longbridge_tools/src')
 
 from akshare_service.infra.client import robust_api
+from akshare_service.infra import events, metrics, snapshots
+from akshare_service.infra.lazy import lazy_import
+
+# 重依赖在首次使用时才导入，见 infra/lazy.py
+ak = lazy_import('akshare')
+pd = lazy_import('pandas')
 
 
 def _get_longbridge_quote_skill():
@@ -27,7 +33,7 @@ def _get_longbridge_quote_skill():
         config = AppConfig.load(config_path)
         return QuoteSkill(config)
     except Exception as e:
-        print(f"Longbridge 初始化失败: {e}")
+        events.warning('market.longbridge_init_failed', error=str(e))
         return None
 
 
@@ -49,6 +55,7 @@ def _convert_code_to_longbridge(market: str, code: str) -> str:
 
 
 @robust_api
+@metrics.track_skill('current_price')
 def get_current_price(market: str, code: str) -> Dict[str, Any]:
     """
     获取股票当前实时行情 (支持多源 Fallback)
@@ -80,7 +87,7 @@ def get_current_price(market: str, code: str) -> Dict[str, Any]:
     # === 2. 尝试 AkShare (东财) ===
     if market == 'A股':
         try:
-            df = ak.stock_zh_a_spot_em()
+            df = snapshots.get_spot('stock_zh_a_spot_em')
             if df is not None and not df.empty:
                 stock = df[df['代码'] == code]
                 if not stock.empty:
@@ -103,7 +110,7 @@ def get_current_price(market: str, code: str) -> Dict[str, Any]:
 
     elif market == '港股':
         try:
-            df = ak.stock_hk_spot_em()
+            df = snapshots.get_spot('stock_hk_spot_em')
             if df is not None and not df.empty:
                 stock = df[df['代码'] == code]
                 if not stock.empty:
@@ -123,7 +130,7 @@ def get_current_price(market: str, code: str) -> Dict[str, Any]:
 
     elif market == '美股':
         try:
-            df = ak.stock_us_spot_em()
+            df = snapshots.get_spot('stock_us_spot_em')
             if df is not None and not df.empty:
                 stock = df[df['代码'] == code]
                 if not stock.empty:
@@ -144,6 +151,7 @@ def get_current_price(market: str, code: str) -> Dict[str, Any]:
     return {'error': f"All sources failed. Errors: {'; '.join(errors)}"}
 
 @robust_api
+@metrics.track_skill('history_price')
 def get_history_price(market: str, code: str, start_date: str = '20240101', end_date: str = '20500101', adjust: str = "qfq") -> pd.DataFrame:
     """
     获取历史K线数据 (支持多源 Fallback)
@@ -237,6 +245,6 @@ def get_history_price(market: str, code: str, start_date: str = '20240101', end_
             errors.append(f"AkShare failed: {e}")
 
     if df.empty:
-        print(f"Failed to get history for {code}. Errors: {'; '.join(errors)}")
+        events.warning('router.failed', skill='history_price', market=market, code=code, errors=errors)
         
     return df
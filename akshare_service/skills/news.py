@@ -4,8 +4,8 @@
 数据源优先级：AkShare(东财) → Tavily/Exa(兜底)
 """
 
-import akshare as ak
-import pandas as pd
+from __future__ import annotations
+
 from typing import List, Dict, Any
 import os
 import sys
@@ -13,6 +13,13 @@ import sys
 sys.path.insert(0, '/root/.openclaw/workspace/deer-flow-analysis/backend')
 
 from akshare_service.infra.client import robust_api
+from akshare_service.infra import events, metrics
+from akshare_service.infra.stock_names import resolve_name
+from akshare_service.infra.lazy import lazy_import
+
+# 重依赖在首次使用时才导入，见 infra/lazy.py
+ak = lazy_import('akshare')
+pd = lazy_import('pandas')
 
 
 def _get_stock_news_tavily(code: str, stock_name: str = "", limit: int = 10) -> List[Dict[str, Any]]:
@@ -44,11 +51,12 @@ def _get_stock_news_tavily(code: str, stock_name: str = "", limit: int = 10) ->
         
         return news_list
     except Exception as e:
-        print(f"Tavily 搜索失败: {e}")
+        events.warning('news.tavily_failed', code=code, error=str(e))
         return []
 
 
 @robust_api
+@metrics.track_skill('stock_news')
 def get_stock_news(market: str, code: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
     获取个股新闻资讯
@@ -70,7 +78,7 @@ def get_stock_news(market: str, code: str, limit: int = 10) -> List[Dict[str, An
                             '新闻内容': '内容'
                         })
                     else:
-                        print(f"Unexpected columns: {df.columns.tolist()}")
+                        events.warning('news.unexpected_columns', code=code, columns=df.columns.tolist())
                         df = None
                 
                 if df is not None and '发布时间' in df.columns:
@@ -87,20 +95,18 @@ def get_stock_news(market: str, code: str, limit: int = 10) -> List[Dict[str, An
                             'data_source': 'AkShare'
                         })
     except Exception as e:
-        print(f"AkShare 获取新闻失败: {e}")
+        events.warning('router.fallback', skill='stock_news', source='akshare_em', next_source='tavily',
+                       code=code, error=str(e))
     
     # === 2. 如果 AkShare 失败，尝试 Tavily ===
     if not news_list:
-        print("尝试 Tavily 兜底...")
+        events.emit('router.attempt', skill='stock_news', source='tavily', code=code)
+        metrics.record_fallback('stock_news', 'akshare_em', 'tavily', market)
         stock_name = ""
         # 尝试获取股票名称
         try:
             if market == 'A股':
-                df = ak.stock_zh_a_spot_em()
-                if df is not None and not df.empty:
-                    stock = df[df['代码'] == code]
-                    if not stock.empty:
-                        stock_name = stock.iloc[0]['名称']
+                stock_name = resolve_name(code)
         except:
             pass
         
@@ -153,5 +159,5 @@ def get_market_news(limit: int = 20) -> List[Dict[str, Any]]:
             })
         return news
     except Exception as e:
-        print(f"Error fetching market news: {e}")
+        events.warning('news.market_news_failed', error=str(e))
         return []
@@ -3,15 +3,21 @@
 提供标准化的估值数据输出，包括股价、PE、PB、市值等。
 """
 
-import akshare as ak
-import pandas as pd
+from __future__ import annotations
+
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import json
 
 from akshare_service.infra.client import robust_api
+from akshare_service.infra import metrics, snapshots
+from akshare_service.infra.lazy import lazy_import
+
+# 重依赖在首次使用时才导入，见 infra/lazy.py
+pd = lazy_import('pandas')
 
 
+@metrics.track_skill('valuation')
 def get_valuation_data(code: str) -> Dict[str, Any]:
     """
     获取实时估值数据（标准化输出）
@@ -26,7 +32,7 @@ def get_valuation_data(code: str) -> Dict[str, Any]:
     
     # 尝试东财接口
     try:
-        df = ak.stock_zh_a_spot_em()
+        df = snapshots.get_spot('stock_zh_a_spot_em')
         if df is not None and not df.empty:
             stock = df[df['代码'] == code]
             if not stock.empty:
@@ -83,6 +89,7 @@ def get_valuation_data(code: str) -> Dict[str, Any]:
     return _error_response(code, errors)
 
 
+@metrics.track_skill('valuation_fast')
 def get_valuation_data_fast(code: str) -> Dict[str, Any]:
     """
     快速获取估值数据（使用新浪接口，更稳定但数据较少）
@@ -100,7 +107,7 @@ def get_valuation_data_fast(code: str) -> Dict[str, Any]:
         market = 'sh' if code.startswith('6') else 'sz'
         sina_code = f"{market}{code}"
         
-        df = ak.stock_zh_a_spot()
+        df = snapshots.get_spot('stock_zh_a_spot')
         if df is not None and not df.empty:
             stock = df[df['code'] == sina_code]
             if not stock.empty:
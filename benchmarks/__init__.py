@@ -0,0 +1,11 @@
+"""
+性能基准测试包
+
+覆盖 Skills 冷/热缓存延迟、批量吞吐、缓存读写速率、DataFrame 处理函数和 JSON 编解码，
+基于录制的 HTTP 夹具离线运行，结果写入 JSON 历史并与基线对比。
+
+使用方法:
+    python -m benchmarks.run                      # 运行全部套件
+    python -m benchmarks.run --suite cache        # 只运行缓存套件
+    python -m benchmarks.run --save-baseline      # 将本次结果保存为基线
+"""
@@ -0,0 +1,62 @@
+"""
+LocalCache 读写基准
+"""
+
+import tempfile
+from typing import List
+
+from benchmarks.runner import BenchContext, BenchResult, measure
+
+
+SUITE = 'cache'
+
+# 与 get_financial_summary 5 年结果规模相当的缓存值
+SAMPLE_VALUE = {
+    'code': '300760',
+    'name': '迈瑞医疗',
+    'source': 'EastMoney.API',
+    'fetched_at': '2026-01-01T00:00:00',
+    'annual_data': [
+        {
+            'year': 2020 + i,
+            'revenue': {'value': 300.12 + i, 'unit': '亿元', 'yoy_growth': 5.1},
+            'net_profit': {'value': 100.5 + i, 'unit': '亿元', 'yoy_growth': 3.2},
+            'gross_margin': {'value': 63.11, 'unit': '%'},
+            'net_margin': {'value': 31.2, 'unit': '%'},
+            'roe': {'value': 28.63, 'unit': '%'},
+            'total_assets': {'value': 500.0, 'unit': '亿元'},
+            'total_equity': {'value': 380.0, 'unit': '亿元'},
+            'total_liabilities': {'value': 120.0, 'unit': '亿元'},
+            'debt_ratio': {'value': 24.0, 'unit': '%'},
+        }
+        for i in range(5)
+    ],
+    'errors': None,
+}
+
+
+def run(ctx: BenchContext) -> List[BenchResult]:
+    from akshare_service.infra.cache import LocalCache
+
+    batch = 200
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = LocalCache(cache_dir=cache_dir)
+        keys = [f"financial_summary:{i:06d}:5" for i in range(batch)]
+
+        def set_batch():
+            for key in keys:
+                cache.set(key, SAMPLE_VALUE)
+
+        def get_batch():
+            for key in keys:
+                cache.get(key)
+
+        def miss_batch():
+            for key in keys:
+                cache.get(f"missing:{key}")
+
+        results.append(measure('set', SUITE, set_batch, repeat=ctx.repeat, ops_per_call=batch))
+        results.append(measure('get_hit', SUITE, get_batch, repeat=ctx.repeat, ops_per_call=batch))
+        results.append(measure('get_miss', SUITE, miss_batch, repeat=ctx.repeat, ops_per_call=batch))
+    return results
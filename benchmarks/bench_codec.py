@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+JSON 编解码基准测试
+
+对比标准库 json 与 orjson / msgspec 在东方财富 datacenter 响应上的解析耗时，
+以及按行记录 / 按列数组构建 DataFrame 的耗时。
+
+使用方法:
+    python benchmarks/bench_codec.py                       # 使用合成的全市场响应
+    python benchmarks/bench_codec.py payloads/*.json.gz    # 使用录制的响应
+"""
+
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra import codec
+
+
+def synthetic_payload(rows: int = 5000, columns: int = 60) -> bytes:
+    """生成与 RPT_LICO_FN_CPD 全市场响应规模相当的合成数据"""
+    rng = random.Random(42)
+    data = []
+    for i in range(rows):
+        record = {'SECURITY_CODE': f'{i:06d}', 'SECURITY_NAME_ABBR': f'股票{i}',
+                  'REPORTDATE': '2025-12-31 00:00:00'}
+        for j in range(columns - 3):
+            record[f'FIELD_{j}'] = rng.random() * 1e9 if j % 5 else None
+        data.append(record)
+    body = {'version': 'bench', 'result': {'pages': 1, 'count': rows, 'data': data},
+            'success': True, 'message': 'ok', 'code': 0}
+    return json.dumps(body, ensure_ascii=False).encode('utf-8')
+
+
+def load_payloads(paths: List[str]) -> Dict[str, bytes]:
+    """读取录制的响应文件（支持 .gz 和目录）"""
+    files = []
+    for path in paths:
+        p = Path(path)
+        if p.is_dir():
+            files.extend(sorted(p.rglob('*.json')) + sorted(p.rglob('*.json.gz')))
+        else:
+            files.append(p)
+
+    payloads = {}
+    for f in files:
+        raw = f.read_bytes()
+        if f.suffix == '.gz':
+            raw = gzip.decompress(raw)
+        payloads[f.name] = raw
+    return payloads
+
+
+def timeit(func: Callable, repeat: int = 5) -> float:
+    """返回最小耗时（毫秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_payload(raw: bytes, repeat: int = 5) -> Dict[str, float]:
+    """单个响应的各项耗时（毫秒）"""
+    import pandas as pd
+
+    results = {'size_kb': round(len(raw) / 1024, 1)}
+    results['json.loads'] = timeit(lambda: json.loads(raw), repeat)
+    results[f'codec.loads[{codec.BACKEND}]'] = timeit(lambda: codec.loads(raw), repeat)
+
+    decoded = codec.loads(raw)
+    records = (decoded.get('result') or {}).get('data') if isinstance(decoded, dict) else None
+    if records:
+        results['DataFrame(records)'] = timeit(lambda: pd.DataFrame(records), repeat)
+        results['DataFrame(columns)'] = timeit(lambda: pd.DataFrame(codec.records_to_columns(records)), repeat)
+
+    results['json.dumps'] = timeit(lambda: json.dumps(decoded, ensure_ascii=False).encode('utf-8'), repeat)
+    results[f'codec.dumps[{codec.BACKEND}]'] = timeit(lambda: codec.dumps(decoded), repeat)
+    return results
+
+
+def run(paths: List[str] = None, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """运行基准，返回 {payload 名称: 指标}"""
+    payloads = load_payloads(paths) if paths else {'synthetic_5000x60': synthetic_payload()}
+    return {name: bench_payload(raw, repeat) for name, raw in payloads.items()}
+
+
+def run_suite(ctx) -> list:
+    """供 benchmarks.run 调用：在合成的全市场响应上计时"""
+    from benchmarks.runner import measure
+
+    payloads = {'synthetic_5000x60': synthetic_payload()}
+    repeat = ctx.repeat
+    results = []
+    for name, raw in payloads.items():
+        kb = round(len(raw) / 1024, 1)
+        for label, func in (
+            ('json.loads', lambda: json.loads(raw)),
+            (f'codec.loads[{codec.BACKEND}]', lambda: codec.loads(raw)),
+        ):
+            result = measure(f'{name}.{label}', 'codec', func, repeat=repeat, warmup=1)
+            result.extra['size_kb'] = kb
+            results.append(result)
+        decoded = codec.loads(raw)
+        results.append(measure(f'{name}.codec.dumps[{codec.BACKEND}]', 'codec',
+                               lambda: codec.dumps(decoded), repeat=repeat, warmup=1))
+    return results
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='JSON 编解码基准测试')
+    parser.add_argument('payloads', nargs='*', help='录制的响应文件或目录')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数（取最小值）')
+    args = parser.parse_args()
+
+    for name, metrics in run(args.payloads, args.repeat).items():
+        print(f"\n{name} ({metrics.pop('size_kb')} KB)")
+        baseline = metrics.get('json.loads')
+        for label, ms in metrics.items():
+            speedup = f"  x{baseline / ms:.1f}" if label.startswith('codec.loads') and ms else ''
+            print(f"  {label:<28} {ms:8.2f} ms{speedup}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+冷启动导入耗时基准
+
+每个样本在全新的子进程中导入目标模块，只计 import 语句本身的耗时，
+同时检查 akshare / tushare / pandas 是否被提前加载。
+"""
+
+import json
+import subprocess
+import sys
+from typing import Dict, List
+
+from benchmarks.runner import PROJECT_ROOT, BenchContext, BenchResult, summarize
+
+
+SUITE = 'import'
+
+TARGETS = [
+    'akshare_service',
+    'akshare_service.skills',
+    'akshare_service.skills.financial_summary',
+    'akshare_service.skills.finance',
+    'akshare_service.crawlers',
+]
+
+# 冷启动时不应被导入的重依赖
+HEAVY_MODULES = ('akshare', 'tushare', 'pandas')
+
+_PROBE = '''
+import sys, time, json
+start = time.perf_counter()
+import {target}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def import_once(target: str) -> Dict:
+    """在子进程中导入一次，返回 {ms, heavy}"""
+    code = _PROBE.format(target=target, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(ctx: BenchContext) -> List[BenchResult]:
+    repeat = 3 if ctx.quick else 10
+    results = []
+    for target in TARGETS:
+        probes = [import_once(target) for _ in range(repeat)]
+        result = summarize(target, SUITE, [p['ms'] for p in probes])
+        result.extra['heavy_modules'] = sorted({m for p in probes for m in p['heavy']})
+        results.append(result)
+    return results
@@ -0,0 +1,162 @@
+"""
+DataFrame 处理函数基准
+
+使用与真实报表规模相当的合成数据（20 年季报、约 100 列），
+只测计算本身，不涉及网络。
+"""
+
+from typing import List
+
+from benchmarks.runner import BenchContext, BenchResult, SkipSuite, measure
+
+
+SUITE = 'processing'
+
+YEARS = 5
+FILLER_COLUMNS = 80
+
+
+def _report_dates():
+    import pandas as pd
+
+    return pd.date_range('2005-03-31', '2024-12-31', freq='QE-DEC')
+
+
+def _with_filler(df):
+    for i in range(FILLER_COLUMNS):
+        df[f'FILLER_{i}'] = 1.0
+    return df
+
+
+def make_sina_frames():
+    """新浪利润表 / 资产负债表"""
+    import numpy as np
+    import pandas as pd
+
+    dates = _report_dates()
+    n = len(dates)
+    profit = _with_filler(pd.DataFrame({
+        '报告日': dates.strftime('%Y%m%d'),
+        '营业收入': np.linspace(1e9, 4e10, n),
+        '营业成本': np.linspace(4e8, 1.5e10, n),
+        '营业利润': np.linspace(3e8, 1.3e10, n),
+        '利润总额': np.linspace(3e8, 1.3e10, n),
+        '所得税费用': np.linspace(4e7, 1.8e9, n),
+        '归属于母公司所有者的净利润': np.linspace(2.5e8, 1.1e10, n),
+    }))
+    balance = _with_filler(pd.DataFrame({
+        '报告日': dates.strftime('%Y%m%d'),
+        '资产总计': np.linspace(5e9, 6e10, n),
+        '所有者权益(或股东权益)合计': np.linspace(3e9, 4e10, n),
+        '负债合计': np.linspace(2e9, 2e10, n),
+        '流动资产合计': np.linspace(2e9, 3e10, n),
+        '流动负债合计': np.linspace(1e9, 1.5e10, n),
+        '货币资金': np.linspace(1e9, 2e10, n),
+        '短期借款': np.linspace(0, 1e9, n),
+        '长期借款': np.linspace(0, 5e8, n),
+    }))
+    return profit, balance
+
+
+def make_em_frames():
+    """AkShare 东财年报利润表 / 资产负债表"""
+    import numpy as np
+    import pandas as pd
+
+    dates = _report_dates()
+    n = len(dates)
+    profit = _with_filler(pd.DataFrame({
+        'REPORT_DATE': dates.strftime('%Y-%m-%d 00:00:00'),
+        'TOTAL_OPERATE_INCOME': np.linspace(1e9, 4e10, n),
+        'OPERATE_COST': np.linspace(4e8, 1.5e10, n),
+        'OPERATE_PROFIT': np.linspace(3e8, 1.3e10, n),
+        'TOTAL_PROFIT': np.linspace(3e8, 1.3e10, n),
+        'INCOME_TAX': np.linspace(4e7, 1.8e9, n),
+        'NETPROFIT': np.linspace(2.5e8, 1.1e10, n),
+    }))
+    balance = _with_filler(pd.DataFrame({
+        'REPORT_DATE': dates.strftime('%Y-%m-%d 00:00:00'),
+        'TOTAL_ASSETS': np.linspace(5e9, 6e10, n),
+        'TOTAL_EQUITY': np.linspace(3e9, 4e10, n),
+        'TOTAL_LIAB': np.linspace(2e9, 2e10, n),
+        'TOTAL_CURRENT_ASSETS': np.linspace(2e9, 3e10, n),
+        'TOTAL_CURRENT_LIAB': np.linspace(1e9, 1.5e10, n),
+        'MONETARYFUNDS': np.linspace(1e9, 2e10, n),
+        'SHORT_LOAN': np.linspace(0, 1e9, n),
+        'LONG_LOAN': np.linspace(0, 5e8, n),
+        'NONCURRENT_LIAB_1YEAR': np.linspace(0, 2e8, n),
+    }))
+    return profit, balance
+
+
+def make_eastmoney_frames():
+    """EastMoneyAPI 归一化后的利润表 / 资产负债表 / 财务指标（金额单位：亿元）"""
+    import numpy as np
+    import pandas as pd
+
+    dates = _report_dates()[::-1]
+    n = len(dates)
+    report_date = dates.strftime('%Y-%m-%d 00:00:00')
+    income = pd.DataFrame({
+        'report_date': report_date,
+        'revenue': np.linspace(400, 10, n),
+        'operate_profit': np.linspace(130, 3, n),
+        'total_profit': np.linspace(130, 3, n),
+        'income_tax': np.linspace(18, 0.4, n),
+        'net_profit': np.linspace(110, 2.5, n),
+    })
+    balance = pd.DataFrame({
+        'report_date': report_date,
+        'total_assets': np.linspace(600, 50, n),
+        'total_equity': np.linspace(400, 30, n),
+        'total_liabilities': np.linspace(200, 20, n),
+        'cash': np.linspace(200, 10, n),
+    })
+    indicator = pd.DataFrame({
+        'report_date': report_date,
+        'revenue': np.linspace(400, 10, n),
+        'net_profit': np.linspace(110, 2.5, n),
+        'roe': np.linspace(30, 10, n),
+        'gross_margin': np.linspace(65, 50, n),
+        'revenue_yoy': 5.0,
+        'profit_yoy': 3.0,
+    })
+    return income, balance, indicator
+
+
+def run(ctx: BenchContext) -> List[BenchResult]:
+    try:
+        import pandas as pd
+        from akshare_service.skills import financial_summary, finance
+    except ImportError as e:
+        raise SkipSuite(f"无法导入 skills: {e}")
+
+    sina_profit, sina_balance = make_sina_frames()
+    em_profit, em_balance = make_em_frames()
+    emapi_income, emapi_balance, emapi_indicator = make_eastmoney_frames()
+
+    def sina_annual(df):
+        df = df.copy()
+        df['报告日'] = pd.to_datetime(df['报告日'])
+        return df[df['报告日'].dt.month == 12]
+
+    sina_profit_annual = sina_annual(sina_profit)
+    sina_balance_annual = sina_annual(sina_balance)
+    em_profit_dt = em_profit.assign(REPORT_DATE=pd.to_datetime(em_profit['REPORT_DATE']))
+    em_balance_dt = em_balance.assign(REPORT_DATE=pd.to_datetime(em_balance['REPORT_DATE']))
+
+    cases = {
+        '_process_sina_data': lambda: financial_summary._process_sina_data(
+            '600519', '', sina_profit_annual, sina_balance_annual, YEARS, []),
+        '_process_em_data': lambda: financial_summary._process_em_data(
+            '600519', '', em_profit.copy(), em_balance.copy(), YEARS, []),
+        '_process_eastmoney_data': lambda: financial_summary._process_eastmoney_data(
+            '600519', '', emapi_indicator, emapi_balance, YEARS, []),
+        '_calculate_roic_from_em_data': lambda: finance._calculate_roic_from_em_data(
+            em_profit_dt, em_balance_dt, YEARS),
+        '_calculate_roic_from_sina_data': lambda: finance._calculate_roic_from_sina_data(
+            sina_profit.copy(), sina_balance.copy(), YEARS),
+        '_calculate_roic_from_eastmoney_data': lambda: finance._calculate_roic_from_eastmoney_data(
+            emapi_income, emapi_balance, YEARS),
+    }
+    return [measure(name, SUITE, func, repeat=ctx.repeat) for name, func in cases.items()]
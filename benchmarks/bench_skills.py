@@ -0,0 +1,110 @@
+"""
+Skills 端到端基准（冷/热缓存、批量吞吐）
+
+基于录制的 HTTP 夹具回放运行，不访问网络；可通过 --latency 注入上游延迟，
+模拟真实网络下的耗时结构。夹具可用 python -m benchmarks.run --record 录制。
+"""
+
+import contextlib
+import os
+import tempfile
+from typing import List
+
+from benchmarks.runner import BenchContext, BenchResult, SkipSuite, measure
+
+
+SUITE = 'skills'
+
+
+@contextlib.contextmanager
+def isolated_cache():
+    """替换全局缓存为临时目录，结束后恢复"""
+    from akshare_service.infra import cache as cache_module
+
+    previous = cache_module._cache_instance
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_module._cache_instance = cache_module.LocalCache(cache_dir=cache_dir)
+        try:
+            yield cache_module._cache_instance
+        finally:
+            cache_module._cache_instance = previous
+
+
+@contextlib.contextmanager
+def no_rate_limit():
+    """回放时关闭 skills 内的请求间隔"""
+    from akshare_service.skills import financial_summary, cashflow
+
+    saved = financial_summary.REQUEST_INTERVAL, cashflow.REQUEST_INTERVAL
+    financial_summary.REQUEST_INTERVAL = cashflow.REQUEST_INTERVAL = 0
+    try:
+        yield
+    finally:
+        financial_summary.REQUEST_INTERVAL, cashflow.REQUEST_INTERVAL = saved
+
+
+def _clear(cache) -> None:
+    """清空缓存目录和进程内行情快照"""
+    from akshare_service.infra import snapshots
+
+    snapshots.clear()
+    for name in os.listdir(cache.cache_dir):
+        if name.endswith('.json'):
+            os.remove(os.path.join(cache.cache_dir, name))
+
+
+def _workload(ctx: BenchContext):
+    from akshare_service.skills.financial_summary import get_financial_summary
+    from akshare_service.skills.cashflow import get_cashflow_data
+    from akshare_service.skills.finance import calculate_roic
+
+    code = ctx.codes[0]
+    return {
+        'summary': lambda: get_financial_summary(code, years=5),
+        'cashflow': lambda: get_cashflow_data(code, years=5),
+        'roic': lambda: calculate_roic('A股', code, years=5),
+        'summary_batch': lambda: [get_financial_summary(c, years=5) for c in ctx.codes],
+    }
+
+
+def record(ctx: BenchContext) -> None:
+    """在线执行一遍工作负载，把上游响应录制到夹具目录"""
+    try:
+        from akshare_service.infra import replay
+        with replay.patch_requests(mode='record', store=replay.FixtureStore(ctx.fixtures)):
+            with isolated_cache(), no_rate_limit():
+                for func in _workload(ctx).values():
+                    func()
+    except ImportError as e:
+        raise SkipSuite(f"无法导入 skills: {e}")
+
+
+def run(ctx: BenchContext) -> List[BenchResult]:
+    if not ctx.fixtures.exists() or not any(ctx.fixtures.rglob('*.json.gz')):
+        raise SkipSuite(f"夹具目录为空: {ctx.fixtures}，请先运行 --record")
+    try:
+        from akshare_service.infra import replay
+        workload = _workload(ctx)
+    except ImportError as e:
+        raise SkipSuite(f"无法导入 skills: {e}")
+
+    repeat = 3 if ctx.quick else 10
+    results = []
+    store = replay.FixtureStore(ctx.fixtures)
+    with replay.patch_requests(mode='replay', store=store, latency=ctx.latency), no_rate_limit():
+        with isolated_cache() as cache:
+            for name, key in (('financial_summary', 'summary'), ('get_cashflow_data', 'cashflow'),
+                              ('calculate_roic', 'roic')):
+                # 冷缓存：每次调用前清空缓存目录
+                results.append(measure(f'{name}.cold', SUITE, workload[key],
+                                       repeat=repeat, warmup=1, setup=lambda: _clear(cache)))
+                # 热缓存：缓存已填充，只测本地命中
+                workload[key]()
+                results.append(measure(f'{name}.warm', SUITE, workload[key], repeat=ctx.repeat))
+
+            results.append(measure('financial_summary.batch_cold', SUITE, workload['summary_batch'],
+                                   repeat=repeat, warmup=1, setup=lambda: _clear(cache),
+                                   ops_per_call=len(ctx.codes)))
+    for r in results:
+        r.extra['latency'] = ctx.latency
+    return results
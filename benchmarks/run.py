@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+基准测试入口
+
+使用方法:
+    python -m benchmarks.run                          # 运行全部套件并写入历史
+    python -m benchmarks.run --suite processing --quick
+    python -m benchmarks.run --latency 150:30         # 回放时注入上游延迟
+    python -m benchmarks.run --record                 # 在线录制 skills 套件所需夹具
+    python -m benchmarks.run --save-baseline          # 将本次结果保存为基线
+
+与基线相比中位数变慢超过阈值（默认 20%）时以退出码 1 结束，可直接用于 CI。
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import bench_cache, bench_codec, bench_import, bench_processing, bench_skills
+from benchmarks.runner import (
+    BASELINE_FILE, DEFAULT_FIXTURE_DIR, DEFAULT_THRESHOLD, HISTORY_FILE,
+    BenchContext, SkipSuite, compare_to_baseline, load_baseline, save_baseline, save_history,
+)
+
+
+SUITES = {
+    'cache': bench_cache.run,
+    'processing': bench_processing.run,
+    'codec': bench_codec.run_suite,
+    'skills': bench_skills.run,
+    'import': bench_import.run,
+}
+
+
+def print_results(results) -> None:
+    print(f"\n{'基准':<52} {'中位数(ms)':>12} {'P95(ms)':>10} {'ops/s':>12}")
+    print('-' * 90)
+    for r in results:
+        ops = f"{r.ops_per_sec:,.0f}" if r.ops_per_sec else '-'
+        print(f"{r.suite + '.' + r.name:<52} {r.median_ms:>12.3f} {r.p95_ms:>10.3f} {ops:>12}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='AkShare Service 性能基准')
+    parser.add_argument('--suite', action='append', choices=list(SUITES),
+                        help='只运行指定套件（可多次指定）')
+    parser.add_argument('--quick', action='store_true', help='减少重复次数')
+    parser.add_argument('--fixtures', default=str(DEFAULT_FIXTURE_DIR), help='HTTP 夹具目录')
+    parser.add_argument('--latency', default=None, help='回放延迟：200 / 200:50 / recorded')
+    parser.add_argument('--codes', default=None, help='股票代码，逗号分隔')
+    parser.add_argument('--record', action='store_true', help='在线录制 skills 套件夹具后退出')
+    parser.add_argument('--save-baseline', action='store_true', help='保存为基线')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='回归阈值（比例）')
+    parser.add_argument('--no-history', action='store_true', help='不写入历史文件')
+    args = parser.parse_args(argv)
+
+    ctx = BenchContext(fixtures=Path(args.fixtures), latency=args.latency, quick=args.quick)
+    if args.codes:
+        ctx.codes = [c.strip() for c in args.codes.split(',') if c.strip()]
+
+    if args.record:
+        bench_skills.record(ctx)
+        print(f"夹具已录制到 {ctx.fixtures}")
+        return 0
+
+    results = []
+    for name in args.suite or list(SUITES):
+        try:
+            suite_results = SUITES[name](ctx)
+        except SkipSuite as e:
+            print(f"[Bench] 跳过 {name}: {e}")
+            continue
+        results.extend(suite_results)
+
+    if not results:
+        print("[Bench] 没有可运行的套件")
+        return 0
+
+    print_results(results)
+
+    heavy = [f"{r.name}: {', '.join(r.extra['heavy_modules'])}" for r in results
+             if r.extra.get('heavy_modules')]
+    if heavy:
+        print("\n⚠️ 冷启动导入了重依赖:\n  " + "\n  ".join(heavy))
+
+    if not args.no_history:
+        save_history(results)
+        print(f"\n历史已写入 {HISTORY_FILE}")
+
+    if args.save_baseline:
+        save_baseline(results)
+        print(f"基线已保存到 {BASELINE_FILE}")
+        return 0
+
+    baseline = load_baseline()
+    if baseline is None:
+        return 0
+    regressions = compare_to_baseline(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n⚠️ 相对基线 ({baseline.get('revision')}) 的性能回归:")
+        for item in regressions:
+            print(f"  {item['name']}: {item['baseline_ms']:.3f} → {item['current_ms']:.3f} ms "
+                  f"(+{item['change_ratio']:.0%})")
+        return 1
+    print(f"\n✅ 无回归（阈值 {args.threshold:.0%}）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+基准测试运行器
+
+负责计时、结果历史（JSONL）和基线对比。
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+BENCH_DIR = Path(__file__).parent
+PROJECT_ROOT = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / 'results'
+HISTORY_FILE = RESULTS_DIR / 'history.jsonl'
+BASELINE_FILE = RESULTS_DIR / 'baseline.json'
+DEFAULT_FIXTURE_DIR = PROJECT_ROOT / 'tests' / 'fixtures' / 'http'
+
+# 默认回归阈值：中位数比基线慢 20% 视为回归
+DEFAULT_THRESHOLD = 0.2
+
+
+@dataclass
+class BenchResult:
+    name: str
+    suite: str
+    median_ms: float
+    p95_ms: float
+    min_ms: float
+    mean_ms: float
+    samples: int
+    ops_per_sec: Optional[float] = None
+    extra: Dict = field(default_factory=dict)
+
+
+@dataclass
+class BenchContext:
+    """套件运行参数"""
+    fixtures: Path = DEFAULT_FIXTURE_DIR
+    latency: Optional[str] = None
+    quick: bool = False
+    codes: List[str] = field(default_factory=lambda: ['600519', '300760'])
+
+    @property
+    def repeat(self) -> int:
+        return 5 if self.quick else 20
+
+
+class SkipSuite(Exception):
+    """套件无法运行（缺少依赖或夹具）"""
+
+
+def measure(name: str, suite: str, func: Callable[[], object], repeat: int = 20,
+            warmup: int = 2, setup: Optional[Callable[[], None]] = None,
+            ops_per_call: int = 1) -> BenchResult:
+    """
+    重复调用 func 并统计耗时
+
+    Args:
+        name: 基准名称
+        suite: 所属套件
+        func: 被测函数
+        repeat: 计时次数
+        warmup: 预热次数（不计时）
+        setup: 每次调用前执行（不计时），如清空缓存
+        ops_per_call: 每次调用包含的操作数，用于计算吞吐
+
+    Returns:
+        BenchResult
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    return summarize(name, suite, samples, ops_per_call)
+
+
+def summarize(name: str, suite: str, samples: List[float], ops_per_call: int = 1) -> BenchResult:
+    """由耗时样本（毫秒）生成 BenchResult"""
+    samples = sorted(samples)
+    median = statistics.median(samples)
+    p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+    return BenchResult(
+        name=name,
+        suite=suite,
+        median_ms=round(median, 4),
+        p95_ms=round(p95, 4),
+        min_ms=round(samples[0], 4),
+        mean_ms=round(statistics.fmean(samples), 4),
+        samples=len(samples),
+        ops_per_sec=round(ops_per_call / (median / 1000), 1) if median > 0 else None,
+    )
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def save_history(results: List[BenchResult], history_file: Path = HISTORY_FILE) -> Dict:
+    """追加一次运行到历史文件"""
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    run = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'host': platform.node(),
+        'results': [asdict(r) for r in results],
+    }
+    with open(history_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run, ensure_ascii=False) + '\n')
+    return run
+
+
+def load_history(history_file: Path = HISTORY_FILE) -> List[Dict]:
+    """读取全部历史运行"""
+    if not history_file.exists():
+        return []
+    with open(history_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_baseline(results: List[BenchResult], baseline_file: Path = BASELINE_FILE) -> None:
+    """保存基线"""
+    baseline_file.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'results': {f"{r.suite}.{r.name}": asdict(r) for r in results},
+    }
+    with open(baseline_file, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+
+
+def load_baseline(baseline_file: Path = BASELINE_FILE) -> Optional[Dict]:
+    if not baseline_file.exists():
+        return None
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: List[BenchResult], baseline: Dict,
+                        threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    与基线对比中位数耗时
+
+    Returns:
+        回归列表 [{name, baseline_ms, current_ms, change_ratio}]
+    """
+    regressions = []
+    base_results = baseline.get('results', {})
+    for r in results:
+        base = base_results.get(f"{r.suite}.{r.name}")
+        if not base or not base.get('median_ms'):
+            continue
+        change = (r.median_ms - base['median_ms']) / base['median_ms']
+        if change > threshold:
+            regressions.append({
+                'name': f"{r.suite}.{r.name}",
+                'baseline_ms': base['median_ms'],
+                'current_ms': r.median_ms,
+                'change_ratio': round(change, 3),
+            })
+    return regressions
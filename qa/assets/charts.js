@@ -0,0 +1,169 @@
+/*
+ * 极简 canvas 图表（轻量报告专用，替代 CDN 上的 Chart.js，离线可用）
+ *
+ * MiniChart.bar(canvas, labels, series, {stacked: true})
+ * MiniChart.line(canvas, labels, series)
+ * MiniChart.doughnut(canvas, labels, values, colors)
+ *
+ * series: [{label: '成功数', data: [...], color: '#10b981'}]，data 中的 null 表示缺失点
+ */
+(function (global) {
+    'use strict';
+
+    var FONT = '12px -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif';
+    var PAD = {top: 28, right: 12, bottom: 36, left: 44};
+
+    function setup(canvas) {
+        var ratio = global.devicePixelRatio || 1;
+        var width = canvas.clientWidth || 400;
+        var height = canvas.clientHeight || 220;
+        canvas.width = width * ratio;
+        canvas.height = height * ratio;
+        var ctx = canvas.getContext('2d');
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        ctx.clearRect(0, 0, width, height);
+        ctx.font = FONT;
+        return {ctx: ctx, width: width, height: height};
+    }
+
+    function legend(c, items) {
+        var x = PAD.left;
+        c.ctx.textBaseline = 'middle';
+        items.forEach(function (item) {
+            c.ctx.fillStyle = item.color;
+            c.ctx.fillRect(x, 8, 10, 10);
+            c.ctx.fillStyle = '#555';
+            c.ctx.fillText(item.label, x + 14, 13);
+            x += c.ctx.measureText(item.label).width + 30;
+        });
+    }
+
+    function niceMax(value) {
+        if (value <= 0) return 1;
+        var step = Math.pow(10, Math.floor(Math.log(value) / Math.LN10));
+        var steps = [1, 2, 2.5, 5, 10];
+        for (var i = 0; i < steps.length; i++) {
+            if (steps[i] * step >= value) return steps[i] * step;
+        }
+        return 10 * step;
+    }
+
+    function axes(c, max, labels) {
+        var ctx = c.ctx;
+        var plotH = c.height - PAD.top - PAD.bottom;
+        var plotW = c.width - PAD.left - PAD.right;
+        ctx.strokeStyle = '#eee';
+        ctx.fillStyle = '#888';
+        ctx.textAlign = 'right';
+        ctx.textBaseline = 'middle';
+        for (var i = 0; i <= 4; i++) {
+            var y = PAD.top + plotH - plotH * i / 4;
+            ctx.beginPath();
+            ctx.moveTo(PAD.left, y);
+            ctx.lineTo(PAD.left + plotW, y);
+            ctx.stroke();
+            ctx.fillText(String(Math.round(max * i / 4)), PAD.left - 6, y);
+        }
+        // 标签过多时抽样显示
+        var every = Math.max(1, Math.ceil(labels.length * 70 / plotW));
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'top';
+        labels.forEach(function (label, i) {
+            if (i % every) return;
+            var x = PAD.left + plotW * (i + 0.5) / labels.length;
+            ctx.fillText(String(label).slice(0, 10), x, PAD.top + plotH + 8);
+        });
+        return {plotW: plotW, plotH: plotH};
+    }
+
+    function bar(canvas, labels, series, options) {
+        var c = setup(canvas);
+        var stacked = options && options.stacked;
+        var max = 0;
+        labels.forEach(function (_, i) {
+            var values = series.map(function (s) { return s.data[i] || 0; });
+            var top = stacked ? values.reduce(function (a, b) { return a + b; }, 0) : Math.max.apply(null, values);
+            max = Math.max(max, top);
+        });
+        max = niceMax(max);
+        var plot = axes(c, max, labels);
+        var slot = plot.plotW / Math.max(1, labels.length);
+        var width = stacked ? slot * 0.7 : slot * 0.7 / series.length;
+        labels.forEach(function (_, i) {
+            var base = 0;
+            series.forEach(function (s, j) {
+                var value = s.data[i] || 0;
+                var h = plot.plotH * value / max;
+                var x = PAD.left + slot * i + slot * 0.15 + (stacked ? 0 : width * j);
+                var y = PAD.top + plot.plotH - h - (stacked ? plot.plotH * base / max : 0);
+                c.ctx.fillStyle = s.color;
+                c.ctx.fillRect(x, y, width, h);
+                if (stacked) base += value;
+            });
+        });
+        legend(c, series);
+    }
+
+    function line(canvas, labels, series) {
+        var c = setup(canvas);
+        var max = 0;
+        series.forEach(function (s) {
+            s.data.forEach(function (v) { if (v != null) max = Math.max(max, v); });
+        });
+        max = niceMax(max);
+        var plot = axes(c, max, labels);
+        var ctx = c.ctx;
+        series.forEach(function (s) {
+            ctx.strokeStyle = s.color;
+            ctx.fillStyle = s.color;
+            ctx.lineWidth = 2;
+            ctx.beginPath();
+            var drawing = false;
+            s.data.forEach(function (v, i) {
+                if (v == null) { drawing = false; return; }
+                var x = PAD.left + plot.plotW * (i + 0.5) / labels.length;
+                var y = PAD.top + plot.plotH - plot.plotH * v / max;
+                if (drawing) ctx.lineTo(x, y); else ctx.moveTo(x, y);
+                drawing = true;
+            });
+            ctx.stroke();
+            s.data.forEach(function (v, i) {
+                if (v == null) return;
+                var x = PAD.left + plot.plotW * (i + 0.5) / labels.length;
+                var y = PAD.top + plot.plotH - plot.plotH * v / max;
+                ctx.beginPath();
+                ctx.arc(x, y, 2.5, 0, Math.PI * 2);
+                ctx.fill();
+            });
+        });
+        ctx.lineWidth = 1;
+        legend(c, series);
+    }
+
+    function doughnut(canvas, labels, values, colors) {
+        var c = setup(canvas);
+        var total = values.reduce(function (a, b) { return a + b; }, 0);
+        var cx = c.width / 2;
+        var cy = PAD.top + (c.height - PAD.top) / 2;
+        var radius = Math.min(c.width, c.height - PAD.top) / 2 - 8;
+        var angle = -Math.PI / 2;
+        values.forEach(function (value, i) {
+            if (!total || !value) return;
+            var next = angle + Math.PI * 2 * value / total;
+            c.ctx.beginPath();
+            c.ctx.moveTo(cx, cy);
+            c.ctx.arc(cx, cy, radius, angle, next);
+            c.ctx.closePath();
+            c.ctx.fillStyle = colors[i];
+            c.ctx.fill();
+            angle = next;
+        });
+        c.ctx.beginPath();
+        c.ctx.arc(cx, cy, radius * 0.55, 0, Math.PI * 2);
+        c.ctx.fillStyle = '#fff';
+        c.ctx.fill();
+        legend(c, labels.map(function (label, i) { return {label: label + ' ' + values[i], color: colors[i]}; }));
+    }
+
+    global.MiniChart = {bar: bar, line: line, doughnut: doughnut};
+})(window);
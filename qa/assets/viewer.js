@@ -0,0 +1,191 @@
+/*
+ * AkShare API 轻量报告查看器（qa/report_generator.py --compact）
+ *
+ * 页面只是一个外壳，数据来自同目录的 <日期>.data.json（列式紧凑格式）：
+ * - 表格虚拟滚动，只渲染可见区域的行，接口数再多也不会生成上千个 DOM 节点
+ * - 趋势图数据来自结果库（qa/result_store.py）的最近若干轮汇总
+ * - 以 file:// 打开时浏览器可能禁止 fetch，此时可手动选择数据文件
+ */
+(function () {
+    'use strict';
+
+    var ROW_HEIGHT = 36;
+    var OVERSCAN = 10;
+    var STATUS_TEXT = {success: '成功', failed: '失败', timeout: '超时', error: '错误'};
+    var STATUS_COLORS = ['#10b981', '#ef4444', '#f59e0b', '#6b7280'];
+
+    var state = {rows: [], view: [], sortKey: 0, sortDesc: false, col: {}};
+
+    function $(id) { return document.getElementById(id); }
+
+    function esc(value) {
+        return String(value == null ? '' : value).replace(/[&<>"']/g, function (ch) {
+            return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[ch];
+        });
+    }
+
+    function renderSummary(data) {
+        var s = data.summary || {};
+        var total = s.total || 0;
+        var rate = total ? Math.round((s.success || 0) / total * 1000) / 10 : 0;
+        $('meta').textContent = '测试日期: ' + (data.test_date || '-') + ' ' + (data.test_time || '') +
+            ' | 耗时: ' + (data.duration_seconds == null ? '-' : data.duration_seconds) + ' 秒' +
+            (data.run_id ? ' | 轮次: ' + data.run_id : '');
+        $('stat-total').textContent = total;
+        $('stat-success').textContent = s.success || 0;
+        $('stat-success-rate').textContent = rate;
+        $('stat-failed').textContent = s.failed || 0;
+        $('stat-timeout').textContent = s.timeout || 0;
+    }
+
+    function renderCharts(data) {
+        var s = data.summary || {};
+        var byCategory = s.by_category || {};
+        var categories = Object.keys(byCategory).sort();
+        MiniChart.bar($('categoryChart'), categories, [
+            {label: '成功数', color: '#10b981', data: categories.map(function (c) { return byCategory[c].success || 0; })},
+            {label: '失败数', color: '#ef4444', data: categories.map(function (c) {
+                return (byCategory[c].failed || 0) + (byCategory[c].timeout || 0);
+            })}
+        ], {stacked: true});
+        MiniChart.doughnut($('statusChart'), ['成功', '失败', '超时', '错误'],
+            [s.success || 0, s.failed || 0, s.timeout || 0, s.error || 0], STATUS_COLORS);
+
+        var trend = data.trend || [];
+        if (trend.length < 2) {
+            $('trendCharts').style.display = 'none';
+            return;
+        }
+        var labels = trend.map(function (t) { return t.run_id; });
+        MiniChart.line($('rateChart'), labels, [{label: '成功率 %', color: '#3b82f6', data: trend.map(function (t) {
+            return t.tested ? Math.round(t.success / t.tested * 1000) / 10 : null;
+        })}]);
+        MiniChart.line($('latencyChart'), labels, [{label: '响应时间中位数 ms', color: '#8b5cf6',
+            data: trend.map(function (t) { return t.p50_ms; })}]);
+    }
+
+    function renderChanges(changes) {
+        var html = [];
+        function block(cls, title, items, fmt) {
+            if (!items || !items.length) return;
+            html.push('<div class="change-item ' + cls + '"><strong>' + title + ' (' + items.length + ' 个):</strong>');
+            items.slice(0, 5).forEach(function (item) { html.push('<br>' + esc(fmt(item))); });
+            if (items.length > 5) html.push('<br>... 还有 ' + (items.length - 5) + ' 个');
+            html.push('</div>');
+        }
+        changes = changes || {};
+        block('success', '✨ 新增接口', changes.new_apis, function (a) { return '+ ' + a; });
+        block('failed', '🗑️ 移除接口', changes.removed_apis, function (a) { return '- ' + a; });
+        block('warning', '🔄 状态变更', changes.status_changed, function (c) { return c.api + ': ' + c.from + ' → ' + c.to; });
+        block('', '📐 结构变更', changes.structure_changed, function (c) {
+            var parts = [];
+            if (c.added_fields && c.added_fields.length) parts.push('新增字段 ' + c.added_fields.join(', '));
+            if (c.removed_fields && c.removed_fields.length) parts.push('移除字段 ' + c.removed_fields.join(', '));
+            return c.api + ': ' + (parts.join('；') || '结构变化');
+        });
+        $('changes').innerHTML = html.length ? html.join('') : '<div class="no-changes">✅ 今日无变更</div>';
+    }
+
+    function setupFilters() {
+        var categories = {};
+        state.rows.forEach(function (r) { categories[r[state.col.category]] = true; });
+        var select = $('categoryFilter');
+        Object.keys(categories).sort().forEach(function (c) {
+            var option = document.createElement('option');
+            option.value = c;
+            option.textContent = c;
+            select.appendChild(option);
+        });
+        ['categoryFilter', 'statusFilter'].forEach(function (id) { $(id).addEventListener('change', applyFilters); });
+        $('searchInput').addEventListener('input', applyFilters);
+        Array.prototype.forEach.call(document.querySelectorAll('.grid-head > div'), function (cell, i) {
+            cell.addEventListener('click', function () {
+                state.sortDesc = state.sortKey === i ? !state.sortDesc : false;
+                state.sortKey = i;
+                applyFilters();
+            });
+        });
+        $('gridBody').addEventListener('scroll', renderRows);
+        window.addEventListener('resize', renderRows);
+    }
+
+    function applyFilters() {
+        var category = $('categoryFilter').value;
+        var status = $('statusFilter').value;
+        var search = $('searchInput').value.toLowerCase();
+        var col = state.col;
+        state.view = state.rows.filter(function (r) {
+            return (!category || r[col.category] === category) &&
+                (!status || r[col.status] === status) &&
+                (!search || String(r[col.api_name]).toLowerCase().indexOf(search) >= 0);
+        });
+        var key = state.sortKey;
+        var sign = state.sortDesc ? -1 : 1;
+        state.view.sort(function (a, b) {
+            var x = a[key], y = b[key];
+            if (x == null) return y == null ? 0 : 1;
+            if (y == null) return -1;
+            return (x < y ? -1 : x > y ? 1 : 0) * sign;
+        });
+        $('rowCount').textContent = '显示 ' + state.view.length + ' / ' + state.rows.length;
+        $('gridSpacer').style.height = state.view.length * ROW_HEIGHT + 'px';
+        $('gridBody').scrollTop = 0;
+        renderRows();
+    }
+
+    function renderRows() {
+        var body = $('gridBody');
+        var first = Math.max(0, Math.floor(body.scrollTop / ROW_HEIGHT) - OVERSCAN);
+        var last = Math.min(state.view.length, Math.ceil((body.scrollTop + body.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+        var col = state.col;
+        var html = [];
+        for (var i = first; i < last; i++) {
+            var r = state.view[i];
+            var status = r[col.status];
+            var ms = r[col.response_time_ms];
+            html.push('<div class="grid-row" style="top:' + i * ROW_HEIGHT + 'px">' +
+                '<div title="' + esc(r[col.api_name]) + '"><code>' + esc(r[col.api_name]) + '</code></div>' +
+                '<div><span class="category-badge">' + esc(r[col.category]) + '</span></div>' +
+                '<div><span class="status-badge ' + esc(status) + '">' + esc(STATUS_TEXT[status] || status) + '</span></div>' +
+                '<div>' + esc(r[col.upstream] || '-') + '</div>' +
+                '<div>' + (ms == null ? '-' : esc(ms) + 'ms') + '</div>' +
+                '<div>' + esc(r[col.fields] || 0) + ' 个字段</div>' +
+                '<div class="error-msg" title="' + esc(r[col.error]) + '">' + esc(r[col.error]) + '</div>' +
+                '</div>');
+        }
+        $('gridSpacer').innerHTML = html.join('');
+    }
+
+    function render(data) {
+        $('loadError').style.display = 'none';
+        $('report').style.display = '';
+        data.columns.forEach(function (name, i) { state.col[name] = i; });
+        state.rows = data.rows;
+        renderSummary(data);
+        renderCharts(data);
+        renderChanges(data.changes);
+        setupFilters();
+        applyFilters();
+    }
+
+    function showLoadError(message) {
+        $('loadError').style.display = '';
+        $('loadErrorText').textContent = message;
+        $('dataFile').addEventListener('change', function (event) {
+            var file = event.target.files[0];
+            if (!file) return;
+            var reader = new FileReader();
+            reader.onload = function () { render(JSON.parse(reader.result)); };
+            reader.readAsText(file, 'utf-8');
+        });
+    }
+
+    var source = document.body.getAttribute('data-report');
+    fetch(source).then(function (resp) {
+        if (!resp.ok) throw new Error('HTTP ' + resp.status);
+        return resp.json();
+    }).then(render, function (err) {
+        showLoadError('无法读取 ' + source + '（' + err.message + '）。以 file:// 打开时浏览器可能禁止读取本地文件，' +
+            '可在报告目录执行 python -m http.server 后访问，或手动选择数据文件：');
+    });
+})();
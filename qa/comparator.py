@@ -3,13 +3,46 @@
 结果对比器
 
 对比今日与昨日的测试结果，识别变更
+
+延迟不再按单次采样比较（网络抖动即可超过 50%），而是读取结果库（qa/result_store.py）近 N 天的
+多次采样，按 API 统计延迟分布（p50/p95/p99），用稳健统计判断回归：
+- 当前轮与基线的中位数偏移超过 MIN_SHIFT_RATIO 且绝对值超过 MIN_SHIFT_MS
+- 且显著：两侧样本足够时用 Mann-Whitney U 检验（p < ALPHA；稳健 z 分数很大时放宽到 0.05），
+  否则用基于 MAD 的稳健 z 分数
+- 基线只取当前轮首次采样之前的全量巡检（调度轮次偏向易失败的接口，不计入），
+  指定历史轮次时不会混入其后的轮次
+- 趋势：基线各轮与当前轮中位数对时间的 Theil-Sen 斜率（毫秒/天）
+
+结构变更基于结构指纹（qa/fingerprint.py）：列名、类型、空值比例、行数量级、列顺序。
+指纹摘要相同直接跳过，只有摘要不同的接口才解析指纹做明细对比，耗时只与接口数成正比。
 """
 
 import json
+import math
 import os
+import statistics
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+# Add project root to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from qa.fingerprint import diff_fingerprints
+    from qa.result_store import RUN_SWEEP
+except ImportError:
+    from fingerprint import diff_fingerprints
+    from result_store import RUN_SWEEP
+
+# 回归判定阈值
+MIN_SHIFT_RATIO = 1.3      # 中位数至少变化 30%
+MIN_SHIFT_MS = 200         # 且至少 200ms
+ALPHA = 0.01               # Mann-Whitney 显著性水平
+ROBUST_Z = 3.5             # 样本不足时的稳健 z 分数阈值
+MIN_CURRENT_SAMPLES = 3
+MIN_BASELINE_SAMPLES = 6
 
 
 def load_report(report_path: str) -> Optional[Dict]:
@@ -25,13 +58,231 @@ def load_report(report_path: str) -> Optional[Dict]:
         return None
 
 
-def compare_reports(today: Dict, yesterday: Dict) -> Dict:
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """线性插值分位数（q 取 0-100）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lower = math.floor(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+def distribution(values: Sequence[float]) -> Dict[str, Any]:
+    """延迟分布摘要"""
+    return {
+        'n': len(values),
+        'p50': _round(percentile(values, 50)),
+        'p95': _round(percentile(values, 95)),
+        'p99': _round(percentile(values, 99)),
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+def mann_whitney_u(a: Sequence[float], b: Sequence[float]) -> Tuple[float, float]:
+    """
+    Mann-Whitney U 检验（双侧，正态近似 + 并列校正 + 连续性校正）
+
+    Returns:
+        (a 组的 U 统计量, p 值)
+    """
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return 0.0, 1.0
+    combined = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    n = n1 + n2
+    rank_sum_a, tie_term, i = 0.0, 0.0, 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        rank_sum_a += rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        i = j + 1
+    u = rank_sum_a - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    return u, min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+
+def theil_sen_slope(points: Sequence[Tuple[float, float]]) -> Optional[float]:
+    """Theil-Sen 斜率（所有点对斜率的中位数，对离群点稳健）"""
+    slopes = [(y2 - y1) / (x2 - x1) for i, (x1, y1) in enumerate(points)
+              for x2, y2 in points[i + 1:] if x2 != x1]
+    return statistics.median(slopes) if slopes else None
+
+
+def detect_shift(current: Sequence[float], baseline: Sequence[float]) -> Dict[str, Any]:
+    """
+    判断当前样本相对基线是否发生显著的中位数偏移
+
+    Returns:
+        {'from_ms', 'to_ms', 'change_ratio', 'p_value', 'robust_z', 'significant', 'direction'}
+    """
+    base_median = statistics.median(baseline)
+    current_median = statistics.median(current)
+    ratio = current_median / base_median if base_median > 0 else float('inf')
+    result = {'from_ms': _round(base_median), 'to_ms': _round(current_median),
+              'change_ratio': round(abs(current_median - base_median) / base_median, 2) if base_median > 0 else None,
+              'p_value': None, 'robust_z': None}
+
+    large = (abs(current_median - base_median) >= MIN_SHIFT_MS
+             and (ratio >= MIN_SHIFT_RATIO or ratio <= 1 / MIN_SHIFT_RATIO))
+    mad = statistics.median(abs(v - base_median) for v in baseline) * 1.4826
+    z = (current_median - base_median) / mad if mad > 0 else float('inf')
+    result['robust_z'] = round(z, 2) if math.isfinite(z) else None
+    robust = abs(z) >= ROBUST_Z and len(baseline) >= 2
+    if len(current) >= MIN_CURRENT_SAMPLES and len(baseline) >= MIN_BASELINE_SAMPLES:
+        _, p_value = mann_whitney_u(current, baseline)
+        result['p_value'] = round(p_value, 5)
+        # 小样本时 U 检验能达到的最小 p 值有限：稳健 z 分数很大时放宽到 0.05
+        significant = p_value < ALPHA or (robust and p_value < 0.05)
+    else:
+        significant = robust
+    result['significant'] = bool(large and significant)
+    result['direction'] = 'slower' if current_median > base_median else 'faster'
+    return result
+
+
+def analyze_latency(history: Dict[str, List[Dict[str, Any]]], run_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    按 API 统计延迟分布并检测回归
+
+    Args:
+        history: api_name -> [{'run_id', 'tested_at', 'samples', 'kind'}]（旧到新，见 ResultStore.latency_history；
+            缺少 kind 视为全量巡检）
+        run_id: 当前轮次，默认取每个 API 最近一次全量巡检探测所在的轮次
+
+    Returns:
+        {'apis': {api: {'current', 'baseline', 'trend_ms_per_day', 'shift'}}, 'regressions', 'improvements'}
+    """
+    analysis = {'apis': {}, 'regressions': [], 'improvements': []}
+    for api_name, rows in history.items():
+        sweeps = [r for r in rows if r.get('kind', RUN_SWEEP) == RUN_SWEEP]
+        current_run = run_id or (sweeps or rows)[-1]['run_id']
+        current_rows = [r for r in rows if r['run_id'] == current_run]
+        current = [v for r in current_rows for v in r['samples']]
+        if not current:
+            continue
+        # 基线：当前轮首次采样之前的全量巡检
+        started = min(r['tested_at'] for r in current_rows)
+        baseline_rows = [r for r in sweeps if r['run_id'] != current_run and r['tested_at'] < started]
+        baseline = [v for r in baseline_rows for v in r['samples']]
+
+        used = [r for r in baseline_rows + current_rows if r['samples']]
+        origin = datetime.fromisoformat(used[0]['tested_at'])
+        points = [((datetime.fromisoformat(r['tested_at']) - origin).total_seconds() / 86400,
+                   statistics.median(r['samples'])) for r in used]
+        slope = theil_sen_slope(points)
+        entry = {
+            'current': distribution(current),
+            'baseline': distribution(baseline),
+            'trend_ms_per_day': _round(slope),
+            'shift': None,
+        }
+        if baseline:
+            shift = detect_shift(current, baseline)
+            entry['shift'] = shift
+            if shift['significant']:
+                item = {'api': api_name, **{k: shift[k] for k in ('from_ms', 'to_ms', 'change_ratio', 'p_value')},
+                        'p95_ms': entry['current']['p95'], 'trend_ms_per_day': entry['trend_ms_per_day']}
+                analysis['regressions' if shift['direction'] == 'slower' else 'improvements'].append(item)
+        analysis['apis'][api_name] = entry
+    for key in ('regressions', 'improvements'):
+        analysis[key].sort(key=lambda item: -(item['change_ratio'] or 0))
+    return analysis
+
+
+def _open_store(db_path: Optional[str] = None):
+    try:
+        from qa.result_store import ResultStore
+    except ImportError:
+        from result_store import ResultStore
+    return ResultStore(db_path)
+
+
+def diff_schemas(current: Dict[str, Tuple[str, str]], previous: Dict[str, Tuple[str, str]]) -> List[Dict]:
+    """
+    对比两轮的结构指纹（ResultStore.schemas 的返回值：api_name -> (digest, 指纹 JSON)）
+
+    只有摘要不同的接口才解析 JSON，返回 structure_changed 列表
+    """
+    changed = []
+    for api_name, (digest, schema_json) in current.items():
+        old = previous.get(api_name)
+        if old is None or old[0] == digest:
+            continue
+        diff = diff_fingerprints(json.loads(old[1]), json.loads(schema_json))
+        if diff:
+            changed.append({'api': api_name, **diff})
+    return sorted(changed, key=lambda item: item['api'])
+
+
+def load_schema_diff(db_path: Optional[str] = None, run_id: Optional[str] = None,
+                     previous_run_id: Optional[str] = None) -> Dict[str, Any]:
+    """从结果库读取两轮的结构指纹并对比（默认最近一轮与其上一轮）"""
+    store = _open_store(db_path)
+    try:
+        if run_id is None:
+            runs = store.runs(limit=1)
+            run_id = runs[0]['run_id'] if runs else None
+        previous_run_id = previous_run_id or (store.previous_run(run_id) if run_id else None)
+        if not run_id or not previous_run_id:
+            return {'run_id': run_id, 'previous_run_id': previous_run_id, 'structure_changed': []}
+        changed = diff_schemas(store.schemas(run_id), store.schemas(previous_run_id))
+    finally:
+        store.close()
+    return {'run_id': run_id, 'previous_run_id': previous_run_id, 'structure_changed': changed}
+
+
+def load_latency_analysis(db_path: Optional[str] = None, days: int = 14,
+                          run_id: Optional[str] = None) -> Dict[str, Any]:
+    """从结果库读取近 days 天的采样并分析"""
+    store = _open_store(db_path)
+    try:
+        analysis = analyze_latency(store.latency_history(days), run_id)
+    finally:
+        store.close()
+    analysis['window_days'] = days
+    return analysis
+
+
+def _compare_latency(api_name: str, today_info: Dict, yesterday_info: Dict) -> Optional[Dict]:
+    """没有历史库时，用两份报告中的多次采样比较延迟（仅一次采样时需显著超过抖动）"""
+    today_samples = today_info.get('latency_samples_ms') or (
+        [today_info['response_time_ms']] if today_info.get('response_time_ms') else [])
+    yesterday_samples = yesterday_info.get('latency_samples_ms') or (
+        [yesterday_info['response_time_ms']] if yesterday_info.get('response_time_ms') else [])
+    if not today_samples or not yesterday_samples:
+        return None
+    shift = detect_shift(today_samples, yesterday_samples)
+    if len(yesterday_samples) < 2:
+        # 单次采样无法估计抖动：仅在变化同时超过比例和绝对阈值的两倍时报告
+        ratio = shift['to_ms'] / shift['from_ms'] if shift['from_ms'] else float('inf')
+        shift['significant'] = (abs(shift['to_ms'] - shift['from_ms']) >= 2 * MIN_SHIFT_MS
+                                and (ratio >= 2 * MIN_SHIFT_RATIO or ratio <= 1 / (2 * MIN_SHIFT_RATIO)))
+    if not shift['significant']:
+        return None
+    return {'api': api_name, **{k: shift[k] for k in ('from_ms', 'to_ms', 'change_ratio', 'p_value')}}
+
+
+def compare_reports(today: Dict, yesterday: Dict, latency: Optional[Dict] = None) -> Dict:
     """
     对比两天的报告
     
     Args:
         today: 今日报告
         yesterday: 昨日报告
+        latency: analyze_latency 的结果（基于多日历史）；不提供时按两份报告的采样比较
         
     Returns:
         变更信息
@@ -76,8 +327,13 @@ def compare_reports(today: Dict, yesterday: Dict) -> Dict:
                 'to': today_status
             })
         
-        # 结构变更（字段变化）
-        if today_status == 'success' and yesterday_status == 'success':
+        # 结构变更：两侧都有结构指纹时按指纹对比，否则只比较字段集合
+        if today_status == 'success' and yesterday_status == 'success' \
+                and today_info.get('schema') and yesterday_info.get('schema'):
+            diff = diff_fingerprints(yesterday_info['schema'], today_info['schema'])
+            if diff:
+                changes['structure_changed'].append({'api': api_name, **diff})
+        elif today_status == 'success' and yesterday_status == 'success':
             today_keys = set(today_info.get('sample_keys', []))
             yesterday_keys = set(yesterday_info.get('sample_keys', []))
             
@@ -91,19 +347,14 @@ def compare_reports(today: Dict, yesterday: Dict) -> Dict:
                     'removed_fields': removed_fields
                 })
         
-        # 性能变更（响应时间变化超过50%）
-        today_time = today_info.get('response_time_ms')
-        yesterday_time = yesterday_info.get('response_time_ms')
-        
-        if today_time and yesterday_time and yesterday_time > 0:
-            change_ratio = abs(today_time - yesterday_time) / yesterday_time
-            if change_ratio > 0.5:  # 变化超过50%
-                changes['performance_changed'].append({
-                    'api': api_name,
-                    'from_ms': yesterday_time,
-                    'to_ms': today_time,
-                    'change_ratio': round(change_ratio, 2)
-                })
+        # 性能变更（无历史分析时按两份报告的采样判断）
+        if latency is None:
+            changed = _compare_latency(api_name, today_info, yesterday_info)
+            if changed:
+                changes['performance_changed'].append(changed)
+    
+    if latency is not None:
+        changes['performance_changed'] = latency['regressions'] + latency['improvements']
     
     return changes
 
@@ -142,17 +393,19 @@ def generate_change_summary(changes: Dict) -> str:
     if changes['structure_changed']:
         lines.append(f"📐 结构变更: {len(changes['structure_changed'])} 个")
         for item in changes['structure_changed'][:3]:
-            if item['added_fields']:
-                lines.append(f"   {item['api']}: 新增字段 {item['added_fields']}")
-            if item['removed_fields']:
-                lines.append(f"   {item['api']}: 移除字段 {item['removed_fields']}")
+            lines.extend(_structure_lines(item))
     
     # 性能变更
     if changes['performance_changed']:
         lines.append(f"⚡ 性能变更: {len(changes['performance_changed'])} 个")
         for item in changes['performance_changed'][:3]:
             direction = "📈 变慢" if item['to_ms'] > item['from_ms'] else "📉 变快"
-            lines.append(f"   {item['api']}: {direction} ({item['from_ms']}ms → {item['to_ms']}ms)")
+            detail = f"{item['from_ms']}ms → {item['to_ms']}ms"
+            if item.get('p_value') is not None:
+                detail += f", p={item['p_value']}"
+            if item.get('trend_ms_per_day') is not None:
+                detail += f", 趋势 {item['trend_ms_per_day']:+}ms/天"
+            lines.append(f"   {item['api']}: {direction} ({detail})")
     
     if not lines:
         lines.append("✅ 无变更")
@@ -160,6 +413,25 @@ def generate_change_summary(changes: Dict) -> str:
     return '\n'.join(lines)
 
 
+def _structure_lines(item: Dict) -> List[str]:
+    """单个接口结构变更的描述行"""
+    lines = []
+    api = item['api']
+    if item.get('added_fields'):
+        lines.append(f"   {api}: 新增字段 {item['added_fields']}")
+    if item.get('removed_fields'):
+        lines.append(f"   {api}: 移除字段 {item['removed_fields']}")
+    for column, (old, new) in (item.get('dtype_changed') or {}).items():
+        lines.append(f"   {api}: {column} 类型 {old} → {new}")
+    if item.get('order_changed'):
+        lines.append(f"   {api}: 列顺序变化")
+    if item.get('rows_bucket'):
+        lines.append(f"   {api}: 行数量级 {item['rows_bucket'][0]} → {item['rows_bucket'][1]}")
+    for column, (old, new) in (item.get('null_ratio_changed') or {}).items():
+        lines.append(f"   {api}: {column} 空值比例 {old:.0%} → {new:.0%}")
+    return lines
+
+
 def get_yesterday_report_path(reports_dir: str, date: Optional[str] = None) -> str:
     """获取昨日报告路径"""
     if date:
@@ -171,15 +443,56 @@ def get_yesterday_report_path(reports_dir: str, date: Optional[str] = None) -> s
     return os.path.join(reports_dir, f"{yesterday_str}.json")
 
 
+def generate_latency_summary(analysis: Dict, limit: int = 10) -> str:
+    """延迟分析摘要文本"""
+    lines = [f"⏱️ 近 {analysis.get('window_days', '-')} 天延迟分析: {len(analysis['apis'])} 个接口"]
+    for title, key in (('📈 显著变慢', 'regressions'), ('📉 显著变快', 'improvements')):
+        items = analysis[key]
+        if not items:
+            continue
+        lines.append(f"{title}: {len(items)} 个")
+        for item in items[:limit]:
+            p_value = f", p={item['p_value']}" if item.get('p_value') is not None else ''
+            trend = f", 趋势 {item['trend_ms_per_day']:+}ms/天" if item.get('trend_ms_per_day') is not None else ''
+            lines.append(f"   {item['api']}: p50 {item['from_ms']}ms → {item['to_ms']}ms, "
+                         f"p95 {item['p95_ms']}ms{p_value}{trend}")
+    if not analysis['regressions'] and not analysis['improvements']:
+        lines.append("✅ 无显著延迟变化")
+    return '\n'.join(lines)
+
+
 if __name__ == '__main__':
     import argparse
     
     parser = argparse.ArgumentParser(description='对比测试结果')
-    parser.add_argument('today', help='今日报告路径')
-    parser.add_argument('yesterday', help='昨日报告路径')
+    parser.add_argument('today', nargs='?', help='今日报告路径')
+    parser.add_argument('yesterday', nargs='?', help='昨日报告路径')
+    parser.add_argument('--db', default=None, help='结果库路径（默认 reports/results.db）')
+    parser.add_argument('--history-days', type=int, default=0,
+                        help='读取结果库近 N 天的采样做延迟分布和回归分析（0 表示不读取）')
+    parser.add_argument('--run-id', default=None, help='当前轮次（默认每个接口最近一次探测）')
+    parser.add_argument('--schema', action='store_true', help='对比结果库中最近两轮的结构指纹')
     
     args = parser.parse_args()
     
+    if args.schema:
+        diff = load_schema_diff(args.db, args.run_id)
+        print(f"📐 结构对比 {diff['previous_run_id']} → {diff['run_id']}: {len(diff['structure_changed'])} 个接口变化")
+        for item in diff['structure_changed']:
+            print('\n'.join(_structure_lines(item)))
+        if not args.today and not args.history_days:
+            exit(0)
+    
+    latency = None
+    if args.history_days:
+        latency = load_latency_analysis(args.db, args.history_days, args.run_id)
+        print(generate_latency_summary(latency))
+        if not args.today:
+            exit(0)
+    
+    if not args.today or not args.yesterday:
+        parser.error('需要今日和昨日报告路径，或使用 --history-days 只做延迟分析')
+    
     today = load_report(args.today)
     yesterday = load_report(args.yesterday)
     
@@ -191,5 +504,5 @@ if __name__ == '__main__':
         print(f"无法加载昨日报告: {args.yesterday}")
         exit(1)
     
-    changes = compare_reports(today, yesterday)
+    changes = compare_reports(today, yesterday, latency)
     print(generate_change_summary(changes))
\ No newline at end of file
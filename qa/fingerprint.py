@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+结构指纹 (Schema Fingerprint)
+
+每次探测为返回值计算一个紧凑的结构指纹，存入结果库（qa/result_store.py），对比器只比较指纹，
+不需要加载样本数据；读取和对比的耗时与样本大小无关，只与接口数成正比。
+
+指纹内容：
+- columns / dtypes: 列名（按顺序）及类型
+- null_ratios: 每列空值比例（保留 2 位小数）
+- rows_bucket: 行数量级（0 / 1 / 2-10 / 11-100 / 101-1k / 1k-10k / 10k-100k / >100k）
+- order_hash: 列顺序的哈希
+- digest: 以上结构信息的摘要，相同即视为无变化（空值比例按 空 / 部分 / 满 分档参与摘要，避免抖动）
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+ROW_BUCKETS = ((0, '0'), (1, '1'), (10, '2-10'), (100, '11-100'), (1000, '101-1k'),
+               (10000, '1k-10k'), (100000, '10k-100k'))
+
+# 空值比例变化超过该值时报告
+NULL_RATIO_CHANGE = 0.5
+
+
+def rows_bucket(rows: int) -> str:
+    """行数量级"""
+    for limit, label in ROW_BUCKETS:
+        if rows <= limit:
+            return label
+    return '>100k'
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+def _null_class(ratio: float) -> str:
+    return 'empty' if ratio >= 1 else ('none' if ratio <= 0 else 'partial')
+
+
+def _finish(columns: List[str], dtypes: Dict[str, str], null_ratios: Dict[str, float], rows: int) -> Dict[str, Any]:
+    bucket = rows_bucket(rows)
+    structure = [[c, dtypes.get(c, ''), _null_class(null_ratios.get(c, 0.0))] for c in columns]
+    return {
+        'columns': columns,
+        'dtypes': dtypes,
+        'null_ratios': null_ratios,
+        'rows_bucket': bucket,
+        'order_hash': _hash('\x1f'.join(columns)),
+        'digest': _hash(json.dumps([structure, bucket], ensure_ascii=False)),
+    }
+
+
+def schema_fingerprint(data: Any) -> Optional[Dict[str, Any]]:
+    """
+    计算返回值的结构指纹
+
+    Args:
+        data: AkShare 返回值（DataFrame / dict / list of dict）
+
+    Returns:
+        指纹字典；无法识别的类型返回 None
+    """
+    if data is None:
+        return _finish([], {}, {}, 0)
+    if hasattr(data, 'columns') and hasattr(data, 'isna'):
+        columns = [str(c) for c in data.columns]
+        rows = len(data)
+        dtypes = {str(c): str(t) for c, t in data.dtypes.items()}
+        if rows:
+            nulls = data.isna().mean()
+            null_ratios = {str(c): round(float(nulls.iloc[i]), 2) for i, c in enumerate(data.columns)}
+        else:
+            null_ratios = {c: 0.0 for c in columns}
+        return _finish(columns, dtypes, null_ratios, rows)
+    if isinstance(data, dict):
+        columns = [str(k) for k in data]
+        return _finish(columns, {str(k): type(v).__name__ for k, v in data.items()},
+                       {str(k): 1.0 if v is None else 0.0 for k, v in data.items()}, 1 if data else 0)
+    if isinstance(data, list):
+        first = data[0] if data and isinstance(data[0], dict) else {}
+        columns = [str(k) for k in first]
+        null_ratios = {c: round(sum(1 for row in data if isinstance(row, dict) and row.get(c) is None)
+                                / len(data), 2) for c in columns}
+        return _finish(columns, {str(k): type(v).__name__ for k, v in first.items()}, null_ratios, len(data))
+    return None
+
+
+def _null_changed(old: float, new: float) -> bool:
+    """空值比例大幅变化，或列变为全空 / 从全空恢复"""
+    return abs(new - old) >= NULL_RATIO_CHANGE or (_null_class(old) == 'empty') != (_null_class(new) == 'empty')
+
+
+def diff_fingerprints(old: Dict[str, Any], new: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    对比两个指纹
+
+    Returns:
+        变化详情（added_fields / removed_fields / dtype_changed / order_changed / rows_bucket /
+        null_ratio_changed）；结构一致时返回 None
+    """
+    if old.get('digest') == new.get('digest'):
+        return None
+    old_columns, new_columns = old.get('columns', []), new.get('columns', [])
+    old_set, new_set = set(old_columns), set(new_columns)
+    common = [c for c in new_columns if c in old_set]
+    old_dtypes, new_dtypes = old.get('dtypes', {}), new.get('dtypes', {})
+    old_nulls, new_nulls = old.get('null_ratios', {}), new.get('null_ratios', {})
+
+    changes = {
+        'added_fields': [c for c in new_columns if c not in old_set],
+        'removed_fields': [c for c in old_columns if c not in new_set],
+        'dtype_changed': {c: [old_dtypes.get(c), new_dtypes.get(c)] for c in common
+                          if old_dtypes.get(c) != new_dtypes.get(c)},
+        'order_changed': (old.get('order_hash') != new.get('order_hash')
+                          and [c for c in old_columns if c in new_set] != common),
+        'rows_bucket': ([old.get('rows_bucket'), new.get('rows_bucket')]
+                        if old.get('rows_bucket') != new.get('rows_bucket') else None),
+        'null_ratio_changed': {c: [old_nulls.get(c, 0.0), new_nulls.get(c, 0.0)] for c in common
+                               if _null_changed(old_nulls.get(c, 0.0), new_nulls.get(c, 0.0))},
+    }
+    if not any(changes.values()):
+        return None
+    return changes
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+探测参数合成 (Parameter Synthesis)
+
+只按参数名填固定值（symbol 一律 '000001'）时，港股、美股、基金、指数等接口大多因参数不合法而失败，
+白白消耗巡检时间和限流额度。这里从 apis/*.txt 文档中合成参数：
+
+1. 结果库中该接口最近一次成功使用的参数（qa/result_store.py 的 params 列）
+2. 文档「接口示例」中的第一个调用，如 ak.stock_zh_a_hist(symbol="000001", period="daily", ...)
+3. 按「输入参数」表逐个合成：描述中的示例值（symbol='603777'）→ 枚举值（choice of {...}，
+   复用 scripts/generate_skills.py 的 extract_enum）→ 按参数名的通用默认值
+4. 其余示例调用
+
+候选参数按以上顺序去重。探测时跳过无法绑定到函数签名的候选（文档与已安装的 AkShare 版本不一致），
+只用第一组能绑定的参数调用一次；调用抛出的异常不换参数重试：上游限流或拦截时返回 HTML，AkShare 同样抛出
+ValueError（JSONDecodeError）/ KeyError，重试只会向已经在限流的站点发更多请求。
+
+使用方法:
+    synth = ParamSynth(cached=store.success_params())
+    synth.candidates('stock_zh_a_hist', parameters)   # [{'symbol': '000001', 'period': 'daily', ...}, ...]
+"""
+
+import ast
+import inspect
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from scripts.generate_skills import extract_enum, parse_table_row
+except ImportError:
+    import sys
+    sys.path.append(str(Path(__file__).parent.parent / 'scripts'))
+    from generate_skills import extract_enum, parse_table_row
+
+CURRENT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = CURRENT_DIR.parent
+APIS_DIR = PROJECT_ROOT / 'apis'
+
+# 每个接口最多尝试的候选参数组数
+MAX_CANDIDATES = 3
+
+# 不参与合成的参数（由调用方控制）
+SKIPPED_PARAMS = {'timeout'}
+
+# 文档中没有示例值时按参数名使用的通用默认值
+FALLBACK_VALUES = {
+    'symbol': '000001', 'code': '000001', 'ts_code': '000001',
+    'start_date': '20240101', 'begin': '20240101',
+    'end_date': '20240131', 'end': '20240131',
+    'period': 'daily',
+    'adjust': '',
+}
+
+
+def parse_example_calls(text: str, api_name: str) -> List[Dict[str, Any]]:
+    """
+    提取文档中 ak.<api_name>(...) 调用的关键字参数（只接受字面量，不执行代码）
+
+    Returns:
+        每个示例调用一组参数，按出现顺序；无法解析的调用跳过
+    """
+    calls = []
+    for args in re.findall(r'ak\.' + re.escape(api_name) + r'\((.*?)\)\s*$', text, re.M):
+        try:
+            call = ast.parse(f'f({args})', mode='eval').body
+            if call.args:
+                continue
+            params = {kw.arg: ast.literal_eval(kw.value) for kw in call.keywords if kw.arg}
+        except (SyntaxError, ValueError):
+            continue
+        calls.append({k: v for k, v in params.items() if k not in SKIPPED_PARAMS})
+    return calls
+
+
+def _doc_default(name: str, description: str) -> Any:
+    """描述开头的示例值，如 "symbol='603777'; 股票代码..." -> '603777'；没有或为 None 时返回 None"""
+    match = re.match(r'\s*' + re.escape(name) + r"\s*=\s*('[^']*'|\"[^\"]*\"|[^;；,，\s]+)", description)
+    if not match:
+        return None
+    try:
+        return ast.literal_eval(match.group(1))
+    except (SyntaxError, ValueError):
+        return None
+
+
+def parse_input_params(text: str) -> Dict[str, Dict[str, Any]]:
+    """
+    解析「输入参数」表
+
+    Returns:
+        参数名 -> {'default': 描述中的示例值, 'enum': 枚举值}（按表格顺序）
+    """
+    params: Dict[str, Dict[str, Any]] = {}
+    in_section = in_table = False
+    for line in text.split('\n'):
+        line = line.strip()
+        if line == '输入参数':
+            in_section = True
+            continue
+        if not in_section:
+            continue
+        if line.startswith('|') and '名称' in line and '类型' in line:
+            in_table = True
+            continue
+        if in_table and line.startswith('|'):
+            if '---' in line:
+                continue
+            name, _, desc = parse_table_row(line)
+            if name and name not in ('-', '名称'):
+                params[name] = {'default': _doc_default(name, desc or ''), 'enum': extract_enum(desc or '')}
+        elif in_table and line:
+            break
+    return params
+
+
+def binds(func: Callable, params: Dict[str, Any]) -> bool:
+    """参数能否绑定到函数签名（只检查签名，不调用函数）；取不到签名时视为可以"""
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        return True
+    try:
+        signature.bind(**params)
+    except TypeError:
+        return False
+    return True
+
+
+def pick_candidate(func: Callable, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """第一组能绑定到函数签名的候选参数；都不能绑定时返回第一组（调用时按参数错误记录）"""
+    for params in candidates:
+        if binds(func, params):
+            return params
+    return candidates[0] if candidates else {}
+
+
+def _key(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ParamSynth:
+    """按接口合成候选参数（线程安全，文档解析结果按接口缓存）"""
+
+    def __init__(self, apis_dir: Optional[str] = None, cached: Optional[Dict[str, Dict]] = None,
+                 max_candidates: int = MAX_CANDIDATES):
+        """
+        Args:
+            apis_dir: 接口文档目录，默认 apis/
+            cached: 过去成功使用的参数 api_name -> params（ResultStore.success_params()）
+            max_candidates: 每个接口最多返回的候选组数
+        """
+        self.apis_dir = Path(apis_dir or APIS_DIR)
+        self.cached: Dict[str, Dict] = dict(cached or {})
+        self.max_candidates = max_candidates
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def doc(self, api_name: str) -> Dict[str, Any]:
+        """接口文档解析结果 {'examples': [...], 'params': {...}}，文档不存在时为空"""
+        with self._lock:
+            if api_name in self._docs:
+                return self._docs[api_name]
+        path = self.apis_dir / f'{api_name}.txt'
+        text = path.read_text(encoding='utf-8') if path.exists() else ''
+        doc = {'examples': parse_example_calls(text, api_name), 'params': parse_input_params(text)}
+        with self._lock:
+            self._docs[api_name] = doc
+        return doc
+
+    def synthesise(self, api_name: str, parameters: Optional[Dict] = None) -> Dict[str, Any]:
+        """按输入参数表（或 skills.json 的 properties）逐个合成一组参数"""
+        doc_params = self.doc(api_name)['params']
+        props = (parameters or {}).get('properties', {})
+        params = {}
+        for name in list(doc_params) + [p for p in props if p not in doc_params]:
+            if name in SKIPPED_PARAMS:
+                continue
+            info = doc_params.get(name, {})
+            enum = info.get('enum') or props.get(name, {}).get('enum')
+            if info.get('default') is not None:
+                params[name] = info['default']
+            elif enum:
+                params[name] = enum[0]
+            elif name in FALLBACK_VALUES:
+                params[name] = FALLBACK_VALUES[name]
+        return params
+
+    def candidates(self, api_name: str, parameters: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        """候选参数组（缓存的成功参数 → 第一个示例调用 → 逐参数合成 → 其余示例），去重后最多 max_candidates 组"""
+        doc = self.doc(api_name)
+        ordered = []
+        if api_name in self.cached:
+            ordered.append(self.cached[api_name])
+        # 同一接口的多个示例往往只差一个枚举值，先用第一个示例和逐参数合成的一组，其余示例排在后面
+        ordered += doc['examples'][:1]
+        ordered.append(self.synthesise(api_name, parameters))
+        ordered += doc['examples'][1:]
+        seen, result = set(), []
+        for params in ordered:
+            key = _key(params)
+            if key not in seen:
+                seen.add(key)
+                result.append(params)
+        return result[:self.max_candidates]
+
+
+_synth_instance: Optional[ParamSynth] = None
+
+
+def get_param_synth() -> ParamSynth:
+    """默认合成器（不带成功参数缓存，供单独调用 test_single_api 时使用）"""
+    global _synth_instance
+    if _synth_instance is None:
+        _synth_instance = ParamSynth()
+    return _synth_instance
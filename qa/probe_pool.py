@@ -0,0 +1,281 @@
+"""
+探测进程池 (Probe Pool)
+AkShare 调用可能卡在网络读或 C 扩展里，线程无法被中断。这里每个探测在独立的工作进程中执行，
+由主进程监督：
+
+- 硬超时：超过 timeout 秒未返回即 kill 工作进程，结果状态为 timeout（附实际耗时），并补充新进程
+- 进程回收：每个工作进程最多执行 max_tasks_per_worker 个任务，或峰值 RSS 超过 recycle_rss_mb 后重启，
+  避免 AkShare / pandas 的内存累积
+- 内存上限：memory_limit_mb 通过 RLIMIT_AS 限制工作进程地址空间，超出时任务以 MemoryError 失败
+- 工作进程就绪（完成 preload 导入）后才开始计时，冷启动不计入探测耗时
+- MemoryWatch 测量单个探测期间的峰值 RSS（每次探测前重置 VmHWM），用于统计各接口的内存代价
+
+使用方法:
+    with ProbePool(func, size=4, timeout=30) as pool:
+        outcome = pool.run('stock_zh_a_spot_em', {})
+        if outcome.status == 'timeout':
+            ...
+"""
+
+import importlib
+import multiprocessing
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+@dataclass
+class ProbeOutcome:
+    """
+    一次探测的执行结果
+
+    status: ok（函数正常返回）/ error（函数抛出异常）/ memory（超出内存上限）/
+            timeout（超时被终止）/ crashed（工作进程异常退出）
+    """
+    status: str
+    value: Any = None
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    peak_rss_mb: Optional[float] = None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """当前进程峰值 RSS（MB，Linux 上 ru_maxrss 单位为 KB）"""
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _proc_status_mb(field: str) -> Optional[float]:
+    """/proc/self/status 中的内存字段（VmRSS 当前 RSS / VmHWM 峰值 RSS），非 Linux 返回 None"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss() -> bool:
+    """把峰值 RSS 重置为当前 RSS（Linux 的 /proc/self/clear_refs 写入 5），失败返回 False"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class MemoryWatch:
+    """
+    测量一段代码执行期间的峰值 RSS 及相对开始时的增量（MB）
+
+    峰值来自 VmHWM，进入时先重置，因此是这段代码期间的峰值而不是进程生命周期内的峰值；
+    无法重置时退回 ru_maxrss。同一进程内有其他线程同时分配内存时，增量会包含它们的分配，
+    因此只在每个工作进程一次执行一个探测时才准确（probe_pool 即是如此）。
+
+        with MemoryWatch() as mem:
+            df = func()
+        mem.peak_mb, mem.delta_mb
+    """
+
+    def __init__(self):
+        self.baseline_mb: Optional[float] = None
+        self.peak_mb: Optional[float] = None
+        self.delta_mb: Optional[float] = None
+        self._reset = False
+
+    def __enter__(self) -> 'MemoryWatch':
+        self.baseline_mb = _proc_status_mb('VmRSS')
+        self._reset = _reset_peak_rss()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.peak_mb = _proc_status_mb('VmHWM') if self._reset else _peak_rss_mb()
+        if self.peak_mb is not None and self.baseline_mb is not None:
+            self.delta_mb = round(max(0.0, self.peak_mb - self.baseline_mb), 1)
+
+
+def _worker_main(conn, func: Callable, memory_limit_mb: Optional[int], preload: Sequence[str]) -> None:
+    """工作进程主循环：收到参数元组即执行 func，收到 None 或连接关闭即退出"""
+    if memory_limit_mb and resource is not None:
+        limit = int(memory_limit_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
+    conn.send('ready')
+    while True:
+        try:
+            args = conn.recv()
+        except EOFError:
+            break
+        if args is None:
+            break
+        value, error = None, None
+        try:
+            value = func(*args)
+            status = 'ok'
+        except MemoryError:
+            status, error = 'memory', f'MemoryError: 超出内存上限 {memory_limit_mb}MB'
+        except Exception as e:
+            status, error = 'error', f'{type(e).__name__}: {e}'
+        try:
+            conn.send((status, value, error, _peak_rss_mb()))
+        except Exception as e:
+            conn.send(('error', None, f'结果无法序列化: {type(e).__name__}: {e}', _peak_rss_mb()))
+
+
+class _Worker:
+    """一个工作进程及其连接"""
+
+    def __init__(self, ctx, func: Callable, memory_limit_mb: Optional[int], preload: Sequence[str]):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, func, memory_limit_mb, tuple(preload)),
+                                   name='probe-worker', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def wait_ready(self, timeout: float) -> bool:
+        try:
+            return self.conn.poll(timeout) and self.conn.recv() == 'ready'
+        except (EOFError, OSError):
+            return False
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(5)
+        self.conn.close()
+
+    def close(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(2)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class ProbePool:
+    """监督式工作进程池（线程安全：多个线程可同时调用 run）"""
+
+    def __init__(self, func: Callable, size: int = 4, timeout: float = 30.0,
+                 max_tasks_per_worker: int = 50, memory_limit_mb: Optional[int] = None,
+                 recycle_rss_mb: Optional[float] = 1024, preload: Sequence[str] = (),
+                 start_method: str = 'spawn', startup_timeout: float = 120.0):
+        """
+        Args:
+            func: 在工作进程中执行的函数（必须可 pickle，即模块级函数）
+            size: 工作进程数
+            timeout: 单次探测硬超时（秒）
+            max_tasks_per_worker: 工作进程执行多少个任务后重启
+            memory_limit_mb: 工作进程地址空间上限（RLIMIT_AS），None 不限制
+            recycle_rss_mb: 峰值 RSS 超过该值后重启工作进程，None 不检查
+            preload: 工作进程就绪前预先导入的模块（如 akshare）
+            start_method: multiprocessing 启动方式（spawn 不继承父进程的线程和锁）
+            startup_timeout: 等待工作进程就绪的最长时间（秒）
+        """
+        self.func = func
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.memory_limit_mb = memory_limit_mb
+        self.recycle_rss_mb = recycle_rss_mb
+        self.preload = tuple(preload)
+        self.startup_timeout = startup_timeout
+        self._ctx = multiprocessing.get_context(start_method)
+        # 空闲工作进程；None 表示一个空位，取到时再启动新进程
+        self._idle: 'queue.Queue[Optional[_Worker]]' = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(None)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {'started': 0, 'timeouts': 0, 'recycled': 0, 'crashed': 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _start_worker(self) -> Optional[_Worker]:
+        worker = _Worker(self._ctx, self.func, self.memory_limit_mb, self.preload)
+        self._count('started')
+        if worker.wait_ready(self.startup_timeout):
+            return worker
+        worker.kill()
+        self._count('crashed')
+        return None
+
+    def run(self, *args) -> ProbeOutcome:
+        """在空闲工作进程中执行 func(*args)，阻塞直到返回、超时或进程退出"""
+        worker = self._idle.get()
+        try:
+            if worker is None:
+                worker = self._start_worker()
+                if worker is None:
+                    return ProbeOutcome('crashed', error=f'工作进程 {self.startup_timeout}s 内未就绪')
+            outcome, worker = self._run_on(worker, args)
+            return outcome
+        finally:
+            self._idle.put(worker)
+
+    def _run_on(self, worker: _Worker, args: tuple):
+        started = time.monotonic()
+        try:
+            worker.conn.send(args)
+            ready = worker.conn.poll(self.timeout)
+        except (OSError, BrokenPipeError):
+            ready = True   # 工作进程已退出，下面 recv 时按 crashed 处理
+        elapsed = time.monotonic() - started
+
+        if not ready and worker.process.is_alive():
+            worker.kill()
+            self._count('timeouts')
+            return ProbeOutcome('timeout', elapsed=elapsed,
+                                error=f'超过 {self.timeout}s 未返回，工作进程已终止'), None
+        try:
+            status, value, error, peak_rss_mb = worker.conn.recv()
+        except (EOFError, OSError):
+            worker.process.join(2)   # 连接已断开，等待进程退出以取得 exitcode
+            exitcode = worker.process.exitcode
+            worker.kill()
+            self._count('crashed')
+            return ProbeOutcome('crashed', elapsed=elapsed, error=f'工作进程异常退出 (exitcode={exitcode})'), None
+
+        outcome = ProbeOutcome(status, value, elapsed, error, peak_rss_mb)
+        worker.tasks += 1
+        if (status == 'memory' or worker.tasks >= self.max_tasks_per_worker
+                or (self.recycle_rss_mb and peak_rss_mb and peak_rss_mb > self.recycle_rss_mb)):
+            worker.close()
+            self._count('recycled')
+            return outcome, None
+        return outcome, worker
+
+    def close(self) -> None:
+        """关闭所有空闲工作进程"""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.close()
+
+    def __enter__(self) -> 'ProbePool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -2,11 +2,20 @@
 """
 报告生成器
 
-生成 HTML 可视化报告
+生成 HTML 可视化报告，两种模式：
+- 完整模式（默认）：单个 HTML 文件，每个接口一行 <tr>，图表依赖 CDN 上的 Chart.js
+- 轻量模式（--compact）：紧凑的列式 JSON 数据文件 + 静态查看器外壳，表格虚拟滚动，
+  趋势图来自结果库（qa/result_store.py），脚本和样式从 qa/assets/ 复制到报告目录，离线可用
+
+使用方法:
+    python qa/report_generator.py reports/2026-03-07.json
+    python qa/report_generator.py reports/2026-03-07.json --compact --db reports/results.db
 """
 
+import html as html_lib
 import json
 import os
+import shutil
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
@@ -361,6 +370,171 @@ def generate_html_report(report_data: Dict, output_path: str):
         f.write(html)
 
 
+COMPACT_TEMPLATE = '''<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>AkShare API 测试报告 - {date}</title>
+    <link rel="stylesheet" href="assets/viewer.css">
+</head>
+<body data-report="{data_file}">
+    <div class="container">
+        <div class="header">
+            <h1>📊 AkShare API 测试报告</h1>
+            <div class="meta" id="meta">加载中...</div>
+        </div>
+        <div class="load-error" id="loadError" style="display: none">
+            <span id="loadErrorText"></span>
+            <input type="file" id="dataFile" accept=".json">
+        </div>
+        <div id="report" style="display: none">
+            <div class="stats">
+                <div class="stat-card total"><div class="value" id="stat-total">-</div><div class="label">总接口数</div></div>
+                <div class="stat-card success"><div class="value" id="stat-success">-</div><div class="label">成功 (<span id="stat-success-rate">-</span>%)</div></div>
+                <div class="stat-card failed"><div class="value" id="stat-failed">-</div><div class="label">失败</div></div>
+                <div class="stat-card timeout"><div class="value" id="stat-timeout">-</div><div class="label">超时</div></div>
+            </div>
+            <div class="charts">
+                <div class="chart-card"><h3>分类统计</h3><canvas id="categoryChart"></canvas></div>
+                <div class="chart-card"><h3>状态分布</h3><canvas id="statusChart"></canvas></div>
+            </div>
+            <div class="charts" id="trendCharts">
+                <div class="chart-card"><h3>成功率趋势</h3><canvas id="rateChart"></canvas></div>
+                <div class="chart-card"><h3>响应时间趋势</h3><canvas id="latencyChart"></canvas></div>
+            </div>
+            <div class="changes">
+                <h3>🔄 变更情况</h3>
+                <div id="changes"></div>
+            </div>
+            <div class="details">
+                <h3>📋 接口详情</h3>
+                <div class="filters">
+                    <select id="categoryFilter"><option value="">所有分类</option></select>
+                    <select id="statusFilter">
+                        <option value="">所有状态</option>
+                        <option value="success">成功</option>
+                        <option value="failed">失败</option>
+                        <option value="timeout">超时</option>
+                        <option value="error">错误</option>
+                    </select>
+                    <input type="text" id="searchInput" placeholder="搜索接口名称...">
+                    <span class="count" id="rowCount"></span>
+                </div>
+                <div class="grid-head">
+                    <div>接口名称</div><div>分类</div><div>状态</div><div>上游</div><div>响应时间</div><div>返回字段</div><div>错误信息</div>
+                </div>
+                <div class="grid-body" id="gridBody"><div class="grid-spacer" id="gridSpacer"></div></div>
+            </div>
+        </div>
+    </div>
+    <script src="assets/charts.js"></script>
+    <script src="assets/viewer.js"></script>
+</body>
+</html>
+'''
+
+ASSETS_DIR = Path(__file__).parent.absolute() / 'assets'
+ASSET_FILES = ('viewer.css', 'viewer.js', 'charts.js')
+
+# 紧凑数据中每个接口一行，按以下列顺序
+COMPACT_COLUMNS = ['api_name', 'category', 'status', 'upstream', 'response_time_ms', 'fields', 'error']
+
+# 错误信息截断长度
+ERROR_MAX_CHARS = 200
+
+
+def compact_report_data(report_data: Dict, trend: Optional[list] = None) -> Dict[str, Any]:
+    """
+    把日报 JSON 转成查看器使用的紧凑数据：接口按列式数组存放，丢弃样本数据，只保留字段数
+
+    Args:
+        report_data: 日报 JSON（或 ResultStore.to_report 的结果）
+        trend: ResultStore.trend() 的结果，用于趋势图
+
+    Returns:
+        {'version', 'test_date', ..., 'summary', 'changes', 'columns', 'rows', 'trend'}
+    """
+    summary = report_data.get('summary', {})
+    changes = report_data.get('changes') or {}
+    rows = []
+    for api_name, info in sorted(report_data.get('apis', {}).items()):
+        error = info.get('error') or ''
+        rows.append([
+            api_name,
+            info.get('category') or 'other',
+            info.get('status') or 'error',
+            info.get('upstream'),
+            info.get('response_time_ms'),
+            len(info.get('sample_keys') or []),
+            error[:ERROR_MAX_CHARS] or None,
+        ])
+    return {
+        'version': 1,
+        'test_date': report_data.get('test_date'),
+        'test_time': report_data.get('test_time'),
+        'duration_seconds': report_data.get('duration_seconds'),
+        'run_id': report_data.get('run_id'),
+        'summary': {k: summary.get(k, 0) for k in ('total', 'success', 'failed', 'timeout', 'error')}
+                   | {'by_category': summary.get('by_category', {})},
+        'changes': {
+            'new_apis': changes.get('new_apis', []),
+            'removed_apis': changes.get('removed_apis', []),
+            'status_changed': changes.get('status_changed', []),
+            'structure_changed': [{'api': c['api'], 'added_fields': c.get('added_fields', []),
+                                   'removed_fields': c.get('removed_fields', [])}
+                                  for c in changes.get('structure_changed', [])],
+        },
+        'columns': COMPACT_COLUMNS,
+        'rows': rows,
+        'trend': trend or [],
+    }
+
+
+def _copy_assets(output_dir: str) -> None:
+    """把查看器脚本和样式复制到报告目录的 assets/（内容相同时跳过）"""
+    target = os.path.join(output_dir, 'assets')
+    os.makedirs(target, exist_ok=True)
+    for name in ASSET_FILES:
+        src, dst = ASSETS_DIR / name, os.path.join(target, name)
+        if os.path.exists(dst) and Path(dst).read_bytes() == src.read_bytes():
+            continue
+        shutil.copyfile(src, dst)
+
+
+def generate_compact_report(report_data: Dict, output_path: str, store=None, trend_runs: int = 30) -> str:
+    """
+    生成轻量报告：<name>.html（查看器外壳）+ <name>.data.json（紧凑数据）+ assets/
+
+    Args:
+        report_data: 日报 JSON
+        output_path: HTML 输出路径，数据文件写在同目录
+        store: ResultStore，提供时从中读取最近 trend_runs 轮的趋势
+        trend_runs: 趋势图的轮次数
+
+    Returns:
+        数据文件路径
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(output_path))[0]
+    data_path = os.path.join(output_dir, f'{stem}.data.json')
+
+    trend = store.trend(trend_runs) if store is not None else None
+    data = compact_report_data(report_data, trend)
+    with open(data_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'), default=str)
+
+    page = COMPACT_TEMPLATE.format(
+        date=html_lib.escape(str(report_data.get('test_date', '-'))),
+        data_file=html_lib.escape(os.path.basename(data_path)),
+    )
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    _copy_assets(output_dir)
+    return data_path
+
+
 def generate_changes_html(changes: Dict) -> str:
     """生成变更部分的 HTML"""
     lines = []
@@ -412,6 +586,10 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='生成 HTML 报告')
     parser.add_argument('report', help='JSON 报告路径')
     parser.add_argument('--output', '-o', help='输出路径 (默认: 同目录同名 .html)')
+    parser.add_argument('--compact', action='store_true',
+                        help='轻量模式：紧凑 JSON 数据 + 虚拟滚动查看器，离线可用')
+    parser.add_argument('--db', help='结果库路径（轻量模式下用于趋势图，默认 reports/results.db，不存在时不画趋势）')
+    parser.add_argument('--trend-runs', type=int, default=30, help='趋势图的轮次数')
     
     args = parser.parse_args()
     
@@ -423,5 +601,19 @@ if __name__ == '__main__':
     else:
         output_path = args.report.replace('.json', '.html')
     
-    generate_html_report(report_data, output_path)
+    if args.compact:
+        try:
+            from qa.result_store import DEFAULT_DB, ResultStore
+        except ImportError:
+            from result_store import DEFAULT_DB, ResultStore
+        db_path = args.db or str(DEFAULT_DB)
+        store = ResultStore(db_path) if os.path.exists(db_path) else None
+        try:
+            data_path = generate_compact_report(report_data, output_path, store, args.trend_runs)
+        finally:
+            if store is not None:
+                store.close()
+        print(f"数据文件已生成: {data_path}")
+    else:
+        generate_html_report(report_data, output_path)
     print(f"HTML 报告已生成: {output_path}")
\ No newline at end of file
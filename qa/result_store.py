@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+巡检结果存储 (Result Store)
+
+替代每批重写整个 reports/test_state.json：探测结果逐条追加到 SQLite（WAL 模式，每条单独提交，
+进程崩溃最多丢失正在进行的一条），以 (run_id, api_name) 为主键。
+
+- runs: 一轮巡检（可能跨多次分批执行），记录开始/结束时间和 API 总数；kind 区分全量巡检（sweep）和
+  调度器按优先级挑选的部分探测（scheduled，qa/scheduler.py），续跑、趋势和结构对比只看全量巡检
+- results: 每个 API 的结果，(api_name, tested_at) 建索引，"接口 X 近 90 天的延迟"为索引查询
+- run_summary: 每轮按状态的计数，追加结果时增量更新，无需重新扫描
+- results.samples: 多次采样的延迟（毫秒，JSON 数组），供 qa/comparator.py 做分布统计和回归检测
+- results.schema / schema_digest: 结构指纹（qa/fingerprint.py），对比结构时只读这两列，不解析样本
+- results.params: 探测使用的参数，success_params() 取每个 API 最近一次成功的参数供下一轮复用
+- results.rows / frame_mb / peak_rss_mb / rss_delta_mb: 返回行数、数据大小和探测期间的内存峰值 / 增量，
+  memory_costs() 按接口汇总内存代价，找出不适合在线上工作进程中调用的接口
+- trend(): 最近若干轮的成功率和延迟中位数，供轻量报告（qa/report_generator.py --compact）画趋势图
+
+使用方法:
+    store = ResultStore()
+    run_id = store.start_run(total=368)
+    store.append(run_id, asdict(result))
+    store.summary(run_id)                       # {'total': 368, 'tested': 1, 'success': 1, ...}
+    store.history('stock_zh_a_spot_em', days=90)
+
+    python qa/result_store.py history stock_zh_a_spot_em --days 90
+    python qa/result_store.py import reports/test_state.json     # 迁移旧状态文件
+    python qa/result_store.py memory --days 30 --limit 20         # 内存代价最高的接口
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+CURRENT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = CURRENT_DIR.parent
+DEFAULT_DB = PROJECT_ROOT / 'reports' / 'results.db'
+
+STATUSES = ('success', 'failed', 'timeout', 'error')
+
+# 单次探测 RSS 增量超过该值（MB）的接口在内存报告中标记为危险
+DANGEROUS_RSS_MB = 512
+
+# 轮次类型：全量巡检 / 调度器挑选的部分探测
+RUN_SWEEP = 'sweep'
+RUN_SCHEDULED = 'scheduled'
+
+# 后续版本新增的列，打开旧库时补齐
+ADDED_RUN_COLUMNS = {'kind': f"TEXT NOT NULL DEFAULT '{RUN_SWEEP}'"}
+ADDED_COLUMNS = {'samples': 'TEXT', 'schema_digest': 'TEXT', 'schema': 'TEXT', 'params': 'TEXT',
+                 'rows': 'INTEGER', 'frame_mb': 'REAL', 'peak_rss_mb': 'REAL', 'rss_delta_mb': 'REAL'}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    total INTEGER NOT NULL DEFAULT 0,
+    kind TEXT NOT NULL DEFAULT 'sweep'
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    api_name TEXT NOT NULL,
+    tested_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    category TEXT,
+    upstream TEXT,
+    response_time_ms INTEGER,
+    error_type TEXT,
+    samples TEXT,
+    schema_digest TEXT,
+    schema TEXT,
+    params TEXT,
+    rows INTEGER,
+    frame_mb REAL,
+    peak_rss_mb REAL,
+    rss_delta_mb REAL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (run_id, api_name)
+);
+CREATE INDEX IF NOT EXISTS idx_results_api_time ON results (api_name, tested_at);
+CREATE INDEX IF NOT EXISTS idx_results_time ON results (tested_at);
+CREATE TABLE IF NOT EXISTS run_summary (
+    run_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    n INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, status)
+);
+'''
+
+
+class ResultStore:
+    """追加写入的巡检结果库（线程安全）"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = str(path or DEFAULT_DB)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info('results')")}
+        for name, kind in ADDED_COLUMNS.items():
+            if columns and name not in columns:
+                self._conn.execute(f'ALTER TABLE results ADD COLUMN {name} {kind}')
+        run_columns = {row['name'] for row in self._conn.execute("PRAGMA table_info('runs')")}
+        for name, kind in ADDED_RUN_COLUMNS.items():
+            if run_columns and name not in run_columns:
+                self._conn.execute(f'ALTER TABLE runs ADD COLUMN {name} {kind}')
+                if name == 'kind':
+                    # 加列之前调度轮次只能从 run_id 前缀识别
+                    self._conn.execute("UPDATE runs SET kind = ? WHERE run_id LIKE 'sched-%'", (RUN_SCHEDULED,))
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ---- 轮次 ----
+
+    def start_run(self, total: int = 0, run_id: Optional[str] = None, kind: str = RUN_SWEEP) -> str:
+        """开始新一轮巡检，返回 run_id（默认取当前时间）"""
+        run_id = run_id or datetime.now().strftime('%Y%m%d-%H%M%S')
+        with self._lock:
+            self._conn.execute('INSERT OR IGNORE INTO runs (run_id, started_at, total, kind) VALUES (?, ?, ?, ?)',
+                               (run_id, datetime.now().isoformat(timespec='seconds'), total, kind))
+        return run_id
+
+    def finish_run(self, run_id: str) -> None:
+        with self._lock:
+            self._conn.execute('UPDATE runs SET finished_at = ? WHERE run_id = ?',
+                               (datetime.now().isoformat(timespec='seconds'), run_id))
+
+    def open_run(self) -> Optional[str]:
+        """最近一轮尚未结束的全量巡检（分批执行时续跑；中断的调度轮次不续跑）"""
+        row = self._conn.execute('SELECT run_id FROM runs WHERE finished_at IS NULL AND kind = ? '
+                                 'ORDER BY started_at DESC, run_id DESC LIMIT 1', (RUN_SWEEP,)).fetchone()
+        return row['run_id'] if row else None
+
+    def runs(self, limit: int = 30, kind: Optional[str] = RUN_SWEEP) -> List[Dict[str, Any]]:
+        """最近的巡检轮次（新到旧），默认只含全量巡检；kind=None 返回所有类型"""
+        if kind is None:
+            rows = self._conn.execute('SELECT * FROM runs ORDER BY started_at DESC, run_id DESC LIMIT ?', (limit,))
+        else:
+            rows = self._conn.execute('SELECT * FROM runs WHERE kind = ? ORDER BY started_at DESC, run_id DESC '
+                                      'LIMIT ?', (kind, limit))
+        return [dict(r) for r in rows]
+
+    # ---- 写入 ----
+
+    def append(self, run_id: str, result: Dict[str, Any], tested_at: Optional[str] = None) -> None:
+        """
+        写入一个 API 的结果（同一轮重复测试时覆盖旧结果），并增量更新该轮的状态计数
+
+        Args:
+            result: TestResult 的 asdict
+            tested_at: 测试时间（ISO 格式），默认当前时间
+        """
+        tested_at = tested_at or datetime.now().isoformat(timespec='seconds')
+        payload = json.dumps(result, ensure_ascii=False, default=str)
+        status = result.get('status') or 'error'
+        samples = result.get('latency_samples_ms')
+        if not samples and status == 'success' and result.get('response_time_ms') is not None:
+            samples = [result['response_time_ms']]
+        schema = result.get('schema')
+        params = result.get('params')
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                old = conn.execute('SELECT status FROM results WHERE run_id = ? AND api_name = ?',
+                                   (run_id, result['api_name'])).fetchone()
+                if old:
+                    conn.execute('UPDATE run_summary SET n = n - 1 WHERE run_id = ? AND status = ?',
+                                 (run_id, old['status']))
+                conn.execute(
+                    'INSERT OR REPLACE INTO results (run_id, api_name, tested_at, status, category, upstream, '
+                    'response_time_ms, error_type, samples, schema_digest, schema, params, '
+                    'rows, frame_mb, peak_rss_mb, rss_delta_mb, payload) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (run_id, result['api_name'], tested_at, status, result.get('category'),
+                     result.get('upstream'), result.get('response_time_ms'), result.get('error_type'),
+                     json.dumps(samples) if samples else None,
+                     schema.get('digest') if schema else None,
+                     json.dumps(schema, ensure_ascii=False) if schema else None,
+                     json.dumps(params, ensure_ascii=False, default=str) if params is not None else None,
+                     result.get('rows'), result.get('frame_mb'), result.get('peak_rss_mb'),
+                     result.get('rss_delta_mb'), payload))
+                conn.execute('INSERT INTO run_summary (run_id, status, n) VALUES (?, ?, 1) '
+                             'ON CONFLICT (run_id, status) DO UPDATE SET n = n + 1', (run_id, status))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    # ---- 查询 ----
+
+    def summary(self, run_id: str) -> Dict[str, int]:
+        """该轮汇总（来自增量计数表）"""
+        run = self._conn.execute('SELECT total FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        counts = {s: 0 for s in STATUSES}
+        for row in self._conn.execute('SELECT status, n FROM run_summary WHERE run_id = ?', (run_id,)):
+            counts[row['status']] = row['n']
+        return {'total': run['total'] if run else 0, 'tested': sum(counts.values()), **counts}
+
+    def breakdown(self, run_id: str, field: str) -> Dict[str, Dict[str, int]]:
+        """按 category 或 upstream 分组的状态计数"""
+        if field not in ('category', 'upstream'):
+            raise ValueError(f"不支持的分组字段: {field}")
+        groups: Dict[str, Dict[str, int]] = {}
+        rows = self._conn.execute(f'SELECT {field} AS k, status, COUNT(*) AS n FROM results '
+                                  f'WHERE run_id = ? GROUP BY {field}, status', (run_id,))
+        for row in rows:
+            group = groups.setdefault(row['k'] or 'other', {'total': 0, **{s: 0 for s in STATUSES}})
+            group['total'] += row['n']
+            group[row['status']] = group.get(row['status'], 0) + row['n']
+        return groups
+
+    def results(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        """该轮全部结果 api_name -> TestResult 字典"""
+        rows = self._conn.execute('SELECT api_name, payload FROM results WHERE run_id = ? ORDER BY rowid',
+                                  (run_id,))
+        return {r['api_name']: json.loads(r['payload']) for r in rows}
+
+    def history(self, api_name: str, days: int = 90, with_payload: bool = False) -> List[Dict[str, Any]]:
+        """某个 API 近 days 天的结果（旧到新，走 (api_name, tested_at) 索引）"""
+        since = (datetime.now() - timedelta(days=days)).isoformat(timespec='seconds')
+        columns = 'run_id, tested_at, status, response_time_ms, error_type' + (', payload' if with_payload else '')
+        rows = self._conn.execute(f'SELECT {columns} FROM results WHERE api_name = ? AND tested_at >= ? '
+                                  f'ORDER BY tested_at', (api_name, since))
+        history = []
+        for row in rows:
+            item = dict(row)
+            if with_payload:
+                item['payload'] = json.loads(item['payload'])
+            history.append(item)
+        return history
+
+    def outcomes(self, days: int = 30) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        近 days 天所有 API 的探测结果（走 tested_at 索引，不解析 payload），供 qa/scheduler.py 排优先级
+
+        Returns:
+            api_name -> [{'tested_at', 'status', 'response_time_ms'}]（旧到新）
+        """
+        since = (datetime.now() - timedelta(days=days)).isoformat(timespec='seconds')
+        rows = self._conn.execute('SELECT api_name, tested_at, status, response_time_ms FROM results '
+                                  'WHERE tested_at >= ? ORDER BY tested_at', (since,))
+        outcomes: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            outcomes.setdefault(row['api_name'], []).append(
+                {'tested_at': row['tested_at'], 'status': row['status'], 'response_time_ms': row['response_time_ms']})
+        return outcomes
+
+    def latency_history(self, days: int = 14) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        近 days 天所有成功探测的延迟采样（走 tested_at 索引，不解析 payload）
+
+        Returns:
+            api_name -> [{'run_id', 'tested_at', 'samples', 'kind'}]（旧到新；kind 为所在轮次的类型）
+        """
+        since = (datetime.now() - timedelta(days=days)).isoformat(timespec='seconds')
+        rows = self._conn.execute("SELECT r.api_name, r.run_id, r.tested_at, r.samples, runs.kind FROM results r "
+                                  "LEFT JOIN runs ON runs.run_id = r.run_id "
+                                  "WHERE r.tested_at >= ? AND r.status = 'success' AND r.samples IS NOT NULL "
+                                  "ORDER BY r.tested_at", (since,))
+        history: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            history.setdefault(row['api_name'], []).append(
+                {'run_id': row['run_id'], 'tested_at': row['tested_at'], 'samples': json.loads(row['samples']),
+                 'kind': row['kind'] or RUN_SWEEP})
+        return history
+
+    def trend(self, limit: int = 30) -> List[Dict[str, Any]]:
+        """
+        最近 limit 轮全量巡检的汇总趋势（旧到新），供报告趋势图使用
+
+        调度轮次只探测挑选出的少数接口（偏向易失败的接口），成功率与全量巡检不可比，不计入
+
+        Returns:
+            [{'run_id', 'started_at', 'total', 'tested', 'success', 'failed', 'timeout', 'error',
+              'p50_ms'}]，p50_ms 为该轮成功探测响应时间的中位数
+        """
+        runs = list(reversed(self.runs(limit)))
+        if not runs:
+            return []
+        ids = [r['run_id'] for r in runs]
+        marks = ','.join('?' * len(ids))
+        latencies: Dict[str, List[int]] = {}
+        rows = self._conn.execute(f"SELECT run_id, response_time_ms FROM results WHERE run_id IN ({marks}) "
+                                  f"AND status = 'success' AND response_time_ms IS NOT NULL", ids)
+        for row in rows:
+            latencies.setdefault(row['run_id'], []).append(row['response_time_ms'])
+        trend = []
+        for run in runs:
+            values = sorted(latencies.get(run['run_id'], []))
+            p50 = values[len(values) // 2] if values else None
+            trend.append({'run_id': run['run_id'], 'started_at': run['started_at'],
+                          **self.summary(run['run_id']), 'p50_ms': p50})
+        return trend
+
+    def success_params(self) -> Dict[str, Dict[str, Any]]:
+        """每个 API 最近一次成功探测使用的参数 api_name -> params（供 qa/param_synth.py 优先复用）"""
+        rows = self._conn.execute("SELECT api_name, params FROM results WHERE status = 'success' "
+                                  "AND params IS NOT NULL ORDER BY tested_at")
+        return {r['api_name']: json.loads(r['params']) for r in rows}
+
+    def memory_costs(self, days: int = 30, run_id: Optional[str] = None,
+                     limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        各 API 探测的内存代价（按 RSS 增量从大到小）
+
+        Args:
+            days: 统计近 days 天，每个 API 取最坏的一次
+            run_id: 只统计该轮（提供时忽略 days）
+
+        Returns:
+            [{'api_name', 'rss_delta_mb', 'peak_rss_mb', 'frame_mb', 'rows', 'probes', 'oom'}]，
+            oom 为超出工作进程内存上限（MemoryError）的次数，这类接口排在最前
+        """
+        if run_id:
+            where, args = 'run_id = ?', [run_id]
+        else:
+            where, args = 'tested_at >= ?', [(datetime.now() - timedelta(days=days)).isoformat(timespec='seconds')]
+        sql = (f'SELECT api_name, MAX(rss_delta_mb) AS rss_delta_mb, MAX(peak_rss_mb) AS peak_rss_mb, '
+               f"MAX(frame_mb) AS frame_mb, MAX(rows) AS rows, COUNT(*) AS probes, "
+               f"SUM(CASE WHEN error_type = 'MemoryError' THEN 1 ELSE 0 END) AS oom FROM results "
+               f"WHERE {where} AND (rss_delta_mb IS NOT NULL OR error_type = 'MemoryError') "
+               f"GROUP BY api_name ORDER BY oom DESC, rss_delta_mb DESC")
+        if limit:
+            sql += ' LIMIT ?'
+            args.append(limit)
+        return [dict(r) for r in self._conn.execute(sql, args)]
+
+    def schemas(self, run_id: str) -> Dict[str, Tuple[str, str]]:
+        """该轮成功探测的结构指纹 api_name -> (digest, 指纹 JSON)，JSON 由调用方按需解析"""
+        rows = self._conn.execute("SELECT api_name, schema_digest, schema FROM results "
+                                  "WHERE run_id = ? AND status = 'success' AND schema_digest IS NOT NULL",
+                                  (run_id,))
+        return {r['api_name']: (r['schema_digest'], r['schema']) for r in rows}
+
+    def previous_run(self, run_id: str) -> Optional[str]:
+        """run_id 之前最近的一轮全量巡检"""
+        row = self._conn.execute('SELECT run_id FROM runs WHERE kind = ? AND (started_at, run_id) < '
+                                 '(SELECT started_at, run_id FROM runs WHERE run_id = ?) '
+                                 'ORDER BY started_at DESC, run_id DESC LIMIT 1', (RUN_SWEEP, run_id)).fetchone()
+        return row['run_id'] if row else None
+
+    def to_report(self, run_id: str) -> Dict[str, Any]:
+        """导出与日报 JSON（reports/YYYY-MM-DD.json）相同结构的报告"""
+        now = datetime.now()
+        return {
+            'test_date': now.strftime('%Y-%m-%d'),
+            'test_time': now.strftime('%H:%M:%S'),
+            'run_id': run_id,
+            'summary': {
+                **self.summary(run_id),
+                'by_category': self.breakdown(run_id, 'category'),
+                'by_upstream': self.breakdown(run_id, 'upstream'),
+            },
+            'apis': self.results(run_id),
+        }
+
+    # ---- 迁移 ----
+
+    def import_state(self, state: Dict[str, Any], run_id: Optional[str] = None) -> Optional[str]:
+        """把旧版 test_state.json 中的 results 导入为一轮巡检，返回 run_id（无结果时返回 None）"""
+        results = state.get('results') or {}
+        if not results:
+            return None
+        run_id = self.start_run(state.get('total_apis') or len(results), run_id or 'imported-state')
+        for result in results.values():
+            self.append(run_id, result)
+        return run_id
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='巡检结果库查询')
+    parser.add_argument('--db', default=str(DEFAULT_DB), help='SQLite 文件路径')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_history = sub.add_parser('history', help='某个 API 的历史结果')
+    p_history.add_argument('api_name')
+    p_history.add_argument('--days', type=int, default=90)
+    p_runs = sub.add_parser('runs', help='最近的巡检轮次')
+    p_runs.add_argument('--limit', type=int, default=10)
+    p_runs.add_argument('--all', action='store_true', help='同时列出调度轮次')
+    p_import = sub.add_parser('import', help='导入旧版 test_state.json')
+    p_import.add_argument('state_path')
+    p_memory = sub.add_parser('memory', help='各 API 探测的内存代价')
+    p_memory.add_argument('--days', type=int, default=30)
+    p_memory.add_argument('--run-id', default=None)
+    p_memory.add_argument('--limit', type=int, default=30)
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    if args.command == 'history':
+        for item in store.history(args.api_name, args.days):
+            print(f"{item['tested_at']}  {item['status']:<8} {item['response_time_ms'] or '-':>7}ms  {item['run_id']}")
+    elif args.command == 'runs':
+        for run in store.runs(args.limit, kind=None if args.all else RUN_SWEEP):
+            summary = store.summary(run['run_id'])
+            print(f"{run['run_id']}  {run['started_at']} → {run['finished_at'] or '进行中'}  "
+                  f"{summary['tested']}/{summary['total']} 成功 {summary['success']}"
+                  f"{'  (调度)' if run['kind'] == RUN_SCHEDULED else ''}")
+    elif args.command == 'import':
+        with open(args.state_path, 'r', encoding='utf-8') as f:
+            print(store.import_state(json.load(f)))
+    elif args.command == 'memory':
+        print(f"{'接口':<45} {'RSS 增量':>9} {'峰值 RSS':>9} {'数据大小':>9} {'行数':>9}")
+        for item in store.memory_costs(args.days, args.run_id, args.limit):
+            delta = item['rss_delta_mb'] or 0
+            flag = f" ⚠️ 超出内存上限 {item['oom']} 次" if item['oom'] else (' ⚠️' if delta >= DANGEROUS_RSS_MB else '')
+            print(f"{item['api_name']:<45} {delta:>7.1f}MB {item['peak_rss_mb'] or 0:>7.1f}MB "
+                  f"{item['frame_mb'] or 0:>7.1f}MB {item['rows'] or 0:>9}{flag}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+探测结果摘要 (Result Sampling)
+
+探测只需要知道接口是否可用、返回了什么结构，不需要保留整个返回值。部分接口（全市场行情、长周期历史行情）
+一次返回几十万行，这里在拿到返回值后立即生成有界的摘要，调用方随即丢弃原数据：
+
+- rows: 行数
+- sample_keys / sample_dtypes: 列名和类型
+- sample_data: 蓄水池抽样的若干行（均匀随机，固定种子，数量有上限，与总行数无关）
+- column_stats: 每列空值数；数值列 min / max / mean，其他列唯一值数
+- frame_mb: 返回值在内存中的大小（DataFrame.memory_usage(deep=True)）
+
+使用方法:
+    summary = summarise(df)
+    del df
+"""
+
+import math
+import random
+from typing import Any, Dict, Iterable, List, Optional
+
+# 每个 API 保留的样本行数
+SAMPLE_ROWS = 3
+
+# 抽样种子固定，同一返回值每次抽到相同的行，便于对比
+SAMPLE_SEED = 0
+
+
+def reservoir_sample(items: Iterable[Any], k: int = SAMPLE_ROWS, seed: int = SAMPLE_SEED) -> List[Any]:
+    """蓄水池抽样（Algorithm R）：单次遍历、只保留 k 个元素，返回按原顺序排列的样本"""
+    rng = random.Random(seed)
+    reservoir: List[Any] = []
+    for i, item in enumerate(items):
+        if i < k:
+            reservoir.append((i, item))
+        else:
+            j = rng.randint(0, i)
+            if j < k:
+                reservoir[j] = (i, item)
+    return [item for _, item in sorted(reservoir, key=lambda pair: pair[0])]
+
+
+def _plain(value: Any) -> Any:
+    """转成可 JSON 序列化的基本类型（numpy 标量取 item，NaN 转 None，其余转字符串）"""
+    if hasattr(value, 'item'):
+        try:
+            value = value.item()
+        except (ValueError, TypeError):
+            pass
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def column_keys(columns: Iterable[Any]) -> List[str]:
+    """列名转成摘要中的键；重复的列名记为 "名称#位置"，避免互相覆盖"""
+    keys: List[str] = []
+    for i, name in enumerate(columns):
+        key = str(name)
+        keys.append(key if key not in keys else f'{key}#{i}')
+    return keys
+
+
+def column_stats(df) -> Dict[str, Dict[str, Any]]:
+    """DataFrame 每列的统计，键见 column_keys"""
+    stats = {}
+    for i, key in enumerate(column_keys(df.columns)):
+        # 按位置取列：列名重复时 df[name] 返回的是 DataFrame
+        column = df.iloc[:, i]
+        entry: Dict[str, Any] = {'nulls': int(column.isna().sum())}
+        if column.dtype.kind in 'iufb' and len(column) > entry['nulls']:
+            entry.update(min=_plain(column.min()), max=_plain(column.max()), mean=_plain(round(float(column.mean()), 4)))
+        else:
+            try:
+                entry['unique'] = int(column.nunique())
+            except TypeError:          # 列中含 list / dict 等不可哈希的值
+                entry['unique'] = None
+        stats[key] = entry
+    return stats
+
+
+def _record(row: Dict[Any, Any]) -> Dict[str, Any]:
+    return {str(k): _plain(v) for k, v in row.items()}
+
+
+def summarise(data: Any, sample_rows: int = SAMPLE_ROWS, seed: int = SAMPLE_SEED) -> Dict[str, Any]:
+    """
+    生成返回值的有界摘要
+
+    Returns:
+        {'rows', 'sample_keys', 'sample_dtypes', 'sample_data', 'column_stats', 'frame_mb'}
+    """
+    summary: Dict[str, Any] = {'rows': 0, 'sample_keys': [], 'sample_dtypes': {}, 'sample_data': [],
+                               'column_stats': {}, 'frame_mb': None}
+    if data is None:
+        return summary
+    if hasattr(data, 'columns') and hasattr(data, 'iloc'):
+        rows = len(data)
+        picked = reservoir_sample(range(rows), sample_rows, seed)
+        summary.update(
+            rows=rows,
+            sample_keys=[str(c) for c in data.columns],
+            sample_dtypes={str(c): str(t) for c, t in data.dtypes.items()},
+            sample_data=[_record(dict(zip(column_keys(data.columns), row)))
+                         for row in data.iloc[picked].itertuples(index=False, name=None)],
+            column_stats=column_stats(data),
+            frame_mb=round(float(data.memory_usage(deep=True).sum()) / 1024 / 1024, 3),
+        )
+    elif isinstance(data, dict):
+        summary.update(rows=1 if data else 0, sample_keys=[str(k) for k in data],
+                       sample_dtypes={str(k): type(v).__name__ for k, v in data.items()},
+                       sample_data=[_record(data)] if data else [])
+    elif isinstance(data, list):
+        first: Optional[Dict] = data[0] if data and isinstance(data[0], dict) else None
+        summary.update(rows=len(data), sample_keys=[str(k) for k in first] if first else [],
+                       sample_data=[_record(r) if isinstance(r, dict) else _plain(r)
+                                    for r in reservoir_sample(data, sample_rows, seed)])
+    return summary
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+探测调度器 (Probe Scheduler)
+
+固定 50 个一批轮转时，稳定接口和频繁出错的接口被同样频繁地探测。这里按结果库（qa/result_store.py）
+近 30 天的历史给每个 API 计算探测间隔：
+
+    risk     = 失败率 × W_FAIL + 延迟变异系数 × W_VAR + 距上次成功的时长 × W_STALE（各项封顶为 1）
+    interval = BASE_INTERVAL_H / (1 + risk)，被 skills 使用的接口再除以 IMPORTANCE_FACTOR，
+               限制在 [MIN_INTERVAL_H, MAX_INTERVAL_H]
+    due      = 距上次探测的时长 / interval（从未探测过的接口视为无穷大）
+
+每轮只探测 due >= 1 的接口，按 due 从大到小排列，直到用完本轮的请求预算和时间预算
+（时间按各接口的历史延迟中位数估算，未知时按 DEFAULT_COST_S 计）。执行时再用 ProbeBudget
+按实际耗时和实际发出的调用次数（TestResult.requests）核对，用完后不再开始新的探测。
+
+使用方法:
+    python qa/scheduler.py --budget-requests 100 --budget-seconds 600     # 只打印计划
+    python qa/test_apis.py --schedule --budget-requests 100 --budget-seconds 600
+"""
+
+import math
+import re
+import statistics
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+CURRENT_DIR = Path(__file__).parent.absolute()
+PROJECT_ROOT = CURRENT_DIR.parent
+SERVICE_DIR = PROJECT_ROOT / 'akshare_service'
+
+HISTORY_DAYS = 30
+
+BASE_INTERVAL_H = 24.0
+MIN_INTERVAL_H = 1.0
+MAX_INTERVAL_H = 72.0
+
+W_FAIL = 4.0
+W_VAR = 1.0
+W_STALE = 2.0
+# 距上次成功超过该时长即按满分计
+STALE_CAP_H = 72.0
+IMPORTANCE_FACTOR = 3.0
+
+# 没有历史延迟时每个探测的估计耗时（秒）
+DEFAULT_COST_S = 5.0
+
+
+@dataclass
+class ScheduledApi:
+    """一个 API 的调度信息"""
+    name: str
+    interval_h: float
+    due: float
+    failure_rate: float
+    latency_cv: float
+    hours_since_success: Optional[float]
+    important: bool
+    est_cost_s: float
+
+
+class ProbeBudget:
+    """
+    本轮执行预算：时间和实际发出的上游调用次数（线程安全）
+
+    探测开始前检查 exhausted()，完成后 charge(result.requests)；并发时正在进行的探测仍会完成，
+    实际用量最多超出并发数个探测
+    """
+
+    def __init__(self, max_requests: Optional[int] = None, max_seconds: Optional[float] = None):
+        self.max_requests = max_requests
+        self.deadline = time.monotonic() + max_seconds if max_seconds else None
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def charge(self, requests: Optional[int]) -> None:
+        with self._lock:
+            self.requests += requests or 0
+
+    def exhausted(self) -> bool:
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        with self._lock:
+            return self.max_requests is not None and self.requests >= self.max_requests
+
+
+def used_apis(catalog: Iterable[str], root: Optional[str] = None) -> Set[str]:
+    """akshare_service 源码中引用到的目录内 API（即被 skills / 路由使用的接口）"""
+    names = set(catalog)
+    used: Set[str] = set()
+    for path in Path(root or SERVICE_DIR).rglob('*.py'):
+        tokens = set(re.findall(r'[a-z][a-z0-9_]+', path.read_text(encoding='utf-8')))
+        used |= tokens & names
+    return used
+
+
+def _hours(later: datetime, earlier: str) -> float:
+    return max(0.0, (later - datetime.fromisoformat(earlier)).total_seconds() / 3600)
+
+
+def score_api(name: str, outcomes: List[Dict[str, Any]], important: bool = False,
+              now: Optional[datetime] = None) -> ScheduledApi:
+    """
+    根据一个 API 的探测历史计算调度信息
+
+    Args:
+        outcomes: [{'tested_at', 'status', 'response_time_ms'}]（旧到新，见 ResultStore.outcomes）
+        important: 是否被 skills 使用
+    """
+    now = now or datetime.now()
+    if not outcomes:
+        return ScheduledApi(name, MIN_INTERVAL_H, math.inf, 0.0, 0.0, None, important, DEFAULT_COST_S)
+
+    failures = sum(1 for o in outcomes if o['status'] != 'success')
+    failure_rate = (failures + 1) / (len(outcomes) + 2)          # 平滑，少量样本时不走极端
+    latencies = [o['response_time_ms'] for o in outcomes
+                 if o['status'] == 'success' and o['response_time_ms'] is not None]
+    mean = statistics.fmean(latencies) if latencies else 0
+    latency_cv = statistics.pstdev(latencies) / mean if len(latencies) >= 2 and mean > 0 else 0.0
+    successes = [o['tested_at'] for o in outcomes if o['status'] == 'success']
+    hours_since_success = _hours(now, successes[-1]) if successes else None
+    stale = 1.0 if hours_since_success is None else min(hours_since_success / STALE_CAP_H, 1.0)
+
+    risk = W_FAIL * failure_rate + W_VAR * min(latency_cv, 1.0) + W_STALE * stale
+    interval_h = BASE_INTERVAL_H / (1 + risk) / (IMPORTANCE_FACTOR if important else 1)
+    interval_h = min(max(interval_h, MIN_INTERVAL_H), MAX_INTERVAL_H)
+
+    # 估计耗时：最近 5 次探测耗时的中位数（超时记录的是被终止前的实际耗时）
+    costs = [o['response_time_ms'] / 1000 for o in outcomes[-5:] if o['response_time_ms'] is not None]
+    est_cost_s = statistics.median(costs) if costs else DEFAULT_COST_S
+    return ScheduledApi(name, round(interval_h, 2), _hours(now, outcomes[-1]['tested_at']) / interval_h,
+                        round(failure_rate, 3), round(latency_cv, 3),
+                        None if hours_since_success is None else round(hours_since_success, 1),
+                        important, round(est_cost_s, 2))
+
+
+def plan(apis: List[Dict], outcomes: Dict[str, List[Dict[str, Any]]], important: Set[str],
+         max_requests: Optional[int] = None, max_seconds: Optional[float] = None,
+         concurrency: int = 1, samples: int = 1, now: Optional[datetime] = None) -> List[ScheduledApi]:
+    """
+    选出本轮要探测的 API（按 due 从大到小）
+
+    Args:
+        apis: load_apis_from_skills 返回的 API 列表
+        outcomes: ResultStore.outcomes() 的结果
+        important: 被 skills 使用的 API（used_apis）
+        max_requests: 本轮最多探测次数（每个 API 计 samples 次），None 不限制
+        max_seconds: 本轮时间预算（秒，按估计耗时 / concurrency 累计），None 不限制
+    """
+    scored = [score_api(api['name'], outcomes.get(api['name'], []), api['name'] in important, now)
+              for api in apis]
+    scored.sort(key=lambda s: (-s.due, not s.important, s.name))
+    selected, requests, seconds = [], 0, 0.0
+    for item in scored:
+        if item.due < 1:
+            break
+        cost = item.est_cost_s * samples / max(1, concurrency)
+        if max_requests is not None and requests + samples > max_requests:
+            break
+        if max_seconds is not None and selected and seconds + cost > max_seconds:
+            break
+        selected.append(item)
+        requests += samples
+        seconds += cost
+    return selected
+
+
+def main():
+    import argparse
+    import json
+
+    try:
+        from qa.result_store import DEFAULT_DB, ResultStore
+        from qa.test_apis import load_apis_from_skills
+    except ImportError:
+        from result_store import DEFAULT_DB, ResultStore
+        from test_apis import load_apis_from_skills
+
+    parser = argparse.ArgumentParser(description='按历史为 API 探测排优先级')
+    parser.add_argument('--skills', default=str(PROJECT_ROOT / 'docs' / 'skills.json'), help='skills.json 路径')
+    parser.add_argument('--db', default=str(DEFAULT_DB), help='结果库路径')
+    parser.add_argument('--budget-requests', type=int, default=None, help='本轮最多探测次数')
+    parser.add_argument('--budget-seconds', type=float, default=None, help='本轮时间预算(秒)')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='输出 JSON')
+    args = parser.parse_args()
+
+    apis = load_apis_from_skills(args.skills)
+    store = ResultStore(args.db)
+    outcomes = store.outcomes(HISTORY_DAYS)
+    store.close()
+    selected = plan(apis, outcomes, used_apis(a['name'] for a in apis),
+                    args.budget_requests, args.budget_seconds, args.concurrency)
+    if args.json:
+        print(json.dumps([asdict(item) for item in selected], ensure_ascii=False, indent=2, default=str))
+        return
+    print(f"本轮探测 {len(selected)}/{len(apis)} 个 API")
+    for item in selected:
+        due = '新' if math.isinf(item.due) else f'{item.due:.1f}'
+        since = '-' if item.hours_since_success is None else f'{item.hours_since_success}h'
+        print(f"  {item.name:<45} due={due:<5} 间隔={item.interval_h}h 失败率={item.failure_rate} "
+              f"CV={item.latency_cv} 距上次成功={since}{' ★' if item.important else ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,69 @@
 #!/usr/bin/env python3
 """
 AkShare API 可用性测试脚本 - 支持分批测试
+
+两种模式：
+- 串行（默认）：逐个测试，每次调用之间随机等待 delay-min ~ delay-max 秒，适合 cron 分批跑
+- 并发（--concurrency N）：N 个工作线程，礼貌限制按上游站点分组（东方财富、新浪、同花顺……，
+  见 akshare_service/infra/upstreams.py）：每个站点有自己的并发上限和最小请求间隔，
+  不同站点之间互不等待，全量目录（--all）一次跑完
+
+使用方法:
+    python qa/test_apis.py --batch 50                          # 串行，按批次
+    python qa/test_apis.py --all --concurrency 8               # 并发全量
+    python qa/test_apis.py --all --concurrency 8 --host-interval 2
+    python qa/test_apis.py --schedule --budget-requests 100 --budget-seconds 600   # 按优先级只测到期的
+
+每个探测默认在受监督的工作进程中执行（见 qa/probe_pool.py）：超过 --timeout 即终止进程并记为 timeout，
+工作进程按任务数 / 内存占用定期重启。--isolation inline 在当前进程内执行（不强制超时）。
 """
 
 import sys
 import os
 import json
 import argparse
+import functools
 import time
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 import random
+import statistics
+import threading
 import traceback
-from typing import Dict, List, Optional
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
-import akshare as ak
-import pandas as pd
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add project root to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from akshare_service.infra.lazy import lazy_import
+from akshare_service.infra.upstreams import UpstreamLimiter, upstream_of
+
+ak = lazy_import('akshare')
+
 # Import local modules
 try:
     from qa import classifier
+    from qa.probe_pool import MemoryWatch, ProbePool
+    from qa.result_store import DANGEROUS_RSS_MB, RUN_SCHEDULED, ResultStore
+    from qa.fingerprint import schema_fingerprint
+    from qa.sampling import summarise
+    from qa.param_synth import ParamSynth, get_param_synth, pick_candidate
+    from qa import scheduler
 except ImportError:
     # Try relative import if running as script
     import classifier
+    from probe_pool import MemoryWatch, ProbePool
+    from result_store import DANGEROUS_RSS_MB, RUN_SCHEDULED, ResultStore
+    from fingerprint import schema_fingerprint
+    from sampling import summarise
+    from param_synth import ParamSynth, get_param_synth, pick_candidate
+    import scheduler
+
+from akshare_service.infra import replay
 
 # Setup paths
 CURRENT_DIR = Path(__file__).parent.absolute()
@@ -54,6 +90,16 @@ class TestResult:
     sample_data: Optional[List[Dict]] = None
     error: Optional[str] = None
     error_type: Optional[str] = None
+    upstream: Optional[str] = None
+    latency_samples_ms: Optional[List[int]] = None
+    schema: Optional[Dict] = None
+    params: Optional[Dict] = None
+    rows: Optional[int] = None
+    column_stats: Optional[Dict[str, Dict]] = None
+    frame_mb: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+    rss_delta_mb: Optional[float] = None
+    requests: Optional[int] = None
 
 
 CATEGORY_RULES = {
@@ -80,24 +126,34 @@ def classify_api(api_name: str) -> str:
     return 'other'
 
 
-def get_sample_params(api_name: str, parameters: Dict) -> Dict:
-    sample_params = {}
-    props = parameters.get('properties', {})
-    for param_name, param_info in props.items():
-        if param_name in ['symbol', 'code', 'ts_code']:
-            sample_params[param_name] = '000001'
-        elif param_name in ['start_date', 'begin']:
-            sample_params[param_name] = '20240101'
-        elif param_name in ['end_date', 'end']:
-            sample_params[param_name] = '20240131'
-        elif param_name in ['period']:
-            sample_params[param_name] = 'daily'
-        elif param_name in ['adjust']:
-            sample_params[param_name] = ''
-    return sample_params
-
-
-def test_single_api(api_name: str, parameters: Dict, timeout: int = 30) -> TestResult:
+def _extra_samples(func: Callable, sample_params: Dict, count: int) -> Tuple[List[int], int]:
+    """首次调用成功后再计时调用 count 次（失败即停止），返回 (各次耗时（毫秒）, 实际调用次数)"""
+    samples = []
+    calls = 0
+    for _ in range(count):
+        start_time = time.time()
+        calls += 1
+        try:
+            func(**sample_params)
+        except Exception:
+            break
+        samples.append(int((time.time() - start_time) * 1000))
+    return samples, calls
+
+
+def test_single_api(api_name: str, parameters: Dict, timeout: int = 30,
+                    candidates: Optional[List[Dict]] = None, samples: int = 1) -> TestResult:
+    """
+    在当前进程内测试单个 API（timeout 仅供记录；硬超时由 probe_isolated 的工作进程池保证）
+
+    candidates 为候选参数组（见 qa/param_synth.py），未提供时由默认合成器从 apis/ 文档生成；
+    取第一组能绑定到函数签名的参数调用一次（调用失败不换参数重试），实际使用的参数记入 params，
+    实际发出的调用次数（含计时采样）记入 requests，供调度器按请求预算计数。
+    samples > 1 时首次调用成功后再计时调用 samples - 1 次，response_time_ms 取各次的中位数，
+    全部耗时记入 latency_samples_ms（供 qa/comparator.py 做分布统计）
+    返回值只保留有界摘要（行数、列统计、蓄水池样本，见 qa/sampling.py）后立即释放，
+    探测期间的峰值 RSS 和增量记入 peak_rss_mb / rss_delta_mb
+    """
     category = classify_api(api_name)
     
     try:
@@ -107,68 +163,54 @@ def test_single_api(api_name: str, parameters: Dict, timeout: int = 30) -> TestR
                 category=category,
                 status='error',
                 error=f"API '{api_name}' 不存在",
-                error_type='not_found'
+                error_type='not_found',
+                requests=0
             )
         
         func = getattr(ak, api_name)
-        sample_params = get_sample_params(api_name, parameters)
+        candidates = candidates or get_param_synth().candidates(api_name, parameters) or [{}]
         
-        start_time = time.time()
+        sample_params = pick_candidate(func, candidates)
         
-        try:
-            if sample_params:
+        with MemoryWatch() as memory:
+            try:
+                start_time = time.time()
                 df = func(**sample_params)
-            else:
-                df = func()
-            
-            end_time = time.time()
-            response_time_ms = int((end_time - start_time) * 1000)
-            
-            if df is None:
+                elapsed = time.time() - start_time
+                schema = schema_fingerprint(df)
+                summary = summarise(df)
+                del df  # 只保留有界摘要，返回值立即释放
+                extra, extra_calls = _extra_samples(func, sample_params, samples - 1)
+                latency_samples = [int(elapsed * 1000)] + extra
+            except Exception as e:
                 return TestResult(
                     api_name=api_name,
                     category=category,
-                    status='success',
-                    response_time_ms=response_time_ms,
-                    sample_keys=[],
-                    sample_data=[]
+                    status='failed',
+                    error=str(e)[:200],
+                    error_type=type(e).__name__,
+                    params=sample_params,
+                    requests=1
                 )
-            
-            if hasattr(df, 'to_dict'):
-                sample_data = df.head(3).to_dict('records') if len(df) > 0 else []
-                sample_keys = list(df.columns) if hasattr(df, 'columns') else []
-                sample_dtypes = {col: str(df[col].dtype) for col in df.columns} if hasattr(df, 'columns') else {}
-            elif isinstance(df, dict):
-                sample_data = [df] if df else []
-                sample_keys = list(df.keys()) if df else []
-                sample_dtypes = {k: type(v).__name__ for k, v in df.items()} if df else {}
-            elif isinstance(df, list):
-                sample_data = df[:3] if df else []
-                sample_keys = list(df[0].keys()) if df and isinstance(df[0], dict) else []
-                sample_dtypes = {}
-            else:
-                sample_data = []
-                sample_keys = []
-                sample_dtypes = {}
-            
-            return TestResult(
-                api_name=api_name,
-                category=category,
-                status='success',
-                response_time_ms=response_time_ms,
-                sample_keys=sample_keys,
-                sample_dtypes=sample_dtypes,
-                sample_data=sample_data[:3]
-            )
-            
-        except Exception as e:
-            return TestResult(
-                api_name=api_name,
-                category=category,
-                status='failed',
-                error=str(e)[:200],
-                error_type=type(e).__name__
-            )
+        
+        return TestResult(
+            api_name=api_name,
+            category=category,
+            status='success',
+            response_time_ms=int(statistics.median(latency_samples)),
+            sample_keys=summary['sample_keys'],
+            sample_dtypes=summary['sample_dtypes'],
+            sample_data=summary['sample_data'],
+            latency_samples_ms=latency_samples,
+            schema=schema,
+            params=sample_params,
+            rows=summary['rows'],
+            column_stats=summary['column_stats'],
+            frame_mb=summary['frame_mb'],
+            peak_rss_mb=memory.peak_mb,
+            rss_delta_mb=memory.delta_mb,
+            requests=1 + extra_calls
+        )
             
     except Exception as e:
         return TestResult(
@@ -180,6 +222,119 @@ def test_single_api(api_name: str, parameters: Dict, timeout: int = 30) -> TestR
         )
 
 
+def _probe_for_pool(api_name: str, parameters: Dict, timeout: int, candidates: Optional[List[Dict]] = None,
+                    samples: int = 1) -> Dict:
+    """工作进程中执行的探测（模块级函数，可被 spawn 进程 pickle）"""
+    replay.activate_from_env()
+    return asdict(test_single_api(api_name, parameters, timeout, candidates, samples))
+
+
+def probe_isolated(pool: ProbePool, api_name: str, parameters: Dict, timeout: int = 30,
+                   candidates: Optional[List[Dict]] = None, samples: int = 1) -> TestResult:
+    """
+    在工作进程池中测试单个 API，超时、内存超限、进程崩溃都转换为 TestResult
+    """
+    outcome = pool.run(api_name, parameters, timeout, candidates, samples)
+    if outcome.status == 'ok':
+        return TestResult(**outcome.value)
+    elapsed_ms = int(outcome.elapsed * 1000)
+    status, error_type = {
+        'timeout': ('timeout', 'Timeout'),
+        'memory': ('failed', 'MemoryError'),
+        'crashed': ('error', 'WorkerCrashed'),
+    }.get(outcome.status, ('error', 'WorkerError'))
+    return TestResult(
+        api_name=api_name,
+        category=classify_api(api_name),
+        status=status,
+        response_time_ms=elapsed_ms,
+        error=(outcome.error or '')[:200],
+        error_type=error_type,
+        params=candidates[0] if candidates else None,
+        peak_rss_mb=outcome.peak_rss_mb,
+        requests=samples  # 工作进程被终止，无法得知实际调用了几次，按上限计
+    )
+
+
+def create_probe_pool(size: int, timeout: int, max_tasks_per_worker: int = 50,
+                      memory_limit_mb: Optional[int] = None, recycle_rss_mb: Optional[float] = 1024) -> ProbePool:
+    """API 探测用的工作进程池（工作进程预先导入 akshare，冷启动不计入探测耗时）"""
+    return ProbePool(_probe_for_pool, size=size, timeout=timeout,
+                     max_tasks_per_worker=max_tasks_per_worker, memory_limit_mb=memory_limit_mb,
+                     recycle_rss_mb=recycle_rss_mb, preload=('akshare',))
+
+
+STATUS_EMOJI = {'success': '✅', 'failed': '❌', 'timeout': '⏱️', 'error': '⚠️'}
+
+
+def interleave_by_upstream(apis: List[Dict]) -> List[Dict]:
+    """
+    按上游站点轮转排列任务，避免同一站点的任务扎堆、占满工作线程后都在等同一个站点的名额
+    """
+    groups: Dict[str, deque] = {}
+    for api in apis:
+        groups.setdefault(upstream_of(api['name'], api.get('description', '')), deque()).append(api)
+    queues = list(groups.values())
+    ordered = []
+    while queues:
+        for queue in list(queues):
+            ordered.append(queue.popleft())
+            if not queue:
+                queues.remove(queue)
+    return ordered
+
+
+def run_sweep(apis: List[Dict], timeout: int = 30, concurrency: int = 8,
+              limiter: Optional[UpstreamLimiter] = None,
+              on_result: Optional[Callable[[TestResult, int], None]] = None,
+              probe: Optional[Callable[[str, Dict, int, Optional[List[Dict]]], TestResult]] = None,
+              budget: Optional['scheduler.ProbeBudget'] = None) -> Dict[str, TestResult]:
+    """
+    并发测试一组 API，按上游站点限流
+
+    Args:
+        apis: load_apis_from_skills 返回的 API 列表
+        timeout: 单个 API 超时时间(秒)
+        concurrency: 工作线程数（全局上限，各站点另有自己的并发上限）
+        limiter: 上游限流器，默认每个站点最小间隔 1 秒
+        on_result: 每完成一个 API 的回调 (result, 已完成数)
+        probe: 探测函数 (api_name, parameters, timeout, candidates)，默认在当前进程内执行 test_single_api
+        budget: 本轮时间和请求预算（见 qa/scheduler.py 的 ProbeBudget），用完后不再开始新的探测
+
+    Returns:
+        api_name -> TestResult，保持 apis 的原始顺序；超出预算未探测的 API 不在其中
+    """
+    limiter = limiter or UpstreamLimiter(default_interval=1.0)
+    done = 0
+    done_lock = threading.Lock()
+
+    def run_one(api: Dict) -> Optional[TestResult]:
+        upstream = upstream_of(api['name'], api.get('description', ''))
+        with limiter.acquire(upstream):
+            if budget is not None and budget.exhausted():
+                return None
+            result = (probe or test_single_api)(api['name'], api.get('parameters', {}), timeout,
+                                                api.get('candidates'))
+        if budget is not None:
+            budget.charge(result.requests)
+        result.upstream = upstream
+        return result
+
+    results: Dict[str, TestResult] = {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='probe') as pool:
+        futures = [pool.submit(run_one, api) for api in interleave_by_upstream(apis)]
+        for future in as_completed(futures):
+            result = future.result()
+            if result is None:
+                continue
+            results[result.api_name] = result
+            if on_result:
+                with done_lock:
+                    done += 1
+                    on_result(result, done)
+    return {api['name']: results[api['name']] for api in apis if api['name'] in results}
+
+
 def load_apis_from_skills(skills_path: str) -> List[Dict]:
     with open(skills_path, 'r', encoding='utf-8') as f:
         skills = json.load(f)
@@ -197,7 +352,7 @@ def load_apis_from_skills(skills_path: str) -> List[Dict]:
 
 
 def load_state(state_path: str) -> Dict:
-    """加载测试状态"""
+    """加载测试状态（批次游标和当前轮次；结果本身在 results.db 中，见 qa/result_store.py）"""
     if os.path.exists(state_path):
         with open(state_path, 'r', encoding='utf-8') as f:
             return json.load(f)
@@ -206,7 +361,7 @@ def load_state(state_path: str) -> Dict:
         'tested_count': 0,
         'current_batch': 0,
         'batch_size': 50,
-        'results': {},
+        'run_id': None,
         'summary': {'total': 0, 'success': 0, 'failed': 0, 'timeout': 0, 'error': 0}
     }
 
@@ -224,19 +379,158 @@ def json_serial(obj):
         return obj.isoformat()
     raise TypeError(f"Type {type(obj)} not serializable")
 
+def run_batch(args, apis: List[Dict], start_idx: int, end_idx: int,
+              probe: Callable[[str, Dict, int, Optional[List[Dict]]], TestResult],
+              record: Optional[Callable[[TestResult], None]] = None,
+              budget: Optional['scheduler.ProbeBudget'] = None) -> Dict[str, TestResult]:
+    """
+    测试 apis[start_idx:end_idx]，每完成一个即调用 record（写入结果库），返回 api_name -> TestResult
+
+    budget 为本轮时间和请求预算（scheduler.ProbeBudget），用完后不再开始新的探测
+    """
+    total_apis = len(apis)
+    batch_results = {}
+    if args.concurrency > 1:
+        # 并发模式：按上游站点限流（见 akshare_service/infra/upstreams.py）
+        limiter = UpstreamLimiter(default_interval=args.host_interval)
+        logger.info(f"并发模式: {args.concurrency} 个工作线程，同站点最小间隔 {args.host_interval}s")
+        
+        def log_result(result: TestResult, done: int):
+            if record:
+                record(result)
+            emoji = STATUS_EMOJI.get(result.status, '❓')
+            logger.info(f"[{done}/{end_idx - start_idx}] {emoji} {result.api_name} [{result.upstream}] "
+                        f"{result.status} ({result.response_time_ms or '-'}ms)")
+        
+        return run_sweep(apis[start_idx:end_idx], args.timeout, args.concurrency,
+                         limiter, on_result=log_result, probe=probe, budget=budget)
+    else:
+        for i in range(start_idx, end_idx):
+            if budget is not None and budget.exhausted():
+                logger.info(f"预算已用完，剩余 {end_idx - i} 个 API 留到下一轮")
+                break
+            api_info = apis[i]
+            api_name = api_info['name']
+            parameters = api_info.get('parameters', {})
+            
+            logger.info(f"[{i+1}/{total_apis}] 测试: {api_name}")
+            
+            result = probe(api_name, parameters, args.timeout, api_info.get('candidates'))
+            if budget is not None:
+                budget.charge(result.requests)
+            result.upstream = upstream_of(api_name, api_info.get('description', ''))
+            batch_results[api_name] = result
+            if record:
+                record(result)
+            
+            emoji = STATUS_EMOJI.get(result.status, '❓')
+            logger.info(f"  {emoji} {result.status} ({result.response_time_ms or '-'}ms)")
+            
+            # 随机延迟
+            if i < end_idx - 1:
+                delay = random.uniform(args.delay_min, args.delay_max)
+                time.sleep(delay)
+    return batch_results
+
+
+def add_candidates(apis: List[Dict], store: ResultStore) -> None:
+    """候选参数：优先复用结果库中最近一次成功的参数，其次从 apis/ 文档合成（见 qa/param_synth.py）"""
+    synth = ParamSynth(cached=store.success_params())
+    for api in apis:
+        api['candidates'] = synth.candidates(api['name'], api.get('parameters', {}))
+
+
+def build_probe(args):
+    """按命令行参数构造探测函数，返回 (probe, 工作进程池或 None)"""
+    samples = max(1, args.samples)
+    if args.isolation != 'process':
+        return functools.partial(test_single_api, samples=samples), None
+    pool = create_probe_pool(max(1, args.concurrency), args.timeout * samples, args.max_tasks_per_worker,
+                             args.memory_limit_mb or None, args.recycle_rss_mb or None)
+    return functools.partial(probe_isolated, pool, samples=samples), pool
+
+
+def run_scheduled(args, apis: List[Dict], store: ResultStore) -> Dict[str, TestResult]:
+    """
+    按优先级调度探测（见 qa/scheduler.py）：只测到期的 API，高优先级在前，受请求数和时间预算限制
+
+    每次调度单独记为一轮（run_id 以 sched- 开头），不影响分批模式的游标和日报
+    """
+    samples = max(1, args.samples)
+    selected = scheduler.plan(apis, store.outcomes(scheduler.HISTORY_DAYS),
+                              scheduler.used_apis(api['name'] for api in apis),
+                              args.budget_requests, args.budget_seconds, max(1, args.concurrency), samples)
+    if not selected:
+        logger.info("没有到期的 API，本轮跳过")
+        return {}
+    by_name = {api['name']: api for api in apis}
+    planned = [by_name[item.name] for item in selected]
+    logger.info(f"调度: 本轮探测 {len(planned)}/{len(apis)} 个 API，"
+                f"其中 {sum(1 for item in selected if item.important)} 个被 skills 使用")
+    add_candidates(planned, store)
+    
+    run_id = store.start_run(len(planned), f"sched-{datetime.now().strftime('%Y%m%d-%H%M%S')}",
+                             kind=RUN_SCHEDULED)
+    budget = scheduler.ProbeBudget(args.budget_requests, args.budget_seconds)
+    probe, pool = build_probe(args)
+    try:
+        results = run_batch(args, planned, 0, len(planned), probe,
+                            record=lambda r: store.append(run_id, asdict(r)), budget=budget)
+    finally:
+        if pool:
+            pool.close()
+    store.finish_run(run_id)
+    
+    summary = store.summary(run_id)
+    logger.info(f"调度轮次 {run_id} 完成: 测试 {summary['tested']} 个，成功 {summary['success']}，"
+                f"失败 {summary['failed']}，超时 {summary['timeout']}，错误 {summary['error']}，"
+                f"上游调用 {budget.requests} 次")
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(description='AkShare API 可用性测试 - 分批模式')
     parser.add_argument('--skills', default='docs/skills.json', help='skills.json 路径')
     parser.add_argument('--output', default='reports', help='输出目录')
     parser.add_argument('--delay-min', type=float, default=2, help='最小请求间隔(秒)')
     parser.add_argument('--delay-max', type=float, default=5, help='最大请求间隔(秒)')
-    parser.add_argument('--timeout', type=int, default=30, help='API 超时时间(秒)')
+    parser.add_argument('--timeout', type=int, default=30, help='API 超时时间(秒，多次采样时按每次计)')
+    parser.add_argument('--samples', type=int, default=1,
+                        help='每个 API 的计时采样次数（>1 时延迟取中位数，供 comparator 做分布统计）')
     parser.add_argument('--batch', type=int, default=50, help='每批测试数量')
     parser.add_argument('--batch-index', type=int, default=None, help='指定批次索引（从0开始）')
-    parser.add_argument('--reset', action='store_true', help='重置测试状态')
+    parser.add_argument('--reset', action='store_true', help='重置测试状态（开始新一轮）')
+    parser.add_argument('--db', default=None, help='结果库路径（默认 <output>/results.db）')
+    parser.add_argument('--all', action='store_true', help='忽略批次，一次测试全部 API')
+    parser.add_argument('--schedule', action='store_true',
+                        help='按历史优先级只测到期的 API（见 qa/scheduler.py），不使用批次游标')
+    parser.add_argument('--budget-requests', type=int, default=None, help='调度模式下本轮最多上游调用次数（含计时采样）')
+    parser.add_argument('--budget-seconds', type=float, default=None, help='调度模式下本轮时间预算(秒)')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='并发工作线程数（>1 时按上游站点限流，不再使用随机间隔）')
+    parser.add_argument('--host-interval', type=float, default=1.0,
+                        help='并发模式下同一上游站点两次请求的最小间隔(秒)')
+    parser.add_argument('--isolation', choices=['process', 'inline'], default='process',
+                        help='process: 每个探测在受监督的工作进程中执行（强制超时）；inline: 当前进程内执行')
+    parser.add_argument('--max-tasks-per-worker', type=int, default=50, help='工作进程执行多少个 API 后重启')
+    parser.add_argument('--memory-limit-mb', type=int, default=4096, help='工作进程地址空间上限(MB)，0 不限制')
+    parser.add_argument('--recycle-rss-mb', type=float, default=1024, help='工作进程峰值 RSS 超过该值后重启(MB)')
+    parser.add_argument('--http-mode', choices=['live', 'record', 'replay'], default=None,
+                        help='HTTP 模式：录制上游响应或离线回放（默认读取 AKSHARE_HTTP_MODE）')
+    parser.add_argument('--fixtures', default=None, help='录制/回放夹具目录')
+    parser.add_argument('--replay-latency', default=None, help='回放延迟(ms)，如 200 或 200:50 或 recorded')
     
     args = parser.parse_args()
     
+    # 录制/回放：AkShare 内部的 requests 调用全部走夹具
+    if args.http_mode:
+        os.environ[replay.MODE_ENV] = args.http_mode
+    if args.fixtures:
+        os.environ[replay.FIXTURE_DIR_ENV] = args.fixtures
+    if args.replay_latency:
+        os.environ[replay.LATENCY_ENV] = args.replay_latency
+    replay.activate_from_env()
+    
     project_root = Path(__file__).parent.parent
     skills_path = project_root / args.skills
     output_dir = project_root / args.output
@@ -254,6 +548,13 @@ def main():
     total_apis = len(apis)
     logger.info(f"共 {total_apis} 个 API")
     
+    # 结果逐条追加到结果库；test_state.json 只保存批次游标
+    store = ResultStore(args.db or str(output_dir / 'results.db'))
+    
+    if args.schedule:
+        run_scheduled(args, apis, store)
+        return
+    
     # 加载或初始化状态
     if args.reset:
         state = load_state('')
@@ -262,6 +563,11 @@ def main():
         logger.info("已重置测试状态")
     else:
         state = load_state(str(state_path))
+        if state.get('results'):
+            # 旧版状态文件：已有结果迁移到结果库，作为当前轮次继续
+            state['run_id'] = store.import_state(state, f"state-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+            state.pop('results')
+            logger.info(f"已将旧版状态文件中的结果导入结果库: {state['run_id']}")
         if state['total_apis'] == 0:
             state['total_apis'] = total_apis
             state['batch_size'] = args.batch
@@ -279,60 +585,53 @@ def main():
         logger.info(f"所有批次已完成！共 {total_batches} 批")
         batch_index = 0  # 从头开始新一轮
     
-    start_idx = batch_index * args.batch
-    end_idx = min(start_idx + args.batch, total_apis)
+    if args.all:
+        batch_index, start_idx, end_idx = total_batches - 1, 0, total_apis
+        logger.info(f"全量测试 {total_apis} 个 API")
+    else:
+        start_idx = batch_index * args.batch
+        end_idx = min(start_idx + args.batch, total_apis)
+        logger.info(f"开始批次 {batch_index + 1}/{total_batches} (API {start_idx + 1}-{end_idx})")
+    
+    # 新一轮：--reset / --all / 批次回到开头 / 状态中没有进行中的轮次
+    run_id = state.get('run_id')
+    new_round = (args.reset or args.all or run_id != store.open_run()
+                 or (args.batch_index is None and batch_index == 0))
+    if new_round:
+        if run_id and run_id == store.open_run():
+            store.finish_run(run_id)
+        run_id = store.start_run(total_apis)
+        logger.info(f"开始新一轮巡检: {run_id}")
     
-    logger.info(f"开始批次 {batch_index + 1}/{total_batches} (API {start_idx + 1}-{end_idx})")
+    add_candidates(apis[start_idx:end_idx], store)
     
     # 测试当前批次
-    batch_results = {}
     batch_start_time = time.time()
     
-    for i in range(start_idx, end_idx):
-        api_info = apis[i]
-        api_name = api_info['name']
-        parameters = api_info.get('parameters', {})
-        
-        logger.info(f"[{i+1}/{total_apis}] 测试: {api_name}")
-        
-        result = test_single_api(api_name, parameters, args.timeout)
-        batch_results[api_name] = result
-        
-        status_emoji = {'success': '✅', 'failed': '❌', 'timeout': '⏱️', 'error': '⚠️'}
-        emoji = status_emoji.get(result.status, '❓')
-        logger.info(f"  {emoji} {result.status} ({result.response_time_ms or '-'}ms)")
-        
-        # 随机延迟
-        if i < end_idx - 1:
-            delay = random.uniform(args.delay_min, args.delay_max)
-            time.sleep(delay)
+    probe, pool = build_probe(args)
+    try:
+        batch_results = run_batch(args, apis, start_idx, end_idx, probe,
+                                  record=lambda r: store.append(run_id, asdict(r)))
+    finally:
+        if pool:
+            pool.close()
+            logger.info(f"工作进程池: {pool.stats}")
     
     batch_end_time = time.time()
     batch_duration = int(batch_end_time - batch_start_time)
     
-    # 更新状态
-    state['results'].update({name: asdict(r) for name, r in batch_results.items()})
-    state['tested_count'] = len(state['results'])
+    # 更新状态（汇总来自结果库的增量计数）
+    summary = store.summary(run_id)
+    summary['total'] = total_apis
+    success = summary['success']
+    state['run_id'] = run_id
+    state['tested_count'] = summary['tested']
     state['current_batch'] = batch_index + 1
-    
-    # 计算汇总
-    success = sum(1 for r in state['results'].values() if r['status'] == 'success')
-    failed = sum(1 for r in state['results'].values() if r['status'] == 'failed')
-    timeout = sum(1 for r in state['results'].values() if r['status'] == 'timeout')
-    error = sum(1 for r in state['results'].values() if r['status'] == 'error')
-    
-    state['summary'] = {
-        'total': total_apis,
-        'tested': state['tested_count'],
-        'success': success,
-        'failed': failed,
-        'timeout': timeout,
-        'error': error
-    }
+    state['summary'] = summary
     
     # 保存状态
     save_state(str(state_path), state)
-    logger.info(f"状态已保存: {state_path}")
+    logger.info(f"状态已保存: {state_path}（结果库: {store.path}）")
     
     # 输出批次汇总
     batch_success = sum(1 for r in batch_results.values() if r.status == 'success')
@@ -358,24 +657,15 @@ def main():
     if state['tested_count'] >= total_apis:
         logger.info("所有 API 测试完成，生成最终报告...")
         
-        # 计算分类统计
-        by_category = {}
-        for api_name, result in state['results'].items():
-            cat = result['category']
-            if cat not in by_category:
-                by_category[cat] = {'total': 0, 'success': 0, 'failed': 0, 'timeout': 0, 'error': 0}
-            by_category[cat]['total'] += 1
-            by_category[cat][result['status']] += 1
-        
-        final_report = {
-            'test_date': datetime.now().strftime('%Y-%m-%d'),
-            'test_time': datetime.now().strftime('%H:%M:%S'),
-            'summary': {
-                **state['summary'],
-                'by_category': by_category
-            },
-            'apis': state['results']
-        }
+        final_report = store.to_report(run_id)
+        final_report['summary']['total'] = total_apis
+        # 内存代价最高的接口（见 python qa/result_store.py memory）
+        final_report['memory'] = store.memory_costs(run_id=run_id, limit=20)
+        for item in final_report['memory']:
+            if item['oom'] or (item['rss_delta_mb'] or 0) >= DANGEROUS_RSS_MB:
+                logger.warning(f"内存代价高: {item['api_name']} RSS 增量 {item['rss_delta_mb']}MB，"
+                               f"{item['rows']} 行，超出内存上限 {item['oom']} 次")
+        store.finish_run(run_id)
         
         report_path = output_dir / f"{datetime.now().strftime('%Y-%m-%d')}.json"
         with open(report_path, 'w', encoding='utf-8') as f:
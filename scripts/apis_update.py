@@ -1,6 +1,7 @@
 import os
 import re
 import json
+import hashlib
 import requests
 import subprocess
 import sys
@@ -21,6 +22,8 @@ DOCS_DIR = PROJECT_ROOT / 'docs'  # 存放生成的文档
 # 文件路径配置
 SOURCE_FILE_PATH = DATA_DIR / 'stock.md.txt'
 MANIFEST_FILE_PATH = APIS_DIR / 'manifest.json'
+CHANGES_FILE_PATH = APIS_DIR / 'changes.json'  # 变更清单，供 generate_skills.py 增量生成
+VALIDATORS_FILE_PATH = CACHE_DIR / 'stock.md.validators.json'  # 上次下载的 ETag / Last-Modified
 API_DOC_URL = 'https://akshare.akfamily.xyz/_sources/data/stock/stock.md.txt'
 
 def extract_info(api_block_content):
@@ -42,20 +45,53 @@ def extract_info(api_block_content):
     
     return interface_name, description
 
-def download_api_doc(url, destination_path):
+def load_validators():
+    """读取上次下载保存的 ETag / Last-Modified"""
+    if VALIDATORS_FILE_PATH.exists():
+        try:
+            with open(VALIDATORS_FILE_PATH, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            pass
+    return {}
+
+
+def save_validators(response):
+    """保存响应头中的 ETag / Last-Modified，下次下载时作为条件请求头"""
+    validators = {k: response.headers[k] for k in ('ETag', 'Last-Modified') if response.headers.get(k)}
+    VALIDATORS_FILE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(VALIDATORS_FILE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(validators, f, ensure_ascii=False, indent=4)
+
+
+def download_api_doc(url, destination_path, force=False):
     """
-    下载API文档文件
-    
+    下载API文档文件（条件请求）
+
+    本地文件存在时带上 If-None-Match / If-Modified-Since，服务器返回 304 则沿用本地文件，不重新下载。
+
     Args:
         url (str): 下载链接
         destination_path (Path): 目标文件路径
-    
+        force (bool): 忽略缓存的 ETag / Last-Modified，强制下载
+
     Returns:
-        bool: 下载是否成功
+        str: 'downloaded'（已下载新内容）、'not_modified'（服务器返回 304）；下载失败返回 None
     """
+    headers = {}
+    if not force and destination_path.exists():
+        validators = load_validators()
+        if validators.get('ETag'):
+            headers['If-None-Match'] = validators['ETag']
+        if validators.get('Last-Modified'):
+            headers['If-Modified-Since'] = validators['Last-Modified']
+
     try:
         print(f"正在从 {url} 下载文件...")
-        response = requests.get(url, timeout=30)
+        response = requests.get(url, timeout=30, headers=headers)
+        if response.status_code == 304:
+            print(f"文件未变化（304），沿用本地文件 {destination_path}")
+            return 'not_modified'
         response.raise_for_status()
         
         # 确保目标目录存在
@@ -63,14 +99,15 @@ def download_api_doc(url, destination_path):
         
         with open(destination_path, 'w', encoding='utf-8') as f:
             f.write(response.text)
+        save_validators(response)
         print(f"文件已成功下载并保存到 {destination_path}")
-        return True
+        return 'downloaded'
     except requests.exceptions.RequestException as e:
         print(f"错误：下载文件失败。URL: {url}, 错误: {e}")
-        return False
+        return None
     except IOError as e:
         print(f"错误：保存文件失败。路径: {destination_path}, 错误: {e}")
-        return False
+        return None
 
 def ensure_directories():
     """
@@ -82,34 +119,13 @@ def ensure_directories():
         print(f"确保目录存在: {directory}")
 
 
-def process_api_docs():
+def split_api_blocks(content):
     """
-    处理API文档的主函数
-    
-    1. 确保目录结构存在
-    2. 下载API文档文件
-    3. 解析并分割API文档
-    4. 生成单独的API文件和清单文件
-    """
-    print("开始处理akshare API文档...")
-    
-    # 确保目录结构存在
-    ensure_directories()
-    
-    # 下载API文档文件
-    if not download_api_doc(API_DOC_URL, SOURCE_FILE_PATH):
-        print("由于下载失败，处理中止。")
-        return False
-
-    if not SOURCE_FILE_PATH.exists():
-        print(f"错误：源文件 {SOURCE_FILE_PATH} 未找到（即使在尝试下载后）。")
-        return False
-
-    manifest_data = []
-
-    with open(SOURCE_FILE_PATH, 'r', encoding='utf-8') as f:
-        content = f.read()
+    按 "接口: " 分割源文档
 
+    Returns:
+        list: 每个接口块去掉 "接口: " 前缀后的文本（按出现顺序）
+    """
     # Split the content by "接口: " to get individual API blocks.
     # The first element of the split might be empty or content before the first API, so we skip it if it's trivial.
     api_blocks_raw = content.split('\n接口: ')
@@ -133,14 +149,145 @@ def process_api_docs():
             # For now, we assume valid blocks are always preceded by "接口: "
             pass # Or handle as an error/special case
 
+    return actual_api_blocks
+
+
+def content_hash(text):
+    """接口块内容的哈希（写入 manifest.json 的 content_hash）"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def load_manifest():
+    """
+    读取现有清单
+
+    Returns:
+        dict: 接口名 -> 清单条目；清单不存在或损坏时为空
+    """
+    if not MANIFEST_FILE_PATH.exists():
+        return {}
+    try:
+        with open(MANIFEST_FILE_PATH, 'r', encoding='utf-8') as f:
+            return {item['interface_name']: item for item in json.load(f)}
+    except (IOError, ValueError, KeyError, TypeError):
+        return {}
+
 
-    for i, block_content_after_marker in enumerate(actual_api_blocks):
+def previous_hash(entry, file_path):
+    """
+    接口文件上次写入时的哈希
+
+    优先取清单中的 content_hash；旧版清单没有该字段时按磁盘上的文件计算，文件不存在返回 None
+    """
+    if not file_path.exists():
+        return None
+    if entry and entry.get('content_hash'):
+        return entry['content_hash']
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return content_hash(f.read())
+
+
+def merge_changes(pending, added, modified, removed):
+    """
+    把本次变更合并进尚未被 generate_skills.py 处理的变更清单
+
+    例如上次新增、本次修改的接口仍记为新增；上次新增、本次删除的接口两边都不再出现。
+
+    Returns:
+        dict: {'added': [...], 'modified': [...], 'removed': [...]}（各自排序）
+    """
+    kinds = {}
+    for kind in ('added', 'modified', 'removed'):
+        for name in (pending or {}).get(kind, []):
+            kinds[name] = kind
+
+    for name in added:
+        kinds[name] = 'modified' if kinds.get(name) == 'removed' else 'added'
+    for name in modified:
+        kinds[name] = 'added' if kinds.get(name) == 'added' else 'modified'
+    for name in removed:
+        if kinds.get(name) == 'added':
+            del kinds[name]
+        else:
+            kinds[name] = 'removed'
+
+    return {kind: sorted(n for n, k in kinds.items() if k == kind) for kind in ('added', 'modified', 'removed')}
+
+
+def write_changes(added, modified, removed):
+    """
+    写入变更清单 apis/changes.json
+
+    上一份清单还没被 generate_skills.py 处理（pending 为 true）时合并，避免连续两次更新丢掉前一次的变更。
+    """
+    pending = None
+    if CHANGES_FILE_PATH.exists():
+        try:
+            with open(CHANGES_FILE_PATH, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            if previous.get('pending'):
+                pending = previous
+        except (IOError, ValueError, AttributeError):
+            pass
+
+    from datetime import datetime
+    changes = merge_changes(pending, added, modified, removed)
+    changes = {
+        'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'source': API_DOC_URL,
+        'pending': True,
+        **changes,
+    }
+    with open(CHANGES_FILE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(changes, f, ensure_ascii=False, indent=4)
+    return changes
+
+
+def process_api_docs(force=False):
+    """
+    处理API文档的主函数（增量）
+    
+    1. 确保目录结构存在
+    2. 下载API文档文件（条件请求，未变化时沿用本地文件）
+    3. 解析并分割API文档，计算每个接口块的哈希
+    4. 只重写哈希变化或文件缺失的接口文件，删除源文档中已移除的接口
+    5. 清单或接口有变化时重写清单文件，并写入变更清单 apis/changes.json
+
+    Args:
+        force (bool): 忽略 ETag / Last-Modified 强制下载
+
+    Returns:
+        dict: {'added', 'modified', 'removed', 'unchanged'}；失败时返回 None
+    """
+    print("开始处理akshare API文档...")
+    
+    # 确保目录结构存在
+    ensure_directories()
+    
+    # 下载API文档文件
+    if not download_api_doc(API_DOC_URL, SOURCE_FILE_PATH, force=force):
+        print("由于下载失败，处理中止。")
+        return None
+
+    if not SOURCE_FILE_PATH.exists():
+        print(f"错误：源文件 {SOURCE_FILE_PATH} 未找到（即使在尝试下载后）。")
+        return None
+
+    old_manifest = load_manifest()
+    manifest_data = []
+    added, modified = [], []
+    unchanged = 0
+
+    with open(SOURCE_FILE_PATH, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    for i, block_content_after_marker in enumerate(split_api_blocks(content)):
         if not block_content_after_marker.strip():
             continue
 
         # The block_content_after_marker is the text *after* "接口: "
         # For saving, we prepend "接口: "
-        full_api_block_text = "接口: " + block_content_after_marker
+        full_api_block_text = ("接口: " + block_content_after_marker).strip() + '\n'
 
         interface_name, description = extract_info(block_content_after_marker)
 
@@ -155,32 +302,58 @@ def process_api_docs():
         # 清理接口名称用作文件名
         filename = f"{interface_name.replace('/', '_').replace(' ', '_')}.txt"
         file_path = APIS_DIR / filename
-
-        try:
-            with open(file_path, 'w', encoding='utf-8') as api_file:
-                api_file.write(full_api_block_text.strip() + '\n')
-            print(f"已保存接口 {interface_name} 到 {file_path}")
-        except IOError as e:
-            print(f"错误：无法写入文件 {file_path}。错误：{e}")
-            continue
+        block_hash = content_hash(full_api_block_text)
+        old_entry = old_manifest.get(interface_name)
+        old_hash = previous_hash(old_entry, file_path)
+
+        if old_hash != block_hash:
+            try:
+                with open(file_path, 'w', encoding='utf-8') as api_file:
+                    api_file.write(full_api_block_text)
+                print(f"已保存接口 {interface_name} 到 {file_path}")
+            except IOError as e:
+                print(f"错误：无法写入文件 {file_path}。错误：{e}")
+                continue
+            (modified if old_entry or old_hash else added).append(interface_name)
+        else:
+            unchanged += 1
 
         manifest_data.append({
             "file": filename,
             "interface_name": interface_name,
             "description": description if description else "",
-            "file_path": str(file_path.relative_to(PROJECT_ROOT))
+            "file_path": str(file_path.relative_to(PROJECT_ROOT)),
+            "content_hash": block_hash
         })
 
-    # 保存清单文件
+    # 源文档中已移除的接口
+    current = {item['interface_name'] for item in manifest_data}
+    removed = sorted(name for name in old_manifest if name not in current)
+    current_files = {item['file'] for item in manifest_data}
+    for name in removed:
+        filename = old_manifest[name].get('file')
+        if filename and filename not in current_files and (APIS_DIR / filename).exists():
+            (APIS_DIR / filename).unlink()
+            print(f"已删除接口 {name} 的文件 {filename}")
+
+    stats = {'added': added, 'modified': modified, 'removed': removed, 'unchanged': unchanged}
+    print(f"新增 {len(added)} 个，修改 {len(modified)} 个，删除 {len(removed)} 个，未变化 {unchanged} 个")
+
+    # 保存清单文件（内容不变时不重写）
     try:
-        with open(MANIFEST_FILE_PATH, 'w', encoding='utf-8') as mf:
-            json.dump(manifest_data, mf, ensure_ascii=False, indent=4)
-        print(f"清单文件已保存到 {MANIFEST_FILE_PATH}")
+        if list(old_manifest.values()) != manifest_data:
+            with open(MANIFEST_FILE_PATH, 'w', encoding='utf-8') as mf:
+                json.dump(manifest_data, mf, ensure_ascii=False, indent=4)
+            print(f"清单文件已保存到 {MANIFEST_FILE_PATH}")
         print(f"共处理了 {len(manifest_data)} 个API接口")
-        return True
     except IOError as e:
         print(f"错误：无法写入清单文件 {MANIFEST_FILE_PATH}。错误：{e}")
-        return False
+        return None
+
+    if added or modified or removed:
+        write_changes(added, modified, removed)
+        print(f"变更清单已保存到 {CHANGES_FILE_PATH}")
+    return stats
 
 def get_installed_akshare_version():
     """
@@ -258,31 +431,42 @@ def generate_summary():
         print(f"摘要文件已生成: {summary_path}")
 
 
-def main():
+def main(argv=None):
     """
     主函数
+
+    默认增量更新；--full 清理全部接口文件后重新生成（旧行为），--force 忽略 ETag / Last-Modified 强制下载。
     """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='更新 AkShare API 文档')
+    parser.add_argument('--full', action='store_true', help='清理全部接口文件后重新生成')
+    parser.add_argument('--force', action='store_true', help='忽略 ETag / Last-Modified，强制下载')
+    args = parser.parse_args([] if argv is None else argv)
+
     print("=" * 50)
     print("AkShare API 文档更新工具")
     print("=" * 50)
     
-    # 清理旧文件
-    clean_old_files()
+    if args.full:
+        # 清理旧文件
+        clean_old_files()
+        if MANIFEST_FILE_PATH.exists():
+            MANIFEST_FILE_PATH.unlink()
     
     # 处理API文档
-    success = process_api_docs()
+    stats = process_api_docs(force=args.force or args.full)
     
-    if success:
-        # 生成摘要
-        generate_summary()
+    if stats is not None:
+        # 有变化时才重新生成摘要
+        if stats['added'] or stats['modified'] or stats['removed']:
+            generate_summary()
         print("\n✅ API文档更新完成！")
         return True
     else:
         print("\n❌ API文档更新失败！")
         return False
-    
-    print("=" * 50)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main(sys.argv[1:])
@@ -7,6 +7,7 @@ CURRENT_DIR = Path(__file__).parent
 PROJECT_ROOT = CURRENT_DIR.parent
 APIS_DIR = PROJECT_ROOT / 'apis'
 MANIFEST_FILE = APIS_DIR / 'manifest.json'
+CHANGES_FILE = APIS_DIR / 'changes.json'  # apis_update.py 写入的变更清单
 OUTPUT_FILE = PROJECT_ROOT / 'docs' / 'skills.json'
 
 def parse_table_row(row_line):
@@ -142,7 +143,56 @@ def parse_api_file(file_path):
     
     return tool_def
 
-def main():
+def load_changes():
+    """
+    读取 apis_update.py 写入的变更清单
+
+    Returns:
+        dict: 待处理的变更 {'added', 'modified', 'removed', ...}；清单不存在或已处理过时返回 None
+    """
+    if not CHANGES_FILE.exists():
+        return None
+    try:
+        with open(CHANGES_FILE, 'r', encoding='utf-8') as f:
+            changes = json.load(f)
+    except (IOError, ValueError):
+        return None
+    return changes if changes.get('pending') else None
+
+
+def mark_changes_done():
+    """标记变更清单已处理，下一次 apis_update.py 不再合并这些变更"""
+    try:
+        with open(CHANGES_FILE, 'r', encoding='utf-8') as f:
+            changes = json.load(f)
+    except (IOError, ValueError):
+        return
+    changes['pending'] = False
+    with open(CHANGES_FILE, 'w', encoding='utf-8') as f:
+        json.dump(changes, f, ensure_ascii=False, indent=4)
+
+
+def build_skill(interface_name, file_path):
+    """解析单个接口文件，生成 skill 定义"""
+    tool_def = parse_api_file(file_path)
+    # 设置函数名
+    tool_def['function']['name'] = interface_name
+    return tool_def
+
+
+def main(argv=None):
+    """
+    生成 docs/skills.json
+
+    apis/changes.json 有待处理的变更且 skills.json 已存在时增量生成：只重新解析新增和修改的接口，
+    删除已移除的接口，其余沿用现有定义。--full 或没有变更清单时全量生成。
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description='生成 Skills 定义')
+    parser.add_argument('--full', action='store_true', help='忽略变更清单，全量生成')
+    args = parser.parse_args([] if argv is None else argv)
+
     if not MANIFEST_FILE.exists():
         print(f"Error: Manifest file not found at {MANIFEST_FILE}")
         return
@@ -150,23 +200,39 @@ def main():
     with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
         manifest = json.load(f)
 
-    skills = []
-    
     print(f"Found {len(manifest)} APIs in manifest.")
-    
+
+    changes = None if args.full else load_changes()
+    if not args.full and changes is None and CHANGES_FILE.exists() and OUTPUT_FILE.exists():
+        print(f"No pending changes in {CHANGES_FILE}, {OUTPUT_FILE} is up to date.")
+        return
+
+    # 没有现有定义时所有接口都会重新解析，即全量生成
+    existing = {}
+    if changes is not None and OUTPUT_FILE.exists():
+        with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
+            existing = {skill['function']['name']: skill for skill in json.load(f)}
+
+    changed = set(changes.get('added', [])) | set(changes.get('modified', [])) if changes else set()
+    skills = []
+    regenerated = 0
+
     for api in manifest:
         interface_name = api['interface_name']
         file_path = APIS_DIR / api['file']
+
+        # 增量模式下未变化的接口沿用现有定义
+        if changes is not None and interface_name not in changed and interface_name in existing:
+            skills.append(existing[interface_name])
+            continue
         
         if not file_path.exists():
             print(f"Warning: File not found for {interface_name}: {file_path}")
             continue
             
         try:
-            tool_def = parse_api_file(file_path)
-            # 设置函数名
-            tool_def['function']['name'] = interface_name
-            skills.append(tool_def)
+            skills.append(build_skill(interface_name, file_path))
+            regenerated += 1
         except Exception as e:
             print(f"Error parsing {interface_name}: {e}")
 
@@ -175,8 +241,14 @@ def main():
     
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
         json.dump(skills, f, ensure_ascii=False, indent=2)
+
+    if changes is not None:
+        print(f"Regenerated {regenerated} changed APIs, removed {len(changes.get('removed', []))}.")
+    if CHANGES_FILE.exists():
+        mark_changes_done()
         
     print(f"Successfully generated skills for {len(skills)} APIs at {OUTPUT_FILE}")
 
 if __name__ == "__main__":
-    main()
+    import sys
+    main(sys.argv[1:])
@@ -0,0 +1,184 @@
+"""
+API 文档增量同步单元测试（离线，下载由假响应代替）
+"""
+
+import json
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import apis_update, generate_skills
+
+
+def block(name, desc, param='symbol'):
+    return f'''
+接口: {name}
+
+描述: {desc}
+
+输入参数
+
+| 名称 | 类型 | 描述 |
+|----|----|----|
+| {param} | str | {param}='000001' |
+'''
+
+
+DOC_V1 = '# 股票数据\n' + block('stock_a', 'A 接口') + block('stock_b', 'B 接口') + block('stock_c', 'C 接口')
+DOC_V2 = '# 股票数据\n' + block('stock_a', 'A 接口') + block('stock_b', 'B 接口', param='date') + block('stock_d', 'D 接口')
+
+
+class FakeResponse:
+    def __init__(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeServer:
+    """按 ETag 返回 200 / 304，记录请求头"""
+
+    def __init__(self, text, etag):
+        self.text, self.etag, self.requests = text, etag, []
+
+    def get(self, url, timeout=None, headers=None):
+        self.requests.append(dict(headers or {}))
+        if (headers or {}).get('If-None-Match') == self.etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.text, {'ETag': self.etag, 'Last-Modified': 'Sun, 18 Oct 2026 00:00:00 GMT'})
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    apis = tmp_path / 'apis'
+    for attr, sub in {'DATA_DIR': 'data', 'APIS_DIR': 'apis', 'CACHE_DIR': 'cache', 'DOCS_DIR': 'docs'}.items():
+        monkeypatch.setattr(apis_update, attr, tmp_path / sub)
+    monkeypatch.setattr(apis_update, 'PROJECT_ROOT', tmp_path)
+    monkeypatch.setattr(apis_update, 'SOURCE_FILE_PATH', tmp_path / 'data' / 'stock.md.txt')
+    monkeypatch.setattr(apis_update, 'MANIFEST_FILE_PATH', apis / 'manifest.json')
+    monkeypatch.setattr(apis_update, 'CHANGES_FILE_PATH', apis / 'changes.json')
+    monkeypatch.setattr(apis_update, 'VALIDATORS_FILE_PATH', tmp_path / 'cache' / 'validators.json')
+    monkeypatch.setattr(generate_skills, 'APIS_DIR', apis)
+    monkeypatch.setattr(generate_skills, 'MANIFEST_FILE', apis / 'manifest.json')
+    monkeypatch.setattr(generate_skills, 'CHANGES_FILE', apis / 'changes.json')
+    monkeypatch.setattr(generate_skills, 'OUTPUT_FILE', tmp_path / 'docs' / 'skills.json')
+    server = FakeServer(DOC_V1, '"v1"')
+    monkeypatch.setattr(apis_update.requests, 'get', server.get)
+    return tmp_path, server
+
+
+def read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TestMergeChanges:
+    """未处理的变更合并"""
+
+    def test_merge(self):
+        pending = {'added': ['a', 'b'], 'modified': ['c'], 'removed': ['d']}
+        merged = apis_update.merge_changes(pending, added=['d'], modified=['a'], removed=['b', 'c'])
+        assert merged == {'added': ['a'], 'modified': ['d'], 'removed': ['c']}
+
+    def test_no_pending(self):
+        assert apis_update.merge_changes(None, ['x'], [], ['y']) == {'added': ['x'], 'modified': [], 'removed': ['y']}
+
+
+class TestIncrementalUpdate:
+    """条件下载、按哈希重写、变更清单"""
+
+    def test_first_run_writes_all(self, tree):
+        root, server = tree
+        stats = apis_update.process_api_docs()
+        assert stats['added'] == ['stock_a', 'stock_b', 'stock_c']
+        manifest = read_json(root / 'apis' / 'manifest.json')
+        assert all(len(item['content_hash']) == 64 for item in manifest)
+        assert read_json(root / 'cache' / 'validators.json')['ETag'] == '"v1"'
+        assert server.requests == [{}]
+
+    def test_not_modified_rewrites_nothing(self, tree):
+        root, server = tree
+        apis_update.process_api_docs()
+        mtimes = {p.name: p.stat().st_mtime_ns for p in (root / 'apis').iterdir()}
+        os.utime(root / 'apis' / 'stock_a.txt', ns=(1, 1))
+
+        stats = apis_update.process_api_docs()
+        assert server.requests[-1]['If-None-Match'] == '"v1"'
+        assert server.requests[-1]['If-Modified-Since']
+        assert stats == {'added': [], 'modified': [], 'removed': [], 'unchanged': 3}
+        assert (root / 'apis' / 'stock_a.txt').stat().st_mtime_ns == 1
+        assert (root / 'apis' / 'manifest.json').stat().st_mtime_ns == mtimes['manifest.json']
+
+    def test_changed_blocks_only(self, tree):
+        root, server = tree
+        apis_update.process_api_docs()
+        os.utime(root / 'apis' / 'stock_a.txt', ns=(1, 1))
+        server.text, server.etag = DOC_V2, '"v2"'
+
+        stats = apis_update.process_api_docs()
+        assert stats['added'] == ['stock_d'] and stats['modified'] == ['stock_b'] and stats['removed'] == ['stock_c']
+        assert (root / 'apis' / 'stock_a.txt').stat().st_mtime_ns == 1
+        assert not (root / 'apis' / 'stock_c.txt').exists()
+        assert 'date' in (root / 'apis' / 'stock_b.txt').read_text(encoding='utf-8')
+
+    def test_missing_file_restored(self, tree):
+        root, _ = tree
+        apis_update.process_api_docs()
+        (root / 'apis' / 'stock_b.txt').unlink()
+        stats = apis_update.process_api_docs()
+        assert stats['modified'] == ['stock_b']
+        assert (root / 'apis' / 'stock_b.txt').exists()
+
+    def test_download_failure(self, tree, monkeypatch):
+        def fail(*args, **kwargs):
+            raise apis_update.requests.exceptions.ConnectionError('down')
+        monkeypatch.setattr(apis_update.requests, 'get', fail)
+        assert apis_update.process_api_docs() is None
+
+
+class TestIncrementalSkills:
+    """generate_skills.py 消费变更清单"""
+
+    def test_only_changed_regenerated(self, tree, monkeypatch):
+        root, server = tree
+        apis_update.process_api_docs()
+        generate_skills.main([])
+        skills_path = root / 'docs' / 'skills.json'
+        assert [s['function']['name'] for s in read_json(skills_path)] == ['stock_a', 'stock_b', 'stock_c']
+        assert read_json(root / 'apis' / 'changes.json')['pending'] is False
+
+        parsed = []
+        original = generate_skills.build_skill
+        monkeypatch.setattr(generate_skills, 'build_skill', lambda name, path: parsed.append(name) or original(name, path))
+        server.text, server.etag = DOC_V2, '"v2"'
+        apis_update.process_api_docs()
+        generate_skills.main([])
+
+        skills = {s['function']['name']: s for s in read_json(skills_path)}
+        assert sorted(parsed) == ['stock_b', 'stock_d']
+        assert list(skills) == ['stock_a', 'stock_b', 'stock_d']
+        assert 'date' in skills['stock_b']['function']['parameters']['properties']
+
+        # 没有新的变更时不再生成
+        parsed.clear()
+        generate_skills.main([])
+        assert parsed == []
+
+    def test_pending_changes_accumulate(self, tree):
+        root, server = tree
+        apis_update.process_api_docs()
+        server.text, server.etag = DOC_V2, '"v2"'
+        apis_update.process_api_docs()
+        changes = read_json(root / 'apis' / 'changes.json')
+        assert changes['pending'] is True
+        assert changes['added'] == ['stock_a', 'stock_b', 'stock_d']
+        assert changes['removed'] == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,54 @@
+"""
+基准测试运行器单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.runner import (
+    BenchResult, measure, save_history, load_history, save_baseline, load_baseline, compare_to_baseline,
+)
+
+
+def _result(name, median_ms):
+    return BenchResult(name=name, suite='cache', median_ms=median_ms, p95_ms=median_ms,
+                       min_ms=median_ms, mean_ms=median_ms, samples=5)
+
+
+class TestBenchRunner:
+    """计时、历史和基线对比测试"""
+
+    def test_measure_counts_samples_and_throughput(self):
+        calls = []
+        result = measure('noop', 'cache', lambda: calls.append(1), repeat=5, warmup=2, ops_per_call=10)
+
+        assert len(calls) == 7
+        assert result.samples == 5
+        assert result.min_ms <= result.median_ms <= result.p95_ms
+        assert result.ops_per_sec > 0
+
+    def test_history_appends_runs(self, tmp_path):
+        history = tmp_path / 'history.jsonl'
+        save_history([_result('get', 1.0)], history)
+        save_history([_result('get', 1.1)], history)
+
+        runs = load_history(history)
+        assert len(runs) == 2
+        assert runs[1]['results'][0]['median_ms'] == 1.1
+
+    def test_regression_flagged_above_threshold(self, tmp_path):
+        baseline_file = tmp_path / 'baseline.json'
+        save_baseline([_result('get', 1.0), _result('set', 1.0)], baseline_file)
+
+        regressions = compare_to_baseline([_result('get', 1.5), _result('set', 1.1), _result('new', 9.0)],
+                                          load_baseline(baseline_file), threshold=0.2)
+
+        assert [r['name'] for r in regressions] == ['cache.get']
+        assert regressions[0]['change_ratio'] == 0.5
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
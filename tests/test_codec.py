@@ -0,0 +1,72 @@
+"""
+JSON 编解码单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra import codec
+
+
+class TestCodec:
+    """codec 测试"""
+
+    def test_roundtrip_keeps_chinese(self):
+        data = {'name': '贵州茅台', 'annual_data': [{'year': 2024, 'roe': 30.5}]}
+
+        raw = codec.dumps(data)
+
+        assert isinstance(raw, bytes)
+        assert '贵州茅台'.encode('utf-8') in raw
+        assert codec.loads(raw) == data
+        assert codec.loads(raw.decode('utf-8')) == data
+
+    def test_invalid_json_raises_decode_error(self):
+        with pytest.raises(codec.DecodeError):
+            codec.loads(b'{broken')
+
+    def test_records_to_columns(self):
+        records = [{'a': 1, 'b': 2}, {'a': 3, 'b': 4}]
+        assert codec.records_to_columns(records) == {'a': [1, 3], 'b': [2, 4]}
+
+    def test_records_to_columns_with_ragged_records(self):
+        records = [{'a': 1}, {'b': 2, 'a': 3}]
+        assert codec.records_to_columns(records) == {'a': [1, 3], 'b': [None, 2]}
+
+
+@pytest.fixture(params=['json', 'orjson', 'msgspec'])
+def backend(request, monkeypatch):
+    """依次以各后端重新加载 codec（未安装的后端跳过）"""
+    import importlib
+    if request.param != 'json':
+        pytest.importorskip(request.param)
+    monkeypatch.setenv('AKSHARE_JSON_BACKEND', request.param)
+    module = importlib.reload(codec)
+    assert module.BACKEND == request.param
+    yield module
+    monkeypatch.delenv('AKSHARE_JSON_BACKEND')
+    importlib.reload(codec)
+
+
+class TestNonFinite:
+    """NaN / ±inf 在各后端都写成 null"""
+
+    def test_roundtrip_to_none(self, backend):
+        np = pytest.importorskip('numpy')
+        data = {'roe': float('nan'), 'pe': [float('inf'), -float('inf'), 1.5], 'pb': np.float64('nan')}
+        raw = backend.dumps(data, default=backend.json_default)
+        assert backend.loads(raw) == {'roe': None, 'pe': [None, None, 1.5], 'pb': None}
+
+    def test_plain_payload_unchanged(self, backend):
+        assert backend.loads(backend.dumps({'a': (1, 2.5), 'b': '中文'})) == {'a': [1, 2.5], 'b': '中文'}
+
+    def test_stdlib_reads_legacy_nan(self, monkeypatch):
+        monkeypatch.setattr(codec, 'BACKEND', 'json')
+        assert codec.loads('{"a": NaN, "b": Infinity}') == {'a': None, 'b': None}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,114 @@
+"""
+延迟分布与回归检测单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+import random
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qa import comparator
+from qa.comparator import analyze_latency, mann_whitney_u, percentile, theil_sen_slope
+from qa.result_store import ResultStore
+
+
+def _history(days, per_day, base, last=None, seed=7):
+    """构造 days 天的采样：每天一轮 per_day 次采样，最后一轮中位数为 last"""
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=days)
+    rows = []
+    for d in range(days):
+        center = last if (last is not None and d == days - 1) else base
+        rows.append({'run_id': f'r{d}', 'tested_at': (start + timedelta(days=d)).isoformat(timespec='seconds'),
+                     'samples': [int(center * rng.uniform(0.9, 1.1)) for _ in range(per_day)]})
+    return rows
+
+
+class TestStatistics:
+    """分位数、Mann-Whitney、Theil-Sen"""
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == pytest.approx(50.5)
+        assert percentile(values, 99) == pytest.approx(99.01)
+        assert percentile([], 50) is None
+
+    def test_mann_whitney(self):
+        _, p_same = mann_whitney_u([10, 11, 12, 13, 14], [10, 11, 12, 13, 14])
+        _, p_shift = mann_whitney_u([30, 31, 32, 33, 34, 35], [10, 11, 12, 13, 14, 15])
+        assert p_same > 0.5 and p_shift < 0.01
+
+    def test_theil_sen_ignores_outlier(self):
+        points = [(0, 100), (1, 110), (2, 120), (3, 5000), (4, 140)]
+        assert theil_sen_slope(points) == pytest.approx(10)
+
+
+class TestAnalyzeLatency:
+    """多日历史的回归检测"""
+
+    def test_regression_detected_with_samples(self):
+        analysis = analyze_latency({'slow_api': _history(10, 3, 400, last=1200),
+                                    'steady_api': _history(10, 3, 400)})
+        assert [r['api'] for r in analysis['regressions']] == ['slow_api']
+        assert analysis['regressions'][0]['p_value'] < comparator.ALPHA
+        steady = analysis['apis']['steady_api']
+        assert steady['current']['n'] == 3 and steady['baseline']['n'] == 27
+        assert not steady['shift']['significant']
+
+    def test_single_noisy_sample_not_flagged(self):
+        # 单次采样翻倍但在基线抖动范围内（旧规则会报告 >50% 变化）
+        rows = [{'run_id': f'r{i}', 'tested_at': f'2026-01-{i + 1:02d}T02:00:00', 'samples': [v]}
+                for i, v in enumerate([300, 700, 250, 650, 320, 680])]
+        assert analyze_latency({'api': rows})['regressions'] == []
+
+    def test_historical_run_baseline_excludes_later_runs(self):
+        rows = _history(10, 3, 400)
+        for row in rows[4:]:
+            row['samples'] = [v * 3 for v in row['samples']]
+        analysis = analyze_latency({'api': rows}, run_id='r3')
+        assert analysis['apis']['api']['baseline']['n'] == 9
+        assert analysis['improvements'] == [] and analysis['regressions'] == []
+
+    def test_scheduled_rounds_excluded_from_baseline(self):
+        rows = _history(6, 3, 400)
+        # 每轮巡检一小时后的调度轮次，只探测易失败的慢接口
+        flaky = [{'run_id': f'sched-{i}',
+                  'tested_at': (datetime.fromisoformat(row['tested_at']) + timedelta(hours=1)).isoformat(),
+                  'samples': [3000, 3100, 2900], 'kind': 'scheduled'} for i, row in enumerate(rows[:-1])]
+        history = {'api': sorted(rows + flaky, key=lambda r: r['tested_at'])}
+        analysis = analyze_latency(history)
+        entry = analysis['apis']['api']
+        assert entry['current']['n'] == 3 and entry['baseline']['n'] == 15
+        assert analysis['improvements'] == []
+
+    def test_compare_reports_uses_samples(self):
+        today = {'apis': {'a': {'status': 'success', 'response_time_ms': 900},
+                          'b': {'status': 'success', 'latency_samples_ms': [2000, 2100, 1900]}}}
+        yesterday = {'apis': {'a': {'status': 'success', 'response_time_ms': 500},
+                              'b': {'status': 'success', 'latency_samples_ms': [500, 520, 480, 510, 490, 505]}}}
+        changes = comparator.compare_reports(today, yesterday)
+        assert [c['api'] for c in changes['performance_changed']] == ['b']
+
+    def test_from_result_store(self, tmp_path):
+        store = ResultStore(str(tmp_path / 'results.db'))
+        for row in _history(7, 3, 300, last=900):
+            store.start_run(run_id=row['run_id'])
+            store.append(row['run_id'], {'api_name': 'x', 'status': 'success', 'response_time_ms': 1,
+                                         'latency_samples_ms': row['samples']}, tested_at=row['tested_at'])
+        store = ResultStore(str(tmp_path / 'results.db'))
+        store.start_run(run_id='sched-1', kind='scheduled')
+        store.append('sched-1', {'api_name': 'x', 'status': 'success', 'response_time_ms': 1,
+                                 'latency_samples_ms': [5000, 5000, 5000]})
+        assert store.latency_history(30)['x'][-1]['kind'] == 'scheduled'
+        store.close()
+        analysis = comparator.load_latency_analysis(str(tmp_path / 'results.db'), days=30)
+        assert analysis['regressions'][0]['api'] == 'x'
+        assert analysis['apis']['x']['baseline']['n'] == 18
+        assert '显著变慢' in comparator.generate_latency_summary(analysis)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
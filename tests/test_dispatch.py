@@ -0,0 +1,188 @@
+"""
+通用调度与上游限流单元测试（离线，使用替身 AkShare 函数）
+"""
+
+import pytest
+import sys
+import os
+import json
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from akshare_service.infra.cache import LocalCache
+from akshare_service.infra.upstreams import UpstreamLimiter, upstream_of
+from akshare_service.service import dispatch
+from akshare_service.service.dispatch import (
+    Catalog, Dispatcher, InvalidArgumentsError, UnknownApiError, ttl_class_of, args_hash
+)
+
+
+TOOLS = [
+    {'type': 'function', 'function': {
+        'name': 'stock_zh_a_hist', 'description': '东方财富网-行情首页-沪深京 A 股-每日行情',
+        'parameters': {'type': 'object', 'required': ['symbol'], 'properties': {
+            'symbol': {'type': 'string'},
+            'period': {'type': 'string', 'enum': ['daily', 'weekly', 'monthly']},
+            'adjust': {'type': 'string', 'enum': ['', 'qfq', 'hfq']},
+        }}}},
+    {'type': 'function', 'function': {
+        'name': 'stock_board_change_em', 'description': '东方财富-板块异动',
+        'parameters': {'type': 'object', 'required': [], 'properties': {
+            'symbol': {'type': 'string', 'enum': ['全部', '具体股票代码']},
+            'top': {'type': 'integer'},
+        }}}},
+]
+
+upstream_calls = []
+
+
+def stock_zh_a_hist(symbol: str = '000001', period: str = 'daily', adjust: str = ''):
+    upstream_calls.append((symbol, period, adjust))
+    time.sleep(0.05)
+    return pd.DataFrame({'日期': pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-04']),
+                         '收盘': [10.0, 10.5, None]})
+
+
+def stock_board_change_em(symbol: str = '全部', top: int = 10):
+    return pd.DataFrame()
+
+
+@pytest.fixture
+def dispatcher(tmp_path, monkeypatch):
+    path = tmp_path / 'skills.json'
+    path.write_text(json.dumps(TOOLS, ensure_ascii=False), encoding='utf-8')
+    monkeypatch.setattr(dispatch, 'ak', SimpleNamespace(stock_zh_a_hist=stock_zh_a_hist,
+                                                       stock_board_change_em=stock_board_change_em))
+    upstream_calls.clear()
+    return Dispatcher(Catalog(str(path)), LocalCache(cache_dir=str(tmp_path / 'cache')))
+
+
+class TestValidation:
+    """schema 校验与参数规范化"""
+
+    def test_unknown_and_missing(self, dispatcher):
+        with pytest.raises(UnknownApiError):
+            dispatcher.call('stock_nope', {})
+        with pytest.raises(InvalidArgumentsError, match='缺少必填参数'):
+            dispatcher.call('stock_zh_a_hist', {})
+        with pytest.raises(InvalidArgumentsError, match='不支持参数'):
+            dispatcher.call('stock_zh_a_hist', {'symbol': '600519', 'ticker': 'x'})
+
+    def test_enum_and_types(self, dispatcher):
+        with pytest.raises(InvalidArgumentsError, match='取值'):
+            dispatcher.call('stock_zh_a_hist', {'symbol': '600519', 'period': 'yearly'})
+        # 说明文字式的枚举不做严格校验
+        assert dispatcher.catalog.validate('stock_board_change_em', {'symbol': '600519', 'top': '5'}) == \
+            {'symbol': '600519', 'top': 5}
+        assert dispatcher.catalog.validate('stock_zh_a_hist', {'symbol': 600519}) == {'symbol': '600519'}
+        with pytest.raises(InvalidArgumentsError):
+            dispatcher.catalog.validate('stock_board_change_em', {'top': 'many'})
+
+
+class TestDispatch:
+    """缓存、列式输出与并发"""
+
+    def test_columnar_output_and_cache(self, dispatcher):
+        first = dispatcher.call('stock_zh_a_hist', {'symbol': '600519'})
+        assert first['cached'] is False
+        assert first['columns'] == ['日期', '收盘']
+        assert first['data']['收盘'] == [10.0, 10.5, None]
+        assert first['data']['日期'][0].startswith('2024-01-02')
+        assert first['ttl_class'] == 'daily' and first['upstream'] == 'eastmoney'
+
+        # 显式写出默认值、调整参数顺序后仍命中同一缓存
+        second = dispatcher.call('stock_zh_a_hist', {'adjust': '', 'period': 'daily', 'symbol': ' 600519 '},
+                                 max_rows=2)
+        assert second['cached'] is True
+        assert second['truncated'] is True and len(second['data']['收盘']) == 2
+        assert len(upstream_calls) == 1
+
+    def test_empty_result_not_cached(self, dispatcher):
+        assert dispatcher.call('stock_board_change_em')['rows'] == 0
+        assert dispatcher.call('stock_board_change_em')['cached'] is False
+
+    def test_concurrent_identical_calls_hit_upstream_once(self, dispatcher):
+        threads = [threading.Thread(target=dispatcher.call, args=('stock_zh_a_hist', {'symbol': '000001'}))
+                   for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(upstream_calls) == 1
+
+    def test_args_hash_is_order_independent(self):
+        assert args_hash({'a': 1, 'b': '2'}) == args_hash({'b': '2', 'a': 1})
+
+
+class TestUpstreams:
+    """上游识别与限流"""
+
+    def test_upstream_and_ttl_classes(self):
+        assert upstream_of('stock_zh_a_spot_em') == 'eastmoney'
+        assert upstream_of('stock_zh_a_minute', '新浪财经-沪深京 A 股') == 'sina'
+        assert upstream_of('stock_info_a_code_name') == 'other'
+        assert ttl_class_of('stock_zh_a_spot_em') == 'realtime'
+        assert ttl_class_of('stock_info_a_code_name') == 'static'
+        assert ttl_class_of('stock_yjbb_em') == 'report'
+        assert ttl_class_of('stock_zh_a_hist') == 'daily'
+
+    def test_limiter_bounds_concurrency(self):
+        limiter = UpstreamLimiter(limits={'ths': 2})
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def work():
+            with limiter.acquire('ths'):
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.05)
+                with lock:
+                    active[0] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert peak[0] == 2
+
+    def test_limiter_min_interval(self):
+        limiter = UpstreamLimiter(limits={'sina': 4}, min_interval={'sina': 0.05})
+        started = time.perf_counter()
+        for _ in range(3):
+            with limiter.acquire('sina'):
+                pass
+        assert time.perf_counter() - started >= 0.09
+
+
+class TestServerRouting:
+    """常驻服务中的 ak.* 方法"""
+
+    def test_ak_methods(self, dispatcher, monkeypatch):
+        from akshare_service.service.server import SkillServer, INVALID_PARAMS, METHOD_NOT_FOUND
+
+        monkeypatch.setattr(dispatch, '_dispatcher_instance', dispatcher)
+        server = SkillServer({})
+        response = asyncio.run(server.dispatch([
+            {'jsonrpc': '2.0', 'id': 1, 'method': 'ak.stock_zh_a_hist',
+             'params': {'symbol': '600519', 'max_rows': 1}},
+            {'jsonrpc': '2.0', 'id': 2, 'method': 'ak.stock_zh_a_hist', 'params': {'period': 'daily'}},
+            {'jsonrpc': '2.0', 'id': 3, 'method': 'ak.stock_nope'},
+            {'jsonrpc': '2.0', 'id': 4, 'method': 'ak.list', 'params': {'prefix': 'stock_board'}},
+        ]))
+        by_id = {r['id']: r for r in response}
+        assert by_id[1]['result']['rows'] == 3 and by_id[1]['result']['truncated'] is True
+        assert by_id[2]['error']['code'] == INVALID_PARAMS
+        assert by_id[3]['error']['code'] == METHOD_NOT_FOUND
+        assert [f['name'] for f in by_id[4]['result']] == ['stock_board_change_em']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,92 @@
+"""
+东方财富分页生成器单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.crawlers.eastmoney_api import EastMoneyAPI, EastMoneyRequestError
+
+
+class FakeEastMoneyAPI(EastMoneyAPI):
+    """按页返回固定数据，记录请求参数"""
+
+    def __init__(self, total_rows: int, failing_pages=()):
+        super().__init__()
+        self.total_rows = total_rows
+        self.failing_pages = set(failing_pages)
+        self.requests = []
+
+    def _request(self, params, strict=False):
+        self.requests.append(params)
+        if params['pageNumber'] in self.failing_pages:
+            if strict:
+                raise EastMoneyRequestError('timeout', pages=[params['pageNumber']])
+            return None
+        size = params['pageSize']
+        start = (params['pageNumber'] - 1) * size
+        rows = [{'SECURITY_CODE': f'{i:06d}'} for i in range(start, min(start + size, self.total_rows))]
+        pages = (self.total_rows + size - 1) // size
+        return {'pages': pages, 'count': self.total_rows, 'data': rows} if rows else None
+
+
+class TestIterReport:
+    """iter_report 测试"""
+
+    def test_reads_all_pages(self):
+        api = FakeEastMoneyAPI(total_rows=25)
+
+        chunks = list(api.iter_report('indicator', page_size=10))
+
+        assert [len(c) for c in chunks] == [10, 10, 5]
+        assert api.requests[0]['reportName'] == 'RPT_LICO_FN_CPD'
+        assert 'filter' not in api.requests[0]
+
+    def test_early_termination_stops_paging(self):
+        api = FakeEastMoneyAPI(total_rows=1000)
+
+        for i, record in enumerate(api.iter_report('RPT_LICO_FN_CPD', page_size=10, as_records=True)):
+            if i == 14:
+                break
+
+        assert len(api.requests) == 2
+
+    def test_max_rows(self):
+        api = FakeEastMoneyAPI(total_rows=100)
+
+        df = api.read_report('indicator', filter='(REPORTDATE=\'2025-12-31\')', page_size=10, max_rows=23)
+
+        assert len(df) == 23
+        assert len(api.requests) == 3
+
+    def test_failed_page_raises(self):
+        api = FakeEastMoneyAPI(total_rows=50, failing_pages=[3])
+
+        received = []
+        with pytest.raises(EastMoneyRequestError) as info:
+            for chunk in api.iter_report('indicator', page_size=10):
+                received.append(len(chunk))
+
+        assert received == [10, 10]
+        assert info.value.pages == [3]
+        with pytest.raises(EastMoneyRequestError):
+            api.read_report('indicator', page_size=10)
+
+    def test_request_failure_after_retries(self, monkeypatch):
+        api = EastMoneyAPI(max_retries=1)
+
+        def fail(*args, **kwargs):
+            raise ConnectionError('远程主机关闭连接')
+
+        monkeypatch.setattr(api.session, 'get', fail)
+        assert api._request({'reportName': 'RPT_LICO_FN_CPD', 'pageNumber': 2}) is None
+        with pytest.raises(EastMoneyRequestError) as info:
+            api._request({'reportName': 'RPT_LICO_FN_CPD', 'pageNumber': 2}, strict=True)
+        assert info.value.pages == [2]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,85 @@
+"""
+结构指纹与结构变更检测单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qa import comparator
+from qa.fingerprint import diff_fingerprints, rows_bucket, schema_fingerprint
+from qa.result_store import ResultStore
+
+
+def _frame(rows=50, **overrides):
+    data = {'代码': [f'{i:06d}' for i in range(rows)], '最新价': [float(i) for i in range(rows)],
+            '成交量': list(range(rows))}
+    data.update(overrides)
+    return pd.DataFrame(data)
+
+
+class TestFingerprint:
+    """指纹计算"""
+
+    def test_fields(self):
+        fp = schema_fingerprint(_frame(rows=50, 最新价=[None] * 25 + [1.0] * 25))
+        assert fp['columns'] == ['代码', '最新价', '成交量']
+        assert fp['dtypes']['成交量'] == 'int64'
+        assert fp['null_ratios']['最新价'] == 0.5
+        assert fp['rows_bucket'] == '11-100'
+        assert rows_bucket(0) == '0' and rows_bucket(5000) == '1k-10k' and rows_bucket(10 ** 6) == '>100k'
+
+    def test_digest_stable_across_values_and_row_count(self):
+        assert schema_fingerprint(_frame(40))['digest'] == schema_fingerprint(_frame(60))['digest']
+        assert schema_fingerprint(_frame(40))['digest'] != schema_fingerprint(_frame(400))['digest']
+
+    def test_dict_and_list(self):
+        assert schema_fingerprint({'a': 1, 'b': None})['null_ratios'] == {'a': 0.0, 'b': 1.0}
+        assert schema_fingerprint([{'a': 1}, {'a': None}])['null_ratios'] == {'a': 0.5}
+
+
+class TestDiff:
+    """指纹对比"""
+
+    def test_changes(self):
+        old = schema_fingerprint(_frame())
+        new = schema_fingerprint(_frame()[['成交量', '代码']].assign(成交量=lambda d: d['成交量'].astype(str),
+                                                                      换手率=[None] * 50))
+        diff = diff_fingerprints(old, new)
+        assert diff['removed_fields'] == ['最新价'] and diff['added_fields'] == ['换手率']
+        assert diff['dtype_changed']['成交量'][0] == 'int64'
+        assert diff['order_changed'] is True
+        assert diff_fingerprints(old, schema_fingerprint(_frame(70))) is None
+
+    def test_column_becomes_empty(self):
+        old = schema_fingerprint(_frame(20, 最新价=[None] * 2 + [1.0] * 18))
+        new = schema_fingerprint(_frame(20, 最新价=[None] * 20))
+        assert diff_fingerprints(old, new)['null_ratio_changed'] == {'最新价': [0.1, 1.0]}
+
+    def test_store_diff_reads_only_fingerprints(self, tmp_path):
+        store = ResultStore(str(tmp_path / 'results.db'))
+        for run_id, frame in (('r1', _frame()), ('r2', _frame().drop(columns=['成交量']))):
+            store.start_run(run_id=run_id)
+            store.append(run_id, {'api_name': 'x', 'status': 'success', 'schema': schema_fingerprint(frame),
+                                  'sample_data': [{'big': 'payload'}]})
+            store.append(run_id, {'api_name': 'y', 'status': 'success', 'schema': schema_fingerprint(_frame())})
+        assert store.previous_run('r2') == 'r1'
+        store.close()
+        diff = comparator.load_schema_diff(str(tmp_path / 'results.db'))
+        assert diff['previous_run_id'] == 'r1'
+        assert [(c['api'], c['removed_fields']) for c in diff['structure_changed']] == [('x', ['成交量'])]
+
+    def test_compare_reports_with_fingerprints(self):
+        today = {'apis': {'x': {'status': 'success', 'sample_keys': ['a'], 'schema': schema_fingerprint(_frame(500))}}}
+        yesterday = {'apis': {'x': {'status': 'success', 'sample_keys': ['a'], 'schema': schema_fingerprint(_frame())}}}
+        changes = comparator.compare_reports(today, yesterday)
+        assert changes['structure_changed'][0]['rows_bucket'] == ['11-100', '101-1k']
+        assert '行数量级' in comparator.generate_change_summary(changes)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
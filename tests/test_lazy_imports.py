@@ -0,0 +1,55 @@
+"""
+延迟导入单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+import json
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra.lazy import LazyModule, lazy_import
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_after(statement: str):
+    """在子进程中执行导入语句，返回已加载的重依赖"""
+    code = (f"import sys, json\n{statement}\n"
+            "print(json.dumps([m for m in ('akshare', 'tushare', 'pandas') if m in sys.modules]))")
+    output = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestLazyImports:
+    """冷启动不加载重依赖"""
+
+    @pytest.mark.parametrize('statement', [
+        'import akshare_service.skills',
+        'from akshare_service.skills import get_financial_summary, calculate_roic, get_valuation_data',
+        'import akshare_service.crawlers, akshare_service.routers, akshare_service.adapters',
+    ])
+    def test_import_does_not_load_heavy_modules(self, statement):
+        assert _loaded_after(statement) == []
+
+    def test_lazy_module_loads_on_first_attribute(self):
+        module = LazyModule('json')
+        assert 'not loaded' in repr(module)
+        assert module.dumps([1]) == '[1]'
+        assert 'not loaded' not in repr(module)
+
+    def test_lazy_import_returns_loaded_module(self):
+        assert lazy_import('os') is os
+
+    def test_skills_getattr(self):
+        import akshare_service.skills as skills
+        assert callable(skills.get_cashflow_data)
+        with pytest.raises(AttributeError):
+            skills.not_a_skill
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
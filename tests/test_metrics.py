@@ -0,0 +1,109 @@
+"""
+指标采集与结构化事件单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+import json
+import logging
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra import events, metrics
+from akshare_service.infra.cache import LocalCache
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.get_registry().reset()
+    yield
+    metrics.get_registry().reset()
+
+
+class TestMetrics:
+    """计数器、直方图和导出格式测试"""
+
+    def test_track_source_records_outcome(self):
+        with metrics.track_source('financial_summary', 'eastmoney') as attempt:
+            attempt.outcome = 'empty'
+        with pytest.raises(RuntimeError):
+            with metrics.track_source('financial_summary', 'sina'):
+                raise RuntimeError('boom')
+
+        registry = metrics.get_registry()
+        labels = dict(skill='financial_summary', market='A股')
+        assert registry.counter_value('akshare_source_attempts_total', source='eastmoney',
+                                      outcome='empty', **labels) == 1
+        assert registry.counter_value('akshare_source_attempts_total', source='sina',
+                                      outcome='error', **labels) == 1
+        hist = registry.histogram('akshare_source_duration_seconds', source='eastmoney',
+                                  outcome='empty', **labels)
+        assert hist.count == 1
+
+    def test_track_skill_reads_market_argument(self):
+        @metrics.track_skill('roic')
+        def calculate(market, code):
+            return code
+
+        assert calculate('港股', '00700') == '00700'
+        assert metrics.get_registry().counter_value(
+            'akshare_skill_calls_total', skill='roic', market='港股', outcome='success') == 1
+
+    def test_cache_lookups_tagged_by_namespace(self, tmp_path):
+        cache = LocalCache(cache_dir=str(tmp_path))
+        cache.get('financial_summary:600519:5')
+        cache.set('financial_summary:600519:5', {'a': 1})
+        cache.get('financial_summary:600519:5')
+
+        registry = metrics.get_registry()
+        for outcome in ('miss', 'hit'):
+            assert registry.counter_value('akshare_cache_requests_total', op='get',
+                                          namespace='financial_summary', outcome=outcome) == 1
+
+    def test_prometheus_text_format(self):
+        metrics.record_fallback('cashflow', 'eastmoney', 'sina')
+        metrics.observe('akshare_upstream_request_seconds', 0.3, upstream='eastmoney', outcome='success')
+
+        text = metrics.render_prometheus()
+        assert '# TYPE akshare_fallback_total counter' in text
+        assert ('akshare_fallback_total{from_source="eastmoney",market="A股",skill="cashflow",'
+                'to_source="sina"} 1') in text
+        assert 'akshare_upstream_request_seconds_bucket{outcome="success",upstream="eastmoney",le="0.25"} 0' in text
+        assert 'akshare_upstream_request_seconds_bucket{outcome="success",upstream="eastmoney",le="0.5"} 1' in text
+        assert 'akshare_upstream_request_seconds_count{outcome="success",upstream="eastmoney"} 1' in text
+
+        openmetrics = metrics.render_prometheus(openmetrics=True)
+        assert '# TYPE akshare_fallback counter' in openmetrics
+        assert openmetrics.rstrip().endswith('# EOF')
+
+    def test_metrics_endpoint(self):
+        metrics.inc('akshare_skill_calls_total', skill='valuation', market='A股', outcome='success')
+        server = metrics.start_metrics_server(port=0, addr='127.0.0.1')
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            request = urllib.request.Request(url, headers={'Accept': 'application/openmetrics-text'})
+            with urllib.request.urlopen(request, timeout=5) as response:
+                body = response.read().decode('utf-8')
+                assert response.headers['Content-Type'].startswith('application/openmetrics-text')
+        finally:
+            server.shutdown()
+        assert 'skill="valuation"' in body
+
+
+class TestEvents:
+    """结构化事件测试"""
+
+    def test_emit_writes_json_line(self, caplog):
+        with caplog.at_level(logging.INFO, logger='akshare_service.events'):
+            events.emit('router.attempt', skill='financial_summary', source='eastmoney', code='600519')
+
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['event'] == 'router.attempt'
+        assert record['source'] == 'eastmoney'
+        assert 'ts' in record
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
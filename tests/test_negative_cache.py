@@ -0,0 +1,182 @@
+"""
+负缓存单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra import negative_cache
+from akshare_service.infra.cache import LocalCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    from akshare_service.infra import cache as cache_module
+    cache = LocalCache(cache_dir=str(tmp_path))
+    monkeypatch.setattr(cache_module, '_cache_instance', cache)
+    return cache
+
+
+class TestNegativeCache:
+    """记录、跳过与失效"""
+
+    def test_ttl_by_outcome(self, cache):
+        negative_cache.record('cashflow', 'sina', '600519', 'empty', ['现金流量表为空'])
+        negative_cache.record('cashflow', 'eastmoney', '600519', 'error', 'timeout')
+        negative_cache.record('cashflow', 'tushare', '600519', 'success')
+        assert cache.expires_in('negative:cashflow:sina:600519') > 3600
+        assert cache.expires_in('negative:cashflow:eastmoney:600519') <= 300
+        assert negative_cache.check('cashflow', 'tushare', '600519') is None
+        assert '现金流量表为空' in negative_cache.skip('cashflow', 'sina', '600519')
+
+    def test_invalidate_and_disable(self, cache, monkeypatch):
+        negative_cache.record('cashflow', 'sina', '600519', 'empty')
+        monkeypatch.setenv('AKSHARE_NEGATIVE_CACHE', 'off')
+        assert negative_cache.skip('cashflow', 'sina', '600519') is None
+        monkeypatch.delenv('AKSHARE_NEGATIVE_CACHE')
+        negative_cache.invalidate('cashflow', '600519', ['eastmoney', 'sina'])
+        assert negative_cache.check('cashflow', 'sina', '600519') is None
+
+    def test_guard(self, cache):
+        calls = []
+
+        @negative_cache.guard('financial_summary', 'hk_report_em', negative_cache.empty_report, market='港股')
+        def fetch(stock, years=5):
+            calls.append(stock)
+            if stock == 'flaky':
+                negative_cache.mark_error()
+                return {'code': stock, 'annual_data': [], 'errors': ['获取数据失败: timeout']}
+            return {'code': stock, 'annual_data': [], 'errors': ['利润表为空']}
+
+        fetch('00001')
+        result = fetch('00001')
+        assert calls == ['00001'] and result['negative_cached'] is True
+        fetch('flaky')
+        assert negative_cache.check('financial_summary', 'hk_report_em', 'flaky')['outcome'] == 'error'
+        assert negative_cache.check('financial_summary', 'hk_report_em', '00001')['outcome'] == 'empty'
+
+        # use_cache=False 不读写负缓存；refresh=True 不跳过，仍记录结果
+        fetch('00001', use_cache=False)
+        fetch('00001', refresh=True)
+        assert calls == ['00001', 'flaky', '00001', '00001']
+        fetch('00002', use_cache=False)
+        assert negative_cache.check('financial_summary', 'hk_report_em', '00002') is None
+
+
+class TestRouting:
+    """路由跳过已知无数据的数据源，成功的数据源清除自己（及相关 skill）的记录"""
+
+    def test_router_skips_known_bad_source(self, cache, monkeypatch):
+        from akshare_service.skills import cashflow
+
+        calls = []
+
+        def eastmoney(code, years):
+            calls.append('eastmoney')
+            return None, ['东方财富现金流量表为空']
+
+        def sina(code, years):
+            calls.append('sina')
+            return {'code': code, 'annual_data': [{'year': 2024}]}, []
+
+        monkeypatch.setattr(cashflow, '_get_cashflow_data_eastmoney', eastmoney)
+        monkeypatch.setattr(cashflow, '_get_cashflow_data_sina', sina)
+
+        cashflow.get_cashflow_data('600519', use_cache=True, cache_ttl=-1)
+        # sina 成功只清除 sina 自己的记录，eastmoney 的空结果按 empty TTL 保留
+        assert negative_cache.check('cashflow', 'eastmoney', '600519')['outcome'] == 'empty'
+        assert cache.expires_in('negative:cashflow:eastmoney:600519') > 3600
+        cashflow.get_cashflow_data('600519', max_stale=0)
+        assert calls == ['eastmoney', 'sina', 'sina']
+
+    def test_refresh_clears_failed_source(self, cache, monkeypatch):
+        from akshare_service.skills import financial_summary
+
+        calls = []
+
+        def eastmoney(code, years, fetch_name):
+            calls.append('eastmoney')
+            return {'code': code, 'annual_data': [{'year': 2024}]}, []
+
+        monkeypatch.setattr(financial_summary, '_get_financial_summary_eastmoney', eastmoney)
+        monkeypatch.setattr(financial_summary, '_get_financial_summary_sina',
+                            lambda code, years, fetch_name: ({'code': code, 'annual_data': [{'year': 2024}]}, []))
+        negative_cache.record('financial_summary', 'eastmoney', '600519', 'error', 'timeout')
+        negative_cache.record('cashflow', 'eastmoney', '600519', 'empty', '无数据')
+        negative_cache.record('calculate_roic', 'eastmoney', '600519', 'error', 'timeout')
+
+        # 普通调用跳过 eastmoney，由 sina 返回
+        assert financial_summary.get_financial_summary('600519', cache_ttl=-1)['source'] == 'AkShare.stock_financial_report_sina'
+        assert calls == []
+        # refresh 不跳过，eastmoney 成功后清除它在相关 skill 上的记录
+        assert financial_summary.get_financial_summary('600519', refresh=True)['source'] == 'EastMoney.API'
+        assert calls == ['eastmoney']
+        for skill in negative_cache.RELATED_SKILLS:
+            assert negative_cache.check(skill, 'eastmoney', '600519') is None
+
+    def test_router_empty_vs_error(self, cache, monkeypatch):
+        import pandas as pd
+        from akshare_service.skills import financial_summary
+
+        class FakeAk:
+            @staticmethod
+            def stock_financial_report_sina(stock, symbol):
+                return pd.DataFrame()
+
+            @staticmethod
+            def stock_profit_sheet_by_yearly_em(symbol):
+                raise ConnectionError('远程主机关闭连接')
+
+        monkeypatch.setattr(financial_summary, 'ak', FakeAk)
+        monkeypatch.setattr(financial_summary, 'REQUEST_INTERVAL', 0)
+        monkeypatch.setattr(financial_summary, '_get_financial_summary_eastmoney',
+                            lambda code, years, fetch_name: (None, ['东方财富财务指标为空']))
+        result = financial_summary.get_financial_summary('600519')
+        assert result['annual_data'] == []
+
+        sina = negative_cache.check('financial_summary', 'sina', '600519')
+        assert sina['outcome'] == 'empty' and '新浪利润表为空' in sina['reason']
+        assert cache.expires_in('negative:financial_summary:sina:600519') > 3600
+        assert negative_cache.check('financial_summary', 'eastmoney', '600519')['outcome'] == 'empty'
+        assert negative_cache.check('financial_summary', 'akshare_em', '600519')['outcome'] == 'error'
+        assert cache.expires_in('negative:financial_summary:akshare_em:600519') <= 300
+
+    def test_all_sources_known_bad(self, cache, monkeypatch):
+        from akshare_service.skills import financial_summary
+
+        def unexpected(*args):
+            raise AssertionError('不应访问上游')
+
+        for name in ('_get_financial_summary_eastmoney', '_get_financial_summary_sina',
+                     '_get_financial_summary_em'):
+            monkeypatch.setattr(financial_summary, name, unexpected)
+        for source in ('eastmoney', 'sina', 'akshare_em'):
+            negative_cache.record('financial_summary', source, '000000', 'empty', '无数据')
+        result = financial_summary.get_financial_summary('000000')
+        assert result['annual_data'] == [] and len(result['errors']) == 3
+
+    def test_roic_a_share_skips(self, cache, monkeypatch):
+        import pandas as pd
+        from akshare_service.skills import finance
+
+        calls = []
+        monkeypatch.setattr(finance, '_roic_eastmoney',
+                            lambda symbol, years: calls.append('eastmoney') or pd.DataFrame())
+        monkeypatch.setattr(finance, '_roic_akshare_em',
+                            lambda symbol, years: calls.append('akshare_em') or pd.DataFrame({'roic': [12.0]}))
+        finance.calculate_roic_a_share('600519')
+        assert negative_cache.check('calculate_roic', 'eastmoney', '600519')['outcome'] == 'empty'
+        df = finance.calculate_roic_a_share('600519')
+        assert calls == ['eastmoney', 'akshare_em', 'akshare_em']
+        assert df['roic'].tolist() == [12.0]
+
+        # use_cache=False 直接访问全部数据源
+        finance.calculate_roic('A股', '600519', use_cache=False)
+        assert calls[-2:] == ['eastmoney', 'akshare_em']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,108 @@
+"""
+探测参数合成单元测试（离线）
+"""
+
+import json
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qa import test_apis
+from qa.param_synth import ParamSynth, parse_example_calls, parse_input_params
+from qa.result_store import ResultStore
+
+DOC = '''接口: stock_demo_em
+
+输入参数
+
+| 名称     | 类型  | 描述                                                   |
+|--------|-----|------------------------------------------------------|
+| symbol | str | symbol='00700'; 港股代码                                 |
+| period | str | choice of {'daily', 'weekly'}                        |
+| market | str | 市场                                                   |
+| timeout | float | timeout=None; 默认不设置超时参数                      |
+
+输出参数
+
+接口示例
+
+```python
+import akshare as ak
+
+df = ak.stock_demo_em(symbol="09988", period='weekly', timeout=3)
+df = ak.stock_demo_em(symbol=os.environ["X"])
+df = ak.stock_demo_em(symbol="01810", period='daily')
+```
+'''
+
+
+@pytest.fixture
+def synth(tmp_path):
+    (tmp_path / 'stock_demo_em.txt').write_text(DOC, encoding='utf-8')
+    return ParamSynth(str(tmp_path), cached={'stock_demo_em': {'symbol': '03690'}})
+
+
+class TestParse:
+    """解析文档示例调用与输入参数表"""
+
+    def test_example_calls_literals_only(self):
+        assert parse_example_calls(DOC, 'stock_demo_em') == [{'symbol': '09988', 'period': 'weekly'},
+                                                             {'symbol': '01810', 'period': 'daily'}]
+
+    def test_input_params(self):
+        params = parse_input_params(DOC)
+        assert params['symbol'] == {'default': '00700', 'enum': None}
+        assert params['period']['enum'] == ['daily', 'weekly'] and params['timeout']['default'] is None
+
+
+class TestCandidates:
+    """候选顺序：缓存的成功参数 → 示例 → 逐参数合成"""
+
+    def test_order_and_dedupe(self, synth):
+        parameters = {'properties': {'symbol': {}, 'market': {}}}
+        assert synth.candidates('stock_demo_em', parameters) == [
+            {'symbol': '03690'}, {'symbol': '09988', 'period': 'weekly'}, {'symbol': '00700', 'period': 'daily'}]
+
+    def test_undocumented_api_falls_back_to_names(self, synth):
+        parameters = {'properties': {'symbol': {}, 'adjust': {}, 'foo': {'enum': ['x', 'y']}}}
+        assert synth.candidates('fund_unknown', parameters) == [{'symbol': '000001', 'adjust': '', 'foo': 'x'}]
+
+    def test_unbindable_candidates_skipped_without_request(self, monkeypatch):
+        calls = []
+
+        def demo(symbol, period='daily'):
+            calls.append(symbol)
+            return [{'a': 1}]
+
+        monkeypatch.setattr(test_apis, 'ak', type('FakeAk', (), {'demo': staticmethod(demo)}))
+        result = test_apis.test_single_api('demo', {}, candidates=[{'code': 'x'}, {'symbol': 'ok'}], samples=2)
+        assert result.status == 'success' and result.params == {'symbol': 'ok'}
+        assert calls == ['ok', 'ok'] and result.requests == 2
+
+    def test_call_errors_not_retried(self, monkeypatch):
+        calls = []
+
+        def demo(symbol):
+            calls.append(symbol)
+            raise json.JSONDecodeError('Expecting value', '<html>', 0)   # 上游限流返回 HTML
+
+        monkeypatch.setattr(test_apis, 'ak', type('FakeAk', (), {'demo': staticmethod(demo)}))
+        result = test_apis.test_single_api('demo', {}, candidates=[{'symbol': 'a'}, {'symbol': 'b'}])
+        assert result.status == 'failed' and result.error_type == 'JSONDecodeError'
+        assert calls == ['a'] and result.requests == 1
+
+    def test_success_params_from_store(self, tmp_path):
+        store = ResultStore(str(tmp_path / 'results.db'))
+        store.start_run(run_id='r1')
+        store.append('r1', {'api_name': 'a', 'status': 'success', 'params': {'symbol': '1'}}, '2026-01-01T00:00:00')
+        store.append('r1', {'api_name': 'b', 'status': 'failed', 'params': {'symbol': '2'}}, '2026-01-01T00:00:01')
+        store.start_run(run_id='r2')
+        store.append('r2', {'api_name': 'a', 'status': 'success', 'params': {'symbol': '3'}}, '2026-01-02T00:00:00')
+        assert store.success_params() == {'a': {'symbol': '3'}}
+        store.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
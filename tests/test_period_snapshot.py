@@ -0,0 +1,153 @@
+"""
+报告期全市场快照单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+import re
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.crawlers.eastmoney_api import EastMoneyAPI, EastMoneyRequestError
+from akshare_service.crawlers.period_snapshot import PeriodSnapshot, get_code_history
+from akshare_service.infra.cache import LocalCache
+
+
+class FlakyEastMoneyAPI(EastMoneyAPI):
+    """固定 25 条记录，可指定失败页"""
+
+    def __init__(self, failing_pages=()):
+        super().__init__()
+        self.failing_pages = set(failing_pages)
+        self.requested_pages = []
+
+    def _request(self, params, strict=False):
+        page = params['pageNumber']
+        self.requested_pages.append(page)
+        assert params['filter'] == "(REPORTDATE='2025-12-31')"
+        if page in self.failing_pages:
+            if strict:
+                raise EastMoneyRequestError('timeout', pages=[page])
+            return None
+        size = params['pageSize']
+        rows = [{'SECURITY_CODE': f'{i:06d}', 'REPORTDATE': '2025-12-31 00:00:00',
+                 'TOTAL_OPERATE_INCOME': 1e8 * i}
+                for i in range((page - 1) * size, min(page * size, 25))]
+        return {'pages': 3, 'data': rows}
+
+
+class MarketEastMoneyAPI(EastMoneyAPI):
+    """按过滤条件中的报告期返回两家公司的记录"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def _request(self, params, strict=False):
+        self.requests.append(params)
+        report_date = re.search(r"'(\d{4}-\d{2}-\d{2})'", params['filter']).group(1)
+        year = int(report_date[:4])
+        date_field = 'REPORTDATE' if params['reportName'] == 'RPT_LICO_FN_CPD' else 'REPORT_DATE'
+        rows = [{'SECURITY_CODE': code, 'SECURITY_NAME_ABBR': name, date_field: f'{report_date} 00:00:00',
+                 'TOTAL_OPERATE_INCOME': 1e8 * year,
+                 'PARENT_NETPROFIT': 1e7 * year, 'WEIGHTAVG_ROE': 20.0, 'XSMLL': 90.0,
+                 'TOTAL_ASSETS': 3e10, 'TOTAL_EQUITY': 2e10, 'TOTAL_LIABILITIES': 1e10}
+                for code, name in (('600519', '贵州茅台'), ('000001', '平安银行'))]
+        return {'pages': 1, 'data': rows}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    from akshare_service.infra import cache as cache_module
+    cache = LocalCache(cache_dir=str(tmp_path / 'cache'))
+    monkeypatch.setattr(cache_module, '_cache_instance', cache)
+    return cache
+
+
+class TestPeriodSnapshot:
+    """快照断点续传测试"""
+
+    def test_resume_after_failed_page(self, tmp_path):
+        first = PeriodSnapshot('indicator', '2025-12-31', snapshot_dir=str(tmp_path),
+                               api=FlakyEastMoneyAPI(failing_pages=[3]), page_size=10)
+        assert first.sync(write_cache=False) is False
+
+        api = FlakyEastMoneyAPI()
+        second = PeriodSnapshot('indicator', '2025-12-31', snapshot_dir=str(tmp_path),
+                                api=api, page_size=10)
+        assert second.sync(write_cache=False) is True
+        assert api.requested_pages == [3]
+
+        df = second.load()
+        assert len(df) == 25
+        assert df['revenue'].iloc[2] == 2
+
+    def test_failed_pages_recorded(self, tmp_path):
+        snapshot = PeriodSnapshot('indicator', '2025-12-31', snapshot_dir=str(tmp_path),
+                                  api=FlakyEastMoneyAPI(failing_pages=[2, 3]), page_size=10)
+        assert snapshot.sync(write_cache=False) is False
+        checkpoint = snapshot.load_checkpoint()
+        assert checkpoint['done_pages'] == [1] and checkpoint['failed_pages'] == [2, 3]
+
+        snapshot.api = FlakyEastMoneyAPI()
+        assert snapshot.sync(write_cache=False) is True
+        assert snapshot.load_checkpoint()['failed_pages'] == []
+
+    def test_get_by_period_raises_on_missing_page(self):
+        api = FlakyEastMoneyAPI(failing_pages=[2])
+        with pytest.raises(EastMoneyRequestError) as info:
+            api.get_financial_indicator_by_period('2025-12-31', page_size=10)
+        assert info.value.pages == [2]
+
+    def test_unknown_report_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            PeriodSnapshot('valuation', '2025-12-31', snapshot_dir=str(tmp_path))
+
+
+
+class TestSnapshotReads:
+    """按代码查询的数据源优先读取快照"""
+
+    def sync(self, tmp_path, reports, dates):
+        for report in reports:
+            for report_date in dates:
+                assert PeriodSnapshot(report, report_date, snapshot_dir=str(tmp_path),
+                                      api=MarketEastMoneyAPI()).sync() is True
+
+    def test_code_history(self, cache, tmp_path):
+        self.sync(tmp_path, ['indicator'], ['2023-12-31', '2024-12-31', '2025-06-30'])
+        df = get_code_history('indicator', '600519', 2)
+        assert df['report_date'].tolist() == ['2024-12-31 00:00:00', '2023-12-31 00:00:00']
+        assert df['revenue'].tolist() == [2024, 2023]
+        assert get_code_history('indicator', '600519', 3) is None
+        assert get_code_history('indicator', '300760', 2) is None
+        assert get_code_history('balance', '600519', 1) is None
+
+    def test_financial_summary_without_request(self, cache, tmp_path, monkeypatch):
+        from akshare_service.crawlers import eastmoney_api
+        from akshare_service.skills import financial_summary
+
+        self.sync(tmp_path, ['indicator', 'balance'], ['2024-12-31', '2025-12-31'])
+
+        class NoRequests:
+            def __getattr__(self, name):
+                raise AssertionError(f'快照已覆盖，不应按代码请求: {name}')
+
+        monkeypatch.setattr(eastmoney_api, 'get_eastmoney_api', lambda: NoRequests())
+        result, errors = financial_summary._get_financial_summary_eastmoney('600519', 2, True)
+        assert [year['year'] for year in result['annual_data']] == [2025, 2024]
+        assert result['annual_data'][0]['revenue']['value'] == 2025
+        assert result['annual_data'][0]['total_assets']['value'] == 300
+
+        # 快照不足所需年数时回退到按代码查询
+        requested = []
+        per_code = MarketEastMoneyAPI()
+        monkeypatch.setattr(per_code, 'get_financial_indicator', lambda code: requested.append(code) or None)
+        monkeypatch.setattr(eastmoney_api, 'get_eastmoney_api', lambda: per_code)
+        financial_summary._get_financial_summary_eastmoney('600519', 3, False)
+        assert requested == ['600519']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
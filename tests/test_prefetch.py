@@ -0,0 +1,144 @@
+"""
+自选股预取、cron 与访问记录单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra import access
+from akshare_service.infra.access import AccessLog
+from akshare_service.infra.cache import LocalCache
+from akshare_service.infra.cron import CronSchedule
+from akshare_service.service import prefetch
+from akshare_service.service.prefetch import Prefetcher
+
+
+class TestCron:
+    """cron 表达式解析"""
+
+    def test_next_after(self):
+        schedule = CronSchedule('30 1 * * *')
+        assert schedule.next_after(datetime(2024, 3, 1, 1, 29)) == datetime(2024, 3, 1, 1, 30)
+        assert schedule.next_after(datetime(2024, 3, 1, 1, 30)) == datetime(2024, 3, 2, 1, 30)
+
+    def test_steps_ranges_and_weekdays(self):
+        assert CronSchedule('*/15 * * * *').next_after(datetime(2024, 3, 1, 10, 16)) == \
+            datetime(2024, 3, 1, 10, 30)
+        # 2024-03-01 是周五，下一个工作日 02:00 为周一
+        assert CronSchedule('0 2 * * 1-5').next_after(datetime(2024, 3, 1, 3, 0)) == \
+            datetime(2024, 3, 4, 2, 0)
+        assert CronSchedule('0 0 * * 7').next_after(datetime(2024, 3, 1)) == datetime(2024, 3, 3)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            CronSchedule('0 2 * *')
+        with pytest.raises(ValueError):
+            CronSchedule('61 * * * *')
+
+
+class TestAccessLog:
+    """访问记录与热度"""
+
+    def test_scores_decay_and_suppression(self, tmp_path):
+        log = AccessLog(str(tmp_path / 'access.jsonl'))
+        now = time.time()
+        log._buffer.extend([(now, 'financial_summary', '600519'), (now, 'cashflow', '600519'),
+                            (now - 72 * 3600, 'valuation', '000001')])
+        log.flush()
+        scores = log.scores(half_life_hours=72, now=now)
+        assert scores['600519'] == pytest.approx(2.0, rel=1e-3)
+        assert scores['000001'] == pytest.approx(0.5, rel=1e-3)
+
+    def test_record_suppressed(self, tmp_path, monkeypatch):
+        log = AccessLog(str(tmp_path / 'access.jsonl'))
+        monkeypatch.setattr(access, '_log_instance', log)
+        access.record('valuation', '600519')
+        with access.suppressed():
+            access.record('valuation', '000001')
+        assert [r['code'] for r in log.load()] == ['600519']
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    cache = LocalCache(cache_dir=str(tmp_path / 'cache'))
+    log = AccessLog(str(tmp_path / 'access.jsonl'))
+    ran = []
+
+    def runner(skill):
+        def run(code, years, ttl):
+            ran.append((skill, code, access._suppressed.get()))
+            return code != 'bad'
+        return run
+
+    monkeypatch.setattr(prefetch, 'PREFETCH_SKILLS', {
+        'financial_summary': (runner('financial_summary'), 'financial_summary:{code}:{years}'),
+        'cashflow': (runner('cashflow'), 'cashflow_data:{code}:{years}'),
+    })
+    config = {'watchlist': ['000001', '600519', 'bad'], 'skills': ['financial_summary', 'cashflow'],
+              'interval': 0.02, 'cache_ttl': 1000}
+    return Prefetcher(config, cache=cache, access_log=log), cache, log, ran
+
+
+class TestPrefetcher:
+    """预取计划与执行"""
+
+    def test_plan_orders_by_access_and_skips_fresh(self, setup):
+        prefetcher, cache, log, _ = setup
+        log._buffer.extend([(time.time(), 'valuation', '600519')] * 3)
+        cache.set('financial_summary:000001:5', {'annual_data': [1]}, ttl=900)   # 仍新鲜
+        cache.set('financial_summary:bad:5', {'annual_data': [1]}, ttl=100)      # 即将过期
+        cache.set('cashflow_data:000001:5', {'annual_data': [1]}, ttl=900)
+        cache.set('cashflow_data:bad:5', {'annual_data': [1]}, ttl=900)
+        jobs, fresh = prefetcher.plan()
+        assert [(j.skill, j.code) for j in jobs] == [
+            ('financial_summary', '600519'), ('cashflow', '600519'), ('financial_summary', 'bad')]
+        assert fresh == 3
+
+    def test_run_once(self, setup):
+        prefetcher, _, _, ran = setup
+        started = time.perf_counter()
+        summary = prefetcher.run_once()
+        assert time.perf_counter() - started >= 0.1    # 6 个任务，间隔 0.02 秒
+        assert summary['planned'] == 6 and summary['succeeded'] == 4 and summary['failed'] == 2
+        assert all(suppressed for _, _, suppressed in ran)
+
+    def test_unknown_skill(self):
+        with pytest.raises(ValueError):
+            Prefetcher({'skills': ['news']})
+
+    def test_valuation_not_supported(self):
+        with pytest.raises(ValueError, match='valuation 不支持预取'):
+            Prefetcher({'skills': ['valuation', 'cashflow']})
+        assert 'valuation' not in prefetch.DEFAULT_CONFIG['skills']
+        assert 'valuation' not in prefetch.load_config()['skills']
+
+
+class TestRoicCache:
+    """calculate_roic 缓存（预取写入、交互命中）"""
+
+    def test_refresh_writes_and_hit_reads(self, tmp_path, monkeypatch):
+        import pandas as pd
+        from akshare_service.infra import cache as cache_module
+        from akshare_service.skills import finance
+
+        calls = []
+
+        def fake_a_share(code, years, **flags):
+            calls.append(code)
+            return pd.DataFrame({'year': [2023, 2024], 'roic': [11.2, 12.8]})
+
+        monkeypatch.setattr(cache_module, '_cache_instance', LocalCache(cache_dir=str(tmp_path)))
+        monkeypatch.setattr(finance, 'calculate_roic_a_share', fake_a_share)
+        finance.calculate_roic('A股', '600519', 2, refresh=True)
+        df = finance.calculate_roic('A股', '600519', 2)
+        assert calls == ['600519']
+        assert df['roic'].tolist() == [11.2, 12.8]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
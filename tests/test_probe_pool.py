@@ -0,0 +1,71 @@
+"""
+探测进程池单元测试（离线，启动真实工作进程）
+"""
+
+import pytest
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qa import test_apis
+from qa.probe_pool import ProbePool
+
+
+def _work(kind, arg=None, *_):
+    """在工作进程中执行的探测替身（模块级函数，spawn 进程可 pickle）"""
+    if kind == 'sleep':
+        time.sleep(arg)
+        return 'woke'
+    if kind == 'alloc':
+        return len(bytearray(arg * 1024 * 1024))
+    if kind == 'exit':
+        os._exit(3)
+    if kind == 'raise':
+        raise ValueError('bad input')
+    return os.getpid()
+
+
+class TestProbePool:
+    """硬超时、崩溃与进程回收"""
+
+    def test_timeout_kills_and_replaces_worker(self):
+        with ProbePool(_work, size=1, timeout=0.5) as pool:
+            started = time.monotonic()
+            outcome = pool.run('sleep', 30)
+            assert outcome.status == 'timeout'
+            assert 0.5 <= outcome.elapsed < 3 and time.monotonic() - started < 5
+            assert pool.run('pid').status == 'ok'      # 新进程继续服务
+            assert pool.stats['timeouts'] == 1 and pool.stats['started'] == 2
+
+    def test_error_crash_and_recycle(self):
+        with ProbePool(_work, size=1, timeout=10, max_tasks_per_worker=2) as pool:
+            first = pool.run('pid').value
+            assert pool.run('raise').error == 'ValueError: bad input'
+            assert pool.run('pid').value != first       # 执行 2 个任务后已重启
+            crashed = pool.run('exit')
+            assert crashed.status == 'crashed' and 'exitcode=3' in crashed.error
+            assert pool.run('pid').status == 'ok'
+            assert pool.stats['recycled'] >= 1 and pool.stats['crashed'] == 1
+
+    @pytest.mark.skipif(sys.platform != 'linux', reason='RLIMIT_AS 仅在 Linux 上可靠')
+    def test_memory_limit(self):
+        with ProbePool(_work, size=1, timeout=10, memory_limit_mb=512) as pool:
+            assert pool.run('alloc', 1024).status == 'memory'
+            ok = pool.run('alloc', 16)
+            assert ok.status == 'ok' and ok.peak_rss_mb > 0
+
+
+class TestProbeIsolated:
+    """超时转换为 timeout 状态的 TestResult"""
+
+    def test_timeout_result(self):
+        with ProbePool(_work, size=1, timeout=0.3) as pool:
+            result = test_apis.probe_isolated(pool, 'sleep', 10)
+        assert result.status == 'timeout' and result.error_type == 'Timeout'
+        assert result.response_time_ms >= 300
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,75 @@
+"""
+性能剖析单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra import metrics, profiling
+
+
+def _workload():
+    raw = json.dumps([{'a': i, 'b': str(i)} for i in range(20000)])
+    for _ in range(5):
+        json.loads(raw)
+    time.sleep(0.05)
+
+
+class TestProfiling:
+    """剖析输出和类别归集测试"""
+
+    def test_classify(self):
+        assert profiling.classify('/usr/lib/python3.11/json/decoder.py') == 'json'
+        assert profiling.classify('/x/site-packages/urllib3/connectionpool.py') == 'network'
+        assert profiling.classify('~', "<method 'recv_into' of '_socket.socket' objects>") == 'network'
+        assert profiling.classify('/x/site-packages/pandas/core/frame.py') == 'pandas'
+        assert profiling.classify('/root/package/akshare_service/skills/finance.py') is None
+
+    @pytest.mark.parametrize('mode', ['sample', 'cprofile'])
+    def test_profile_writes_outputs(self, tmp_path, mode):
+        with profiling.profile('roic_600519', mode=mode, output_dir=str(tmp_path), interval_ms=1) as info:
+            _workload()
+
+        path = info['path']
+        files = set(os.listdir(path))
+        assert {'summary.json', 'profile.collapsed', 'profile.speedscope.json'} <= files
+        if mode == 'cprofile':
+            assert 'profile.prof' in files
+            assert info['result'].categories['json'] > 0
+
+        with open(os.path.join(path, 'summary.json'), 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+        assert summary['wall_ms'] >= 50
+        assert set(summary['categories']) == set(profiling.CATEGORIES)
+
+        with open(os.path.join(path, 'profile.speedscope.json'), 'r', encoding='utf-8') as f:
+            speedscope = json.load(f)
+        profile = speedscope['profiles'][0]
+        assert len(profile['samples']) == len(profile['weights']) > 0
+
+    def test_env_switch_profiles_outermost_skill_only(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(profiling.MODE_ENV, 'sample')
+        monkeypatch.setenv(profiling.DIR_ENV, str(tmp_path))
+
+        @metrics.track_skill('inner')
+        def inner(code):
+            _workload()
+
+        @metrics.track_skill('outer')
+        def outer(code):
+            inner(code)
+
+        outer('600519')
+
+        entries = os.listdir(tmp_path)
+        assert len(entries) == 1
+        assert entries[0].split('_', 3)[3].startswith('outer_600519')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
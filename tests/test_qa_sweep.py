@@ -0,0 +1,65 @@
+"""
+API 可用性并发巡检单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra.upstreams import UpstreamLimiter
+from qa import test_apis
+from qa.test_apis import interleave_by_upstream, run_sweep
+
+
+def _apis(*names):
+    return [{'name': n, 'description': '', 'parameters': {}} for n in names]
+
+
+class TestInterleave:
+    """按上游轮转排列"""
+
+    def test_round_robin(self):
+        apis = _apis('a_em', 'b_em', 'c_em', 'd_sina', 'e_ths')
+        assert [a['name'] for a in interleave_by_upstream(apis)] == ['a_em', 'd_sina', 'e_ths', 'b_em', 'c_em']
+
+
+class TestSweep:
+    """并发巡检：同站点限流、不同站点并行"""
+
+    def test_per_host_throttling(self, monkeypatch):
+        starts = {}
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def fake_probe(api_name, parameters, timeout=30, candidates=None):
+            with lock:
+                starts.setdefault(api_name.rsplit('_', 1)[1], []).append(time.monotonic())
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return test_apis.TestResult(api_name=api_name, category='other', status='success', response_time_ms=50)
+
+        monkeypatch.setattr(test_apis, 'test_single_api', fake_probe)
+        apis = _apis(*[f'x{i}_sina' for i in range(3)], *[f'y{i}_ths' for i in range(3)],
+                     *[f'z{i}_em' for i in range(3)])
+        limiter = UpstreamLimiter(limits={'eastmoney': 3}, min_interval={'sina': 0.1})
+        done = []
+        results = run_sweep(apis, concurrency=6, limiter=limiter, on_result=lambda r, n: done.append(n))
+
+        assert list(results) == [a['name'] for a in apis]
+        assert results['x0_sina'].upstream == 'sina' and done == list(range(1, 10))
+        sina = starts['sina']
+        assert all(b - a >= 0.09 for a, b in zip(sina, sina[1:]))
+        ths = starts['ths']
+        assert all(b - a >= 0.045 for a, b in zip(ths, ths[1:]))    # 同花顺并发上限 1
+        assert peak[0] >= 3                                           # 不同站点并行
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
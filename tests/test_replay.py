@@ -0,0 +1,96 @@
+"""
+HTTP 录制/回放单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra import replay
+from akshare_service.crawlers.eastmoney_api import EastMoneyAPI
+
+
+def _fake_response(request, body: bytes, status: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers['Content-Type'] = 'application/json'
+    response.url = request.url
+    response.request = request
+    return response
+
+
+class TestRecordReplay:
+    """录制/回放测试"""
+
+    def test_record_then_replay(self, tmp_path, monkeypatch):
+        store = replay.FixtureStore(tmp_path)
+        calls = []
+
+        def fake_send(adapter, request, **kwargs):
+            calls.append(request.url)
+            return _fake_response(request, b'{"ok": true}')
+
+        monkeypatch.setattr(replay, '_ORIGINAL_SEND', fake_send)
+
+        recorder = replay.install(requests.Session(), mode='record', store=store)
+        assert recorder.get('https://example.com/api', params={'a': 1, '_': 111}).json() == {'ok': True}
+        assert len(calls) == 1
+
+        player = replay.install(requests.Session(), mode='replay', store=store)
+        response = player.get('https://example.com/api', params={'_': 222, 'a': 1})
+        assert response.json() == {'ok': True}
+        assert len(calls) == 1
+
+    def test_replay_missing_fixture_raises(self, tmp_path):
+        session = replay.install(requests.Session(), mode='replay', store=replay.FixtureStore(tmp_path))
+        with pytest.raises(requests.ConnectionError):
+            session.get('https://example.com/missing')
+
+    def test_latency_injection(self, tmp_path):
+        store = replay.FixtureStore(tmp_path)
+        request = requests.Request('GET', 'https://example.com/slow').prepare()
+        store.put('GET', request.url, None, _fake_response(request, b'[]'), elapsed_ms=5)
+
+        session = replay.install(requests.Session(), mode='replay', store=store, latency='50')
+        start = time.perf_counter()
+        session.get('https://example.com/slow')
+        assert time.perf_counter() - start >= 0.05
+
+        assert replay.LatencyModel.parse('recorded').delay_ms({'elapsed_ms': 5}) == 5
+        assert 0 <= replay.LatencyModel.parse('10:10').delay_ms({}) <= 20
+
+    def test_patch_requests_covers_module_level_calls(self, tmp_path):
+        store = replay.FixtureStore(tmp_path)
+        request = requests.Request('GET', 'https://example.com/ak').prepare()
+        store.put('GET', request.url, None, _fake_response(request, b'{"v": 1}'))
+
+        with replay.patch_requests(mode='replay', store=store):
+            assert requests.get('https://example.com/ak').json() == {'v': 1}
+        assert requests.adapters.HTTPAdapter.send is replay._ORIGINAL_SEND
+
+    def test_eastmoney_api_replay(self, tmp_path, monkeypatch):
+        store = replay.FixtureStore(tmp_path)
+        body = ('{"success": true, "result": {"pages": 1, "data": ['
+                '{"REPORTDATE": "2024-12-31 00:00:00", "SECURITY_CODE": "300760", '
+                '"TOTAL_OPERATE_INCOME": 36726000000, "PARENT_NETPROFIT": 11668000000}]}}').encode('utf-8')
+        params = {"reportName": "RPT_LICO_FN_CPD", "columns": "ALL",
+                  "filter": '(SECURITY_CODE="300760")', "pageSize": 50, "pageNumber": 1}
+        request = requests.Request('GET', EastMoneyAPI.BASE_URL, params=params).prepare()
+        store.put('GET', request.url, None, _fake_response(request, body))
+
+        monkeypatch.setenv(replay.MODE_ENV, 'replay')
+        monkeypatch.setenv(replay.FIXTURE_DIR_ENV, str(tmp_path))
+        df = EastMoneyAPI().get_financial_indicator('300760')
+
+        assert len(df) == 1
+        assert round(df['revenue'].iloc[0], 2) == 367.26
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,67 @@
+"""
+轻量报告生成单元测试（离线）
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qa.report_generator import COMPACT_COLUMNS, compact_report_data, generate_compact_report
+from qa.result_store import ResultStore
+
+
+def _report(n=3):
+    apis = {}
+    for i in range(n):
+        apis[f'api_{i}'] = {'api_name': f'api_{i}', 'category': 'stock', 'status': 'success' if i else 'failed',
+                            'response_time_ms': 100 + i, 'sample_keys': ['a', 'b'],
+                            'sample_data': [{'a': 1, 'b': 2}] * 3, 'error': None if i else 'x' * 500}
+    return {'test_date': '2026-03-07', 'test_time': '12:00:00',
+            'summary': {'total': n, 'success': n - 1, 'failed': 1, 'timeout': 0, 'error': 0,
+                        'by_category': {'stock': {'success': n - 1, 'failed': 1}}},
+            'changes': {'structure_changed': [{'api': 'api_1', 'added_fields': ['c'], 'field_count_change': 1}]},
+            'apis': apis}
+
+
+class TestCompactReport:
+    """紧凑数据与查看器外壳"""
+
+    def test_compact_rows_drop_samples(self):
+        data = compact_report_data(_report())
+        assert data['columns'] == COMPACT_COLUMNS
+        row = dict(zip(data['columns'], data['rows'][0]))
+        assert row == {'api_name': 'api_0', 'category': 'stock', 'status': 'failed', 'upstream': None,
+                       'response_time_ms': 100, 'fields': 2, 'error': 'x' * 200}
+        assert 'sample_data' not in json.dumps(data)
+        assert data['changes']['structure_changed'] == [{'api': 'api_1', 'added_fields': ['c'], 'removed_fields': []}]
+
+    def test_generate_offline_viewer(self, tmp_path):
+        output = tmp_path / '2026-03-07.html'
+        data_path = generate_compact_report(_report(500), str(output))
+        page = output.read_text(encoding='utf-8')
+        assert 'data-report="2026-03-07.data.json"' in page
+        assert 'http' not in page and '<tr' not in page          # 无 CDN，不内联表格行
+        for name in ('viewer.js', 'viewer.css', 'charts.js'):
+            assert (tmp_path / 'assets' / name).exists()
+        assert len(json.load(open(data_path, encoding='utf-8'))['rows']) == 500
+
+    def test_trend_from_store(self, tmp_path):
+        store = ResultStore(str(tmp_path / 'results.db'))
+        for run_id, ms in (('r1', [100, 300, 200]), ('r2', [400, 500])):
+            store.start_run(total=3, run_id=run_id)
+            for i, value in enumerate(ms):
+                store.append(run_id, {'api_name': f'a{i}', 'status': 'success', 'response_time_ms': value})
+        store.append('r2', {'api_name': 'a9', 'status': 'failed', 'response_time_ms': None})
+        data_path = generate_compact_report(_report(), str(tmp_path / 'r.html'), store=store)
+        store.close()
+        trend = json.load(open(data_path, encoding='utf-8'))['trend']
+        assert [(t['run_id'], t['success'], t['failed'], t['p50_ms']) for t in trend] == [
+            ('r1', 3, 0, 200), ('r2', 2, 1, 500)]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,103 @@
+"""
+巡检结果库单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlite3
+
+from qa.result_store import RUN_SCHEDULED, ResultStore
+
+
+def _result(name, status='success', ms=100, category='stock', upstream='eastmoney'):
+    return {'api_name': name, 'category': category, 'status': status, 'response_time_ms': ms,
+            'upstream': upstream, 'sample_keys': ['a']}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.db'))
+    yield store
+    store.close()
+
+
+class TestResultStore:
+    """追加写入、增量汇总与历史查询"""
+
+    def test_incremental_summary(self, store):
+        run_id = store.start_run(total=3, run_id='r1')
+        store.append(run_id, _result('a'))
+        store.append(run_id, _result('b', 'failed', None, upstream='sina'))
+        assert store.summary(run_id) == {'total': 3, 'tested': 2, 'success': 1, 'failed': 1,
+                                         'timeout': 0, 'error': 0}
+        store.append(run_id, _result('b', 'timeout', 30000, upstream='sina'))   # 同一轮重测覆盖
+        summary = store.summary(run_id)
+        assert summary['tested'] == 2 and summary['failed'] == 0 and summary['timeout'] == 1
+        assert store.breakdown(run_id, 'upstream')['sina'] == {'total': 1, 'success': 0, 'failed': 0,
+                                                              'timeout': 1, 'error': 0}
+
+    def test_open_run_and_report(self, store):
+        run_id = store.start_run(total=1, run_id='r1')
+        assert store.open_run() == 'r1'
+        store.append(run_id, _result('a'))
+        report = store.to_report(run_id)
+        assert report['apis']['a']['sample_keys'] == ['a']
+        assert report['summary']['by_category']['stock']['success'] == 1
+        store.finish_run(run_id)
+        assert store.open_run() is None
+
+    def test_history_uses_index(self, store):
+        old = (datetime.now() - timedelta(days=120)).isoformat(timespec='seconds')
+        recent = (datetime.now() - timedelta(days=3)).isoformat(timespec='seconds')
+        store.append(store.start_run(run_id='r0'), _result('a', ms=90), tested_at=old)
+        store.append(store.start_run(run_id='r1'), _result('a', ms=110), tested_at=recent)
+        store.append('r1', _result('b'), tested_at=recent)
+        history = store.history('a', days=90)
+        assert [(h['run_id'], h['response_time_ms']) for h in history] == [('r1', 110)]
+        plan = store._conn.execute('EXPLAIN QUERY PLAN SELECT * FROM results WHERE api_name = ? '
+                                   'AND tested_at >= ?', ('a', recent)).fetchall()
+        assert 'idx_results_api_time' in ' '.join(str(tuple(row)) for row in plan)
+
+    def test_scheduled_runs_excluded(self, store):
+        store.append(store.start_run(total=4, run_id='r1'), _result('a'))
+        store.append('r1', _result('b'))
+        store.finish_run('r1')
+        sched = store.start_run(total=1, run_id='sched-1', kind=RUN_SCHEDULED)
+        store.append(sched, _result('c', status='failed'))              # 未结束的调度轮次
+        assert store.open_run() is None
+        assert [r['run_id'] for r in store.runs(limit=1)] == ['r1']
+        assert [r['run_id'] for r in store.runs(kind=None)] == ['sched-1', 'r1']
+        assert [t['run_id'] for t in store.trend()] == ['r1']
+        store.start_run(run_id='r2')
+        assert store.previous_run('r2') == 'r1'
+
+    def test_kind_migration(self, tmp_path):
+        path = str(tmp_path / 'old.db')
+        conn = sqlite3.connect(path)
+        conn.executescript("CREATE TABLE runs (run_id TEXT PRIMARY KEY, started_at TEXT NOT NULL, "
+                           "finished_at TEXT, total INTEGER NOT NULL DEFAULT 0);"
+                           "INSERT INTO runs VALUES ('r1', '2026-01-01T00:00:00', NULL, 3);"
+                           "INSERT INTO runs VALUES ('sched-1', '2026-01-02T00:00:00', NULL, 1);")
+        conn.close()
+        store = ResultStore(path)
+        assert {r['run_id']: r['kind'] for r in store.runs(kind=None)} == {'r1': 'sweep', 'sched-1': 'scheduled'}
+        assert store.open_run() == 'r1'
+        store.close()
+
+    def test_persisted_per_append_and_import(self, tmp_path):
+        path = str(tmp_path / 'results.db')
+        store = ResultStore(path)
+        run_id = store.import_state({'total_apis': 5, 'results': {'a': _result('a'), 'b': _result('b')}})
+        store.close()
+        reopened = ResultStore(path)                 # 重新打开后结果仍在
+        assert reopened.summary(run_id)['tested'] == 2 and reopened.open_run() == run_id
+        reopened.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,164 @@
+"""
+Stale-while-revalidate 单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+import time
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra import revalidate
+from akshare_service.infra.cache import LocalCache
+from akshare_service.infra.revalidate import Revalidator, max_stale_for
+
+
+class TestCacheMeta:
+    """带新鲜度的缓存读取"""
+
+    def test_fresh_stale_and_expired(self, tmp_path):
+        cache = LocalCache(cache_dir=str(tmp_path))
+        cache.set('fresh', {'v': 1}, ttl=60)
+        cache.set('stale', {'v': 2}, ttl=-30)   # 30 秒前过期
+
+        data, age, stale = cache.get_with_meta('fresh')
+        assert data == {'v': 1} and not stale and age < 5
+        assert cache.get_with_meta('stale', max_stale=60)[2] is True
+        assert cache.get_with_meta('stale', max_stale=10) is None
+        assert cache.get('stale') is None           # 超出陈旧时间后已删除
+
+    def test_concurrent_expiry(self, tmp_path, monkeypatch):
+        from akshare_service.infra import cache as cache_module
+
+        cache = LocalCache(cache_dir=str(tmp_path))
+        cache.set('k', {'v': 1}, ttl=-30)
+
+        def removed_by_other_reader(path):
+            raise FileNotFoundError(path)
+
+        monkeypatch.setattr(cache_module.os, 'remove', removed_by_other_reader)
+        assert cache.get_with_meta('k') is None
+        cache.delete('missing')
+
+    def test_clear_expired_grace(self, tmp_path):
+        cache = LocalCache(cache_dir=str(tmp_path))
+        cache.set('a', {'v': 1}, ttl=-30)
+        assert cache.clear_expired(grace=60) == 0
+        assert cache.clear_expired() == 1
+
+
+class TestRevalidator:
+    """后台刷新 single-flight"""
+
+    def test_single_flight(self):
+        revalidator = Revalidator(max_workers=2)
+        release = threading.Event()
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            release.wait(2)
+
+        assert revalidator.schedule('k', refresh) is True
+        assert revalidator.schedule('k', refresh) is False
+        release.set()
+        revalidator.wait(2)
+        assert calls == [1]
+        assert revalidator.schedule('k', lambda: None) is True
+        revalidator.wait(2)
+
+    def test_max_stale_env_override(self, monkeypatch):
+        assert max_stale_for('financial_summary') == 24 * 3600
+        monkeypatch.setenv('AKSHARE_MAX_STALE_FINANCIAL_SUMMARY', '0')
+        assert max_stale_for('financial_summary') == 0
+        assert max_stale_for('valuation') == 0
+
+
+class TestSkillServing:
+    """财务指标过期后先返回旧值并后台刷新"""
+
+    def test_stale_value_served_then_refreshed(self, tmp_path, monkeypatch):
+        from akshare_service.infra import cache as cache_module
+        from akshare_service.skills import financial_summary
+
+        cache = LocalCache(cache_dir=str(tmp_path))
+        monkeypatch.setattr(cache_module, '_cache_instance', cache)
+        fetched = []
+
+        def fake_eastmoney(code, years, fetch_name):
+            fetched.append(code)
+            time.sleep(0.2)
+            return {'code': code, 'annual_data': [{'year': 2024, 'roe': 20.0}]}, []
+
+        monkeypatch.setattr(financial_summary, '_get_financial_summary_eastmoney', fake_eastmoney)
+        key = 'financial_summary:600519:5'
+        cache.set(key, {'code': '600519', 'annual_data': [{'year': 2023, 'roe': 18.0}]}, ttl=-60)
+
+        started = time.perf_counter()
+        result = financial_summary.get_financial_summary('600519')
+        assert time.perf_counter() - started < 0.15
+        assert result['stale'] is True and result['cache_age_seconds'] >= 0
+        assert result['annual_data'][0]['year'] == 2023
+
+        revalidate.get_revalidator().wait(5)
+        assert fetched == ['600519']
+        refreshed = financial_summary.get_financial_summary('600519')
+        assert refreshed['stale'] is False and refreshed['annual_data'][0]['year'] == 2024
+
+    def test_max_stale_zero_waits_for_upstream(self, tmp_path, monkeypatch):
+        from akshare_service.infra import cache as cache_module
+        from akshare_service.skills import cashflow
+
+        cache = LocalCache(cache_dir=str(tmp_path))
+        monkeypatch.setattr(cache_module, '_cache_instance', cache)
+        monkeypatch.setattr(cashflow, '_get_cashflow_data_eastmoney',
+                            lambda code, years: ({'code': code, 'annual_data': [{'year': 2024}]}, []))
+        cache.set('cashflow_data:600519:5', {'code': '600519', 'annual_data': [{'year': 2023}]}, ttl=-60)
+
+        result = cashflow.get_cashflow_data('600519', max_stale=0)
+        assert result['annual_data'][0]['year'] == 2024
+        assert result['stale'] is False and result['cache_age_seconds'] == 0
+
+    def test_fresh_results_have_same_shape(self, tmp_path, monkeypatch):
+        from akshare_service.infra import cache as cache_module
+        from akshare_service.skills import financial_summary
+
+        monkeypatch.setattr(cache_module, '_cache_instance', LocalCache(cache_dir=str(tmp_path)))
+        for name in ('_get_financial_summary_eastmoney', '_get_financial_summary_sina', '_get_financial_summary_em'):
+            monkeypatch.setattr(financial_summary, name, lambda code, years, fetch_name: (None, ['无数据']))
+        result = financial_summary.get_financial_summary('600519', use_cache=False)
+        assert result['annual_data'] == []
+        assert result['stale'] is False and result['cache_age_seconds'] == 0
+
+    def test_roic_stale_served_then_refreshed(self, tmp_path, monkeypatch):
+        import pandas as pd
+        from akshare_service.infra import cache as cache_module
+        from akshare_service.skills import finance
+
+        cache = LocalCache(cache_dir=str(tmp_path))
+        monkeypatch.setattr(cache_module, '_cache_instance', cache)
+        computed = []
+
+        def fake_a_share(code, years, **flags):
+            computed.append(flags)
+            time.sleep(0.2)
+            return pd.DataFrame({'year': [2024], 'roic': [12.8]})
+
+        monkeypatch.setattr(finance, 'calculate_roic_a_share', fake_a_share)
+        cache.set('roic:A股:600519:5', [{'year': 2023, 'roic': 11.2}], ttl=-60)
+
+        started = time.perf_counter()
+        df = finance.calculate_roic('A股', '600519')
+        assert time.perf_counter() - started < 0.15
+        assert df['roic'].tolist() == [11.2] and df.attrs['stale'] is True
+
+        revalidate.get_revalidator().wait(5)
+        assert computed == [{'use_cache': True, 'refresh': True}]
+        refreshed = finance.calculate_roic('A股', '600519')
+        assert refreshed['roic'].tolist() == [12.8] and refreshed.attrs['stale'] is False
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,96 @@
+"""
+探测结果摘要与内存统计单元测试（离线）
+"""
+
+import json
+import pytest
+import sys
+import os
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qa import test_apis
+from qa.probe_pool import MemoryWatch
+from qa.result_store import ResultStore
+from qa.sampling import reservoir_sample, summarise
+
+
+class TestReservoir:
+    """蓄水池抽样：有界、确定、覆盖整个输入"""
+
+    def test_bounded_and_deterministic(self):
+        sample = reservoir_sample(iter(range(100000)), 3)
+        assert len(sample) == 3 and sample == sorted(sample)
+        assert sample == reservoir_sample(range(100000), 3)
+        assert reservoir_sample(range(2), 3) == [0, 1]
+
+    def test_not_only_head(self):
+        picks = [i for seed in range(50) for i in reservoir_sample(range(1000), 3, seed)]
+        assert max(picks) > 500
+
+
+class TestSummarise:
+    """摘要只保留行数、列统计和少量样本"""
+
+    def test_dataframe_summary(self):
+        df = pd.DataFrame({'code': [f'{i:06d}' for i in range(1000)], 'price': [float(i) for i in range(1000)],
+                           'date': pd.date_range('2024-01-01', periods=1000)})
+        df.loc[0, 'price'] = None
+        summary = summarise(df)
+        assert summary['rows'] == 1000 and len(summary['sample_data']) == 3
+        assert summary['column_stats']['price'] == {'nulls': 1, 'min': 1.0, 'max': 999.0, 'mean': 500.0}
+        assert summary['column_stats']['code'] == {'nulls': 0, 'unique': 1000}
+        assert summary['sample_dtypes']['date'].startswith('datetime64') and summary['frame_mb'] > 0
+        json.dumps(summary)                                     # 样本已转成基本类型
+
+    def test_duplicate_column_names(self):
+        df = pd.DataFrame([[1, 2, 'x'], [3, None, 'y']], columns=['a', 'a', 'b'])
+        summary = summarise(df)
+        assert summary['rows'] == 2 and summary['sample_keys'] == ['a', 'a', 'b']
+        assert summary['column_stats']['a'] == {'nulls': 0, 'min': 1, 'max': 3, 'mean': 2.0}
+        assert summary['column_stats']['a#1'] == {'nulls': 1, 'min': 2.0, 'max': 2.0, 'mean': 2.0}
+        assert summary['column_stats']['b'] == {'nulls': 0, 'unique': 2}
+        assert summary['sample_data'][0] == {'a': 1, 'a#1': 2.0, 'b': 'x'}
+
+    def test_list_and_none(self):
+        assert summarise([{'a': 1}] * 10)['rows'] == 10
+        assert summarise(None)['rows'] == 0
+
+
+class TestMemory:
+    """探测期间的峰值 RSS 与内存代价报告"""
+
+    @pytest.mark.skipif(not os.path.exists('/proc/self/clear_refs'), reason='需要 Linux /proc')
+    def test_memory_watch_measures_block(self):
+        with MemoryWatch() as memory:
+            block = bytearray(64 * 1024 * 1024)
+            block[::4096] = b'x' * len(block[::4096])
+            del block
+        assert memory.delta_mb >= 50 and memory.peak_mb >= memory.baseline_mb
+
+    def test_probe_keeps_summary_only(self, monkeypatch):
+        def big():
+            return pd.DataFrame({'v': range(200000)})
+
+        monkeypatch.setattr(test_apis, 'ak', type('FakeAk', (), {'big': staticmethod(big)}))
+        result = test_apis.test_single_api('big', {}, candidates=[{}])
+        assert result.status == 'success' and result.rows == 200000 and len(result.sample_data) == 3
+        assert result.column_stats['v']['max'] == 199999 and result.frame_mb > 1
+        assert result.peak_rss_mb is not None
+
+    def test_memory_costs(self, tmp_path):
+        store = ResultStore(str(tmp_path / 'results.db'))
+        store.start_run(run_id='r1')
+        store.append('r1', {'api_name': 'small', 'status': 'success', 'rss_delta_mb': 5, 'rows': 10})
+        store.append('r1', {'api_name': 'big', 'status': 'success', 'rss_delta_mb': 800, 'rows': 500000})
+        store.append('r1', {'api_name': 'oom', 'status': 'failed', 'error_type': 'MemoryError'})
+        store.append('r1', {'api_name': 'plain', 'status': 'failed', 'error_type': 'KeyError'})
+        costs = store.memory_costs(run_id='r1')
+        assert [(c['api_name'], c['oom']) for c in costs] == [('oom', 1), ('big', 0), ('small', 0)]
+        store.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,104 @@
+"""
+探测调度器单元测试（离线）
+"""
+
+import math
+import pytest
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from qa import scheduler, test_apis
+from qa.result_store import ResultStore
+
+NOW = datetime(2026, 3, 10, 12, 0, 0)
+
+
+def _outcomes(statuses, hours_ago, latencies=None, step_h=24):
+    """按时间顺序生成探测记录，最后一条在 hours_ago 小时前"""
+    rows = []
+    for i, status in enumerate(statuses):
+        tested = NOW - timedelta(hours=hours_ago + step_h * (len(statuses) - 1 - i))
+        ms = latencies[i] if latencies else (100 if status == 'success' else None)
+        rows.append({'tested_at': tested.isoformat(timespec='seconds'), 'status': status, 'response_time_ms': ms})
+    return rows
+
+
+class TestScore:
+    """间隔随失败率、延迟波动、重要性缩短"""
+
+    def test_flaky_and_important_probe_sooner(self):
+        stable = scheduler.score_api('a', _outcomes(['success'] * 10, 8), now=NOW)
+        flaky = scheduler.score_api('b', _outcomes(['success', 'failed'] * 5, 8), now=NOW)
+        noisy = scheduler.score_api('c', _outcomes(['success'] * 10, 8, [100, 900] * 5), now=NOW)
+        important = scheduler.score_api('d', _outcomes(['success'] * 10, 8), important=True, now=NOW)
+        assert flaky.interval_h < stable.interval_h and noisy.interval_h < stable.interval_h
+        assert important.interval_h == pytest.approx(stable.interval_h / scheduler.IMPORTANCE_FACTOR, abs=0.01)
+        assert stable.due < 1 < flaky.due
+
+    def test_never_tested_and_stale(self):
+        assert math.isinf(scheduler.score_api('new', [], now=NOW).due)
+        broken = scheduler.score_api('x', _outcomes(['success'] + ['failed'] * 3, 2), now=NOW)
+        assert broken.hours_since_success == 74.0 and broken.interval_h < 5
+
+
+class TestPlan:
+    """按 due 排序，受请求数和时间预算限制"""
+
+    def test_budget_and_order(self):
+        apis = [{'name': n} for n in ('stable', 'flaky', 'new', 'used')]
+        outcomes = {
+            'stable': _outcomes(['success'] * 10, 1),
+            'flaky': _outcomes(['failed', 'success', 'failed'], 10, [None, 4000, None]),
+            'used': _outcomes(['success'] * 10, 6),
+        }
+        selected = scheduler.plan(apis, outcomes, {'used'}, now=NOW)
+        assert [s.name for s in selected] == ['new', 'flaky', 'used']
+        assert [s.name for s in scheduler.plan(apis, outcomes, {'used'}, max_requests=2, now=NOW)] == ['new', 'flaky']
+        # new 估计 5 秒，flaky 估计 4 秒：时间预算 8 秒只够第一个
+        assert [s.name for s in scheduler.plan(apis, outcomes, {'used'}, max_seconds=8, now=NOW)] == ['new']
+
+    def test_used_apis_scans_service_source(self, tmp_path):
+        (tmp_path / 'skill.py').write_text("df = ak.stock_zh_a_hist(symbol=code)\nname = 'stock_news_em'\n")
+        assert scheduler.used_apis(['stock_zh_a_hist', 'stock_news_em', 'fund_x'], str(tmp_path)) == {
+            'stock_zh_a_hist', 'stock_news_em'}
+
+    def test_outcomes_from_store(self, tmp_path):
+        store = ResultStore(str(tmp_path / 'results.db'))
+        store.start_run(run_id='r1')
+        store.append('r1', {'api_name': 'a', 'status': 'failed', 'response_time_ms': None})
+        store.append('r1', {'api_name': 'b', 'status': 'success', 'response_time_ms': 80})
+        assert {k: [o['status'] for o in v] for k, v in store.outcomes(30).items()} == {
+            'a': ['failed'], 'b': ['success']}
+        store.close()
+
+
+class TestBudget:
+    """时间或请求预算用完后不再开始新的探测"""
+
+    def test_sweep_stops_at_deadline(self):
+        def slow_probe(api_name, parameters, timeout=30, candidates=None):
+            time.sleep(0.1)
+            return test_apis.TestResult(api_name=api_name, category='other', status='success')
+
+        apis = [{'name': f'a{i}_em', 'description': '', 'parameters': {}} for i in range(10)]
+        results = test_apis.run_sweep(apis, concurrency=1, probe=slow_probe,
+                                      limiter=test_apis.UpstreamLimiter(default_interval=0),
+                                      budget=scheduler.ProbeBudget(max_seconds=0.25))
+        assert 2 <= len(results) <= 4
+
+    def test_sweep_counts_actual_requests(self):
+        def probe(api_name, parameters, timeout=30, candidates=None):
+            return test_apis.TestResult(api_name=api_name, category='other', status='success', requests=3)
+
+        apis = [{'name': f'a{i}_em', 'description': '', 'parameters': {}} for i in range(10)]
+        budget = scheduler.ProbeBudget(max_requests=7)
+        results = test_apis.run_sweep(apis, concurrency=1, probe=probe, budget=budget,
+                                      limiter=test_apis.UpstreamLimiter(default_interval=0))
+        assert len(results) == 3 and budget.requests == 9 and budget.exhausted()
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
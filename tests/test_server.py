@@ -0,0 +1,201 @@
+"""
+常驻 Skills 服务单元测试（离线，使用替身方法）
+"""
+
+import pytest
+import sys
+import os
+import json
+import time
+import asyncio
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.service.server import (
+    SkillServer, ServiceClient, RpcError, METHOD_NOT_FOUND, INVALID_PARAMS, SERVER_BUSY, skill_methods
+)
+
+
+calls = []
+
+
+def get_price(code: str, market: str = 'A股'):
+    """测试用行情"""
+    calls.append(code)
+    return {'code': code, 'market': market, 'price': 10.0}
+
+
+def get_frame(code: str):
+    import pandas as pd
+    return pd.DataFrame({'year': [2023, 2024], 'roic': [12.5, None]})
+
+
+def slow(seconds: float = 0.2):
+    time.sleep(seconds)
+    return seconds
+
+
+def broken():
+    raise ValueError('boom')
+
+
+METHODS = {'get_price': get_price, 'get_frame': get_frame, 'slow': slow, 'broken': broken}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+class TestDispatch:
+    """JSON-RPC 调度测试"""
+
+    def test_call_with_named_and_positional_params(self):
+        server = SkillServer(METHODS)
+        response = run(server.dispatch({'jsonrpc': '2.0', 'id': 1, 'method': 'get_price',
+                                        'params': {'code': '600519'}}))
+        assert response == {'jsonrpc': '2.0', 'id': 1,
+                            'result': {'code': '600519', 'market': 'A股', 'price': 10.0}}
+        response = run(server.dispatch({'jsonrpc': '2.0', 'id': 2, 'method': 'get_price',
+                                        'params': ['00700', '港股']}))
+        assert response['result']['market'] == '港股'
+
+    def test_errors(self):
+        server = SkillServer(METHODS)
+        unknown = run(server.dispatch({'jsonrpc': '2.0', 'id': 1, 'method': 'nope'}))
+        assert unknown['error']['code'] == METHOD_NOT_FOUND
+        bad_params = run(server.dispatch({'jsonrpc': '2.0', 'id': 2, 'method': 'get_price',
+                                          'params': {'ticker': 'x'}}))
+        assert bad_params['error']['code'] == INVALID_PARAMS
+        failed = run(server.dispatch({'jsonrpc': '2.0', 'id': 3, 'method': 'broken'}))
+        assert 'boom' in failed['error']['message']
+
+    def test_batch_deduplicates_identical_calls(self):
+        server = SkillServer(METHODS)
+        request = {'jsonrpc': '2.0', 'method': 'get_price', 'params': {'code': '600519'}}
+        responses = run(server.dispatch([
+            {**request, 'id': 1}, {**request, 'id': 2},
+            {'jsonrpc': '2.0', 'id': 3, 'method': 'get_price', 'params': {'code': '000001'}},
+            {'jsonrpc': '2.0', 'method': 'get_price', 'params': {'code': '300760'}},  # 通知
+        ]))
+        assert [r['id'] for r in responses] == [1, 2, 3]
+        assert sorted(calls) == ['000001', '300760', '600519']
+        assert server.stats['deduplicated'] == 1
+
+    def test_concurrency_limit_and_busy(self):
+        server = SkillServer(METHODS, max_concurrency=2, max_pending=3)
+        batch = [{'jsonrpc': '2.0', 'id': i, 'method': 'slow', 'params': [0.2 + i / 1000]} for i in range(4)]
+        started = time.perf_counter()
+        responses = run(server.dispatch(batch))
+        elapsed = time.perf_counter() - started
+        busy = [r for r in responses if 'error' in r]
+        assert len(busy) == 1 and busy[0]['error']['code'] == SERVER_BUSY
+        assert 0.35 < elapsed < 1.0  # 3 个请求、并发 2：两轮
+
+    def test_frame_result_is_columnar(self):
+        server = SkillServer(METHODS)
+        from akshare_service.service.server import encode_json
+        response = run(server.dispatch({'jsonrpc': '2.0', 'id': 1, 'method': 'get_frame',
+                                        'params': ['600519']}))
+        result = json.loads(encode_json(response))['result']
+        assert result == {'columns': ['year', 'roic'], 'data': {'year': [2023, 2024], 'roic': [12.5, None]},
+                          'rows': 2}
+
+    def test_skill_methods_match_all(self):
+        from akshare_service import skills
+        assert set(skill_methods()) == set(skills.__all__)
+
+
+class TestTransports:
+    """HTTP 与 Unix socket 往返测试"""
+
+    @pytest.fixture
+    def running_server(self):
+        server = SkillServer(METHODS)
+        unix_path = os.path.join(tempfile.mkdtemp(), 'skills.sock')
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        holder = {}
+
+        async def start():
+            holder['http'] = await asyncio.start_server(server.handle_http, '127.0.0.1', 0)
+            holder['unix'] = await asyncio.start_unix_server(server.handle_lines, unix_path)
+            ready.set()
+
+        thread = threading.Thread(target=lambda: (loop.run_until_complete(start()), loop.run_forever()),
+                                  daemon=True)
+        thread.start()
+        ready.wait(5)
+        port = holder['http'].sockets[0].getsockname()[1]
+        yield port, unix_path
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+    def test_http_roundtrip(self, running_server):
+        port, _ = running_server
+        client = ServiceClient(url=f'http://127.0.0.1:{port}/rpc')
+        assert client.call('get_price', code='600519')['price'] == 10.0
+        results = client.batch([('get_price', ['000001']), ('nope', None)])
+        assert results[0]['code'] == '000001'
+        assert isinstance(results[1], RpcError) and results[1].code == METHOD_NOT_FOUND
+
+        import urllib.request
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/health') as response:
+            assert json.loads(response.read())['status'] == 'ok'
+
+    @pytest.mark.parametrize('length', ['abc', '-5'])
+    def test_invalid_content_length(self, running_server, length):
+        import socket
+        port, _ = running_server
+        with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+            sock.sendall(f'POST /rpc HTTP/1.1\r\nContent-Length: {length}\r\n\r\n'.encode('latin-1'))
+            reply = b''
+            while chunk := sock.recv(4096):
+                reply += chunk
+        assert reply.startswith(b'HTTP/1.1 400')
+        assert b'invalid content-length' in reply
+
+    def test_unix_roundtrip(self, running_server):
+        _, unix_path = running_server
+        client = ServiceClient(unix_path=unix_path)
+        assert client.call('rpc.ping') == 'pong'
+        with pytest.raises(RpcError):
+            client.call('broken')
+
+
+class TestSnapshots:
+    """行情快照进程内缓存测试"""
+
+    def test_snapshot_fetched_once_within_ttl(self, monkeypatch):
+        import pandas as pd
+        from types import SimpleNamespace
+        from akshare_service.infra import snapshots
+
+        fetched = []
+
+        def stock_zh_a_spot_em():
+            fetched.append(1)
+            time.sleep(0.05)
+            return pd.DataFrame({'代码': ['600519'], '最新价': [1500.0]})
+
+        monkeypatch.setattr(snapshots, 'ak', SimpleNamespace(stock_zh_a_spot_em=stock_zh_a_spot_em))
+        snapshots.clear()
+        threads = [threading.Thread(target=snapshots.get_spot, args=('stock_zh_a_spot_em',)) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(fetched) == 1
+        assert snapshots.get_spot('stock_zh_a_spot_em', ttl=0).iloc[0]['最新价'] == 1500.0
+        assert len(fetched) == 2
+        snapshots.clear()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
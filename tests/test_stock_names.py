@@ -0,0 +1,98 @@
+"""
+股票名称字典单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra.stock_names import StockNameRegistry, normalize_code
+
+
+class FakeRegistry(StockNameRegistry):
+    """用固定数据替代 AkShare 拉取"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetch_count = 0
+
+    def _fetch(self):
+        self.fetch_count += 1
+        return {'600519': '贵州茅台', '300760': '迈瑞医疗'}
+
+
+class TestStockNameRegistry:
+    """名称字典测试"""
+
+    def test_normalize_code(self):
+        assert normalize_code('SH600519') == '600519'
+        assert normalize_code('600519.SH') == '600519'
+        assert normalize_code('sz000001') == '000001'
+
+    def test_resolve_names_bulk(self, tmp_path):
+        registry = FakeRegistry(path=str(tmp_path / 'names.json'))
+
+        names = registry.resolve_names(['600519', 'SZ300760', '999999'])
+
+        assert names == {'600519': '贵州茅台', 'SZ300760': '迈瑞医疗', '999999': ''}
+        assert registry.fetch_count == 1
+
+    def test_persisted_dictionary_is_reused(self, tmp_path):
+        path = str(tmp_path / 'names.json')
+        FakeRegistry(path=path).resolve('600519')
+
+        registry = FakeRegistry(path=path)
+        assert registry.resolve('600519') == '贵州茅台'
+        assert registry.fetch_count == 0
+
+    def test_stale_dictionary_refreshes_in_background(self, tmp_path):
+        registry = FakeRegistry(path=str(tmp_path / 'names.json'), refresh_interval=0)
+        registry.resolve('600519')
+        time.sleep(0.01)
+
+        assert registry.resolve('300760') == '迈瑞医疗'
+        registry._refresh_thread.join(timeout=5)
+        assert registry.fetch_count == 2
+
+    def test_failed_fetch_backs_off(self, tmp_path):
+        class DownRegistry(FakeRegistry):
+            def _fetch(self):
+                self.fetch_count += 1
+                return {}
+
+        registry = DownRegistry(path=str(tmp_path / 'names.json'))
+        assert registry.resolve('600519') == ''
+        assert registry.resolve_names(['300760']) == {'300760': ''}
+        assert registry.fetch_count == 1
+
+        registry._failed_at -= registry.failure_backoff
+        registry.resolve('600519')
+        assert registry.fetch_count == 2
+
+    def test_exchange_lists_fallback(self, tmp_path, monkeypatch):
+        import types
+        import pandas as pd
+
+        def unavailable():
+            raise ConnectionError('远程主机关闭连接')
+
+        fake_ak = types.SimpleNamespace(
+            stock_info_a_code_name=unavailable,
+            stock_info_sh_name_code=lambda symbol: pd.DataFrame(
+                {'证券代码': ['600519'] if symbol == '主板A股' else ['688981'],
+                 '证券简称': ['贵州茅台'] if symbol == '主板A股' else ['中芯国际']}),
+            stock_info_sz_name_code=lambda symbol: pd.DataFrame({'A股代码': ['000001'], 'A股简称': ['平安银行']}),
+            stock_info_bj_name_code=lambda: pd.DataFrame({'证券代码': ['430047'], '证券简称': ['诺思兰德']}),
+        )
+        monkeypatch.setitem(sys.modules, 'akshare', fake_ak)
+
+        registry = StockNameRegistry(path=str(tmp_path / 'names.json'))
+        assert registry.resolve_names(['600519', '688981', 'SZ000001', '430047.BJ']) == {
+            '600519': '贵州茅台', '688981': '中芯国际', 'SZ000001': '平安银行', '430047.BJ': '诺思兰德'}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,104 @@
+"""
+链路追踪单元测试（离线）
+"""
+
+import pytest
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from akshare_service.infra import metrics, tracing
+from akshare_service.infra.cache import LocalCache
+from akshare_service.crawlers.eastmoney_api import EastMoneyAPI
+
+
+@pytest.fixture
+def exporter():
+    exporter = tracing.InMemoryExporter()
+    tracing.configure(exporter=exporter)
+    yield exporter
+    tracing.configure(mode='off')
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, body: bytes):
+        self.content = body
+
+    def raise_for_status(self):
+        pass
+
+
+class TestTracing:
+    """span 嵌套、属性和导出测试"""
+
+    def test_noop_by_default(self):
+        tracing.configure(mode='off')
+        with tracing.start_span('skill.test') as span:
+            span.set_attribute('code', '600519')
+        assert span is tracing.NOOP_SPAN
+
+    def test_fallback_chain_spans(self, exporter, tmp_path):
+        cache = LocalCache(cache_dir=str(tmp_path))
+
+        @metrics.track_skill('financial_summary')
+        def get_summary(code):
+            cache.get(f"financial_summary:{code}:5")
+            with pytest.raises(ValueError):
+                with metrics.track_source('financial_summary', 'eastmoney', code=code):
+                    raise ValueError('upstream down')
+            with metrics.track_source('financial_summary', 'sina', code=code):
+                pass
+            return {'code': code}
+
+        get_summary('600519')
+
+        spans = {span.name: span for span in exporter.spans}
+        root = spans['skill.financial_summary']
+        assert root.parent_id is None
+        assert root.attributes['code'] == '600519'
+        for name in ('cache.get', 'source.eastmoney', 'source.sina'):
+            assert spans[name].parent_id == root.span_id
+            assert spans[name].trace_id == root.trace_id
+        assert spans['cache.get'].attributes['outcome'] == 'miss'
+        assert spans['source.eastmoney'].status == 'ERROR'
+        assert spans['source.eastmoney'].attributes['code'] == '600519'
+        assert spans['source.sina'].attributes['outcome'] == 'success'
+
+    def test_eastmoney_request_span(self, exporter):
+        api = EastMoneyAPI()
+        body = json.dumps({'success': True, 'result': {'pages': 1, 'data': [{'A': 1}]}}).encode('utf-8')
+        api.session.get = lambda *args, **kwargs: FakeResponse(body)
+
+        assert api._request({'reportName': 'RPT_LICO_FN_CPD', 'pageNumber': 1})
+
+        span = exporter.spans[-1]
+        assert span.name == 'http.eastmoney'
+        assert span.attributes['bytes_received'] == len(body)
+        assert span.attributes['retry_count'] == 0
+        assert span.attributes['report'] == 'RPT_LICO_FN_CPD'
+
+    def test_json_exporter_and_tree(self, tmp_path):
+        path = str(tmp_path / 'traces.jsonl')
+        tracing.configure(exporter=tracing.JsonFileExporter(path))
+        try:
+            with tracing.start_span('skill.calculate_roic', {'code': '600519'}):
+                with tracing.start_span('source.eastmoney', {'code': '600519'}) as span:
+                    span.set_attribute('bytes_received', 2048)
+        finally:
+            tracing.configure(mode='off')
+
+        traces = tracing.load_traces(path)
+        assert len(traces) == 1
+        tree = tracing.format_trace(next(iter(traces.values())))
+        lines = tree.splitlines()
+        assert lines[0].startswith('skill.calculate_roic')
+        assert lines[1].startswith('  source.eastmoney')
+        assert 'bytes_received=2048' in lines[1]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])